@@ -36,11 +36,9 @@ if str(SRC_PATH) not in sys.path:
     sys.path.insert(0, str(SRC_PATH))
 
 from wbs_common import (
-    WBS_DEF, WBS_STATE,
-    load_definition, load_state, get_counts
+    load_definition, load_state, load_state_snapshot, get_counts, state_manager
 )
 from governed_platform.governance.engine import GovernanceEngine
-from governed_platform.governance.state_manager import StateManager
 
 
 class SubstrateGovernanceMCP:
@@ -53,7 +51,7 @@ class SubstrateGovernanceMCP:
     def _get_engine(self) -> GovernanceEngine:
         """Build governance engine from current state."""
         definition = load_definition()
-        sm = StateManager(WBS_STATE)
+        sm = state_manager()
         state = sm.load()
         # Ensure all packets exist in state
         for packet in definition.get("packets", []):
@@ -94,6 +92,28 @@ class SubstrateGovernanceMCP:
                     "required": []
                 }
             },
+            {
+                "name": "wbs_next",
+                "description": (
+                    "Get the best ready packet(s) for an agent, ordered by priority, critical-path "
+                    "slack and how much work they unblock. Use this to pick what to claim next."
+                ),
+                "inputSchema": {
+                    "type": "object",
+                    "properties": {
+                        "agent": {
+                            "type": "string",
+                            "description": "Agent identifier; packets it may not claim are skipped"
+                        },
+                        "limit": {
+                            "type": "integer",
+                            "description": "Number of packets to return (default 1)",
+                            "default": 1
+                        }
+                    },
+                    "required": []
+                }
+            },
             {
                 "name": "wbs_status",
                 "description": "Get current governance status showing all packets grouped by state (in_progress, pending, done, failed, blocked).",
@@ -245,6 +265,8 @@ class SubstrateGovernanceMCP:
         try:
             if name == "wbs_ready":
                 return self._tool_ready()
+            elif name == "wbs_next":
+                return self._tool_next(arguments.get("agent"), arguments.get("limit", 1))
             elif name == "wbs_status":
                 return self._tool_status(arguments.get("packet_id"))
             elif name == "wbs_claim":
@@ -284,31 +306,18 @@ class SubstrateGovernanceMCP:
     def _tool_ready(self) -> dict:
         """List ready packets."""
         engine = self._get_engine()
-        state = self._get_state()
-        definition = self._get_definition()
 
         ready_packets = []
-        deps = definition.get("dependencies", {})
-
-        for pkt in definition.get("packets", []):
-            pid = pkt["id"]
-            pkt_state = state.get("packets", {}).get(pid, {})
-            if pkt_state.get("status") != "pending":
-                continue
-            # Check dependencies
-            pkt_deps = deps.get(pid, [])
-            deps_met = all(
-                state.get("packets", {}).get(d, {}).get("status") == "done"
-                for d in pkt_deps
-            )
-            if deps_met:
-                ready_packets.append({
-                    "id": pid,
-                    "title": pkt.get("title", ""),
-                    "scope": pkt.get("scope", pkt.get("purpose", "")),
-                    "wbs_ref": pkt.get("wbs_ref", ""),
-                    "dependencies": pkt_deps
-                })
+        for entry in engine.ready().get("ready", []):
+            pid = entry["id"]
+            pkt = engine.graph.packet_by_id[pid]
+            ready_packets.append({
+                "id": pid,
+                "title": pkt.get("title", ""),
+                "scope": pkt.get("scope", pkt.get("purpose", "")),
+                "wbs_ref": pkt.get("wbs_ref", ""),
+                "dependencies": list(engine.graph.dependencies_of(pid))
+            })
 
         return {
             "ready_count": len(ready_packets),
@@ -316,9 +325,16 @@ class SubstrateGovernanceMCP:
             "hint": "Use wbs_claim to claim a packet before starting work"
         }
 
+    def _tool_next(self, agent: str = None, limit: int = 1) -> dict:
+        """Best ready packets for an agent."""
+        engine = self._get_engine()
+        result = engine.next_packets(agent=agent or None, limit=max(1, min(int(limit), 50)))
+        result["hint"] = "Use wbs_claim to claim the first packet"
+        return result
+
     def _tool_status(self, packet_id: str = None) -> dict:
         """Get current status."""
-        state = self._get_state()
+        state = load_state_snapshot()
         definition = self._get_definition()
 
         if packet_id:
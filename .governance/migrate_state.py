@@ -1,7 +1,6 @@
 #!/usr/bin/env python3
 """State migration runner for governed platform state files."""
 
-import json
 import sys
 from pathlib import Path
 
@@ -11,6 +10,11 @@ if str(SRC) not in sys.path:
     sys.path.insert(0, str(SRC))
 
 from governed_platform.governance.migrations.runner import migrate_state, LATEST_VERSION
+from governed_platform.governance.serialization import (
+    decode_document,
+    detect_format,
+    encode_document,
+)
 
 
 def main():
@@ -19,11 +23,12 @@ def main():
         print(f"State file not found: {target}")
         sys.exit(1)
 
-    state = json.loads(target.read_text())
+    raw = target.read_bytes()
+    state = decode_document(raw)
     before = state.get("version", "legacy")
     migrated = migrate_state(state)
     after = migrated.get("version", "unknown")
-    target.write_text(json.dumps(migrated, indent=2) + "\n")
+    target.write_bytes(encode_document(migrated, detect_format(raw)))
     print(f"Migrated {target}: {before} -> {after} (latest={LATEST_VERSION})")
 
 
@@ -14,6 +14,8 @@ from datetime import datetime
 from pathlib import Path
 from typing import Any, Callable, Dict, List, Tuple
 
+from governed_platform.governance.graph_cycles import dependency_cycles, find_dependency_cycle
+
 
 def _split_list(value: Any) -> List[str]:
     if isinstance(value, list):
@@ -64,32 +66,7 @@ def normalize_packet_id(raw: Any, area_index: int, packet_index: int, used: set)
 
 
 def detect_cycle(dependencies: Dict[str, List[str]]) -> List[str]:
-    visited = set()
-    rec_stack = set()
-    path: List[str] = []
-
-    def dfs(node: str) -> List[str]:
-        visited.add(node)
-        rec_stack.add(node)
-        path.append(node)
-        for neighbor in dependencies.get(node, []):
-            if neighbor not in visited:
-                found = dfs(neighbor)
-                if found:
-                    return found
-            elif neighbor in rec_stack:
-                i = path.index(neighbor)
-                return path[i:] + [neighbor]
-        path.pop()
-        rec_stack.remove(node)
-        return []
-
-    for node in dependencies:
-        if node not in visited:
-            cycle = dfs(node)
-            if cycle:
-                return cycle
-    return []
+    return find_dependency_cycle(dependencies)
 
 
 def _normalize_dependency_token(token: str, aliases: Dict[str, str]) -> str:
@@ -550,8 +527,7 @@ def validate_definition(definition: Dict[str, Any]) -> List[str]:
                 )
             normalized_deps[pid].append(dep_id)
 
-    cycle = detect_cycle(normalized_deps)
-    if cycle:
+    for cycle in dependency_cycles(normalized_deps):
         errors.append(
             "Dependency cycle detected: "
             + " -> ".join(cycle)
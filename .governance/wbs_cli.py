@@ -9,22 +9,27 @@ import sys
 import csv
 import os
 import subprocess
+import re
 from pathlib import Path
 from datetime import datetime
 from typing import Optional
 
 from wbs_common import (
-    GOV, WBS_DEF, WBS_STATE,
+    GOV, STORAGE_CONFIG, WBS_DEF, WBS_STATE,
     green, red, yellow, bold, dim,
-    load_definition, load_state, get_counts
+    load_definition, load_state, save_state, get_counts, iter_log, log_tail,
+    refresh_ready_queue, state_exists, state_manager, state_storage, storage_config,
+    uses_json_state,
 )
 
 SRC_PATH = GOV.parent / "src"
 if str(SRC_PATH) not in sys.path:
     sys.path.insert(0, str(SRC_PATH))
 
+from governed_platform.determinism.fingerprint import fingerprint_json
+from governed_platform.governance.dependency_index import dependency_index
 from governed_platform.governance.engine import GovernanceEngine
-from governed_platform.governance.file_lock import atomic_write_json
+from governed_platform.governance.file_lock import atomic_write_json, file_lock
 from governed_platform.governance.git_ledger import (
     GIT_MODE_ADVISORY,
     GIT_MODE_DISABLED,
@@ -46,13 +51,37 @@ from governed_platform.governance.git_ledger import (
     run_governance_auto_commit,
     save_git_governance_config,
 )
+from governed_platform.governance.graph_cycles import dependency_cycles, find_dependency_cycle
+from governed_platform.governance.log_archive import (
+    archive_dir_for,
+    archive_manifest,
+    archive_state_log,
+    archived_count,
+    find_archived_event,
+    iter_archived_entries,
+    restore_log_archive,
+    snapshot_log_archive,
+)
 from governed_platform.governance.log_integrity import (
     LOG_MODE_HASH_CHAIN,
     LOG_MODE_PLAIN,
     normalize_log_mode,
-    verify_log_integrity,
 )
-from governed_platform.governance.state_manager import StateManager
+from governed_platform.governance.log_checkpoints import checkpoint_path_for, verify_state_log
+from governed_platform.governance.merkle import (
+    consistency_proof_payload,
+    inclusion_proof_for_event,
+    load_merkle_tree,
+    merkle_path_for,
+)
+from governed_platform.governance.log_segments import (
+    LOG_STORAGE_SEGMENTED,
+    normalize_log_storage,
+    restore_log_segments,
+    segment_dir_for,
+    snapshot_log_segments,
+)
+from governed_platform.governance.ready_queue import ready_packet_ids
 from governed_platform.governance.residual_risks import (
     add_risks,
     get_risk,
@@ -64,6 +93,13 @@ from governed_platform.governance.residual_risks import (
     update_risk_status,
 )
 from governed_platform.governance.schema_registry import SchemaRegistry
+from governed_platform.governance.serialization import (
+    STATE_FORMAT_KEY,
+    detect_format,
+    encode_document,
+    normalize_state_format,
+)
+from governed_platform.governance.state_store import state_companion_paths, state_revision
 from governed_platform.governance.status import (
     PACKET_STATUS_VALUES,
     normalize_packet_status,
@@ -80,6 +116,7 @@ from governed_platform.governance.supervisor import (
     normalize_enforcement_mode,
     save_agent_registry,
 )
+from governed_platform.governance.topo_order import load_topo_order, save_topo_order
 from planner import (
     build_definition as build_planned_definition,
     collect_import_review_warnings,
@@ -89,7 +126,8 @@ from planner import (
     validate_definition as validate_planned_definition,
     write_definition as write_planned_definition,
 )
-from substrate_core import ActorContext, FileStorage, PacketEngine
+from substrate_core import ActorContext, PacketEngine
+from substrate_core.storage import STORAGE_BACKEND_ENV, build_storage, normalize_storage_backend
 
 try:
     from jsonschema import Draft202012Validator
@@ -197,15 +235,10 @@ def ensure_state_shape(state: dict) -> dict:
     return normalize_packet_status_map(state)
 
 
-def save_state(state: dict):
-    """Save state with cross-platform lock + atomic replace."""
-    atomic_write_json(WBS_STATE, state)
-
-
 def governance_engine() -> GovernanceEngine:
     """Build governance engine from current definition and state path."""
     definition = load_definition()
-    sm = StateManager(WBS_STATE)
+    sm = state_manager()
     state = sm.load()
     changed = False
     # Ensure all packets in definition exist in state
@@ -227,8 +260,8 @@ def governance_engine() -> GovernanceEngine:
 
 
 def packet_engine() -> PacketEngine:
-    """Build substrate core packet engine with file-backed storage."""
-    return PacketEngine(storage=FileStorage(WBS_STATE), definition=load_definition())
+    """Build substrate core packet engine with the configured storage backend."""
+    return PacketEngine(storage=state_storage(), definition=load_definition())
 
 
 def log_event(state: dict, packet_id: str, event: str, agent: str = None, notes: str = None):
@@ -244,29 +277,7 @@ def log_event(state: dict, packet_id: str, event: str, agent: str = None, notes:
 
 def detect_circular(dependencies: dict) -> Optional[list]:
     """Detect circular dependencies. Returns cycle path if found."""
-    visited, rec_stack, path = set(), set(), []
-
-    def dfs(node):
-        visited.add(node)
-        rec_stack.add(node)
-        path.append(node)
-        for neighbor in dependencies.get(node, []):
-            if neighbor not in visited:
-                result = dfs(neighbor)
-                if result:
-                    return result
-            elif neighbor in rec_stack:
-                return path[path.index(neighbor):] + [neighbor]
-        path.pop()
-        rec_stack.remove(node)
-        return None
-
-    for node in dependencies:
-        if node not in visited:
-            result = dfs(node)
-            if result:
-                return result
-    return None
+    return find_dependency_cycle(dependencies) or None
 
 
 def cmd_init(wbs_path: str) -> bool:
@@ -287,9 +298,10 @@ def cmd_init(wbs_path: str) -> bool:
 
     # Check for circular dependencies
     deps = definition.get("dependencies", {})
-    cycle = detect_circular(deps)
-    if cycle:
+    cycles = dependency_cycles(deps)
+    for cycle in cycles:
         print(red(f"Circular dependency: {' -> '.join(cycle)}"))
+    if cycles:
         return False
 
     # Copy definition to .governance/wbs.json if different path
@@ -299,6 +311,9 @@ def cmd_init(wbs_path: str) -> bool:
             f.write("\n")
 
     # Initialize or update state
+    if not state_exists():
+        # Checkpoints from a previous state would not match the fresh log.
+        checkpoint_path_for(WBS_STATE).unlink(missing_ok=True)
     state = ensure_state_shape(load_state())
 
     # Preserve existing packet states, add new ones
@@ -560,8 +575,6 @@ def cmd_git_governance_autocommit(value: str) -> bool:
 
 def cmd_git_verify_ledger(strict: bool = False) -> bool:
     """Verify git linkage integrity recorded on lifecycle log entries."""
-    state = ensure_state_shape(load_state())
-    entries = state.get("log", [])
     issues = []
     warnings = []
 
@@ -570,9 +583,7 @@ def cmd_git_verify_ledger(strict: bool = False) -> bool:
     checked = 0
     linked = 0
     warning_count = 0
-    for idx, entry in enumerate(entries):
-        if not isinstance(entry, dict):
-            continue
+    for idx, entry in enumerate(iter_log()):
         has_git_fields = any(str(key).startswith("git_") for key in entry.keys())
         if not has_git_fields:
             continue
@@ -768,16 +779,45 @@ def cmd_git_branch_close(packet_id: str, agent: str, base_branch: str = "main",
 
 
 def _snapshot_state_bytes():
-    if WBS_STATE.exists():
-        return WBS_STATE.read_bytes()
-    return None
+    if not uses_json_state():
+        return json.dumps(load_state()).encode() if state_exists() else None
+    if not WBS_STATE.exists():
+        return None
+    # Shared lock: the document and its segment/archive listings must come from one write.
+    with file_lock(WBS_STATE, shared=True):
+        return {
+            "state": WBS_STATE.read_bytes(),
+            "segments": snapshot_log_segments(WBS_STATE),
+            "archive": snapshot_log_archive(WBS_STATE),
+        }
 
 
 def _restore_state_bytes(snapshot) -> None:
+    if not uses_json_state():
+        if snapshot is not None:
+            # The snapshot carries the revision it was taken at; rebase it onto
+            # the stored one so the backend's revision check accepts the rollback.
+            state = json.loads(snapshot)
+            state["revision"] = state_revision(load_state())
+            save_state(state)
+        return
     if snapshot is None:
         WBS_STATE.unlink(missing_ok=True)
     else:
-        WBS_STATE.write_bytes(snapshot)
+        WBS_STATE.write_bytes(snapshot["state"])
+        restore_log_segments(WBS_STATE, snapshot["segments"])
+        restore_log_archive(WBS_STATE, snapshot["archive"])
+
+
+def _stage_files(config: dict) -> list:
+    """Configured stage files, plus the state document's companion directories when it is staged."""
+    files = list(config.get("stage_files", []))
+    if str(WBS_STATE.relative_to(GOV.parent)) in files:
+        for path in state_companion_paths(WBS_STATE):
+            rel = str(path.relative_to(GOV.parent))
+            if path.exists() and rel not in files:
+                files.append(rel)
+    return files
 
 
 def _annotate_git_link(
@@ -867,7 +907,7 @@ def _run_lifecycle_with_git(
         packet_id=packet_id,
         action=action,
         actor=agent or "system",
-        stage_files=config.get("stage_files", []),
+        stage_files=_stage_files(config),
         protocol_version=config.get("commit_protocol_version", GIT_PROTOCOL_VERSION),
         area_id=area_id,
         closeout_area=closeout_area,
@@ -914,16 +954,6 @@ def _run_lifecycle_with_git(
     return True, f"{msg} (Git-native advisory warning: {commit_msg})", data
 
 
-def check_deps_met(packet_id: str, definition: dict, state: dict) -> tuple:
-    """Check if all dependencies are done. Returns (ready, blocking_id)."""
-    deps = definition.get("dependencies", {}).get(packet_id, [])
-    for dep_id in deps:
-        dep_state = state["packets"].get(dep_id, {})
-        if normalize_runtime_status(dep_state.get("status")) != "done":
-            return False, dep_id
-    return True, None
-
-
 def cmd_claim(packet_id: str, agent: str) -> bool:
     """Claim a packet."""
     ok, msg, data = _run_lifecycle_with_git(
@@ -1291,17 +1321,13 @@ def cmd_agent_register(agent_id: str, agent_type: str, capabilities_csv: str) ->
 
 def cmd_ready():
     """List packets ready to claim."""
-    definition = load_definition()
+    index = dependency_index(load_definition())
     state = ensure_state_shape(load_state())
 
-    packets = definition.get("packets", [])
     ready = []
-    for pkt in packets:
-        pid = pkt["id"]
-        if normalize_runtime_status(state["packets"].get(pid, {}).get("status")) == "pending":
-            ok, _ = check_deps_met(pid, definition, state)
-            if ok:
-                ready.append({"id": pkt["id"], "wbs_ref": pkt["wbs_ref"], "title": pkt["title"]})
+    for pid in ready_packet_ids(state, index):
+        pkt = index.packet_by_id[pid]
+        ready.append({"id": pkt["id"], "wbs_ref": pkt["wbs_ref"], "title": pkt["title"]})
 
     if output_json({"ready": ready}):
         return
@@ -1525,8 +1551,8 @@ def cmd_context(
 
 def cmd_log(limit: int = 20):
     """Show recent activity."""
-    state = ensure_state_shape(load_state())
-    entries = state.get("log", [])[-limit:]
+    # Streams the log (and only the newest archive segments needed) instead of loading state.
+    entries = log_tail(limit)
 
     if output_json({"log": entries}):
         return
@@ -1543,6 +1569,39 @@ def cmd_log(limit: int = 20):
     print()
 
 
+def cmd_as_of(target: str, packet_id: str = "") -> bool:
+    """Show packet state replayed from the log at a timestamp or just after an event id."""
+    target = (target or "").strip()
+    is_event = bool(re.match(r"^evt-\d+$", target))
+    result = packet_engine().as_of(
+        timestamp=None if is_event else target,
+        event_id=target if is_event else None,
+        packet_id=packet_id or None,
+    )
+    if not result.ok:
+        print(red(result.message))
+        return False
+    payload = result.payload
+    if output_json(payload):
+        return True
+
+    checkpoint = payload["checkpoint"]
+    source = f"checkpoint {checkpoint}" if checkpoint is not None else "start of log"
+    print(
+        f"\nState as of {target} (log position {payload['position']}, "
+        f"replayed {payload['replayed']} events from {source}):"
+    )
+    print("-" * 80)
+    print(f"{'Packet':<14} {'Status':<12} {'Assigned':<14} {'Notes'}")
+    print("-" * 80)
+    for pid, pkt in sorted(payload["packets"].items()):
+        notes = (pkt.get("notes") or "")[:30]
+        assigned = pkt.get("assigned_to") or "-"
+        print(f"{pid:<14} {pkt.get('status', 'pending'):<12} {assigned:<14} {notes}")
+    print()
+    return True
+
+
 def cmd_risk_list(packet_id: str = "", status: str = "", limit: int = 100) -> bool:
     """List residual risks with optional packet/status filters."""
     if status:
@@ -1748,23 +1807,147 @@ def cmd_log_mode(mode: str) -> bool:
     return True
 
 
-def cmd_verify_log() -> bool:
-    """Verify lifecycle log hash chain integrity."""
+def cmd_log_storage(mode: Optional[str] = None) -> bool:
+    """Show or switch lifecycle log storage (inline or segmented)."""
+    state = ensure_state_shape(load_state())
+    current = normalize_log_storage(state.get("log_storage"))
+    if mode is None:
+        result = {
+            "storage": current,
+            "events": len(state.get("log", [])),
+            "segments": len((state.get("log_segments") or {}).get("segments", [])),
+            "segment_dir": str(segment_dir_for(WBS_STATE)),
+        }
+        if output_json(result):
+            return True
+        print(f"Log storage: {current} ({result['events']} events)")
+        if current == LOG_STORAGE_SEGMENTED:
+            print(f"Segments: {result['segments']} in {result['segment_dir']}")
+        return True
+
+    try:
+        normalized = normalize_log_storage(mode, strict=True)
+    except ValueError as e:
+        print(red(str(e)))
+        return False
+
+    state["log_storage"] = normalized
+    save_state(state)
+    if normalized == LOG_STORAGE_SEGMENTED:
+        print(
+            green(
+                f"Log storage set: segmented ({len(state.get('log', []))} events "
+                f"in {segment_dir_for(WBS_STATE)})"
+            )
+        )
+    else:
+        print(green("Log storage set: inline"))
+    return True
+
+
+def cmd_state_format(fmt: Optional[str] = None) -> bool:
+    """Show or convert the on-disk state encoding (json, json-compact, binary)."""
+    if not uses_json_state():
+        print(
+            red("state-format applies to the JSON state file; the configured backend is not json")
+        )
+        return False
+    state = ensure_state_shape(load_state())
+    current = normalize_state_format(state.get(STATE_FORMAT_KEY))
+    if fmt is None:
+        result = {
+            "format": current,
+            "detected": detect_format(WBS_STATE.read_bytes()),
+            "bytes": WBS_STATE.stat().st_size,
+        }
+        if output_json(result):
+            return True
+        print(f"State format: {current} ({result['bytes']} bytes on disk)")
+        return True
+
+    try:
+        normalized = normalize_state_format(fmt, strict=True)
+    except ValueError as e:
+        print(red(str(e)))
+        return False
+
+    before = WBS_STATE.stat().st_size
+    state[STATE_FORMAT_KEY] = normalized
+    save_state(state)
+    print(green(f"State format set: {normalized} ({before} -> {WBS_STATE.stat().st_size} bytes)"))
+    return True
+
+
+def cmd_storage_backend(backend: Optional[str] = None) -> bool:
+    """Show or switch the state storage backend (json or sqlite), migrating state."""
+    config = storage_config()
+    if backend is None:
+        if output_json(config):
+            return True
+        print(f"Storage backend: {config['backend']}")
+        if config["backend"] == "sqlite":
+            print(f"SQLite path: {build_storage(WBS_STATE, config).db_path}")
+        return True
+
+    try:
+        target = normalize_storage_backend(backend, strict=True)
+    except ValueError as e:
+        print(red(str(e)))
+        return False
+    if os.environ.get(STORAGE_BACKEND_ENV):
+        print(
+            red(f"{STORAGE_BACKEND_ENV} is set; unset it before switching the configured backend")
+        )
+        return False
+    if target == config["backend"]:
+        print(f"Storage backend already {target}")
+        return True
+
+    state = ensure_state_shape(load_state())
+    target_config = dict(config, backend=target)
+    storage = build_storage(WBS_STATE, target_config)
+    # The revision counts writes to the source backend; rebase it onto the
+    # target's so its revision check accepts the migrated document.
+    state["revision"] = state_revision(storage.read_state())
+    storage.write_state(state)
+    STORAGE_CONFIG.write_text(json.dumps(target_config, indent=2) + "\n")
+    print(
+        green(
+            f"Storage backend set: {target} ({len(state.get('packets', {}))} packets, "
+            f"{len(state.get('log', []))} events migrated)"
+        )
+    )
+    return True
+
+
+def cmd_verify_log(full: bool = False, workers: int = 1) -> bool:
+    """Verify lifecycle log hash chain integrity (incremental from checkpoints unless full)."""
     state = ensure_state_shape(load_state())
     entries = state.get("log", [])
-    valid, issues = verify_log_integrity(entries)
+    verification = verify_state_log(WBS_STATE, state, full=full, workers=workers)
+    valid, issues, head = verification["valid"], verification["issues"], verification["head"]
     result = {
         "valid": valid,
         "events": len(entries),
-        "hashed_events": sum(1 for e in entries if isinstance(e, dict) and e.get("hash")),
+        "archived_events": archived_count(state),
+        "hashed_events": head["index"],
         "mode": state.get("log_integrity_mode", LOG_MODE_PLAIN),
         "issues": issues,
+        "full": full,
+        "verified_from": verification["verified_from"],
     }
     if output_json(result):
         return valid
 
     if valid:
-        print(green(f"Log integrity OK: {result['hashed_events']} hashed events across {result['events']} total events"))
+        scope = "full audit" if full else f"verified from event {result['verified_from']}"
+        total = result["events"] + result["archived_events"]
+        print(
+            green(
+                f"Log integrity OK: {result['hashed_events']} hashed events "
+                f"across {total} total events ({scope})"
+            )
+        )
         return True
 
     print(red(f"Log integrity FAILED ({len(issues)} issues):"))
@@ -1773,31 +1956,164 @@ def cmd_verify_log() -> bool:
     return False
 
 
-def cmd_next():
-    """Show recommended next action."""
+def _log_merkle_tree(state: dict):
+    """Merkle tree over archived plus in-state log entries."""
+    tree, _ = load_merkle_tree(
+        merkle_path_for(WBS_STATE),
+        state.get("log", []),
+        offset=archived_count(state),
+        prefix_loader=lambda: [entry for _, entry in iter_archived_entries(WBS_STATE, state)],
+    )
+    return tree
+
+
+def cmd_log_archive(
+    older_than_days: Optional[float] = None,
+    keep_last: Optional[int] = None,
+    codec: Optional[str] = None,
+    save_policy: bool = False,
+    dry_run: bool = False,
+) -> bool:
+    """Move old lifecycle log entries into compressed archive segments (or show archive status)."""
+    if not uses_json_state():
+        print(red("log-archive applies to the JSON state file; the configured backend is not json"))
+        return False
+    state = ensure_state_shape(load_state())
+    manifest = archive_manifest(state)
+    policy = manifest["policy"]
+    has_rule = older_than_days is not None or keep_last is not None
+    if not has_rule and policy.get("older_than_days") is None and policy.get("keep_last") is None:
+        result = {
+            "archived_events": manifest["entries"],
+            "segments": [
+                {key: seg.get(key) for key in ("name", "codec", "count", "from", "to")}
+                for seg in manifest["segments"]
+            ],
+            "policy": policy,
+            "archive_dir": str(archive_dir_for(WBS_STATE)),
+        }
+        if output_json(result):
+            return True
+        print(
+            f"Archived events: {result['archived_events']} in {len(result['segments'])} "
+            f"segments ({result['archive_dir']})"
+        )
+        for seg in result["segments"]:
+            print(f"  {seg['name']}: {seg['count']} events, {seg['from']} .. {seg['to']}")
+        print("No archive policy set; use --older-than-days n and/or --keep n")
+        return True
+
+    try:
+        result = archive_state_log(
+            WBS_STATE,
+            older_than_days=older_than_days,
+            keep_last=keep_last,
+            codec=codec,
+            save_policy=save_policy,
+            dry_run=dry_run,
+        )
+    except ValueError as e:
+        print(red(str(e)))
+        return False
+    if output_json(result):
+        return True
+    if dry_run:
+        print(f"Would archive {result['archived']} events ({result['codec']})")
+    elif result["segment"]:
+        print(
+            green(
+                f"Archived {result['archived']} events to {result['segment']['name']} "
+                f"({result['archived_total']} archived in total)"
+            )
+        )
+    else:
+        print("Nothing to archive")
+    if save_policy and not dry_run:
+        print(green(f"Archive policy saved: {result['policy']}"))
+    return True
+
+
+def cmd_log_proof(event_id: str, size: Optional[int] = None) -> bool:
+    """Print a Merkle inclusion proof for one lifecycle log event."""
+    state = ensure_state_shape(load_state())
+    entries = state.get("log", [])
+    tree = _log_merkle_tree(state)
+    try:
+        try:
+            result = inclusion_proof_for_event(
+                tree, entries, event_id, size, offset=archived_count(state)
+            )
+        except KeyError:
+            position, entry = find_archived_event(WBS_STATE, state, event_id)
+            result = inclusion_proof_for_event(tree, [entry], event_id, size, offset=position)
+    except KeyError:
+        print(red(f"Error: Event {event_id} not found in log"))
+        return False
+    except ValueError as exc:
+        print(red(f"Error: {exc}"))
+        return False
+    if output_json(result):
+        return True
+
+    print(
+        f"Event {event_id} at log position {result['position']} (tree size {result['tree_size']})"
+    )
+    print(f"  leaf: {result['leaf']}")
+    print(f"  root: {result['root']}")
+    print(f"  proof ({len(result['proof'])} hashes):")
+    for digest in result["proof"]:
+        print(f"    {digest}")
+    return True
+
+
+def cmd_log_consistency(first: int, second: Optional[int] = None) -> bool:
+    """Print a Merkle consistency proof between two log tree sizes."""
+    state = ensure_state_shape(load_state())
+    tree = _log_merkle_tree(state)
+    try:
+        result = consistency_proof_payload(tree, first, second)
+    except ValueError as exc:
+        print(red(f"Error: {exc}"))
+        return False
+    if output_json(result):
+        return True
+
+    print(f"Tree size {result['first_size']} -> {result['second_size']}")
+    print(f"  first root:  {result['first_root']}")
+    print(f"  second root: {result['second_root']}")
+    print(f"  proof ({len(result['proof'])} hashes):")
+    for digest in result["proof"]:
+        print(f"    {digest}")
+    return True
+
+
+def cmd_next(agent: str = ""):
+    """Show recommended next action (for `agent`, the best packet it may claim)."""
     definition = load_definition()
     state = ensure_state_shape(load_state())
 
     # Check for in-progress
     for pkt in definition.get("packets", []):
         pid = pkt["id"]
-        if normalize_runtime_status(state["packets"].get(pid, {}).get("status")) == "in_progress":
-            agent = state["packets"][pid].get("assigned_to", "your-name")
+        pstate = state["packets"].get(pid, {})
+        if normalize_runtime_status(pstate.get("status")) == "in_progress":
+            owner = pstate.get("assigned_to", "your-name")
+            if agent and owner != agent:
+                continue
             print("Next action:")
-            print(f"  python3 .governance/wbs_cli.py done {pid} {agent} \"notes\"")
+            print(f"  python3 .governance/wbs_cli.py done {pid} {owner} \"notes\"")
             print(f"Reason: {pid} is in progress")
             return
 
-    # Check for ready
-    for pkt in definition.get("packets", []):
-        pid = pkt["id"]
-        if normalize_runtime_status(state["packets"].get(pid, {}).get("status")) == "pending":
-            ok, _ = check_deps_met(pid, definition, state)
-            if ok:
-                print("Next action:")
-                print(f"  python3 .governance/wbs_cli.py claim {pid} your-name")
-                print(f"Reason: {pid} is ready ({pkt['title']})")
-                return
+    # Check for ready: highest priority, then least critical-path slack, then widest fan-out
+    for pkt in governance_engine().next_packets(agent=agent or None).get("next", []):
+        print("Next action:")
+        print(f"  python3 .governance/wbs_cli.py claim {pkt['id']} {agent or 'your-name'}")
+        print(
+            f"Reason: {pkt['id']} is ready ({pkt['title']}; priority {pkt['priority']}, "
+            f"slack {pkt['slack']}, unblocks {pkt['fan_out']})"
+        )
+        return
 
     # Check completion
     done = sum(1 for p in state["packets"].values() if normalize_runtime_status(p.get("status")) == "done")
@@ -1881,7 +2197,7 @@ def cmd_closeout_l2(area_id: str, agent: str, assessment_path: str, notes: str =
 
 def require_state():
     """Check state file exists."""
-    if not WBS_STATE.exists():
+    if not state_exists():
         print(red("Not initialized. Run: python3 .governance/wbs_cli.py init .governance/wbs.json"))
         return False
     return True
@@ -1972,22 +2288,30 @@ def cmd_add_dep(packet_id: str, depends_on: str) -> bool:
         return False
 
     deps = defn.setdefault("dependencies", {})
-    pkt_deps = deps.setdefault(packet_id, [])
-
-    if depends_on in pkt_deps:
+    if depends_on in deps.get(packet_id, []):
         print(yellow(f"Dependency already exists"))
         return True
+    previous = fingerprint_json(defn)
 
-    pkt_deps.append(depends_on)
-
-    # Check for circular dependency
-    cycle = detect_circular(deps)
+    # Check for circular dependency: only the packets between the two in the
+    # maintained topological order are searched.
+    topo = load_topo_order(WBS_DEF, defn)
+    if topo is not None:
+        cycle = topo.add_dependency(packet_id, depends_on)
+    else:
+        pkt_deps = deps.setdefault(packet_id, [])
+        pkt_deps.append(depends_on)
+        cycle = detect_circular(deps)
+        if cycle:
+            pkt_deps.remove(depends_on)
     if cycle:
-        pkt_deps.remove(depends_on)
         print(red(f"Would create circular dependency: {' -> '.join(cycle)}"))
         return False
 
     save_definition(defn)
+    if topo is not None:
+        save_topo_order(WBS_DEF, topo)
+    refresh_ready_queue(defn, previous, [packet_id])
     print(green(f"Added dependency: {packet_id} depends on {depends_on}"))
     return True
 
@@ -2151,8 +2475,7 @@ def cmd_validate(strict: bool = False) -> bool:
 
     # Check for circular dependencies
     if isinstance(deps, dict):
-        cycle = detect_circular(deps)
-        if cycle:
+        for cycle in dependency_cycles(deps):
             errors.append(f"Circular dependency: {' -> '.join(cycle)}")
 
     # Check all packets have valid areas
@@ -2441,22 +2764,40 @@ def cmd_graph(output_path: str = ""):
 
 def cmd_export(kind: str, out_path: str) -> bool:
     """Export state/log data for external analysis."""
-    state = ensure_state_shape(load_state())
     kind = (kind or "").strip().lower()
     out = Path(out_path).expanduser()
     if not out.is_absolute():
         out = GOV.parent / out
     out.parent.mkdir(parents=True, exist_ok=True)
 
+    if kind in ("state-json", "state-pretty"):
+        state = ensure_state_shape(load_state())
+
     if kind == "state-json":
         payload = {"packets": state.get("packets", {}), "area_closeouts": state.get("area_closeouts", {})}
         out.write_text(json.dumps(payload, indent=2) + "\n")
         print(green(f"Exported state JSON: {out}"))
         return True
 
+    if kind == "state-pretty":
+        # Full state document as pretty JSON, whatever the on-disk encoding.
+        out.write_bytes(encode_document(state))
+        print(green(f"Exported state document: {out}"))
+        return True
+
     if kind == "log-json":
-        payload = {"log": state.get("log", [])}
-        out.write_text(json.dumps(payload, indent=2) + "\n")
+        # Entries are streamed through one at a time; same layout as json.dumps(indent=2).
+        count = 0
+        with open(out, "w") as f:
+            f.write('{\n  "log": [')
+            for entry in iter_log():
+                f.write(
+                    ("," if count else "")
+                    + "\n    "
+                    + json.dumps(entry, indent=2).replace("\n", "\n    ")
+                )
+                count += 1
+            f.write("\n  ]\n}\n" if count else "]\n}\n")
         print(green(f"Exported log JSON: {out}"))
         return True
 
@@ -2465,7 +2806,7 @@ def cmd_export(kind: str, out_path: str) -> bool:
         with open(out, "w", newline="") as f:
             writer = csv.DictWriter(f, fieldnames=fields)
             writer.writeheader()
-            for entry in state.get("log", []):
+            for entry in iter_log():
                 writer.writerow({k: entry.get(k) for k in fields})
         print(green(f"Exported log CSV: {out}"))
         return True
@@ -2476,7 +2817,9 @@ def cmd_export(kind: str, out_path: str) -> bool:
         print(green(f"Exported residual risk JSON: {out}"))
         return True
 
-    print(red("Unknown export type. Use: state-json | log-json | log-csv | risk-json"))
+    print(
+        red("Unknown export type. Use: state-json | state-pretty | log-json | log-csv | risk-json")
+    )
     return False
 
 
@@ -2491,12 +2834,15 @@ def print_help():
     print("  status                Full project status")
     print("  briefing              Session bootstrap summary")
     print("  ready                 List claimable packets")
-    print("  next                  Recommended next action")
+    print("  next [agent]          Recommended next action (best packet by priority/critical path)")
     print("  scope <id>            Packet details")
     print("  context <id>          Packet context bundle (deps/history/handovers/files)")
     print("  progress              Summary counts")
     print("  graph [--output file] ASCII dependency graph (+ optional Graphviz DOT export)")
-    print("  export <type> <path>  Export state/log/risk data (state-json|log-json|log-csv|risk-json)")
+    print(
+        "  export <type> <path>  Export state/log/risk data "
+        "(state-json|state-pretty|log-json|log-csv|risk-json)"
+    )
     print("  validate [--strict]   Check WBS structure (strict enforces packet contract)")
     print("  template-validate     Run template integrity checks")
     print("  validate-packet [path] Validate packets against packet schema")
@@ -2511,13 +2857,26 @@ def print_help():
     print("  resume <id> <agent>   Resume active handover and assign owner")
     print("  stale <minutes>       Find stuck packets")
     print("  log [limit]           Recent activity")
+    print(
+        "  as-of <timestamp|event_id> [packet_id] Packet state replayed from the log at that point"
+    )
     print("  risk-list [--packet id] [--status status] [--limit n] List residual risks")
     print("  risk-show <risk_id>   Show one residual risk entry")
     print("  risk-add <packet_id> <actor> <description> [--likelihood v] [--impact v] [--confidence v] [--notes text]")
     print("  risk-update-status <risk_id> <status> <actor> [notes] Update risk status")
     print("  risk-summary          Aggregate residual risk counts")
     print("  log-mode <mode>       Set log integrity mode (plain|hash-chain)")
-    print("  verify-log            Verify tamper-evident log chain")
+    print("  log-storage [mode]    Show or set log storage (inline|segmented)")
+    print("  state-format [fmt]    Show or convert state encoding (json|json-compact|binary)")
+    print("  storage-backend [name] Show or switch state backend (json|sqlite)")
+    print("  verify-log [--full] [--workers n] Verify tamper-evident log chain")
+    print("                        (incremental from checkpoints)")
+    print("  log-archive [--older-than-days n] [--keep n] [--codec gzip|lzma]")
+    print("              [--save-policy] [--dry-run]")
+    print("                        Move old log entries to compressed archive segments")
+    print("                        (no args: status)")
+    print("  log-proof <event_id> [--size n]    Merkle inclusion proof for one log event")
+    print("  log-consistency <first> [second]   Merkle consistency proof between tree sizes")
     print()
     print("  add-area <id> <title> [desc]       Add work area")
     print("  add-packet <id> <area> <title>     Add packet (scope via stdin or -s)")
@@ -2698,7 +3057,7 @@ def main():
         elif cmd == "ready":
             if require_state(): cmd_ready()
         elif cmd == "next":
-            if require_state(): cmd_next()
+            if require_state(): cmd_next(args[1] if len(args) > 1 else "")
         elif cmd == "progress":
             if require_state(): cmd_progress()
         elif cmd == "scope":
@@ -2905,6 +3264,12 @@ def main():
         elif cmd == "log":
             limit = int(args[1]) if len(args) > 1 else 20
             if require_state(): cmd_log(limit)
+        elif cmd == "as-of":
+            if len(args) < 2:
+                print("Usage: wbs_cli.py as-of <timestamp|event_id> [packet_id]")
+                sys.exit(1)
+            if require_state() and not cmd_as_of(args[1], args[2] if len(args) > 2 else ""):
+                sys.exit(1)
         elif cmd == "risk-list":
             packet_id = ""
             status = ""
@@ -2984,8 +3349,69 @@ def main():
                 sys.exit(1)
             if require_state() and not cmd_log_mode(args[1]):
                 sys.exit(1)
+        elif cmd == "log-storage":
+            if require_state() and not cmd_log_storage(args[1] if len(args) > 1 else None):
+                sys.exit(1)
+        elif cmd == "state-format":
+            if require_state() and not cmd_state_format(args[1] if len(args) > 1 else None):
+                sys.exit(1)
+        elif cmd == "storage-backend":
+            if require_state() and not cmd_storage_backend(args[1] if len(args) > 1 else None):
+                sys.exit(1)
         elif cmd == "verify-log":
-            if require_state() and not cmd_verify_log():
+            workers = 1
+            if "--workers" in args:
+                idx = args.index("--workers")
+                if idx + 1 >= len(args) or not args[idx + 1].isdigit():
+                    print(
+                        "Usage: wbs_cli.py verify-log [--full] [--workers n]  (n=0 uses all CPUs)"
+                    )
+                    sys.exit(1)
+                workers = int(args[idx + 1]) or (os.cpu_count() or 1)
+            if require_state() and not cmd_verify_log(full="--full" in args[1:], workers=workers):
+                sys.exit(1)
+        elif cmd == "log-archive":
+            usage = (
+                "Usage: wbs_cli.py log-archive [--older-than-days n] [--keep n] "
+                "[--codec gzip|lzma] [--save-policy] [--dry-run]"
+            )
+            options = {}
+            for flag, cast in (("--older-than-days", float), ("--keep", int), ("--codec", str)):
+                if flag in args:
+                    idx = args.index(flag)
+                    try:
+                        options[flag] = cast(args[idx + 1])
+                    except (IndexError, ValueError):
+                        print(usage)
+                        sys.exit(1)
+            if require_state() and not cmd_log_archive(
+                older_than_days=options.get("--older-than-days"),
+                keep_last=options.get("--keep"),
+                codec=options.get("--codec"),
+                save_policy="--save-policy" in args,
+                dry_run="--dry-run" in args,
+            ):
+                sys.exit(1)
+        elif cmd == "log-proof":
+            if len(args) < 2:
+                print("Usage: wbs_cli.py log-proof <event_id> [--size n]")
+                sys.exit(1)
+            size = None
+            if "--size" in args:
+                idx = args.index("--size")
+                if idx + 1 >= len(args) or not args[idx + 1].isdigit():
+                    print("Usage: wbs_cli.py log-proof <event_id> [--size n]")
+                    sys.exit(1)
+                size = int(args[idx + 1])
+            if require_state() and not cmd_log_proof(args[1], size):
+                sys.exit(1)
+        elif cmd == "log-consistency":
+            sizes = args[1:3]
+            if not sizes or not all(token.isdigit() for token in sizes):
+                print("Usage: wbs_cli.py log-consistency <first> [second]")
+                sys.exit(1)
+            second = int(sizes[1]) if len(sizes) > 1 else None
+            if require_state() and not cmd_log_consistency(int(sizes[0]), second):
                 sys.exit(1)
         elif cmd == "graph":
             output = ""
@@ -2998,7 +3424,10 @@ def main():
             if require_state(): cmd_graph(output)
         elif cmd == "export":
             if len(args) < 3:
-                print("Usage: wbs_cli.py export <state-json|log-json|log-csv|risk-json> <path>")
+                print(
+                    "Usage: wbs_cli.py export "
+                    "<state-json|state-pretty|log-json|log-csv|risk-json> <path>"
+                )
                 sys.exit(1)
             if require_state() and not cmd_export(args[1], args[2]):
                 sys.exit(1)
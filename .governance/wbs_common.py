@@ -13,19 +13,37 @@ from pathlib import Path
 GOV = Path(__file__).parent
 WBS_DEF = GOV / "wbs.json"
 WBS_STATE = GOV / "wbs-state.json"
+STORAGE_CONFIG = GOV / "storage-config.json"
 
 SRC_PATH = GOV.parent / "src"
 if str(SRC_PATH) not in sys.path:
     sys.path.insert(0, str(SRC_PATH))
 
 try:
-    from governed_platform.governance.status import normalize_runtime_status, normalize_packet_status_map
-    from governed_platform.governance.log_integrity import normalize_log_mode
+    from governed_platform.governance.status import normalize_runtime_status
+    from governed_platform.governance.state_store import (
+        iter_state_log,
+        read_state_document,
+        tail_state_log,
+        write_state_document,
+    )
+    from governed_platform.governance.state_snapshot import (
+        SnapshotCache,
+        freeze,
+        read_state_snapshot,
+    )
 except Exception:
     # Fallback keeps utility import-safe even before src is available.
-    normalize_runtime_status = lambda value, default="pending", strict=False: str(value or default).lower()  # noqa: E731
-    normalize_packet_status_map = lambda state: state  # noqa: E731
-    normalize_log_mode = lambda value, strict=False: str(value or "plain").lower()  # noqa: E731
+    def normalize_runtime_status(value, default="pending", strict=False):
+        return str(value or default).lower()
+
+    read_state_document = lambda path: json.loads(Path(path).read_text())  # noqa: E731
+    write_state_document = None
+    iter_state_log = None
+    tail_state_log = None
+    SnapshotCache = None
+    freeze = lambda value: value  # noqa: E731
+    read_state_snapshot = read_state_document
 
 # Colors (respects NO_COLOR env var)
 def c(code, text):
@@ -49,8 +67,58 @@ def load_definition() -> dict:
         return json.load(f)
 
 
+_definition_cache = (
+    SnapshotCache(loader=lambda path: json.loads(Path(path).read_text())) if SnapshotCache else None
+)
+
+
+def load_definition_snapshot() -> dict:
+    """Immutable, cached WBS definition for read-only callers.
+
+    Re-parsed only when wbs.json changes.
+    """
+    if _definition_cache is None or not WBS_DEF.exists():
+        return freeze(load_definition())
+    return _definition_cache.get(WBS_DEF).data
+
+
+def storage_config() -> dict:
+    """Load state storage backend config (`WBS_STORAGE_BACKEND` overrides file)."""
+    from substrate_core.storage import load_storage_config
+
+    return load_storage_config(STORAGE_CONFIG)
+
+
+def state_storage():
+    """Build the configured substrate_core storage for the current state."""
+    from substrate_core.storage import build_storage
+
+    return build_storage(WBS_STATE, storage_config())
+
+
+def uses_json_state() -> bool:
+    """Whether state lives in the JSON state document (the default backend)."""
+    return storage_config().get("backend") == "json"
+
+
+def state_manager():
+    """Build a StateManager bound to the configured storage backend."""
+    from governed_platform.governance.state_manager import StateManager
+
+    return StateManager(WBS_STATE, storage=None if uses_json_state() else state_storage())
+
+
+def state_exists() -> bool:
+    """Check whether execution state has been initialized."""
+    if uses_json_state():
+        return WBS_STATE.exists()
+    return state_storage().exists()
+
+
 def load_state() -> dict:
     """Load current execution state."""
+    if not uses_json_state():
+        return state_storage().read_state()
     if not WBS_STATE.exists():
         now = datetime.now().isoformat()
         return {
@@ -62,18 +130,76 @@ def load_state() -> dict:
             "area_closeouts": {},
             "log_integrity_mode": "plain",
         }
-    with open(WBS_STATE) as f:
-        state = json.load(f)
-    now = datetime.now().isoformat()
-    state.setdefault("version", "1.0")
-    state.setdefault("created_at", now)
-    state.setdefault("updated_at", now)
-    state.setdefault("packets", {})
-    state.setdefault("log", [])
-    state.setdefault("area_closeouts", {})
-    state.setdefault("log_integrity_mode", "plain")
-    state["log_integrity_mode"] = normalize_log_mode(state.get("log_integrity_mode"))
-    return normalize_packet_status_map(state)
+    # Normalized on write; stale or hand-edited documents are normalized on read.
+    return read_state_document(WBS_STATE)
+
+
+def load_state_snapshot() -> dict:
+    """Immutable view of current state for read-only callers.
+
+    Takes no lock and, for the JSON backend, re-parses only after a writer has
+    replaced the state document. Use `load_state()` when the result is mutated.
+    """
+    if not uses_json_state() or not WBS_STATE.exists():
+        return freeze(load_state())
+    return read_state_snapshot(WBS_STATE)
+
+
+def iter_log(packet_id: str = None):
+    """Yield lifecycle log entries (oldest first) without loading the full state.
+
+    The JSON backend streams the document, archive and segments incrementally;
+    other backends fall back to reading state.
+    """
+    if uses_json_state() and WBS_STATE.exists() and iter_state_log:
+        yield from iter_state_log(WBS_STATE, packet_id=packet_id)
+        return
+    for entry in load_state().get("log", []):
+        if isinstance(entry, dict) and (
+            packet_id is None or str(entry.get("packet_id") or "") == packet_id
+        ):
+            yield entry
+
+
+def log_tail(limit: int) -> list:
+    """The newest `limit` lifecycle log entries."""
+    if uses_json_state() and WBS_STATE.exists() and tail_state_log:
+        return tail_state_log(WBS_STATE, limit)
+    return load_state().get("log", [])[-limit:] if limit > 0 else []
+
+
+def save_state(state: dict):
+    """Save state with cross-platform lock + atomic replace."""
+    if not uses_json_state():
+        state_storage().write_state(state)
+        return
+    write_state_document(WBS_STATE, state)
+
+
+def refresh_ready_queue(definition: dict, previous_fingerprint: str, changed: list) -> bool:
+    """Carry the stored ready queue across a dependency edit, recounting only `changed`.
+
+    Best effort: without a stored queue, or when another writer got in first,
+    nothing is written and the next engine save rebuilds the queue.
+    """
+    from governed_platform.governance.dependency_index import dependency_index
+    from governed_platform.governance.ready_queue import READY_QUEUE_KEY, sync_ready_queue
+    from governed_platform.governance.state_store import StateConflictError, state_revision
+
+    if not state_exists():
+        return False
+    state = load_state()
+    if READY_QUEUE_KEY not in state:
+        return False
+    sync_ready_queue(state, dependency_index(definition), previous_fingerprint, changed)
+    try:
+        if uses_json_state():
+            write_state_document(WBS_STATE, state, expected_revision=state_revision(state))
+        else:
+            state_storage().write_state(state)
+    except StateConflictError:
+        return False
+    return True
 
 
 def get_counts(state: dict) -> dict:
@@ -18,12 +18,45 @@ from pathlib import Path
 from typing import Dict, List, Optional
 from urllib.parse import parse_qs, urlparse
 
-from wbs_common import GOV, WBS_DEF, WBS_STATE, load_definition, load_state, get_counts
+from wbs_common import (
+    GOV,
+    WBS_DEF,
+    WBS_STATE,
+    get_counts,
+    load_definition,
+    load_definition_snapshot,
+    load_state,
+    load_state_snapshot,
+    log_tail,
+    refresh_ready_queue,
+    save_state,
+    state_manager,
+    state_storage,
+    uses_json_state,
+)
+from governed_platform.determinism.fingerprint import fingerprint_json
+from governed_platform.governance.dependency_index import dependency_index
+from governed_platform.governance.engine import GovernanceEngine
 from governed_platform.governance.file_lock import atomic_write_json
+from governed_platform.governance.log_archive import (
+    archived_count,
+    find_archived_event,
+    iter_archived_entries,
+)
+from governed_platform.governance.merkle import (
+    consistency_proof_payload,
+    inclusion_proof_for_event,
+    load_merkle_tree,
+    merkle_path_for,
+)
+from governed_platform.governance.ready_queue import ready_packet_ids
 from governed_platform.governance.residual_risks import add_risks, normalize_risk_input, risk_summary
 from governed_platform.governance.status import normalize_runtime_status
+from governed_platform.governance.topo_order import load_topo_order, save_topo_order
 from identity import IdentityManager
-from substrate_core import ActorContext, FileStorage, PacketEngine
+from substrate_core import ActorContext, PacketEngine
+from substrate_core.audit import provenance_chain
+from substrate_core.group_commit import GroupCommitWriter
 
 STATIC = GOV / "static"
 CLI = GOV / "wbs_cli.py"
@@ -75,9 +108,20 @@ def save_definition(defn: dict):
     atomic_write_json(WBS_DEF, defn)
 
 
+def _build_packet_engine() -> PacketEngine:
+    # The frozen snapshot is shared until wbs.json changes, so its dependency
+    # index is reused across requests instead of being rebuilt per engine.
+    return PacketEngine(storage=state_storage(), definition=load_definition_snapshot())
+
+
+# Lifecycle writes from concurrent request threads are group-committed: one
+# state write per batch of queued operations, one result per request.
+STATE_WRITER = GroupCommitWriter(_build_packet_engine)
+
+
 class Handler(BaseHTTPRequestHandler):
     def _packet_engine(self) -> PacketEngine:
-        return PacketEngine(storage=FileStorage(WBS_STATE), definition=load_definition())
+        return _build_packet_engine()
 
     def _write_json(self, data: Dict, status: int = 200, headers: Optional[Dict[str, str]] = None) -> None:
         """Send a JSON HTTP response with consistent headers and status code."""
@@ -185,8 +229,12 @@ class Handler(BaseHTTPRequestHandler):
             "/api/terminal/metrics": self.api_terminal_metrics,
             "/api/status": self.api_status,
             "/api/ready": self.api_ready,
+            "/api/next": lambda: self.api_next(
+                query.get("agent", [""])[0], int(query.get("limit", [1])[0])
+            ),
             "/api/progress": self.api_progress,
             "/api/log": lambda: self.api_log(int(query.get("limit", [20])[0])),
+            "/api/log-proof": lambda: self.api_log_proof(query),
             "/api/packet": lambda: self.api_packet(query.get("id", [""])[0]),
             "/api/file": lambda: self.api_file(query.get("path", [""])[0]),
             "/api/docs-index": lambda: self.api_docs_index(query),
@@ -280,8 +328,8 @@ class Handler(BaseHTTPRequestHandler):
 
     def api_status(self) -> Dict:
         """Return definition/state snapshot used by the dashboard grid."""
-        defn = load_definition()
-        state = load_state()
+        defn = load_definition_snapshot()
+        state = load_state_snapshot()
         area_closeouts = state.get("area_closeouts", {})
         areas = []
         for area in defn.get("work_areas", []):
@@ -384,19 +432,35 @@ class Handler(BaseHTTPRequestHandler):
                 if sub == "claim":
                     if len(tokens) < 3:
                         return {"success": False, "message": "Usage: substrate claim <id>"}
-                    result = engine.claim(tokens[2], actor_ctx)
+                    result = STATE_WRITER.submit(
+                        {"action": "claim", "packet_id": tokens[2]}, actor_ctx
+                    )
                     code = 0 if result.ok else 1
                     output = result.message
                 elif sub == "close":
                     if len(tokens) < 3:
                         return {"success": False, "message": "Usage: substrate close <id>"}
-                    result = engine.done(tokens[2], actor_ctx, "Closed from embedded terminal")
+                    result = STATE_WRITER.submit(
+                        {
+                            "action": "done",
+                            "packet_id": tokens[2],
+                            "notes": "Closed from embedded terminal",
+                        },
+                        actor_ctx,
+                    )
                     code = 0 if result.ok else 1
                     output = result.message
                 elif sub == "block":
                     if len(tokens) < 3:
                         return {"success": False, "message": "Usage: substrate block <id>"}
-                    result = engine.block(tokens[2], actor_ctx, "Blocked from embedded terminal")
+                    result = STATE_WRITER.submit(
+                        {
+                            "action": "block",
+                            "packet_id": tokens[2],
+                            "reason": "Blocked from embedded terminal",
+                        },
+                        actor_ctx,
+                    )
                     code = 0 if result.ok else 1
                     output = result.message
                 elif sub == "validate":
@@ -410,8 +474,9 @@ class Handler(BaseHTTPRequestHandler):
                     if len(tokens) < 3:
                         return {"success": False, "message": "Usage: substrate audit <id>"}
                     packet = tokens[2]
-                    state = load_state()
-                    entries = [entry for entry in state.get("log", []) if entry.get("packet_id") == packet]
+                    entries = provenance_chain(
+                        load_state(), packet, WBS_STATE if uses_json_state() else None
+                    )
                     output = json.dumps({"packet_id": packet, "audit": entries}, indent=2)
                     code = 0
                 elif sub == "drift-check":
@@ -495,24 +560,21 @@ class Handler(BaseHTTPRequestHandler):
 
     def api_ready(self) -> Dict:
         """Return packets that are pending and dependency-ready."""
-        defn = load_definition()
-        state = load_state()
-        deps = defn.get("dependencies", {})
+        index = dependency_index(load_definition_snapshot())
         ready = []
-        for p in defn.get("packets", []):
-            pid = p["id"]
-            if normalize_runtime_status(state["packets"].get(pid, {}).get("status", "pending")) == "pending":
-                ok = all(
-                    normalize_runtime_status(state["packets"].get(d, {}).get("status")) == "done"
-                    for d in deps.get(pid, [])
-                )
-                if ok:
-                    ready.append({"id": pid, "wbs_ref": p["wbs_ref"], "title": p["title"]})
+        for pid in ready_packet_ids(load_state_snapshot(), index):
+            p = index.packet_by_id[pid]
+            ready.append({"id": pid, "wbs_ref": p["wbs_ref"], "title": p["title"]})
         return {"ready": ready}
 
+    def api_next(self, agent: str = "", limit: int = 1) -> Dict:
+        """Return the best ready packets for `agent` (priority, critical-path slack, fan-out)."""
+        engine = GovernanceEngine(load_definition_snapshot(), state_manager())
+        return engine.next_packets(agent=agent.strip() or None, limit=max(1, min(limit, 50)))
+
     def api_progress(self) -> Dict:
         """Return aggregate packet status counts."""
-        state = load_state()
+        state = load_state_snapshot()
         counts = get_counts(state)
         return {"counts": counts, "total": sum(counts.values())}
 
@@ -545,9 +607,40 @@ class Handler(BaseHTTPRequestHandler):
 
     def api_log(self, limit: int = 20) -> Dict:
         """Return the most recent lifecycle log entries."""
+        return {"log": log_tail(limit)}
+
+    def api_log_proof(self, query: Dict[str, List[str]]) -> Dict:
+        """Return a Merkle inclusion proof (`event_id`) or consistency proof (`first`, `second`)."""
         state = load_state()
-        entries = state.get("log", [])[-limit:]
-        return {"log": entries}
+        entries = state.get("log", [])
+        offset = archived_count(state)
+        tree, _ = load_merkle_tree(
+            merkle_path_for(WBS_STATE),
+            entries,
+            offset=offset,
+            prefix_loader=lambda: [entry for _, entry in iter_archived_entries(WBS_STATE, state)],
+        )
+        event_id = (query.get("event_id", [""])[0] or "").strip()
+        try:
+            size = int(query["size"][0]) if query.get("size") else None
+            if event_id:
+                try:
+                    proof = inclusion_proof_for_event(tree, entries, event_id, size, offset=offset)
+                except KeyError:
+                    position, entry = find_archived_event(WBS_STATE, state, event_id)
+                    proof = inclusion_proof_for_event(
+                        tree, [entry], event_id, size, offset=position
+                    )
+            elif query.get("first"):
+                second = int(query["second"][0]) if query.get("second") else None
+                proof = consistency_proof_payload(tree, int(query["first"][0]), second)
+            else:
+                return {"success": False, "message": "Missing event_id or first"}
+        except KeyError:
+            return {"success": False, "message": f"Event {event_id} not found"}
+        except ValueError as exc:
+            return {"success": False, "message": str(exc)}
+        return {"success": True, **proof}
 
     def _scan_document_files(self, repo_root: Path) -> List[Path]:
         """Discover documentation-related files from curated top-level locations."""
@@ -762,7 +855,7 @@ class Handler(BaseHTTPRequestHandler):
         pkt_state = state.get("packets", {}).get(packet_id, {})
         deps = defn.get("dependencies", {}).get(packet_id, [])
         dependents = [pid for pid, dep_list in defn.get("dependencies", {}).items() if packet_id in dep_list]
-        events = [e for e in state.get("log", []) if e.get("packet_id") == packet_id]
+        events = provenance_chain(state, packet_id, WBS_STATE if uses_json_state() else None)
         docs = self._extract_doc_paths(*self._collect_text_values(pkt), pkt_state.get("notes", ""))
 
         return {
@@ -850,7 +943,6 @@ class Handler(BaseHTTPRequestHandler):
         save_definition(defn)
 
         # Initialize state for new packet
-        from wbs_common import WBS_STATE
         state = load_state()
         if pid not in state["packets"]:
             state["packets"][pid] = {
@@ -860,7 +952,7 @@ class Handler(BaseHTTPRequestHandler):
                 "completed_at": None,
                 "notes": None
             }
-            atomic_write_json(WBS_STATE, state)
+            save_state(state)
 
         return {"success": True, "message": f"Packet {pid} added"}
 
@@ -916,21 +1008,28 @@ class Handler(BaseHTTPRequestHandler):
             return {"success": False, "message": f"Packet {depends_on} not found"}
 
         deps = defn.setdefault("dependencies", {})
-        pkt_deps = deps.setdefault(packet, [])
-
-        if depends_on in pkt_deps:
+        if depends_on in deps.get(packet, []):
             return {"success": False, "message": "Dependency already exists"}
+        previous = fingerprint_json(defn)
 
-        pkt_deps.append(depends_on)
-
-        # Check for circular dependency
-        from wbs_cli import detect_circular
-        cycle = detect_circular(deps)
+        # Check for circular dependency within the maintained topological order
+        topo = load_topo_order(WBS_DEF, defn)
+        if topo is not None:
+            cycle = topo.add_dependency(packet, depends_on)
+        else:
+            from wbs_cli import detect_circular
+            pkt_deps = deps.setdefault(packet, [])
+            pkt_deps.append(depends_on)
+            cycle = detect_circular(deps)
+            if cycle:
+                pkt_deps.remove(depends_on)
         if cycle:
-            pkt_deps.remove(depends_on)
             return {"success": False, "message": f"Would create circular dependency: {' -> '.join(cycle)}"}
 
         save_definition(defn)
+        if topo is not None:
+            save_topo_order(WBS_DEF, topo)
+        refresh_ready_queue(defn, previous, [packet])
         return {"success": True, "message": "Dependency added"}
 
     def api_remove_dep(self, body):
@@ -945,12 +1044,21 @@ class Handler(BaseHTTPRequestHandler):
 
         if packet not in deps or depends_on not in deps[packet]:
             return {"success": False, "message": "Dependency not found"}
+        previous = fingerprint_json(defn)
 
-        deps[packet].remove(depends_on)
-        if not deps[packet]:
-            del deps[packet]
+        # Removing an edge keeps the topological order valid; carry it over.
+        topo = load_topo_order(WBS_DEF, defn)
+        if topo is not None:
+            topo.remove_dependency(packet, depends_on)
+        else:
+            deps[packet].remove(depends_on)
+            if not deps[packet]:
+                del deps[packet]
 
         save_definition(defn)
+        if topo is not None:
+            save_topo_order(WBS_DEF, topo)
+        refresh_ready_queue(defn, previous, [packet])
         return {"success": True, "message": "Dependency removed"}
 
     def api_edit_packet(self, body):
@@ -1032,8 +1140,7 @@ class Handler(BaseHTTPRequestHandler):
         # Remove from state
         if pid in state["packets"]:
             del state["packets"][pid]
-            from wbs_common import WBS_STATE
-            atomic_write_json(WBS_STATE, state)
+            save_state(state)
 
         return {"success": True, "message": f"Packet {pid} deleted"}
 
@@ -1046,7 +1153,6 @@ class Handler(BaseHTTPRequestHandler):
         save_definition(body)
 
         # Initialize/update state for all packets
-        from wbs_common import WBS_STATE
         state = load_state()
 
         # Add new packets to state, preserve existing status
@@ -1071,7 +1177,7 @@ class Handler(BaseHTTPRequestHandler):
                 del state["packets"][pid]
 
         # Save state
-        atomic_write_json(WBS_STATE, state)
+        save_state(state)
 
         return {"success": True, "message": f"Saved {len(body.get('work_areas', []))} areas, {len(body.get('packets', []))} packets"}
 
@@ -1096,10 +1202,9 @@ class Handler(BaseHTTPRequestHandler):
                 "message": "Missing residual_risk_ack (use 'none' or 'declared')",
             }
         actor = ActorContext(user_id=agent or "system", role=role, source=source)
-        engine = self._packet_engine()
 
         if cmd == "claim":
-            result = engine.claim(pid, actor)
+            result = STATE_WRITER.submit({"action": "claim", "packet_id": pid}, actor)
             return {
                 "success": result.ok,
                 "message": result.message,
@@ -1130,7 +1235,9 @@ class Handler(BaseHTTPRequestHandler):
                     normalize_risk_input(raw, packet_id=pid, actor=agent)
                 except ValueError as exc:
                     return {"success": False, "message": str(exc)}
-            result = engine.done(pid, actor, notes)
+            result = STATE_WRITER.submit(
+                {"action": "done", "packet_id": pid, "notes": notes}, actor
+            )
             message = result.message
             if result.ok and risk_entries:
                 try:
@@ -1147,7 +1254,9 @@ class Handler(BaseHTTPRequestHandler):
                 "payload": result.payload,
             }
         if cmd == "note":
-            result = engine.note(pid, notes, actor)
+            result = STATE_WRITER.submit(
+                {"action": "note", "packet_id": pid, "message": notes}, actor
+            )
             return {
                 "success": result.ok,
                 "message": result.message,
@@ -1155,7 +1264,9 @@ class Handler(BaseHTTPRequestHandler):
                 "payload": result.payload,
             }
         if cmd == "fail":
-            result = engine.fail(pid, actor, notes)
+            result = STATE_WRITER.submit(
+                {"action": "fail", "packet_id": pid, "reason": notes}, actor
+            )
             return {
                 "success": result.ok,
                 "message": result.message,
@@ -1163,7 +1274,10 @@ class Handler(BaseHTTPRequestHandler):
                 "payload": result.payload,
             }
         if cmd == "reset":
-            result = engine.reset(pid, ActorContext(user_id="system", role="system", source=source))
+            result = STATE_WRITER.submit(
+                {"action": "reset", "packet_id": pid},
+                ActorContext(user_id="system", role="system", source=source),
+            )
             return {
                 "success": result.ok,
                 "message": result.message,
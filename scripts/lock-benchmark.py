@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""Compare state lock backends (lockfile polling vs kernel flock) under contention.
+
+Each worker process repeatedly takes the lock on a shared target, holds it for
+a short critical section and releases it. Acquire latency percentiles and
+total throughput are reported per backend.
+
+Usage: python3 scripts/lock-benchmark.py [--workers 20] [--iterations 50] [--hold-ms 1.0]
+"""
+
+import argparse
+import json
+import multiprocessing
+import os
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+SRC = ROOT / "src"
+if str(SRC) not in sys.path:
+    sys.path.insert(0, str(SRC))
+
+from governed_platform.governance.file_lock import (  # noqa: E402
+    LOCK_BACKEND_ENV,
+    LOCK_BACKEND_FLOCK,
+    LOCK_BACKENDS,
+    fcntl,
+    file_lock,
+)
+
+
+def _worker(args):
+    backend, target, iterations, hold_s, start_at = args
+    os.environ[LOCK_BACKEND_ENV] = backend
+    while time.time() < start_at:
+        time.sleep(0.001)
+    waits = []
+    for _ in range(iterations):
+        started = time.perf_counter()
+        with file_lock(Path(target), timeout=60.0):
+            waits.append(time.perf_counter() - started)
+            time.sleep(hold_s)
+    return waits
+
+
+def _percentile(values, pct):
+    ordered = sorted(values)
+    idx = min(len(ordered) - 1, int(round(pct / 100.0 * (len(ordered) - 1))))
+    return ordered[idx]
+
+
+def run_backend(backend: str, workers: int, iterations: int, hold_ms: float) -> dict:
+    with tempfile.TemporaryDirectory() as td:
+        target = str(Path(td) / "wbs-state.json")
+        start_at = time.time() + 0.5
+        jobs = [(backend, target, iterations, hold_ms / 1000.0, start_at) for _ in range(workers)]
+        with multiprocessing.Pool(workers) as pool:
+            began = time.time()
+            results = pool.map(_worker, jobs)
+            elapsed = time.time() - max(began, start_at)
+    waits_ms = [w * 1000.0 for worker in results for w in worker]
+    return {
+        "backend": backend,
+        "workers": workers,
+        "acquisitions": len(waits_ms),
+        "elapsed_s": round(elapsed, 3),
+        "throughput_per_s": round(len(waits_ms) / elapsed, 1) if elapsed > 0 else None,
+        "wait_ms": {
+            "mean": round(statistics.mean(waits_ms), 3),
+            "p50": round(_percentile(waits_ms, 50), 3),
+            "p95": round(_percentile(waits_ms, 95), 3),
+            "p99": round(_percentile(waits_ms, 99), 3),
+            "max": round(max(waits_ms), 3),
+        },
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--workers", type=int, default=20)
+    parser.add_argument("--iterations", type=int, default=50)
+    parser.add_argument("--hold-ms", type=float, default=1.0)
+    parser.add_argument("--json", action="store_true", help="emit machine-readable results")
+    args = parser.parse_args()
+
+    backends = [b for b in LOCK_BACKENDS if b != LOCK_BACKEND_FLOCK or fcntl is not None]
+    results = [run_backend(b, args.workers, args.iterations, args.hold_ms) for b in backends]
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+
+    print(
+        f"{args.workers} workers x {args.iterations} acquisitions, "
+        f"{args.hold_ms} ms critical section"
+    )
+    header = f"{'backend':<10} {'ops/s':>8}"
+    header += "".join(f" {col:>9}" for col in ("mean", "p50", "p95", "p99", "max"))
+    print(f"{header}  (wait ms)")
+    for r in results:
+        w = r["wait_ms"]
+        print(
+            f"{r['backend']:<10} {r['throughput_per_s']:>8} {w['mean']:>9} {w['p50']:>9} "
+            f"{w['p95']:>9} {w['p99']:>9} {w['max']:>9}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -20,7 +20,8 @@ done
 echo "[3/6] JSON integrity"
 python3 -m json.tool .governance/wbs.json >/dev/null
 if [ -f .governance/wbs-state.json ]; then
-  python3 -m json.tool .governance/wbs-state.json >/dev/null
+  # Any configured state_format (json, json-compact, binary) is accepted.
+  python3 -c 'import sys; sys.path.insert(0, "src"); from governed_platform.governance.state_store import read_state_document; read_state_document(".governance/wbs-state.json")'
 fi
 
 echo "[4/6] CLI sanity"
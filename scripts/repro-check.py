@@ -9,11 +9,12 @@ if str(SRC) not in sys.path:
     sys.path.insert(0, str(SRC))
 
 from governed_platform.determinism.validator import build_reproducibility_record
+from governed_platform.governance.state_store import read_state_document
 
 
 def main():
     state_path = ROOT / ".governance" / "wbs-state.json"
-    state = json.loads(state_path.read_text())
+    state = read_state_document(state_path)
     execution = {
         "command": ["python3", ".governance/wbs_cli.py", "status"],
         "returncode": 0,
@@ -10,16 +10,19 @@ mkdir -p "$(dirname "${OUT_EVENTS}")"
 
 python3 - <<'PY'
 import json
+import sys
 from pathlib import Path
 
 root = Path(".").resolve()
+sys.path.insert(0, str(root / "src"))
+from governed_platform.governance.state_store import tail_state_log
+
 state_path = root / ".governance" / "wbs-state.json"
 events_path = root / "docs" / "codex-migration" / "skills" / "observability-events.json"
 report_path = root / "docs" / "codex-migration" / "skills" / "observability-report.md"
 
-state = json.loads(state_path.read_text())
-log = state.get("log", [])
-sample = log[-50:]
+# Decodes any state_format and includes segmented/archived log entries.
+sample = tail_state_log(state_path, 50)
 
 events_path.write_text(json.dumps(sample, indent=2) + "\n")
 
@@ -0,0 +1,88 @@
+"""Content-addressed blob store next to the state document.
+
+Blobs are immutable byte strings addressed by their SHA-256 digest and stored
+under `<stem>-blobs/<aa>/<rest-of-digest>`. Writing the same content twice is
+a no-op, so snapshots that share packet records share storage. State keeps
+only digests; bodies are loaded on demand.
+"""
+
+import hashlib
+import json
+import os
+import re
+from pathlib import Path
+from typing import Any
+
+_DIGEST_RE = re.compile(r"^[0-9a-f]{64}$")
+
+
+def blob_root_for(state_path: Path) -> Path:
+    state_path = Path(state_path)
+    return state_path.with_name(f"{state_path.stem}-blobs")
+
+
+def blob_digest(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+def encode_json_blob(value: Any) -> bytes:
+    """Canonical JSON encoding, so equal records always get the same digest."""
+    return json.dumps(value, sort_keys=True, separators=(",", ":")).encode()
+
+
+def json_digest(value: Any) -> str:
+    return blob_digest(encode_json_blob(value))
+
+
+def check_digest(digest: str) -> str:
+    token = str(digest or "").strip().lower()
+    if not _DIGEST_RE.match(token):
+        raise ValueError(f"Invalid blob digest: {digest!r}")
+    return token
+
+
+class BlobStore:
+    """Directory of immutable, content-addressed blobs."""
+
+    def __init__(self, root: Path):
+        self.root = Path(root)
+
+    def path_for(self, digest: str) -> Path:
+        digest = check_digest(digest)
+        return self.root / digest[:2] / digest[2:]
+
+    def has(self, digest: str) -> bool:
+        return self.path_for(digest).exists()
+
+    def put(self, data: bytes) -> str:
+        digest = blob_digest(data)
+        target = self.path_for(digest)
+        if target.exists():
+            return digest
+        target.parent.mkdir(parents=True, exist_ok=True)
+        tmp = target.with_name(f"{target.name}.{os.getpid()}.tmp")
+        with open(tmp, "wb") as f:
+            f.write(data)
+        os.replace(tmp, target)
+        return digest
+
+    def get(self, digest: str) -> bytes:
+        """Return a blob's bytes; raises KeyError when missing or corrupted."""
+        target = self.path_for(digest)
+        try:
+            data = target.read_bytes()
+        except FileNotFoundError:
+            raise KeyError(digest) from None
+        if blob_digest(data) != check_digest(digest):
+            raise KeyError(f"{digest} (content does not match digest)")
+        return data
+
+
+__all__ = [
+    "BlobStore",
+    "blob_root_for",
+    "blob_digest",
+    "encode_json_blob",
+    "json_digest",
+    "check_digest",
+]
@@ -0,0 +1,176 @@
+"""Compiled dependency graph for a WBS definition.
+
+`dependency_index(definition)` builds forward/reverse adjacency, a
+packet-by-id map with definition positions, a topological order and area
+membership once and caches the result per definition fingerprint, so graph
+queries (dependents, transitive upstream/downstream, packet lookup) are dict
+lookups instead of scans over every dependency list.
+
+Frozen definitions (`load_definition_snapshot`) are also cached by identity,
+which skips fingerprinting entirely. Mutable definitions are fingerprinted
+on every call; long-lived holders such as the engines keep the index they
+got, since definitions are read-only once loaded.
+"""
+
+import threading
+from collections import OrderedDict, deque
+from typing import Any, Dict, List, Optional, Tuple
+
+from governed_platform.determinism.fingerprint import fingerprint_json
+from governed_platform.governance.state_snapshot import FrozenDict
+
+_CACHE_SIZE = 8
+
+
+class DependencyIndex:
+    """Read-only adjacency and lookup tables for one definition."""
+
+    def __init__(self, definition: Dict[str, Any], fingerprint: str = ""):
+        self.fingerprint = fingerprint
+        self.packet_by_id: Dict[str, Dict[str, Any]] = {}
+        self.position: Dict[str, int] = {}
+        self.areas: Dict[str, List[str]] = {}
+        for packet in definition.get("packets", []) or []:
+            if not isinstance(packet, dict) or not packet.get("id"):
+                continue
+            packet_id = str(packet["id"])
+            self.packet_by_id[packet_id] = packet
+            self.position.setdefault(packet_id, len(self.position))
+            area_id = str(packet.get("area_id") or "")
+            if area_id:
+                self.areas.setdefault(area_id, []).append(packet_id)
+
+        self.forward: Dict[str, Tuple[str, ...]] = {}
+        reverse: Dict[str, Dict[str, None]] = {}
+        for target, sources in (definition.get("dependencies") or {}).items():
+            self.forward[target] = tuple(sources or ())
+            for source in self.forward[target]:
+                reverse.setdefault(source, {})[target] = None
+        # Dependents in definition order, each listed once.
+        self.reverse: Dict[str, Tuple[str, ...]] = {
+            source: tuple(targets) for source, targets in reverse.items()
+        }
+        self.topo_order, self.acyclic = self._topological_order()
+        self._upstream: Dict[str, Tuple[str, ...]] = {}
+        self._downstream: Dict[str, Tuple[str, ...]] = {}
+        self._slack: Optional[Dict[str, int]] = None
+
+    def _topological_order(self) -> Tuple[List[str], bool]:
+        nodes = list(dict.fromkeys([*self.packet_by_id, *self.forward, *self.reverse]))
+        indegree = {node: len(set(self.forward.get(node, ()))) for node in nodes}
+        queue = deque(node for node in nodes if indegree[node] == 0)
+        order: List[str] = []
+        while queue:
+            node = queue.popleft()
+            order.append(node)
+            for child in self.reverse.get(node, ()):
+                indegree[child] -= 1
+                if indegree[child] == 0:
+                    queue.append(child)
+        return order, len(order) == len(nodes)
+
+    def dependencies_of(self, packet_id: str) -> Tuple[str, ...]:
+        return self.forward.get(packet_id, ())
+
+    def dependents_of(self, packet_id: str) -> Tuple[str, ...]:
+        return self.reverse.get(packet_id, ())
+
+    def area_of(self, packet_id: str) -> str:
+        return str(self.packet_by_id.get(packet_id, {}).get("area_id") or "")
+
+    @staticmethod
+    def _walk(start: Tuple[str, ...], edges: Dict[str, Tuple[str, ...]]) -> Tuple[str, ...]:
+        seen = set()
+        out: List[str] = []
+        queue = deque(start)
+        while queue:
+            node = queue.popleft()
+            if node in seen:
+                continue
+            seen.add(node)
+            out.append(node)
+            queue.extend(nxt for nxt in edges.get(node, ()) if nxt not in seen)
+        return tuple(out)
+
+    def upstream(self, packet_id: str) -> List[str]:
+        """Transitive dependencies, breadth-first (memoized)."""
+        if packet_id not in self._upstream:
+            self._upstream[packet_id] = self._walk(self.dependencies_of(packet_id), self.forward)
+        return list(self._upstream[packet_id])
+
+    def downstream(self, packet_id: str) -> List[str]:
+        """Transitive dependents, breadth-first (memoized)."""
+        return list(self._downstream_of(packet_id))
+
+    def _downstream_of(self, packet_id: str) -> Tuple[str, ...]:
+        if packet_id not in self._downstream:
+            self._downstream[packet_id] = self._walk(self.dependents_of(packet_id), self.reverse)
+        return self._downstream[packet_id]
+
+    def fan_out(self, packet_id: str) -> int:
+        """Number of transitive dependents."""
+        return len(self._downstream_of(packet_id))
+
+    def slack(self, packet_id: str) -> int:
+        """Critical-path slack in packets (unit durations); 0 on the longest chain.
+
+        Both longest-path passes run once over the topological order. A cyclic
+        definition has no schedule, so every packet reports 0.
+        """
+        if self._slack is None:
+            self._slack = {}
+            if self.acyclic:
+                head: Dict[str, int] = {}
+                for node in self.topo_order:
+                    head[node] = max(
+                        (head[dep] + 1 for dep in self.forward.get(node, ())), default=0
+                    )
+                tail: Dict[str, int] = {}
+                for node in reversed(self.topo_order):
+                    tail[node] = max(
+                        (tail[child] + 1 for child in self.reverse.get(node, ())), default=0
+                    )
+                length = max((head[node] + tail[node] for node in self.topo_order), default=0)
+                self._slack = {node: length - head[node] - tail[node] for node in self.topo_order}
+        return self._slack.get(packet_id, 0)
+
+
+_by_fingerprint: "OrderedDict[str, DependencyIndex]" = OrderedDict()
+# id(frozen definition) -> (definition, index); the reference keeps the id valid.
+_by_identity: "OrderedDict[int, Tuple[Any, DependencyIndex]]" = OrderedDict()
+_cache_lock = threading.Lock()
+
+
+def _remember(cache: OrderedDict, key: Any, value: Any) -> None:
+    cache[key] = value
+    cache.move_to_end(key)
+    while len(cache) > _CACHE_SIZE:
+        cache.popitem(last=False)
+
+
+def dependency_index(definition: Optional[Dict[str, Any]]) -> DependencyIndex:
+    """The compiled index for `definition`, built once per fingerprint."""
+    definition = definition or {}
+    frozen = isinstance(definition, FrozenDict)
+    if frozen:
+        with _cache_lock:
+            hit = _by_identity.get(id(definition))
+        if hit is not None and hit[0] is definition:
+            return hit[1]
+
+    fingerprint = fingerprint_json(definition)
+    with _cache_lock:
+        index = _by_fingerprint.get(fingerprint)
+    if index is None:
+        index = DependencyIndex(definition, fingerprint)
+    with _cache_lock:
+        _remember(_by_fingerprint, fingerprint, index)
+        if frozen:
+            _remember(_by_identity, id(definition), (definition, index))
+    return index
+
+
+__all__ = [
+    "DependencyIndex",
+    "dependency_index",
+]
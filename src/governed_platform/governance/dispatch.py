@@ -0,0 +1,58 @@
+"""Dispatch order for ready packets.
+
+Ready packets are handed out best first by:
+
+1. `priority` (CRITICAL, HIGH, MEDIUM, LOW; packets without one rank as MEDIUM),
+2. critical-path slack (packets on the longest remaining chain first),
+3. transitive fan-out (packets that unblock more work first),
+4. definition order.
+
+All four are properties of the definition, so a packet's key is computed
+once when it becomes ready and kept in the ready queue's binary heap
+(`ready_queue`). Readers walk that heap best-first (`iter_heap`) without
+popping or re-sorting it, which costs O(m log m) for the first m packets.
+"""
+
+import heapq
+from typing import Any, Dict, Iterator, List, Sequence
+
+PRIORITY_RANK = {"CRITICAL": 0, "HIGH": 1, "MEDIUM": 2, "LOW": 3}
+DEFAULT_PRIORITY = "MEDIUM"
+
+
+def packet_priority(packet: Dict[str, Any]) -> str:
+    priority = str((packet or {}).get("priority") or "").strip().upper()
+    return priority if priority in PRIORITY_RANK else DEFAULT_PRIORITY
+
+
+def dispatch_key(index: Any, packet_id: str) -> List[Any]:
+    """Heap entry for `packet_id` in `index` (a `DependencyIndex`); smaller is dispatched first."""
+    return [
+        PRIORITY_RANK[packet_priority(index.packet_by_id.get(packet_id, {}))],
+        index.slack(packet_id),
+        -index.fan_out(packet_id),
+        index.position.get(packet_id, len(index.position)),
+        packet_id,
+    ]
+
+
+def iter_heap(heap: Sequence[Sequence[Any]]) -> Iterator[str]:
+    """Packet ids of a heap array in key order, leaving the array untouched."""
+    if not heap:
+        return
+    frontier = [(heap[0], 0)]
+    while frontier:
+        entry, idx = heapq.heappop(frontier)
+        yield entry[-1]
+        for child in (2 * idx + 1, 2 * idx + 2):
+            if child < len(heap):
+                heapq.heappush(frontier, (heap[child], child))
+
+
+__all__ = [
+    "PRIORITY_RANK",
+    "DEFAULT_PRIORITY",
+    "packet_priority",
+    "dispatch_key",
+    "iter_heap",
+]
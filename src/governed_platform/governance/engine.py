@@ -1,15 +1,25 @@
 from datetime import datetime
+import functools
 from pathlib import Path
 import re
 from typing import Dict, Any, Tuple, List
 
+from governed_platform.governance.dependency_index import DependencyIndex, dependency_index
 from governed_platform.governance.interfaces import GovernanceInterface
+from governed_platform.governance.log_checkpoints import verify_state_log
 from governed_platform.governance.file_lock import file_lock
 from governed_platform.governance.log_integrity import (
     LOG_MODE_HASH_CHAIN,
+    append_log_entry,
     build_log_entry,
+    next_chain_link,
     normalize_log_mode,
-    verify_log_integrity,
+)
+from governed_platform.governance.dispatch import packet_priority
+from governed_platform.governance.ready_queue import (
+    dispatch_order,
+    ready_packet_ids,
+    sync_ready_queue,
 )
 from governed_platform.governance.state_manager import StateManager
 from governed_platform.governance.status import normalize_runtime_status
@@ -28,34 +38,38 @@ class GovernanceEngine(GovernanceInterface):
         self.state_manager = state_manager
         self.supervisor = supervisor or DeterministicSupervisor()
 
+    @functools.cached_property
+    def graph(self) -> DependencyIndex:
+        return dependency_index(self.definition)
+
     def _load(self) -> Dict[str, Any]:
         return self.state_manager.load()
 
+    def _load_for_update(self) -> Dict[str, Any]:
+        return self.state_manager.load_for_update()
+
     def _save(self, state: Dict[str, Any]) -> None:
+        sync_ready_queue(state, self.graph)
         self.state_manager.save(state)
 
     def _deps_met(self, state: Dict[str, Any], packet_id: str) -> Tuple[bool, str]:
-        deps = self.definition.get("dependencies", {}).get(packet_id, [])
-        for dep_id in deps:
+        for dep_id in self.graph.dependencies_of(packet_id):
             dep_state = state.get("packets", {}).get(dep_id, {})
             if normalize_runtime_status(dep_state.get("status")) != "done":
                 return False, dep_id
         return True, ""
 
     def _log(self, state: Dict[str, Any], packet_id: str, event: str, agent: str = None, notes: str = None):
-        log_entries = state.setdefault("log", [])
         mode = normalize_log_mode(state.get("log_integrity_mode", "plain"))
         timestamp = datetime.now().isoformat()
 
         prev_hash = ""
         hash_index = 1
         if mode == LOG_MODE_HASH_CHAIN:
-            hashed_entries = [e for e in log_entries if isinstance(e, dict) and e.get("hash")]
-            if hashed_entries:
-                prev_hash = hashed_entries[-1].get("hash", "") or ""
-                hash_index = len(hashed_entries) + 1
+            prev_hash, hash_index = next_chain_link(state)
 
-        log_entries.append(
+        append_log_entry(
+            state,
             build_log_entry(
                 packet_id=packet_id,
                 event=event,
@@ -65,7 +79,7 @@ class GovernanceEngine(GovernanceInterface):
                 mode=mode,
                 previous_hash=prev_hash,
                 hash_index=hash_index,
-            )
+            ),
         )
 
     def _approve(
@@ -92,10 +106,7 @@ class GovernanceEngine(GovernanceInterface):
         return {}
 
     def _find_packet_definition(self, packet_id: str) -> Dict[str, Any]:
-        for pkt in self.definition.get("packets", []):
-            if pkt.get("id") == packet_id:
-                return pkt
-        return {}
+        return self.graph.packet_by_id.get(packet_id) or {}
 
     def _collect_text_values(self, value: Any, out: List[str]) -> None:
         if isinstance(value, str):
@@ -178,7 +189,7 @@ class GovernanceEngine(GovernanceInterface):
         # Hold the lock across load->validate->mutate->save so concurrent claims
         # cannot both observe "pending" and succeed.
         with file_lock(self.state_manager.state_path):
-            state = self._load()
+            state = self._load_for_update()
             if packet_id not in state.get("packets", {}):
                 return False, f"Packet {packet_id} not found"
             pkt = state["packets"][packet_id]
@@ -194,6 +205,7 @@ class GovernanceEngine(GovernanceInterface):
             self._log(state, packet_id, "started", agent, f"Claimed by {agent}")
             if reason and reason != "approved":
                 self._log(state, packet_id, "capability_warning", agent, reason)
+            sync_ready_queue(state, self.graph)
             self.state_manager.save_without_lock(state)
 
         message = f"{packet_id} claimed by {agent}"
@@ -205,7 +217,7 @@ class GovernanceEngine(GovernanceInterface):
         allowed, reason = self._approve("done", packet_id, agent=agent, notes=notes)
         if not allowed:
             return False, reason
-        state = self._load()
+        state = self._load_for_update()
         if packet_id not in state.get("packets", {}):
             return False, f"Packet {packet_id} not found"
         pkt = state["packets"][packet_id]
@@ -225,7 +237,7 @@ class GovernanceEngine(GovernanceInterface):
         allowed, reason = self._approve("note", packet_id, agent=agent, notes=notes)
         if not allowed:
             return False, reason
-        state = self._load()
+        state = self._load_for_update()
         if packet_id not in state.get("packets", {}):
             return False, f"Packet {packet_id} not found"
         state["packets"][packet_id]["notes"] = notes
@@ -237,7 +249,7 @@ class GovernanceEngine(GovernanceInterface):
         allowed, sup_reason = self._approve("fail", packet_id, agent=agent, notes=reason)
         if not allowed:
             return False, sup_reason
-        state = self._load()
+        state = self._load_for_update()
         if packet_id not in state.get("packets", {}):
             return False, f"Packet {packet_id} not found"
         pkt = state["packets"][packet_id]
@@ -250,8 +262,7 @@ class GovernanceEngine(GovernanceInterface):
         pkt["completed_at"] = datetime.now().isoformat()
         pkt["notes"] = reason
         self._log(state, packet_id, "failed", agent, reason)
-        deps = self.definition.get("dependencies", {})
-        to_block = [pid for pid, dep_list in deps.items() if packet_id in dep_list]
+        to_block = list(self.graph.dependents_of(packet_id))
         blocked = []
         while to_block:
             pid = to_block.pop(0)
@@ -260,13 +271,13 @@ class GovernanceEngine(GovernanceInterface):
                 cur["status"] = "blocked"
                 self._log(state, pid, "blocked", None, f"Blocked by {packet_id}")
                 blocked.append(pid)
-                to_block.extend(p for p, d in deps.items() if pid in d)
+                to_block.extend(self.graph.dependents_of(pid))
         self._save(state)
         suffix = f"; blocked: {', '.join(blocked)}" if blocked else ""
         return True, f"{packet_id} failed{suffix}"
 
     def reset(self, packet_id: str) -> Tuple[bool, str]:
-        state = self._load()
+        state = self._load_for_update()
         if packet_id not in state.get("packets", {}):
             return False, f"Packet {packet_id} not found"
         pkt = state["packets"][packet_id]
@@ -294,7 +305,7 @@ class GovernanceEngine(GovernanceInterface):
         if not allowed:
             return False, sup_reason
 
-        state = self._load()
+        state = self._load_for_update()
         if packet_id not in state.get("packets", {}):
             return False, f"Packet {packet_id} not found"
         pkt = state["packets"][packet_id]
@@ -340,7 +351,7 @@ class GovernanceEngine(GovernanceInterface):
         if not allowed:
             return False, sup_reason
 
-        state = self._load()
+        state = self._load_for_update()
         if packet_id not in state.get("packets", {}):
             return False, f"Packet {packet_id} not found"
         pkt = state["packets"][packet_id]
@@ -399,18 +410,18 @@ class GovernanceEngine(GovernanceInterface):
             "notes": packet_state.get("notes"),
         }
 
-        deps = self.definition.get("dependencies", {})
         upstream = []
-        for dep_id in deps.get(packet_id, []):
+        for dep_id in self.graph.dependencies_of(packet_id):
             dep_status = normalize_runtime_status(state.get("packets", {}).get(dep_id, {}).get("status", "pending"))
             upstream.append({"packet_id": dep_id, "status": dep_status})
         downstream = []
-        for target, sources in deps.items():
-            if packet_id in sources:
-                target_status = normalize_runtime_status(state.get("packets", {}).get(target, {}).get("status", "pending"))
-                downstream.append({"packet_id": target, "status": target_status})
+        for target in self.graph.dependents_of(packet_id):
+            target_status = normalize_runtime_status(
+                state.get("packets", {}).get(target, {}).get("status", "pending")
+            )
+            downstream.append({"packet_id": target, "status": target_status})
 
-        full_history = [entry for entry in state.get("log", []) if entry.get("packet_id") == packet_id]
+        full_history = self.state_manager.packet_log(state, packet_id)
         history = list(reversed(full_history))
         history_dropped = max(0, len(history) - max_events)
         history = history[:max_events]
@@ -467,16 +478,49 @@ class GovernanceEngine(GovernanceInterface):
         }
         return True, payload
 
-    def ready(self) -> Dict[str, Any]:
-        state = self._load()
+    def _ready_packets(self, state: Dict[str, Any]) -> List[Dict[str, str]]:
         ready: List[Dict[str, str]] = []
-        for pkt in self.definition.get("packets", []):
-            pid = pkt["id"]
-            if normalize_runtime_status(state.get("packets", {}).get(pid, {}).get("status")) == "pending":
-                ok, _ = self._deps_met(state, pid)
-                if ok:
-                    ready.append({"id": pid, "wbs_ref": pkt.get("wbs_ref"), "title": pkt.get("title")})
-        return {"ready": ready}
+        for pid in ready_packet_ids(state, self.graph):
+            pkt = self.graph.packet_by_id[pid]
+            ready.append({"id": pid, "wbs_ref": pkt.get("wbs_ref"), "title": pkt.get("title")})
+        return ready
+
+    def ready(self) -> Dict[str, Any]:
+        return {"ready": self._ready_packets(self._load())}
+
+    def next_packets(self, agent: str = None, limit: int = 1) -> Dict[str, Any]:
+        """Best ready packets to dispatch, highest priority and least slack first.
+
+        With `agent`, packets the supervisor would refuse that agent at claim
+        time (for example missing capabilities in strict mode) are skipped.
+        """
+        limit = max(1, int(limit))
+        picked: List[Dict[str, Any]] = []
+        for pid in dispatch_order(self._load(), self.graph):
+            pkt = self.graph.packet_by_id[pid]
+            if agent:
+                required = pkt.get("required_capabilities")
+                allowed, _ = self._approve(
+                    "claim",
+                    pid,
+                    agent=agent,
+                    required_capabilities=required if isinstance(required, list) else [],
+                )
+                if not allowed:
+                    continue
+            picked.append(
+                {
+                    "id": pid,
+                    "wbs_ref": pkt.get("wbs_ref"),
+                    "title": pkt.get("title"),
+                    "priority": packet_priority(pkt),
+                    "slack": self.graph.slack(pid),
+                    "fan_out": self.graph.fan_out(pid),
+                }
+            )
+            if len(picked) >= limit:
+                break
+        return {"agent": agent, "next": picked}
 
     def briefing(self, recent_events: int = 10, compact: bool = False) -> Dict[str, Any]:
         """Return a versioned session bootstrap summary for operators and agents."""
@@ -501,7 +545,7 @@ class GovernanceEngine(GovernanceInterface):
                     }
                 )
 
-        ready_packets = self.ready().get("ready", [])
+        ready_packets = self._ready_packets(state)
         blocked_packets: List[Dict[str, Any]] = []
         for pkt in packets:
             pid = pkt["id"]
@@ -572,18 +616,21 @@ class GovernanceEngine(GovernanceInterface):
         }
 
     def status(self) -> Dict[str, Any]:
-        state = self._load()
-        return state
+        """Read-only state snapshot (no lock; mutate a `thaw()` copy, not this)."""
+        return self.state_manager.snapshot()
 
-    def verify_log(self) -> Tuple[bool, List[str]]:
-        state = self._load()
-        return verify_log_integrity(state.get("log", []))
+    def verify_log(self, workers: int = 1, full: bool = False) -> Tuple[bool, List[str]]:
+        """Verify the log from the newest usable checkpoint (every entry when `full`)."""
+        verification = verify_state_log(
+            self.state_manager.state_path, self._load(), full=full, workers=workers
+        )
+        return verification["valid"], verification["issues"]
 
     def closeout_l2(self, area_id: str, agent: str, assessment_path: str, notes: str = "") -> Tuple[bool, str]:
         allowed, reason = self._approve("closeout_l2", f"AREA-{area_id}", agent=agent, notes=notes)
         if not allowed:
             return False, reason
-        state = self._load()
+        state = self._load_for_update()
         area_id = (area_id or "").strip()
         area_ids = {a["id"] for a in self.definition.get("work_areas", [])}
         if area_id not in area_ids and area_id.isdigit():
@@ -1,22 +1,171 @@
 import json
 import os
+import signal
+import threading
 import time
 from contextlib import contextmanager
 from pathlib import Path
-from typing import Any, Iterator
+from typing import Any, Iterator, Optional
+
+from governed_platform.governance.serialization import STATE_FORMAT_JSON, encode_document
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - Windows
+    fcntl = None
+
+
+LOCK_BACKEND_ENV = "WBS_LOCK_BACKEND"
+LOCK_BACKEND_LOCKFILE = "lockfile"
+LOCK_BACKEND_FLOCK = "flock"
+LOCK_BACKENDS = (LOCK_BACKEND_LOCKFILE, LOCK_BACKEND_FLOCK)
+
+FSYNC_ENV = "WBS_STATE_FSYNC"
 
 
 class LockTimeoutError(TimeoutError):
     """Raised when lock acquisition exceeds timeout budget."""
 
 
+def normalize_lock_backend(value: Any, strict: bool = False) -> str:
+    token = str(value or "").strip().lower()
+    if token in LOCK_BACKENDS:
+        return token
+    if strict:
+        raise ValueError(f"Invalid lock backend: {value!r}")
+    return LOCK_BACKEND_LOCKFILE
+
+
+def lock_backend() -> str:
+    """Configured lock backend; `flock` falls back to lockfiles where fcntl is unavailable."""
+    backend = normalize_lock_backend(os.environ.get(LOCK_BACKEND_ENV))
+    if backend == LOCK_BACKEND_FLOCK and fcntl is None:
+        return LOCK_BACKEND_LOCKFILE
+    return backend
+
+
 def _lock_path_for(path: Path) -> Path:
     return Path(f"{path}.lock")
 
 
+def _flock_path_for(path: Path) -> Path:
+    # Separate from `.lock`: the flock file persists, which the lockfile
+    # backend would otherwise read as a held lock.
+    return Path(f"{path}.flock")
+
+
+class _FlockAlarm(Exception):
+    pass
+
+
+def _raise_flock_alarm(signum: int, frame: Any) -> None:
+    raise _FlockAlarm()
+
+
+def _alarm_available() -> bool:
+    return (
+        hasattr(signal, "setitimer")
+        and threading.current_thread() is threading.main_thread()
+        and signal.getitimer(signal.ITIMER_REAL)[0] == 0
+    )
+
+
+def _flock_blocking(fd: int, operation: int, timeout: float) -> bool:
+    """Block in `flock` until a one-shot `SIGALRM` interrupts it after `timeout`."""
+    previous = signal.signal(signal.SIGALRM, _raise_flock_alarm)
+    acquired = False
+    try:
+        try:
+            signal.setitimer(signal.ITIMER_REAL, timeout)
+            fcntl.flock(fd, operation)
+            acquired = True
+        finally:
+            signal.setitimer(signal.ITIMER_REAL, 0)
+    except _FlockAlarm:
+        if not acquired:
+            # The alarm may land between flock returning and the flag being set.
+            fcntl.flock(fd, fcntl.LOCK_UN)
+    finally:
+        signal.signal(signal.SIGALRM, previous)
+    return acquired
+
+
+def _flock_poll(fd: int, operation: int, timeout: float, poll_interval: float) -> bool:
+    """Retry a non-blocking `flock`, backing off from 1 ms up to `poll_interval`."""
+    deadline = time.monotonic() + timeout
+    delay = 0.001
+    while True:
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            return False
+        time.sleep(min(delay, remaining))
+        delay = min(delay * 2, max(poll_interval, 0.001))
+        try:
+            fcntl.flock(fd, operation | fcntl.LOCK_NB)
+            return True
+        except BlockingIOError:
+            pass
+
+
+def _flock_acquire(fd: int, operation: int, timeout: float, poll_interval: float) -> bool:
+    """Take `operation` (`LOCK_EX`/`LOCK_SH`) on `fd` within `timeout`; False on timeout.
+
+    An uncontended lock costs one non-blocking call. Otherwise the main thread
+    waits in a blocking `flock` bounded by an interval timer, so it is woken
+    as soon as the holder releases; other threads cannot receive the alarm and
+    poll instead.
+    """
+    try:
+        fcntl.flock(fd, operation | fcntl.LOCK_NB)
+        return True
+    except BlockingIOError:
+        pass
+    if timeout <= 0:
+        return False
+    if _alarm_available():
+        return _flock_blocking(fd, operation, timeout)
+    return _flock_poll(fd, operation, timeout, poll_interval)
+
+
+@contextmanager
+def _flock(path: Path, timeout: float, poll_interval: float, shared: bool) -> Iterator[None]:
+    lock_path = _flock_path_for(path)
+    lock_path.parent.mkdir(parents=True, exist_ok=True)
+    fd = os.open(str(lock_path), os.O_RDWR | os.O_CREAT, 0o644)
+    operation = fcntl.LOCK_SH if shared else fcntl.LOCK_EX
+    try:
+        if not _flock_acquire(fd, operation, max(timeout, 0.0), poll_interval):
+            raise LockTimeoutError(f"Timeout waiting for lock: {lock_path}")
+        try:
+            yield
+        finally:
+            fcntl.flock(fd, fcntl.LOCK_UN)
+    finally:
+        os.close(fd)
+
+
 @contextmanager
-def file_lock(path: Path, timeout: float = 10.0, poll_interval: float = 0.05, stale_after: float = 300.0) -> Iterator[None]:
-    """Acquire cross-platform lock via atomic lockfile creation."""
+def file_lock(
+    path: Path,
+    timeout: float = 10.0,
+    poll_interval: float = 0.05,
+    stale_after: float = 300.0,
+    shared: bool = False,
+) -> Iterator[None]:
+    """Acquire the lock guarding `path`.
+
+    The default backend creates `<path>.lock` atomically and polls while it is
+    held (cross-platform; `shared` is treated as exclusive). With
+    `WBS_LOCK_BACKEND=flock` a kernel `flock` on `<path>.flock` is used
+    instead: waiters block in the kernel (bounded by `timeout`), `shared=True`
+    takes a reader lock, and the lock is released automatically if the holder
+    dies. All processes sharing a state file must use the same backend.
+    """
+    if lock_backend() == LOCK_BACKEND_FLOCK:
+        with _flock(path, timeout, poll_interval, shared):
+            yield
+        return
+
     lock_path = _lock_path_for(path)
     lock_path.parent.mkdir(parents=True, exist_ok=True)
     deadline = time.monotonic() + max(timeout, 0.0)
@@ -50,12 +199,48 @@ def file_lock(path: Path, timeout: float = 10.0, poll_interval: float = 0.05, st
         lock_path.unlink(missing_ok=True)
 
 
-def atomic_write_json(path: Path, payload: Any, timeout: float = 10.0) -> None:
-    """Write JSON atomically under cross-platform lock."""
+def fsync_enabled() -> bool:
+    return os.environ.get(FSYNC_ENV, "").strip().lower() in {"1", "true", "yes", "on"}
+
+
+def _fsync_dir(path: Path) -> None:
+    try:
+        fd = os.open(str(path), os.O_RDONLY)
+    except OSError:  # pragma: no cover - directories cannot be opened on Windows
+        return
+    try:
+        os.fsync(fd)
+    except OSError:  # pragma: no cover - filesystem without directory fsync
+        pass
+    finally:
+        os.close(fd)
+
+
+def replace_json(
+    path: Path, payload: Any, fmt: str = STATE_FORMAT_JSON, fsync: Optional[bool] = None
+) -> None:
+    """Write a document via temp file + replace; caller is responsible for locking.
+
+    `fmt` selects the encoding (see `serialization`); pretty JSON by default.
+    With `fsync` (default: `WBS_STATE_FSYNC`) the file and its directory are
+    flushed to disk before returning.
+    """
+    fsync = fsync_enabled() if fsync is None else fsync
     path.parent.mkdir(parents=True, exist_ok=True)
     tmp = path.with_suffix(path.suffix + ".tmp")
+    with open(tmp, "wb") as f:
+        f.write(encode_document(payload, fmt))
+        if fsync:
+            f.flush()
+            os.fsync(f.fileno())
+    tmp.replace(path)
+    if fsync:
+        _fsync_dir(path.parent)
+
+
+def atomic_write_json(
+    path: Path, payload: Any, timeout: float = 10.0, fmt: str = STATE_FORMAT_JSON
+) -> None:
+    """Write a document atomically under cross-platform lock."""
     with file_lock(path, timeout=timeout):
-        with open(tmp, "w") as f:
-            json.dump(payload, f, indent=2)
-            f.write("\n")
-        tmp.replace(path)
+        replace_json(path, payload, fmt)
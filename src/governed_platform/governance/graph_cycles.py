@@ -0,0 +1,111 @@
+"""Cycle reporting for dependency maps (iterative Tarjan SCC).
+
+`dependencies` maps a packet to the packets it depends on. One linear pass
+finds every strongly connected component with an explicit stack, so chains
+of any length are handled without recursion. Each component that contains
+a cycle (more than one packet, or a packet depending on itself) is reported
+with one concrete cycle path, written in dependency direction and closed on
+its first packet: `["A", "B", "A"]` means A depends on B, and B on A.
+"""
+
+from collections import deque
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+Dependencies = Dict[str, Sequence[str]]
+
+
+def _edges(dependencies: Dependencies, node: str) -> Sequence[str]:
+    return dependencies.get(node) or ()
+
+
+def _nodes(dependencies: Dependencies) -> List[str]:
+    return list(
+        dict.fromkeys(
+            [*dependencies, *(dep for deps in dependencies.values() for dep in deps or ())]
+        )
+    )
+
+
+def strongly_connected_components(dependencies: Dependencies) -> List[List[str]]:
+    """All SCCs, dependencies before dependents; members in discovery order."""
+    index: Dict[str, int] = {}
+    low: Dict[str, int] = {}
+    stack: List[str] = []
+    on_stack = set()
+    components: List[List[str]] = []
+
+    def visit(node: str) -> Tuple[str, Iterator[str]]:
+        index[node] = low[node] = len(index)
+        stack.append(node)
+        on_stack.add(node)
+        return node, iter(_edges(dependencies, node))
+
+    for root in _nodes(dependencies):
+        if root in index:
+            continue
+        work = [visit(root)]
+        while work:
+            node, edges = work[-1]
+            for nxt in edges:
+                if nxt not in index:
+                    work.append(visit(nxt))
+                    break
+                if nxt in on_stack:
+                    low[node] = min(low[node], index[nxt])
+            else:
+                work.pop()
+                if work:
+                    parent = work[-1][0]
+                    low[parent] = min(low[parent], low[node])
+                if low[node] == index[node]:
+                    component: List[str] = []
+                    while True:
+                        member = stack.pop()
+                        on_stack.discard(member)
+                        component.append(member)
+                        if member == node:
+                            break
+                    components.append(component[::-1])
+    return components
+
+
+def _cycle_through(start: str, members: set, dependencies: Dependencies) -> List[str]:
+    """Shortest cycle from `start` back to itself inside one component (BFS)."""
+    parent: Dict[str, Optional[str]] = {start: None}
+    queue = deque([start])
+    while queue:
+        node = queue.popleft()
+        for nxt in _edges(dependencies, node):
+            if nxt == start:
+                chain = [node]
+                while parent[chain[-1]] is not None:
+                    chain.append(parent[chain[-1]])
+                return chain[::-1] + [start]
+            if nxt in members and nxt not in parent:
+                parent[nxt] = node
+                queue.append(nxt)
+    return []
+
+
+def dependency_cycles(dependencies: Dependencies) -> List[List[str]]:
+    """One cycle path per cyclic component, in component order; [] for a DAG."""
+    cycles = []
+    for component in strongly_connected_components(dependencies):
+        start = component[0]
+        if len(component) == 1 and start not in _edges(dependencies, start):
+            continue
+        cycles.append(_cycle_through(start, set(component), dependencies))
+    return cycles
+
+
+def find_dependency_cycle(dependencies: Dependencies) -> List[str]:
+    """The first reported cycle path, or [] when the graph is acyclic."""
+    cycles = dependency_cycles(dependencies)
+    return cycles[0] if cycles else []
+
+
+__all__ = [
+    "strongly_connected_components",
+    "dependency_cycles",
+    "find_dependency_cycle",
+]
@@ -0,0 +1,189 @@
+"""Incremental reader for large JSON documents.
+
+Read-only tooling usually needs one array member of the state document (the
+lifecycle log) and a handful of small top-level keys. `iter_array_member`
+decodes the array one element at a time with `JSONDecoder.raw_decode` over a
+buffer refilled in fixed-size chunks, so memory is bounded by the chunk size
+plus the largest single element rather than by the whole document. Members
+that are not wanted are skipped with a scanner that never materializes them.
+
+Generators stop reading as soon as the caller stops iterating, so "first N"
+and "until found" queries only read the prefix they need.
+"""
+
+import codecs
+import json
+import re
+from typing import IO, Any, Dict, Iterable, Iterator
+
+DEFAULT_CHUNK_SIZE = 1 << 16
+
+_WHITESPACE = " \t\n\r"
+_STRUCTURAL = re.compile(r'["\[\]{},]')
+_STRING_SPECIAL = re.compile(r'["\\]')
+_NUMBER_TAIL = frozenset("0123456789.eE+-")
+
+
+class _ChunkReader:
+    """Text buffer over a binary stream; consumed text is dropped on refill."""
+
+    def __init__(self, stream: IO[bytes], chunk_size: int = DEFAULT_CHUNK_SIZE):
+        self.stream = stream
+        self.chunk_size = max(int(chunk_size), 1)
+        self.decoder = codecs.getincrementaldecoder("utf-8")()
+        self.json = json.JSONDecoder()
+        self.buf = ""
+        self.pos = 0
+        self.dropped = 0
+        self.eof = False
+
+    @property
+    def offset(self) -> int:
+        """Characters consumed since the start of the stream."""
+        return self.dropped + self.pos
+
+    def fill(self) -> bool:
+        """Append the next chunk; False once the stream is exhausted."""
+        if self.eof:
+            return False
+        data = self.stream.read(self.chunk_size)
+        self.eof = not data
+        self.dropped += self.pos
+        self.buf = self.buf[self.pos :] + self.decoder.decode(data, final=self.eof)
+        self.pos = 0
+        return not self.eof
+
+    def peek(self) -> str:
+        """Next non-whitespace character (not consumed), or "" at end of input."""
+        while True:
+            while self.pos < len(self.buf) and self.buf[self.pos] in _WHITESPACE:
+                self.pos += 1
+            if self.pos < len(self.buf):
+                return self.buf[self.pos]
+            if not self.fill():
+                return ""
+
+    def expect(self, char: str) -> None:
+        found = self.peek()
+        if found != char:
+            raise ValueError(f"Expected {char!r} in JSON stream, found {found or 'end of input'!r}")
+        self.pos += 1
+
+    def decode(self) -> Any:
+        """Decode the next complete value, reading more input until it fits."""
+        self.peek()
+        while True:
+            try:
+                value, end = self.json.raw_decode(self.buf, self.pos)
+            except json.JSONDecodeError:
+                if not self.fill():
+                    raise
+                continue
+            if (end == len(self.buf) or self.buf[end] in _NUMBER_TAIL) and self.fill():
+                # A number cut at the chunk boundary; decode it again with more input.
+                continue
+            self.pos = end
+            return value
+
+    def skip(self) -> None:
+        """Consume the next value without decoding it."""
+        self.peek()
+        depth = 0
+        in_string = False
+        while True:
+            if in_string:
+                match = _STRING_SPECIAL.search(self.buf, self.pos)
+                if match is None or match.end() >= len(self.buf) and match.group() == "\\":
+                    # Keep a trailing backslash so its escaped character is seen with it.
+                    self.pos = match.start() if match else len(self.buf)
+                    if not self.fill():
+                        raise ValueError("Unterminated string in JSON stream")
+                    continue
+                self.pos = match.end() + (1 if match.group() == "\\" else 0)
+                in_string = match.group() != '"'
+                continue
+            match = _STRUCTURAL.search(self.buf, self.pos)
+            if match is None:
+                self.pos = len(self.buf)
+                if not self.fill():
+                    if depth:
+                        raise ValueError("Unterminated container in JSON stream")
+                    return
+                continue
+            char = match.group()
+            if char == '"':
+                in_string = True
+                self.pos = match.end()
+            elif char in "[{":
+                depth += 1
+                self.pos = match.end()
+            elif depth == 0:
+                # "," / "]" / "}" closing the enclosing container ends this value.
+                self.pos = match.start()
+                return
+            else:
+                self.pos = match.end()
+                if char in "]}":
+                    depth -= 1
+
+    def members(self) -> Iterator[str]:
+        """Yield the keys of the top-level object, positioned at each value."""
+        self.expect("{")
+        if self.peek() == "}":
+            return
+        while True:
+            key = self.decode()
+            if not isinstance(key, str):
+                raise ValueError("Object key in JSON stream is not a string")
+            self.expect(":")
+            start = self.offset
+            yield key
+            if self.offset == start:
+                self.skip()
+            separator = self.peek()
+            if separator == "}":
+                return
+            self.expect(",")
+
+
+def scan_object(
+    stream: IO[bytes], skip: Iterable[str] = (), chunk_size: int = DEFAULT_CHUNK_SIZE
+) -> Dict[str, Any]:
+    """Decode a top-level JSON object, leaving out (and never decoding) `skip` members."""
+    skipped = set(skip)
+    reader = _ChunkReader(stream, chunk_size)
+    result: Dict[str, Any] = {}
+    for key in reader.members():
+        if key not in skipped:
+            result[key] = reader.decode()
+    return result
+
+
+def iter_array_member(
+    stream: IO[bytes], key: str, chunk_size: int = DEFAULT_CHUNK_SIZE
+) -> Iterator[Any]:
+    """Yield the elements of the top-level array member `key`, one at a time.
+
+    Yields nothing when the member is absent or null.
+    """
+    reader = _ChunkReader(stream, chunk_size)
+    for name in reader.members():
+        if name != key:
+            continue
+        if reader.peek() != "[":
+            return
+        reader.expect("[")
+        if reader.peek() == "]":
+            return
+        while True:
+            yield reader.decode()
+            if reader.peek() == "]":
+                return
+            reader.expect(",")
+
+
+__all__ = [
+    "DEFAULT_CHUNK_SIZE",
+    "scan_object",
+    "iter_array_member",
+]
@@ -0,0 +1,448 @@
+"""Cold archive for old lifecycle log entries.
+
+`log-archive` moves a prefix of the in-state log (entries older than N days
+and/or beyond the newest N) into immutable compressed NDJSON segments next to
+the state file (`<state-stem>-archive/archive-000001.ndjson.gz`, gzip or
+lzma). Loading state no longer parses archived history; readers that need it
+(`log`, exports, provenance queries, `verify-log --full`) open segments lazily.
+
+Each segment has a small index file (`archive-000001.index.json`) mapping
+packet_id to line offsets, and its manifest record in the state document
+(`log_archive.segments`) carries the time range, entry count, position of its
+first entry, the hash-chain position it starts from and the SHA-256 of the
+compressed file. `log_archive.head` is the chain position at the archive
+boundary, so new entries keep extending the same chain
+(`log_integrity.chain_base`).
+"""
+
+import gzip
+import hashlib
+import json
+import lzma
+import os
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import IO, Any, Dict, Iterator, List, Optional, Tuple
+
+from governed_platform.governance.log_integrity import (
+    CHAIN_HEAD_KEY,
+    LOG_ARCHIVE_KEY,
+    LOG_DIGEST_KEY,
+    verify_log_integrity,
+)
+from governed_platform.governance.log_segments import drop_log_segment_prefix, is_segmented
+
+ARCHIVE_CODEC_GZIP = "gzip"
+ARCHIVE_CODEC_LZMA = "lzma"
+ARCHIVE_CODECS = (ARCHIVE_CODEC_GZIP, ARCHIVE_CODEC_LZMA)
+DEFAULT_ARCHIVE_CODEC = ARCHIVE_CODEC_GZIP
+
+_SUFFIXES = {ARCHIVE_CODEC_GZIP: ".ndjson.gz", ARCHIVE_CODEC_LZMA: ".ndjson.xz"}
+
+
+def normalize_archive_codec(value: Any, strict: bool = False) -> str:
+    token = str(value or DEFAULT_ARCHIVE_CODEC).strip().lower()
+    token = {"gz": ARCHIVE_CODEC_GZIP, "xz": ARCHIVE_CODEC_LZMA}.get(token, token)
+    if token in ARCHIVE_CODECS:
+        return token
+    if strict:
+        raise ValueError(f"Invalid archive codec: {value!r}")
+    return DEFAULT_ARCHIVE_CODEC
+
+
+def archive_dir_for(state_path: Path) -> Path:
+    state_path = Path(state_path)
+    return state_path.with_name(f"{state_path.stem}-archive")
+
+
+def archive_manifest(state: Dict[str, Any]) -> Dict[str, Any]:
+    """The `log_archive` manifest with defaults filled in (empty when nothing is archived)."""
+    raw = state.get(LOG_ARCHIVE_KEY)
+    raw = raw if isinstance(raw, dict) else {}
+    head = raw.get("head") if isinstance(raw.get("head"), dict) else {}
+    return {
+        "entries": int(raw.get("entries") or 0),
+        "head": {"index": int(head.get("index") or 0), "hash": head.get("hash", "") or ""},
+        "segments": [
+            seg for seg in raw.get("segments", []) if isinstance(seg, dict) and seg.get("name")
+        ],
+        "policy": dict(raw.get("policy") or {}),
+    }
+
+
+def archived_count(state: Dict[str, Any]) -> int:
+    raw = state.get(LOG_ARCHIVE_KEY)
+    return int(raw.get("entries") or 0) if isinstance(raw, dict) else 0
+
+
+def _parse_timestamp(value: Any) -> Optional[datetime]:
+    try:
+        parsed = datetime.fromisoformat(str(value))
+    except (TypeError, ValueError):
+        return None
+    if parsed.tzinfo is not None:
+        parsed = parsed.astimezone().replace(tzinfo=None)
+    return parsed
+
+
+def select_archivable(
+    entries: List[Dict[str, Any]],
+    older_than_days: Optional[float] = None,
+    keep_last: Optional[int] = None,
+    now: Optional[datetime] = None,
+) -> int:
+    """Number of leading entries the policy allows to archive.
+
+    An entry qualifies when it is older than `older_than_days` or falls
+    outside the newest `keep_last` entries; only a contiguous prefix is ever
+    archived.
+    """
+    count = 0
+    if keep_last is not None:
+        count = max(count, len(entries) - max(int(keep_last), 0))
+    if older_than_days is not None:
+        cutoff = (now or datetime.now()) - timedelta(days=float(older_than_days))
+        aged = 0
+        for entry in entries:
+            ts = _parse_timestamp(entry.get("timestamp")) if isinstance(entry, dict) else None
+            if ts is None or ts >= cutoff:
+                break
+            aged += 1
+        count = max(count, aged)
+    return max(0, min(count, len(entries)))
+
+
+def _open(path: Path, codec: str, mode: str) -> IO[bytes]:
+    if normalize_archive_codec(codec) == ARCHIVE_CODEC_LZMA:
+        return lzma.open(path, mode)
+    return gzip.open(path, mode)
+
+
+def _encode_entry(entry: Dict[str, Any]) -> bytes:
+    return (json.dumps(entry, sort_keys=True, separators=(",", ":")) + "\n").encode("utf-8")
+
+
+def _file_sha256(path: Path) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def archive_log_prefix(
+    state_path: Path,
+    state: Dict[str, Any],
+    count: int,
+    codec: str = DEFAULT_ARCHIVE_CODEC,
+) -> Optional[Dict[str, Any]]:
+    """Move `state["log"][:count]` into a new sealed segment and update the manifest.
+
+    Caller holds the state lock and must write the state afterwards; until
+    then the new segment is not referenced and a retry simply overwrites it.
+    Returns the segment record, or None when there is nothing to archive.
+    """
+    entries = state.get("log", [])
+    count = max(0, min(int(count), len(entries)))
+    if not count:
+        return None
+    codec = normalize_archive_codec(codec, strict=True)
+    manifest = archive_manifest(state)
+    base = archive_dir_for(state_path)
+    base.mkdir(parents=True, exist_ok=True)
+    sequence = len(manifest["segments"]) + 1
+    name = f"archive-{sequence:06d}{_SUFFIXES[codec]}"
+    index_name = f"archive-{sequence:06d}.index.json"
+
+    start = dict(manifest["head"])
+    head = dict(start)
+    packets: Dict[str, List[int]] = {}
+    timestamps: List[str] = []
+    tmp = base / f"{name}.tmp"
+    with _open(tmp, codec, "wb") as f:
+        for offset, entry in enumerate(entries[:count]):
+            f.write(_encode_entry(entry))
+            packets.setdefault(str(entry.get("packet_id") or ""), []).append(offset)
+            if entry.get("timestamp"):
+                timestamps.append(str(entry["timestamp"]))
+            if entry.get("hash"):
+                head = {"index": head["index"] + 1, "hash": entry["hash"]}
+    os.replace(tmp, base / name)
+
+    record = {
+        "name": name,
+        "codec": codec,
+        "count": count,
+        "first_position": manifest["entries"],
+        "from": min(timestamps) if timestamps else None,
+        "to": max(timestamps) if timestamps else None,
+        "start": start,
+        "sha256": _file_sha256(base / name),
+        "index": index_name,
+    }
+    index = {key: record[key] for key in ("name", "count", "first_position", "from", "to")}
+    index["packets"] = packets
+    tmp_index = base / f"{index_name}.tmp"
+    tmp_index.write_text(json.dumps(index, sort_keys=True, separators=(",", ":")) + "\n")
+    os.replace(tmp_index, base / index_name)
+
+    manifest["segments"].append(record)
+    manifest["entries"] += count
+    manifest["head"] = head
+    state[LOG_ARCHIVE_KEY] = manifest
+    state["log"] = entries[count:]
+    if is_segmented(state):
+        # Trim the segment manifest to match, so the next write does not lay
+        # the whole remaining log out again.
+        drop_log_segment_prefix(state_path, state, count)
+    # Cached head and digest refer to the old log layout; rebuilt on next append.
+    state.pop(CHAIN_HEAD_KEY, None)
+    state.pop(LOG_DIGEST_KEY, None)
+    return record
+
+
+def _iter_segment(state_path: Path, segment: Dict[str, Any]) -> Iterator[Dict[str, Any]]:
+    with _open(archive_dir_for(state_path) / segment["name"], segment.get("codec"), "rb") as f:
+        for raw in f:
+            yield json.loads(raw)
+
+
+def load_segment_index(state_path: Path, segment: Dict[str, Any]) -> Dict[str, Any]:
+    return json.loads((archive_dir_for(state_path) / segment["index"]).read_text())
+
+
+def _in_range(segment: Dict[str, Any], since: Optional[str], until: Optional[str]) -> bool:
+    if since and segment.get("to") and str(segment["to"]) < since:
+        return False
+    if until and segment.get("from") and str(segment["from"]) > until:
+        return False
+    return True
+
+
+def iter_archived_entries(
+    state_path: Path,
+    state: Dict[str, Any],
+    packet_id: Optional[str] = None,
+    since: Optional[str] = None,
+    until: Optional[str] = None,
+    start: int = 0,
+) -> Iterator[Tuple[int, Dict[str, Any]]]:
+    """Yield `(log position, entry)` from archived segments, oldest first.
+
+    Segments outside the `since`/`until` timestamp range, or wholly before
+    log position `start`, are skipped without being opened. With `packet_id`,
+    segments whose index has no entry for it are skipped and decompression
+    stops after its last offset.
+    """
+    for segment in archive_manifest(state)["segments"]:
+        if not _in_range(segment, since, until):
+            continue
+        first = int(segment.get("first_position") or 0)
+        if first + int(segment.get("count") or 0) <= start:
+            continue
+        if packet_id is None:
+            for offset, entry in enumerate(_iter_segment(state_path, segment)):
+                if first + offset >= start:
+                    yield first + offset, entry
+            continue
+        offsets = load_segment_index(state_path, segment).get("packets", {}).get(packet_id)
+        if not offsets:
+            continue
+        wanted = set(offsets)
+        last = max(offsets)
+        for offset, entry in enumerate(_iter_segment(state_path, segment)):
+            if offset in wanted and first + offset >= start:
+                yield first + offset, entry
+            if offset >= last:
+                break
+
+
+def archived_tail(state_path: Path, state: Dict[str, Any], limit: int) -> List[Dict[str, Any]]:
+    """The newest `limit` archived entries, opening only the segments needed."""
+    tail: List[Dict[str, Any]] = []
+    if limit <= 0:
+        return tail
+    for segment in reversed(archive_manifest(state)["segments"]):
+        tail = list(_iter_segment(state_path, segment))[-(limit - len(tail)) :] + tail
+        if len(tail) >= limit:
+            break
+    return tail
+
+
+def find_archived_event(
+    state_path: Path, state: Dict[str, Any], event_id: str
+) -> Tuple[int, Dict[str, Any]]:
+    """Locate a hashed event by id, opening only the segment whose chain range holds it."""
+    try:
+        wanted = int(str(event_id).rsplit("-", 1)[-1])
+    except ValueError:
+        raise KeyError(event_id) from None
+    manifest = archive_manifest(state)
+    segments = manifest["segments"]
+    for idx, segment in enumerate(segments):
+        start = int((segment.get("start") or {}).get("index") or 0)
+        end = (
+            int((segments[idx + 1].get("start") or {}).get("index") or 0)
+            if idx + 1 < len(segments)
+            else manifest["head"]["index"]
+        )
+        if not start < wanted <= end:
+            continue
+        first = int(segment.get("first_position") or 0)
+        for offset, entry in enumerate(_iter_segment(state_path, segment)):
+            if entry.get("event_id") == event_id:
+                return first + offset, entry
+    raise KeyError(event_id)
+
+
+def iter_full_log(state_path: Path, state: Dict[str, Any]) -> Iterator[Dict[str, Any]]:
+    """Archived entries (streamed from segments) followed by the in-state log."""
+    for _, entry in iter_archived_entries(state_path, state):
+        yield entry
+    yield from state.get("log", [])
+
+
+def verify_archive(
+    state_path: Path, state: Dict[str, Any], workers: int = 1
+) -> Tuple[bool, List[str]]:
+    """Check segment digests, counts and hash-chain continuity up to the archive head."""
+    manifest = archive_manifest(state)
+    issues: List[str] = []
+    expected = {"index": 0, "hash": ""}
+    position = 0
+    for segment in manifest["segments"]:
+        name = segment["name"]
+        path = archive_dir_for(state_path) / name
+        if not path.exists():
+            issues.append(f"archive {name}: segment file missing")
+            continue
+        if _file_sha256(path) != segment.get("sha256"):
+            issues.append(f"archive {name}: sha256 mismatch")
+        start = segment.get("start") or {}
+        if (
+            int(start.get("index") or 0) != expected["index"]
+            or (start.get("hash") or "") != expected["hash"]
+        ):
+            issues.append(f"archive {name}: chain does not continue from previous segment")
+        if int(segment.get("first_position") or 0) != position:
+            issues.append(f"archive {name}: first_position mismatch")
+        try:
+            entries = list(_iter_segment(state_path, segment))
+        except (OSError, EOFError, lzma.LZMAError, ValueError) as exc:
+            issues.append(f"archive {name}: unreadable segment ({exc})")
+            continue
+        if len(entries) != int(segment.get("count") or 0):
+            issues.append(
+                f"archive {name}: entry count mismatch ({len(entries)} != {segment.get('count')})"
+            )
+        ok, chain_issues = verify_log_integrity(
+            entries,
+            start={
+                "position": 0,
+                "index": int(start.get("index") or 0),
+                "hash": start.get("hash", "") or "",
+            },
+            workers=workers,
+        )
+        issues.extend(f"archive {name}: {issue}" for issue in chain_issues)
+        for entry in entries:
+            if isinstance(entry, dict) and entry.get("hash"):
+                expected = {"index": expected["index"] + 1, "hash": entry["hash"]}
+        position += len(entries)
+    if position != manifest["entries"]:
+        issues.append(f"archive holds {position} entries, manifest records {manifest['entries']}")
+    if expected != manifest["head"]:
+        issues.append("archive head does not match the last archived hashed entry")
+    return len(issues) == 0, issues
+
+
+def snapshot_log_archive(state_path: Path) -> List[str]:
+    """Names of the files in the archive directory, for `restore_log_archive`.
+
+    Segments and their indexes are never modified once referenced, so names
+    are enough to undo an archive run.
+    """
+    base = archive_dir_for(state_path)
+    if not base.is_dir():
+        return []
+    return sorted(path.name for path in base.glob("archive-*"))
+
+
+def restore_log_archive(state_path: Path, snapshot: List[str]) -> None:
+    """Remove archive files written since `snapshot_log_archive`."""
+    base = archive_dir_for(state_path)
+    if not base.is_dir():
+        return
+    keep = set(snapshot)
+    for path in base.glob("archive-*"):
+        if path.name not in keep:
+            path.unlink(missing_ok=True)
+
+
+def archive_state_log(
+    state_path: Path,
+    older_than_days: Optional[float] = None,
+    keep_last: Optional[int] = None,
+    codec: Optional[str] = None,
+    save_policy: bool = False,
+    dry_run: bool = False,
+    timeout: float = 10.0,
+) -> Dict[str, Any]:
+    """Apply the archive policy to the state document under the state lock.
+
+    Unset options fall back to the stored policy (`log_archive.policy`).
+    """
+    from governed_platform.governance.file_lock import file_lock
+    from governed_platform.governance.state_store import read_state_document, write_state_document
+
+    state_path = Path(state_path)
+    with file_lock(state_path, timeout=timeout):
+        state = read_state_document(state_path)
+        manifest = archive_manifest(state)
+        policy = manifest["policy"]
+        if older_than_days is None:
+            older_than_days = policy.get("older_than_days")
+        if keep_last is None:
+            keep_last = policy.get("keep_last")
+        codec = normalize_archive_codec(codec or policy.get("codec"), strict=True)
+        count = select_archivable(state.get("log", []), older_than_days, keep_last)
+        result = {
+            "archived": count,
+            "codec": codec,
+            "policy": {"older_than_days": older_than_days, "keep_last": keep_last, "codec": codec},
+            "dry_run": dry_run,
+            "segment": None,
+        }
+        if dry_run or (not count and not save_policy):
+            return result
+        segment = archive_log_prefix(state_path, state, count, codec)
+        if save_policy:
+            state.setdefault(LOG_ARCHIVE_KEY, archive_manifest(state))["policy"] = result["policy"]
+        # Verification checkpoints use absolute chain positions and need no rebase.
+        write_state_document(state_path, state, lock=False)
+        result["segment"] = segment
+        result["archived_total"] = archived_count(state)
+        return result
+
+
+__all__ = [
+    "ARCHIVE_CODEC_GZIP",
+    "ARCHIVE_CODEC_LZMA",
+    "ARCHIVE_CODECS",
+    "DEFAULT_ARCHIVE_CODEC",
+    "normalize_archive_codec",
+    "archive_dir_for",
+    "archive_manifest",
+    "archived_count",
+    "select_archivable",
+    "archive_log_prefix",
+    "load_segment_index",
+    "iter_archived_entries",
+    "archived_tail",
+    "find_archived_event",
+    "iter_full_log",
+    "verify_archive",
+    "snapshot_log_archive",
+    "restore_log_archive",
+    "archive_state_log",
+]
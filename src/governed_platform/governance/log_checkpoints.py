@@ -0,0 +1,259 @@
+"""Recorded verification checkpoints for incremental log verification.
+
+After a successful `verify-log`, the verified chain position (entry count,
+hashed-event index, last hash) is recorded next to the state file. The next
+run only re-hashes entries appended after the newest checkpoint whose anchor
+entry still matches. `verify-log --full` ignores checkpoints.
+
+Positions are absolute chain positions, counting archived entries (see
+`log_archive`), so archiving a log prefix never rewrites the checkpoint file;
+a checkpoint whose anchor entry was archived is simply no longer usable.
+
+When `WBS_LOG_CHECKPOINT_KEY` is set, checkpoints are HMAC-SHA256 signed and
+unsigned or mis-signed checkpoints are ignored.
+"""
+
+import hashlib
+import hmac
+import json
+import os
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from governed_platform.governance.file_lock import atomic_write_json
+from governed_platform.governance.log_archive import archived_count, verify_archive
+from governed_platform.governance.log_integrity import (
+    LOG_DIGEST_KEY,
+    chain_base,
+    compute_entry_hash,
+    log_digest_current,
+    rebuild_log_digest,
+    verify_log_integrity,
+)
+
+CHECKPOINT_KEY_ENV = "WBS_LOG_CHECKPOINT_KEY"
+MAX_CHECKPOINTS = 20
+
+_SIGNED_FIELDS = ("position", "index", "hash", "hash_position", "created_at")
+
+
+def checkpoint_path_for(state_path: Path) -> Path:
+    state_path = Path(state_path)
+    return state_path.with_name(f"{state_path.stem}-log-checkpoints.json")
+
+
+def _signing_key() -> Optional[bytes]:
+    raw = os.environ.get(CHECKPOINT_KEY_ENV, "")
+    return raw.encode() if raw else None
+
+
+def _signature(checkpoint: Dict[str, Any], key: bytes) -> str:
+    payload = {field: checkpoint.get(field) for field in _SIGNED_FIELDS}
+    encoded = json.dumps(payload, sort_keys=True, separators=(",", ":")).encode()
+    return hmac.new(key, encoded, hashlib.sha256).hexdigest()
+
+
+def signature_ok(checkpoint: Dict[str, Any], key: Optional[bytes] = None) -> bool:
+    key = key if key is not None else _signing_key()
+    if key is None:
+        return True
+    signature = str(checkpoint.get("signature") or "")
+    return bool(signature) and hmac.compare_digest(signature, _signature(checkpoint, key))
+
+
+def advance_checkpoint(
+    start: Optional[Dict[str, Any]], entries: List[Dict[str, Any]]
+) -> Dict[str, Any]:
+    """Walk entries after `start` and return the chain position at the log tail."""
+    head = {"position": 0, "index": 0, "hash": "", "hash_position": -1}
+    if start:
+        head.update({field: start.get(field, head[field]) for field in head})
+    for idx in range(int(head["position"]), len(entries)):
+        entry = entries[idx]
+        if isinstance(entry, dict) and entry.get("hash"):
+            head["index"] = int(head["index"]) + 1
+            head["hash"] = entry["hash"]
+            head["hash_position"] = idx
+    head["position"] = len(entries)
+    return head
+
+
+def shift_checkpoint(checkpoint: Dict[str, Any], offset: int) -> Dict[str, Any]:
+    """`checkpoint` with its positions moved by `offset` (in-state <-> absolute)."""
+    shifted = dict(checkpoint, position=int(checkpoint["position"]) + offset)
+    if int(checkpoint.get("hash_position", -1)) >= 0:
+        shifted["hash_position"] = int(checkpoint["hash_position"]) + offset
+    return shifted
+
+
+def anchor_matches(
+    checkpoint: Dict[str, Any], entries: List[Dict[str, Any]], offset: int = 0
+) -> bool:
+    """O(1) check that the checkpointed anchor entry is still the one that was verified.
+
+    `offset` is the absolute position of `entries[0]` (the archived count).
+    """
+    try:
+        position = int(checkpoint.get("position", -1))
+        index = int(checkpoint.get("index", -1))
+        hash_position = int(checkpoint.get("hash_position", -1))
+    except (TypeError, ValueError):
+        return False
+    if position < offset or position > offset + len(entries) or index < 0:
+        return False
+    if index == 0:
+        return hash_position == -1
+    if not offset <= hash_position < position:
+        return False
+    anchor = entries[hash_position - offset]
+    return (
+        isinstance(anchor, dict)
+        and anchor.get("hash") == checkpoint.get("hash")
+        and anchor.get("event_id") == f"evt-{index:08d}"
+        and compute_entry_hash(anchor) == checkpoint.get("hash")
+    )
+
+
+def load_checkpoints(path: Path) -> List[Dict[str, Any]]:
+    target = Path(path)
+    if not target.exists():
+        return []
+    raw = json.loads(target.read_text())
+    items = raw.get("checkpoints", []) if isinstance(raw, dict) else []
+    return [item for item in items if isinstance(item, dict)]
+
+
+def record_checkpoint(path: Path, head: Dict[str, Any]) -> Dict[str, Any]:
+    """Append a checkpoint for a verified chain position (keeps the newest MAX_CHECKPOINTS)."""
+    checkpoint = {
+        "position": int(head["position"]),
+        "index": int(head["index"]),
+        "hash": head.get("hash", "") or "",
+        "hash_position": int(head.get("hash_position", -1)),
+        "created_at": datetime.now(timezone.utc).isoformat(),
+    }
+    key = _signing_key()
+    if key is not None:
+        checkpoint["signature"] = _signature(checkpoint, key)
+    checkpoints = [
+        cp for cp in load_checkpoints(path) if int(cp.get("position", -1)) < checkpoint["position"]
+    ]
+    checkpoints.append(checkpoint)
+    atomic_write_json(Path(path), {"checkpoints": checkpoints[-MAX_CHECKPOINTS:]})
+    return checkpoint
+
+
+def verify_log_incremental(
+    entries: List[Dict[str, Any]],
+    checkpoints: List[Dict[str, Any]],
+    workers: int = 1,
+    base: Optional[Dict[str, Any]] = None,
+    offset: int = 0,
+) -> Dict[str, Any]:
+    """Verify only entries after the newest trustworthy checkpoint.
+
+    `base` is the chain position before `entries[0]` and `offset` its
+    absolute position when older entries were archived (see
+    `log_integrity.chain_base`). `verified_from` and `head` are absolute.
+    """
+    chosen: Optional[Dict[str, Any]] = None
+    ignored = 0
+    rewritten: List[str] = []
+    key = _signing_key()
+    for checkpoint in sorted(checkpoints, key=lambda cp: int(cp.get("position", -1)), reverse=True):
+        if not signature_ok(checkpoint, key):
+            ignored += 1
+            continue
+        if anchor_matches(checkpoint, entries, offset):
+            chosen = checkpoint
+            break
+        ignored += 1
+        try:
+            in_state = offset <= int(checkpoint.get("position", -1)) <= offset + len(entries) and (
+                int(checkpoint.get("index", -1)) == 0
+                or int(checkpoint.get("hash_position", -1)) >= offset
+            )
+        except (TypeError, ValueError):
+            in_state = False
+        if in_state:
+            # The anchor is still within the in-state log, so the verified prefix itself changed.
+            rewritten.append(
+                f"checkpoint at position {checkpoint.get('position')} no longer matches log history"
+            )
+    start = shift_checkpoint(chosen, -offset) if chosen else base
+    valid, issues = verify_log_integrity(entries, start=start, workers=workers)
+    issues = rewritten + issues
+    return {
+        "valid": valid and not rewritten,
+        "issues": issues,
+        "checkpoint": chosen,
+        "ignored_checkpoints": ignored,
+        "verified_from": int(chosen["position"]) if chosen else offset,
+        "head": shift_checkpoint(advance_checkpoint(start, entries), offset),
+    }
+
+
+def verify_state_log(
+    state_path: Path,
+    state: Dict[str, Any],
+    full: bool = False,
+    workers: int = 1,
+) -> Dict[str, Any]:
+    """Verify the log of `state` (stored at `state_path`) and record a checkpoint on success.
+
+    Incremental from the newest usable checkpoint unless `full`, which
+    re-hashes every in-state entry and the archive segments and re-rolls the
+    cached `log_digest`, so a rewritten entry is reported in plain mode too.
+    """
+    entries = state.get("log", [])
+    offset = archived_count(state)
+    base = chain_base(state)
+    checkpoint_path = checkpoint_path_for(state_path)
+    if full:
+        valid, issues = verify_log_integrity(entries, start=base, workers=workers)
+        if offset:
+            archive_ok, archive_issues = verify_archive(state_path, state, workers=workers)
+            valid, issues = valid and archive_ok, archive_issues + issues
+        if (
+            log_digest_current(state)
+            and rebuild_log_digest(entries)["digest"] != state[LOG_DIGEST_KEY]["digest"]
+        ):
+            valid = False
+            issues.append("log digest mismatch: an entry was changed after it was appended")
+        verification = {
+            "valid": valid,
+            "issues": issues,
+            "checkpoint": None,
+            "ignored_checkpoints": 0,
+            "verified_from": 0,
+            "head": shift_checkpoint(advance_checkpoint(base, entries), offset),
+        }
+    else:
+        verification = verify_log_incremental(
+            entries, load_checkpoints(checkpoint_path), workers=workers, base=base, offset=offset
+        )
+    head = verification["head"]
+    previous = verification["checkpoint"]
+    if (
+        verification["valid"]
+        and entries
+        and (previous is None or int(previous["position"]) < head["position"])
+    ):
+        record_checkpoint(checkpoint_path, head)
+    return verification
+
+
+__all__ = [
+    "CHECKPOINT_KEY_ENV",
+    "MAX_CHECKPOINTS",
+    "checkpoint_path_for",
+    "signature_ok",
+    "advance_checkpoint",
+    "shift_checkpoint",
+    "anchor_matches",
+    "load_checkpoints",
+    "record_checkpoint",
+    "verify_log_incremental",
+    "verify_state_log",
+]
@@ -0,0 +1,225 @@
+"""Per-packet offset index for the lifecycle log.
+
+Every state write appends one line per new log entry to a sidecar next to
+the state file (`<stem>-log-index.ndjson`): `[position, packet_id, digest]`,
+where `position` counts archived entries too. Packet history lookups then
+read `state["log"]` only at that packet's positions instead of filtering
+the whole log.
+
+The digest is a short hash of the entry. An index is reused only while its
+digest at the last shared position still matches the log; a rolled-back or
+rewritten log rebuilds it, and entries past the sidecar (written by a tool
+that bypassed it) are indexed in memory and appended on the next write.
+"""
+
+import hashlib
+import json
+import os
+import threading
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from governed_platform.governance.log_archive import archived_count
+
+
+def log_index_path_for(state_path: Path) -> Path:
+    state_path = Path(state_path)
+    return state_path.with_name(f"{state_path.stem}-log-index.ndjson")
+
+
+def entry_digest(entry: Any) -> str:
+    encoded = json.dumps(entry, sort_keys=True, separators=(",", ":"), default=str).encode()
+    return hashlib.sha256(encoded).hexdigest()[:16]
+
+
+def _packet_of(entry: Any) -> str:
+    return str(entry.get("packet_id") or "") if isinstance(entry, dict) else ""
+
+
+class LogIndex:
+    """packet_id -> ordered log positions for entries `start .. size - 1`."""
+
+    def __init__(self, start: int = 0):
+        self.start = start
+        self.packets: List[str] = []
+        self.digests: List[str] = []
+        self.positions: Dict[str, List[int]] = {}
+
+    @property
+    def size(self) -> int:
+        return self.start + len(self.packets)
+
+    @classmethod
+    def from_entries(cls, entries: List[Dict[str, Any]], start: int = 0) -> "LogIndex":
+        index = cls(start)
+        for entry in entries:
+            index.append(_packet_of(entry), entry_digest(entry))
+        return index
+
+    def append(self, packet_id: str, digest: str) -> None:
+        self.positions.setdefault(packet_id, []).append(self.size)
+        self.packets.append(packet_id)
+        self.digests.append(digest)
+
+    def digest_at(self, position: int) -> str:
+        return self.digests[position - self.start]
+
+    def truncate(self, size: int) -> None:
+        while self.size > max(size, self.start):
+            packet_id = self.packets.pop()
+            self.digests.pop()
+            owned = self.positions[packet_id]
+            owned.pop()
+            if not owned:
+                del self.positions[packet_id]
+
+    def copy(self) -> "LogIndex":
+        other = LogIndex(self.start)
+        other.packets = list(self.packets)
+        other.digests = list(self.digests)
+        other.positions = {pid: list(owned) for pid, owned in self.positions.items()}
+        return other
+
+    def positions_for(self, packet_id: str) -> List[int]:
+        return list(self.positions.get(packet_id, []))
+
+
+# Last loaded index per sidecar path, keyed by file fingerprint.
+_index_cache: Dict[str, Tuple[Tuple[int, int, int], LogIndex]] = {}
+_cache_lock = threading.Lock()
+
+
+def _fingerprint(path: Path) -> Optional[Tuple[int, int, int]]:
+    try:
+        st = path.stat()
+    except FileNotFoundError:
+        return None
+    return (st.st_ino, st.st_mtime_ns, st.st_size)
+
+
+def _read_sidecar(path: Path) -> Tuple[LogIndex, bool]:
+    """Load the sidecar; the flag is False if a torn or out-of-order line was hit."""
+    index: Optional[LogIndex] = None
+    if not path.exists():
+        return LogIndex(), True
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            try:
+                position, packet_id, digest = json.loads(line)
+            except (json.JSONDecodeError, TypeError, ValueError):
+                return index or LogIndex(), False  # torn final line from an interrupted append
+            if index is None:
+                index = LogIndex(int(position))
+            elif position != index.size:
+                return index, False
+            index.append(str(packet_id), str(digest))
+    return index or LogIndex(), True
+
+
+def _sidecar_lines(index: LogIndex, start: int) -> List[str]:
+    return [
+        json.dumps(
+            [position, index.packets[position - index.start], index.digest_at(position)],
+            separators=(",", ":"),
+        )
+        + "\n"
+        for position in range(max(start, index.start), index.size)
+    ]
+
+
+def load_log_index(
+    path: Path, entries: List[Dict[str, Any]], offset: int = 0
+) -> Tuple[LogIndex, Optional[int]]:
+    """Return an index over `entries` and the log position up to which the sidecar is valid.
+
+    `offset` is the log position of `entries[0]` (the archived entry count).
+    The position is None when the sidecar has to be rewritten. When the sidecar
+    already matches the log exactly the shared cached index is returned;
+    callers must not mutate it.
+    """
+    path = Path(path)
+    fingerprint = _fingerprint(path)
+    with _cache_lock:
+        cached = _index_cache.get(str(path))
+    if cached and cached[0] == fingerprint:
+        index, intact = cached[1], True
+    else:
+        index, intact = _read_sidecar(path)
+        if intact and fingerprint is not None:
+            with _cache_lock:
+                _index_cache[str(path)] = (fingerprint, index)
+
+    end = offset + len(entries)
+    if not index.start <= offset <= index.size:
+        return LogIndex.from_entries(entries, offset), None
+    usable = min(index.size, end)
+    if usable > offset and index.digest_at(usable - 1) != entry_digest(
+        entries[usable - offset - 1]
+    ):
+        return LogIndex.from_entries(entries, offset), None
+    if usable == index.size == end:
+        return index, end if intact else None
+    on_disk = index.size
+    index = index.copy()
+    index.truncate(usable)
+    for entry in entries[usable - offset :]:
+        index.append(_packet_of(entry), entry_digest(entry))
+    return index, usable if intact and usable == on_disk else None
+
+
+def sync_log_index(path: Path, entries: List[Dict[str, Any]], offset: int = 0) -> LogIndex:
+    """Bring the sidecar in line with `entries`, appending only new positions.
+
+    No sidecar is kept while there is nothing to index.
+    """
+    path = Path(path)
+    if not entries:
+        path.unlink(missing_ok=True)
+        with _cache_lock:
+            _index_cache.pop(str(path), None)
+        return LogIndex(offset)
+    index, valid = load_log_index(path, entries, offset)
+    if valid is not None:
+        if valid < index.size:
+            with open(path, "a", encoding="utf-8") as f:
+                f.writelines(_sidecar_lines(index, valid))
+    else:
+        tmp = path.with_suffix(path.suffix + ".tmp")
+        with open(tmp, "w", encoding="utf-8") as f:
+            f.writelines(_sidecar_lines(index, index.start))
+        os.replace(tmp, path)
+    with _cache_lock:
+        _index_cache[str(path)] = (_fingerprint(path), index)
+    return index
+
+
+def packet_log_entries(
+    state: Dict[str, Any],
+    packet_id: str,
+    state_path: Optional[Path] = None,
+) -> List[Dict[str, Any]]:
+    """In-state log entries for one packet, oldest first.
+
+    With `state_path` the sidecar index is used, so the cost is the packet's
+    own event count; without it (non-file backends) the log is scanned.
+    """
+    entries = state.get("log", [])
+    if state_path is None:
+        return [e for e in entries if _packet_of(e) == packet_id]
+    offset = archived_count(state)
+    index, _ = load_log_index(log_index_path_for(state_path), entries, offset)
+    return [
+        entries[position - offset]
+        for position in index.positions_for(packet_id)
+        if position >= offset
+    ]
+
+
+__all__ = [
+    "LogIndex",
+    "log_index_path_for",
+    "entry_digest",
+    "load_log_index",
+    "sync_log_index",
+    "packet_log_entries",
+]
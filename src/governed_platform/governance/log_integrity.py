@@ -1,11 +1,28 @@
 import hashlib
 import json
-from typing import Any, Dict, List, Tuple
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Dict, List, Optional, Tuple
 
+from governed_platform.governance.log_segments import log_offset
 
 LOG_MODE_PLAIN = "plain"
 LOG_MODE_HASH_CHAIN = "hash_chain"
 
+CHAIN_HEAD_KEY = "log_chain_head"
+# Rolling digest of the in-state log (`{"position", "digest"}`), folded forward
+# on every append so the append-only guard can pin the whole prefix cheaply.
+LOG_DIGEST_KEY = "log_digest"
+# Manifest of entries moved to cold archive segments; its `head` is the chain
+# position at the archive boundary (see `log_archive`).
+LOG_ARCHIVE_KEY = "log_archive"
+
+# Below this many hashed entries process start-up costs more than it saves.
+PARALLEL_VERIFY_MIN_ENTRIES = 5000
+PARALLEL_VERIFY_CHUNK_SIZE = 2000
+
+_HASH_FIELDS = ("event_id", "prev_hash", "hash")
+
 _MODE_ALIASES = {
     "plain": LOG_MODE_PLAIN,
     "off": LOG_MODE_PLAIN,
@@ -40,12 +57,46 @@ def _hash_payload(entry: Dict[str, Any]) -> Dict[str, Any]:
     }
 
 
-def compute_entry_hash(entry: Dict[str, Any]) -> str:
-    payload = _hash_payload(entry)
+def _hash_encoded_payload(payload: Dict[str, Any]) -> str:
     encoded = json.dumps(payload, sort_keys=True, separators=(",", ":"), ensure_ascii=True)
     return hashlib.sha256(encoded.encode()).hexdigest()
 
 
+def compute_entry_hash(entry: Dict[str, Any]) -> str:
+    return _hash_encoded_payload(_hash_payload(entry))
+
+
+def _hash_chunk(payloads: List[Optional[Dict[str, Any]]]) -> List[Optional[str]]:
+    return [_hash_encoded_payload(payload) if payload is not None else None for payload in payloads]
+
+
+def compute_entry_hashes(
+    entries: List[Dict[str, Any]],
+    workers: int = 1,
+    chunk_size: int = PARALLEL_VERIFY_CHUNK_SIZE,
+) -> List[Optional[str]]:
+    """Hash every fully hash-chained entry, fanning chunks out to worker processes.
+
+    Returns a list aligned with `entries` (None for entries without chain
+    fields). Falls back to in-process hashing if a pool cannot be started.
+    """
+    payloads = [
+        _hash_payload(entry)
+        if isinstance(entry, dict) and all(f in entry for f in _HASH_FIELDS)
+        else None
+        for entry in entries
+    ]
+    chunk_size = max(int(chunk_size), 1)
+    chunks = [payloads[i : i + chunk_size] for i in range(0, len(payloads), chunk_size)]
+    if workers > 1 and len(chunks) > 1:
+        try:
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                return [digest for chunk in pool.map(_hash_chunk, chunks) for digest in chunk]
+        except (OSError, BrokenProcessPool):
+            pass
+    return _hash_chunk(payloads)
+
+
 def build_log_entry(
     packet_id: str,
     event: str,
@@ -72,12 +123,234 @@ def build_log_entry(
     return entry
 
 
-def verify_log_integrity(entries: List[Dict[str, Any]]) -> Tuple[bool, List[str]]:
+def entry_digest(entry: Any) -> str:
+    encoded = json.dumps(entry, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(encoded.encode()).hexdigest()
+
+
+def roll_log_digest(digest: str, entry: Any) -> str:
+    """Fold one more entry into the rolling digest of the log prefix before it."""
+    return hashlib.sha256(f"{digest}:{entry_digest(entry)}".encode()).hexdigest()
+
+
+def rebuild_log_digest(entries: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Roll the digest over the whole in-state log (full pass; used as fallback)."""
+    digest = ""
+    for entry in entries:
+        digest = roll_log_digest(digest, entry)
+    return {"position": len(entries), "digest": digest}
+
+
+def log_digest_current(state: Dict[str, Any]) -> bool:
+    """Whether the cached rolling digest describes a log of the loaded length."""
+    record = state.get(LOG_DIGEST_KEY)
+    return (
+        isinstance(record, dict)
+        and isinstance(record.get("digest"), str)
+        and record.get("position") == log_offset(state) + len(state.get("log", []))
+    )
+
+
+def log_digest(state: Dict[str, Any]) -> Dict[str, Any]:
+    """Return the cached rolling digest of the log, rebuilding it when its position is stale.
+
+    Like `chain_head`, a rebuild needs the whole in-state log and is refused
+    for a state that only loaded the active log segment.
+    """
+    if not log_digest_current(state):
+        if log_offset(state):
+            raise ValueError("Log digest is stale and only the active log segment is loaded")
+        state[LOG_DIGEST_KEY] = rebuild_log_digest(state.setdefault("log", []))
+    return state[LOG_DIGEST_KEY]
+
+
+def advance_log_digest(state: Dict[str, Any], entry: Dict[str, Any]) -> None:
+    """Fold an entry that was just appended to `state["log"]` into the cached digest."""
+    position = log_offset(state) + len(state.get("log", []))
+    record = state.get(LOG_DIGEST_KEY)
+    if not isinstance(record, dict) or record.get("position") != position - 1:
+        state.pop(LOG_DIGEST_KEY, None)
+        return
+    state[LOG_DIGEST_KEY] = {
+        "position": position,
+        "digest": roll_log_digest(record.get("digest", ""), entry),
+    }
+
+
+def chain_base(state: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """Verification start for the in-state log when older entries were archived.
+
+    Returns a checkpoint-shaped `{"position": 0, "index", "hash"}` describing
+    the chain at the archive boundary, or None when nothing was archived.
+    """
+    archive = state.get(LOG_ARCHIVE_KEY)
+    if not isinstance(archive, dict) or not isinstance(archive.get("head"), dict):
+        return None
+    head = archive["head"]
+    return {
+        "position": 0,
+        "index": int(head.get("index") or 0),
+        "hash": head.get("hash", "") or "",
+        "hash_position": -1,
+    }
+
+
+def rebuild_chain_head(
+    entries: List[Dict[str, Any]], base: Optional[Dict[str, Any]] = None
+) -> Dict[str, Any]:
+    """Scan the log for the last hashed entry (full pass; used as fallback).
+
+    `base` (see `chain_base`) continues the chain from archived entries.
+    """
+    head: Dict[str, Any] = {"hash": "", "index": 0, "hash_position": -1, "position": len(entries)}
+    if base:
+        head.update({"hash": base.get("hash", "") or "", "index": int(base.get("index") or 0)})
+    for idx, entry in enumerate(entries):
+        if isinstance(entry, dict) and entry.get("hash"):
+            head["hash"] = entry.get("hash", "") or ""
+            head["index"] += 1
+            head["hash_position"] = idx
+    return head
+
+
+def _head_matches_tail(
+    head: Any,
+    entries: List[Dict[str, Any]],
+    base: Optional[Dict[str, Any]] = None,
+    offset: int = 0,
+) -> bool:
+    if not isinstance(head, dict):
+        return False
+    try:
+        position = int(head.get("position", -1))
+        index = int(head.get("index", -1))
+        hash_position = int(head.get("hash_position", -1))
+    except (TypeError, ValueError):
+        return False
+    if position != offset + len(entries) or index < 0:
+        return False
+    if hash_position == -1:
+        # No hashed entry in the in-state log; the head is the archive boundary.
+        base = base or {}
+        return index == int(base.get("index") or 0) and (head.get("hash") or "") == (
+            base.get("hash") or ""
+        )
+    if index == 0 or not offset <= hash_position < offset + len(entries):
+        return False
+    anchor = entries[hash_position - offset]
+    return (
+        isinstance(anchor, dict)
+        and anchor.get("hash") == head.get("hash")
+        and anchor.get("event_id") == f"evt-{index:08d}"
+    )
+
+
+def chain_head_current(state: Dict[str, Any]) -> bool:
+    """Whether the cached chain head can be trusted for the loaded log without a rebuild."""
+    return _head_matches_tail(
+        state.get(CHAIN_HEAD_KEY), state.get("log", []), chain_base(state), log_offset(state)
+    )
+
+
+def log_tail_current(state: Dict[str, Any]) -> bool:
+    """Whether a transition can append to the loaded log tail without reading the rest.
+
+    Needs the rolling digest and, in hash-chain mode, the chain head.
+    """
+    if not log_digest_current(state):
+        return False
+    return normalize_log_mode(
+        state.get("log_integrity_mode")
+    ) != LOG_MODE_HASH_CHAIN or chain_head_current(state)
+
+
+def chain_head(state: Dict[str, Any]) -> Dict[str, Any]:
+    """Return the cached hash-chain head, rebuilding it when it disagrees with the log tail.
+
+    The check is O(1): the cached head must describe a log of the current
+    length and point at an entry carrying the same hash and event id. A
+    rebuild needs the whole in-state log, so it is refused for a state that
+    only loaded the active log segment (`log_segments.hydrate_log`).
+    """
+    entries = state.setdefault("log", [])
+    head = state.get(CHAIN_HEAD_KEY)
+    if not chain_head_current(state):
+        if log_offset(state):
+            raise ValueError("Log chain head is stale and only the active log segment is loaded")
+        head = rebuild_chain_head(entries, chain_base(state))
+        state[CHAIN_HEAD_KEY] = head
+    return head
+
+
+def next_chain_link(state: Dict[str, Any]) -> Tuple[str, int]:
+    """Return (previous_hash, hash_index) for the next hashed log entry."""
+    head = chain_head(state)
+    return head.get("hash", "") or "", int(head.get("index", 0)) + 1
+
+
+def advance_chain_head(state: Dict[str, Any], entry: Dict[str, Any]) -> None:
+    """Record an entry that was just appended to `state["log"]` in the cached head."""
+    position = log_offset(state) + len(state.get("log", []))
+    head: Optional[Dict[str, Any]] = state.get(CHAIN_HEAD_KEY)
+    if not isinstance(head, dict) or head.get("position") != position - 1:
+        # Stale head; drop it so the next hashed append rebuilds from the log.
+        state.pop(CHAIN_HEAD_KEY, None)
+        return
+    head = dict(head, position=position)
+    if entry.get("hash"):
+        head.update(
+            {
+                "hash": entry["hash"],
+                "index": int(head.get("index", 0)) + 1,
+                "hash_position": position - 1,
+            }
+        )
+    state[CHAIN_HEAD_KEY] = head
+
+
+def append_log_entry(state: Dict[str, Any], entry: Dict[str, Any]) -> Dict[str, Any]:
+    """Append an entry to the state log and advance the cached chain head and digest.
+
+    A stale digest is rebuilt first when the whole in-state log is loaded.
+    """
+    if not log_offset(state):
+        log_digest(state)
+    state.setdefault("log", []).append(entry)
+    advance_chain_head(state, entry)
+    advance_log_digest(state, entry)
+    return entry
+
+
+def verify_log_integrity(
+    entries: List[Dict[str, Any]],
+    start: Optional[Dict[str, Any]] = None,
+    workers: int = 1,
+) -> Tuple[bool, List[str]]:
+    """Verify hash-chain linkage; `start` resumes after a trusted checkpoint.
+
+    A checkpoint is `{"position", "index", "hash"}`: the number of entries
+    already verified, the hashed-event count and the last hash at that point.
+    With `workers > 1` and a large enough range, entry hashes are computed in
+    parallel chunks first; linkage is then checked in one sequential pass, so
+    the issues list is identical to the single-process result.
+    """
     issues = []
     last_hash = ""
     hashed_count = 0
+    begin = 0
+    if start:
+        begin = int(start.get("position", 0))
+        hashed_count = int(start.get("index", 0))
+        last_hash = start.get("hash", "") or ""
+        if begin > len(entries):
+            return False, [f"log shorter than verification checkpoint ({len(entries)} < {begin})"]
 
-    for idx, entry in enumerate(entries):
+    precomputed: Optional[List[Optional[str]]] = None
+    if workers > 1 and len(entries) - begin >= PARALLEL_VERIFY_MIN_ENTRIES:
+        precomputed = compute_entry_hashes(entries[begin:], workers=workers)
+
+    for idx in range(begin, len(entries)):
+        entry = entries[idx]
         if not isinstance(entry, dict):
             issues.append(f"log[{idx}] entry must be an object")
             continue
@@ -99,7 +372,10 @@ def verify_log_integrity(entries: List[Dict[str, Any]]) -> Tuple[bool, List[str]
         if entry.get("prev_hash", "") != expected_prev:
             issues.append(f"log[{idx}] prev_hash mismatch")
 
-        expected_hash = compute_entry_hash(entry)
+        if precomputed is not None:
+            expected_hash = precomputed[idx - begin]
+        else:
+            expected_hash = compute_entry_hash(entry)
         if entry.get("hash") != expected_hash:
             issues.append(f"log[{idx}] hash mismatch")
 
@@ -0,0 +1,383 @@
+"""Segmented append-only NDJSON storage for the lifecycle log.
+
+In segmented mode the state document keeps a small manifest under
+`log_segments` and the entries themselves live in rotating NDJSON files next
+to the state file (`<state-stem>-log/segment-000001.ndjson`, ...). A save only
+appends new entries to the active segment, and writers load only that
+segment (`hydrate_log(full=False)`), so neither cost grows with history
+length.
+
+The manifest is the source of truth: readers stop at the recorded entry count
+of each segment, so lines appended by a write whose state document was never
+committed (or was rolled back) are ignored and truncated by the next writer.
+Files the committed manifest references are never rewritten: edits to the
+active segment and re-layouts after a history rewrite are written under new
+segment names, and superseded files are pruned only after the state document
+that drops them has replaced the old one (one revision late, so readers and
+rollbacks of the previous document still find theirs).
+"""
+
+import json
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Set
+
+LOG_STORAGE_INLINE = "inline"
+LOG_STORAGE_SEGMENTED = "segmented"
+LOG_STORAGE_MODES = (LOG_STORAGE_INLINE, LOG_STORAGE_SEGMENTED)
+
+DEFAULT_SEGMENT_MAX_ENTRIES = 1000
+
+# In-memory marker of a partially hydrated log (see `hydrate_log`); never written.
+LOG_OFFSET_KEY = "log_loaded_from"
+
+
+def normalize_log_storage(value: Any, strict: bool = False) -> str:
+    """Normalize log storage mode values."""
+    raw = str(value or LOG_STORAGE_INLINE).strip().lower()
+    if raw in LOG_STORAGE_MODES:
+        return raw
+    if strict:
+        raise ValueError(f"Invalid log storage mode: {value}")
+    return LOG_STORAGE_INLINE
+
+
+def is_segmented(state: Dict[str, Any]) -> bool:
+    return normalize_log_storage(state.get("log_storage")) == LOG_STORAGE_SEGMENTED
+
+
+def segment_dir_for(state_path: Path) -> Path:
+    state_path = Path(state_path)
+    return state_path.with_name(f"{state_path.stem}-log")
+
+
+def segment_name(sequence: int) -> str:
+    return f"segment-{sequence:06d}.ndjson"
+
+
+def _encode_entry(entry: Dict[str, Any]) -> bytes:
+    return (json.dumps(entry, sort_keys=True, separators=(",", ":")) + "\n").encode("utf-8")
+
+
+def _manifest(state: Dict[str, Any]) -> Dict[str, Any]:
+    raw = state.get("log_segments")
+    manifest = raw if isinstance(raw, dict) else {}
+    segments = [
+        {"name": str(seg.get("name")), "count": int(seg.get("count") or 0)}
+        for seg in manifest.get("segments", [])
+        if isinstance(seg, dict) and seg.get("name")
+    ]
+    try:
+        max_entries = int(manifest.get("max_entries") or DEFAULT_SEGMENT_MAX_ENTRIES)
+    except (TypeError, ValueError):
+        max_entries = DEFAULT_SEGMENT_MAX_ENTRIES
+    return {"max_entries": max(max_entries, 1), "segments": segments}
+
+
+def _read_segment_lines(path: Path, count: int) -> List[bytes]:
+    lines: List[bytes] = []
+    if count <= 0:
+        return lines
+    with open(path, "rb") as f:
+        for raw in f:
+            if not raw.endswith(b"\n"):
+                # Torn trailing write; never part of the committed manifest.
+                break
+            lines.append(raw)
+            if len(lines) >= count:
+                break
+    if len(lines) < count:
+        raise ValueError(
+            f"Log segment {path.name} is shorter than manifest ({len(lines)} < {count})"
+        )
+    return lines
+
+
+def iter_segment_entries(state_path: Path, state: Dict[str, Any]) -> Iterator[Dict[str, Any]]:
+    """Yield committed log entries across all segments in order."""
+    base = segment_dir_for(state_path)
+    for seg in _manifest(state)["segments"]:
+        for raw in _read_segment_lines(base / seg["name"], seg["count"]):
+            yield json.loads(raw)
+
+
+def load_segmented_log(state_path: Path, state: Dict[str, Any]) -> List[Dict[str, Any]]:
+    return list(iter_segment_entries(state_path, state))
+
+
+def log_offset(state: Dict[str, Any]) -> int:
+    """Position of `state["log"][0]` in the segmented log.
+
+    0 unless only the active segment was loaded.
+    """
+    try:
+        return max(int(state.get(LOG_OFFSET_KEY) or 0), 0)
+    except (TypeError, ValueError):
+        return 0
+
+
+def hydrate_log(state_path: Path, state: Dict[str, Any], full: bool = True) -> Dict[str, Any]:
+    """Populate `state["log"]` from segments when the document is segmented.
+
+    With `full=False` only the active segment is read and `LOG_OFFSET_KEY`
+    records how many sealed entries precede it; writers use this, since a
+    save only appends to (or rewrites) the active segment.
+    """
+    if not is_segmented(state):
+        return state
+    segments = _manifest(state)["segments"]
+    if full or not segments:
+        state["log"] = load_segmented_log(state_path, state)
+        state.pop(LOG_OFFSET_KEY, None)
+        return state
+    active = segments[-1]
+    lines = _read_segment_lines(segment_dir_for(state_path) / active["name"], active["count"])
+    state["log"] = [json.loads(raw) for raw in lines]
+    state[LOG_OFFSET_KEY] = sum(seg["count"] for seg in segments[:-1])
+    return state
+
+
+def load_log_prefix(state_path: Path, state: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """The sealed entries a partially hydrated state leaves out (empty when fully loaded)."""
+    remaining = log_offset(state)
+    prefix: List[Dict[str, Any]] = []
+    if not remaining:
+        return prefix
+    for entry in iter_segment_entries(state_path, state):
+        prefix.append(entry)
+        if len(prefix) >= remaining:
+            break
+    return prefix
+
+
+def _sequence(name: str) -> int:
+    digits = "".join(ch for ch in name if ch.isdigit())
+    return int(digits) if digits else 0
+
+
+def _write_lines(path: Path, lines: List[bytes]) -> None:
+    with open(path, "wb") as f:
+        f.writelines(lines)
+
+
+class _Prepared:
+    """Lazily mapped view of the log, so only the entries being written are prepared."""
+
+    def __init__(
+        self, entries: List[Dict[str, Any]], prepare: Callable[[Dict[str, Any]], Dict[str, Any]]
+    ):
+        self.entries = entries
+        self.prepare = prepare
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def __getitem__(self, key: slice) -> List[Dict[str, Any]]:
+        return [self.prepare(entry) for entry in self.entries[key]]
+
+
+def persist_log_segments(
+    state_path: Path,
+    state: Dict[str, Any],
+    prepare: Optional[Callable[[Dict[str, Any]], Dict[str, Any]]] = None,
+) -> Dict[str, Any]:
+    """Append unpersisted log entries to segment files and return the new manifest.
+
+    Caller must hold the state lock. The returned manifest only becomes
+    authoritative once the state document referencing it is written, so no
+    file the committed manifest counts on is modified here: changed entries
+    of the active segment and re-layouts after a history rewrite go to new
+    segment names, and the committed files are only ever appended to past
+    their recorded count. Call `prune_log_segments` after the document is
+    replaced. `prepare` maps each entry to the form stored on disk (for
+    example with large notes moved out of line); it must be deterministic.
+    """
+    base = segment_dir_for(state_path)
+    base.mkdir(parents=True, exist_ok=True)
+    manifest = _manifest(state)
+    max_entries = manifest["max_entries"]
+    segments = [dict(seg) for seg in manifest["segments"]]
+    used = {seg["name"] for seg in segments}
+    offset = log_offset(state)
+    entries: Any = state.get("log", [])
+    if prepare is not None:
+        entries = _Prepared(entries, prepare)
+    total = offset + len(entries)
+    persisted = sum(seg["count"] for seg in segments)
+
+    def fresh_name() -> str:
+        name = segment_name(max((_sequence(n) for n in used), default=0) + 1)
+        used.add(name)
+        return name
+
+    if persisted > total:
+        # History was rewritten (for example a rollback); lay it out again
+        # under new names, reading any unloaded prefix from the old files.
+        rows = [_encode_entry(e) for e in load_log_prefix(state_path, state)]
+        rows.extend(_encode_entry(e) for e in entries[0 : len(entries)])
+        segments = []
+        for start in range(0, len(rows), max_entries):
+            chunk = rows[start : start + max_entries]
+            segments.append({"name": fresh_name(), "count": len(chunk)})
+            _write_lines(base / segments[-1]["name"], chunk)
+        persisted = total
+    elif segments:
+        active = segments[-1]
+        start = persisted - active["count"]
+        loaded = max(start, offset)  # entries before `offset` are not in memory and unchanged
+        path = base / active["name"]
+        wanted = [_encode_entry(e) for e in entries[loaded - offset : persisted - offset]]
+        try:
+            on_disk = _read_segment_lines(path, active["count"])
+        except (OSError, ValueError):
+            on_disk = None
+        if on_disk is None or on_disk[loaded - start :] != wanted:
+            if on_disk is None and loaded > start:
+                raise ValueError(f"Log segment {active['name']} is unreadable and not loaded")
+            active["name"] = fresh_name()
+            _write_lines(base / active["name"], (on_disk or [])[: loaded - start] + wanted)
+        else:
+            # Drop lines left behind by an uncommitted writer.
+            with open(path, "r+b") as f:
+                f.truncate(sum(len(line) for line in on_disk))
+
+    pending = entries[persisted - offset : len(entries)]
+    while pending:
+        if not segments or segments[-1]["count"] >= max_entries:
+            segments.append({"name": fresh_name(), "count": 0})
+            _write_lines(base / segments[-1]["name"], [])
+        active = segments[-1]
+        room = max_entries - active["count"]
+        chunk, pending = pending[:room], pending[room:]
+        with open(base / active["name"], "ab") as f:
+            for entry in chunk:
+                f.write(_encode_entry(entry))
+        active["count"] += len(chunk)
+
+    manifest = {"max_entries": max_entries, "segments": segments, "entries": total}
+    state["log_segments"] = manifest
+    return manifest
+
+
+def drop_log_segment_prefix(state_path: Path, state: Dict[str, Any], count: int) -> Dict[str, Any]:
+    """Remove the first `count` entries from the manifest (they were archived elsewhere).
+
+    Segments wholly inside the prefix are dropped from the manifest; only a
+    segment the boundary cuts through is rewritten, under a new name, with
+    its remaining lines copied as stored. Caller holds the state lock and
+    has already removed the entries from `state["log"]`. Dropped files are
+    listed under `retired` until the next write, so they outlive the
+    document that still references them (see `prune_log_segments`).
+    """
+    base = segment_dir_for(state_path)
+    manifest = _manifest(state)
+    used = {seg["name"] for seg in manifest["segments"]}
+    remaining = max(int(count), 0)
+    segments = []
+    retired = []
+    for seg in manifest["segments"]:
+        if remaining >= seg["count"]:
+            remaining -= seg["count"]
+            retired.append(seg["name"])
+            continue
+        if remaining:
+            lines = _read_segment_lines(base / seg["name"], seg["count"])[remaining:]
+            name = segment_name(max(_sequence(n) for n in used) + 1)
+            used.add(name)
+            _write_lines(base / name, lines)
+            retired.append(seg["name"])
+            seg = {"name": name, "count": len(lines)}
+            remaining = 0
+        segments.append(dict(seg))
+    manifest = {
+        "max_entries": manifest["max_entries"],
+        "segments": segments,
+        "entries": sum(seg["count"] for seg in segments),
+        "retired": retired,
+    }
+    state["log_segments"] = manifest
+    return manifest
+
+
+def segment_names(state: Dict[str, Any]) -> Set[str]:
+    """Segment files referenced by the state's manifest.
+
+    Includes segments retired since the last write.
+    """
+    if not is_segmented(state):
+        return set()
+    raw = state.get("log_segments")
+    retired = raw.get("retired", []) if isinstance(raw, dict) else []
+    return {seg["name"] for seg in _manifest(state)["segments"]} | {str(name) for name in retired}
+
+
+def prune_log_segments(state_path: Path, keep: Iterable[str]) -> List[str]:
+    """Delete segment files not in `keep`; call only after the state document was replaced.
+
+    Writers keep the previous manifest's files as well as the new ones, so a
+    reader that parsed the previous document (or a rollback to it) still
+    finds every segment it references.
+    """
+    base = segment_dir_for(state_path)
+    keep = set(keep)
+    removed = []
+    if not base.is_dir():
+        return removed
+    for path in sorted(base.glob("segment-*.ndjson")):
+        if path.name not in keep:
+            path.unlink(missing_ok=True)
+            removed.append(path.name)
+    return removed
+
+
+def snapshot_log_segments(state_path: Path) -> Dict[str, Optional[bytes]]:
+    """Capture the segment directory for `restore_log_segments`.
+
+    Sealed segments are never modified in place, so only the newest file
+    (the one a writer appends to) is captured by content; the rest are
+    recorded by name.
+    """
+    base = segment_dir_for(state_path)
+    if not base.is_dir():
+        return {}
+    names = sorted((path.name for path in base.glob("segment-*.ndjson")), key=_sequence)
+    snapshot: Dict[str, Optional[bytes]] = {name: None for name in names}
+    if names:
+        snapshot[names[-1]] = (base / names[-1]).read_bytes()
+    return snapshot
+
+
+def restore_log_segments(state_path: Path, snapshot: Dict[str, Optional[bytes]]) -> None:
+    """Undo segment writes made since `snapshot_log_segments`."""
+    base = segment_dir_for(state_path)
+    if not base.is_dir():
+        return
+    for path in base.glob("segment-*.ndjson"):
+        if path.name not in snapshot:
+            path.unlink(missing_ok=True)
+    for name, data in snapshot.items():
+        if data is not None:
+            (base / name).write_bytes(data)
+
+
+__all__ = [
+    "LOG_STORAGE_INLINE",
+    "LOG_STORAGE_SEGMENTED",
+    "LOG_STORAGE_MODES",
+    "DEFAULT_SEGMENT_MAX_ENTRIES",
+    "LOG_OFFSET_KEY",
+    "normalize_log_storage",
+    "is_segmented",
+    "segment_dir_for",
+    "segment_name",
+    "iter_segment_entries",
+    "load_segmented_log",
+    "log_offset",
+    "hydrate_log",
+    "load_log_prefix",
+    "persist_log_segments",
+    "drop_log_segment_prefix",
+    "segment_names",
+    "prune_log_segments",
+    "snapshot_log_segments",
+    "restore_log_segments",
+]
@@ -0,0 +1,377 @@
+"""Incremental Merkle tree over lifecycle log entries.
+
+Leaves are the entry hashes used by the hash chain (`compute_entry_hash`), so
+a leaf can be checked against a single log entry. Tree hashing, inclusion
+proofs and consistency proofs follow RFC 6962 (Certificate Transparency):
+an auditor holding a root can confirm one event with O(log n) hashes, and
+confirm that a later root extends an earlier one without re-hashing the log.
+
+In `hash_chain` mode every state write appends the new leaves to a sidecar
+(`<stem>-merkle.ndjson`, one line of completed subtree hashes per entry) and
+stamps `log_merkle` (`size`, `root`) into the state document.
+"""
+
+import hashlib
+import json
+import os
+import threading
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from governed_platform.governance.log_integrity import compute_entry_hash
+
+MERKLE_KEY = "log_merkle"
+
+EMPTY_ROOT = hashlib.sha256(b"").hexdigest()
+
+
+def merkle_path_for(state_path: Path) -> Path:
+    state_path = Path(state_path)
+    return state_path.with_name(f"{state_path.stem}-merkle.ndjson")
+
+
+def leaf_hash(entry: Dict[str, Any]) -> str:
+    digest = compute_entry_hash(entry) if isinstance(entry, dict) else ""
+    return hashlib.sha256(b"\x00" + digest.encode()).hexdigest()
+
+
+def node_hash(left: str, right: str) -> str:
+    return hashlib.sha256(b"\x01" + bytes.fromhex(left) + bytes.fromhex(right)).hexdigest()
+
+
+def _split(size: int) -> int:
+    """Largest power of two strictly smaller than `size` (size > 1)."""
+    return 1 << ((size - 1).bit_length() - 1)
+
+
+class MerkleTree:
+    """Append-only Merkle tree storing every complete power-of-two subtree.
+
+    `levels[k][i]` is the hash of leaves `[i * 2**k, (i + 1) * 2**k)`. Any
+    subtree used by a proof is either stored or combined from O(log n)
+    stored subtrees, so proofs never re-hash leaves.
+    """
+
+    def __init__(self):
+        self.levels: List[List[str]] = [[]]
+
+    @property
+    def size(self) -> int:
+        return len(self.levels[0])
+
+    @classmethod
+    def from_entries(cls, entries: List[Dict[str, Any]]) -> "MerkleTree":
+        tree = cls()
+        for entry in entries:
+            tree.append(leaf_hash(entry))
+        return tree
+
+    def append(self, leaf: str) -> List[str]:
+        """Add a leaf hash; returns the subtree hashes it completed, leaf first."""
+        completed = [leaf]
+        self.levels[0].append(leaf)
+        level = 0
+        while len(self.levels[level]) % 2 == 0:
+            parent = node_hash(self.levels[level][-2], self.levels[level][-1])
+            level += 1
+            if len(self.levels) == level:
+                self.levels.append([])
+            self.levels[level].append(parent)
+            completed.append(parent)
+        return completed
+
+    def copy(self) -> "MerkleTree":
+        other = MerkleTree()
+        other.levels = [list(level) for level in self.levels]
+        return other
+
+    def truncate(self, size: int) -> None:
+        """Drop leaves past `size` (keeps every complete subtree inside the prefix)."""
+        self.levels = [level[: size >> k] for k, level in enumerate(self.levels)] or [[]]
+        while len(self.levels) > 1 and not self.levels[-1]:
+            self.levels.pop()
+
+    def _subtree(self, start: int, size: int) -> str:
+        if size & (size - 1) == 0:
+            level = size.bit_length() - 1
+            return self.levels[level][start >> level]
+        k = _split(size)
+        return node_hash(self._subtree(start, k), self._subtree(start + k, size - k))
+
+    def _check_size(self, size: Optional[int]) -> int:
+        size = self.size if size is None else int(size)
+        if not 0 <= size <= self.size:
+            raise ValueError(f"tree size {size} out of range (0..{self.size})")
+        return size
+
+    def root(self, size: Optional[int] = None) -> str:
+        size = self._check_size(size)
+        return self._subtree(0, size) if size else EMPTY_ROOT
+
+    def inclusion_proof(self, index: int, size: Optional[int] = None) -> List[str]:
+        """Audit path for leaf `index` in the tree of the first `size` leaves."""
+        size = self._check_size(size)
+        if not 0 <= index < size:
+            raise ValueError(f"leaf index {index} out of range for tree size {size}")
+        proof: List[str] = []
+        start = 0
+        while size > 1:
+            k = _split(size)
+            if index < k:
+                proof.append(self._subtree(start + k, size - k))
+                size = k
+            else:
+                proof.append(self._subtree(start, k))
+                start, index, size = start + k, index - k, size - k
+        proof.reverse()
+        return proof
+
+    def consistency_proof(self, first: int, second: Optional[int] = None) -> List[str]:
+        """Proof that the tree of `first` leaves is a prefix of the tree of `second` leaves."""
+        second = self._check_size(second)
+        if not 0 <= first <= second:
+            raise ValueError(f"first size {first} out of range for tree size {second}")
+        if first in (0, second):
+            return []
+        proof: List[str] = []
+        start, m, size, complete = 0, first, second, True
+        while m != size:
+            k = _split(size)
+            if m <= k:
+                proof.append(self._subtree(start + k, size - k))
+                size = k
+            else:
+                proof.append(self._subtree(start, k))
+                start, m, size, complete = start + k, m - k, size - k, False
+        if not complete:
+            proof.append(self._subtree(start, size))
+        proof.reverse()
+        return proof
+
+
+def verify_inclusion(leaf: str, index: int, size: int, proof: List[str], root: str) -> bool:
+    """Check an inclusion proof (RFC 9162 section 2.1.3.2)."""
+    if not 0 <= index < size:
+        return False
+    fn, sn, r = index, size - 1, leaf
+    for sibling in proof:
+        if sn == 0:
+            return False
+        if fn & 1 or fn == sn:
+            r = node_hash(sibling, r)
+            while not fn & 1 and fn != 0:
+                fn >>= 1
+                sn >>= 1
+        else:
+            r = node_hash(r, sibling)
+        fn >>= 1
+        sn >>= 1
+    return sn == 0 and r == root
+
+
+def verify_consistency(
+    first: int, second: int, first_root: str, second_root: str, proof: List[str]
+) -> bool:
+    """Check a consistency proof (RFC 9162 section 2.1.4.2)."""
+    if not 0 <= first <= second:
+        return False
+    if first == second:
+        return not proof and first_root == second_root
+    if first == 0:
+        return not proof and first_root == EMPTY_ROOT
+    path = list(proof)
+    if first & (first - 1) == 0:
+        path.insert(0, first_root)
+    if not path:
+        return False
+    fn, sn = first - 1, second - 1
+    while fn & 1:
+        fn >>= 1
+        sn >>= 1
+    fr = sr = path[0]
+    for node in path[1:]:
+        if sn == 0:
+            return False
+        if fn & 1 or fn == sn:
+            fr = node_hash(node, fr)
+            sr = node_hash(node, sr)
+            while not fn & 1 and fn != 0:
+                fn >>= 1
+                sn >>= 1
+        else:
+            sr = node_hash(sr, node)
+        fn >>= 1
+        sn >>= 1
+    return sn == 0 and fr == first_root and sr == second_root
+
+
+# Last synced tree per sidecar path, keyed by file fingerprint, so appends only
+# hash new entries instead of reloading the sidecar.
+_tree_cache: Dict[str, Tuple[Tuple[int, int, int], MerkleTree]] = {}
+_cache_lock = threading.Lock()
+
+
+def _fingerprint(path: Path) -> Optional[Tuple[int, int, int]]:
+    try:
+        st = path.stat()
+    except FileNotFoundError:
+        return None
+    return (st.st_ino, st.st_mtime_ns, st.st_size)
+
+
+def _read_sidecar(path: Path) -> Tuple[MerkleTree, bool]:
+    """Load stored subtree hashes; the flag is False if a torn or invalid line was hit."""
+    tree = MerkleTree()
+    if not path.exists():
+        return tree, True
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            try:
+                nodes = json.loads(line)
+            except json.JSONDecodeError:
+                return tree, False  # torn final line from an interrupted append
+            idx = tree.size
+            expected = ((idx + 1) & -(idx + 1)).bit_length()
+            if not isinstance(nodes, list) or len(nodes) != expected:
+                return tree, False
+            for level, digest in enumerate(nodes):
+                if len(tree.levels) == level:
+                    tree.levels.append([])
+                tree.levels[level].append(digest)
+    return tree, True
+
+
+def _sidecar_lines(tree: MerkleTree, start: int) -> List[str]:
+    lines = []
+    for idx in range(start, tree.size):
+        nodes = [tree.levels[0][idx]]
+        level = 1
+        while (idx + 1) % (1 << level) == 0:
+            nodes.append(tree.levels[level][((idx + 1) >> level) - 1])
+            level += 1
+        lines.append(json.dumps(nodes, separators=(",", ":")) + "\n")
+    return lines
+
+
+def load_merkle_tree(
+    path: Path,
+    entries: List[Dict[str, Any]],
+    offset: int = 0,
+    prefix_loader: Optional[Callable[[], List[Dict[str, Any]]]] = None,
+) -> Tuple[MerkleTree, Optional[int]]:
+    """Return a tree over `entries` and how many sidecar lines remain valid for it.
+
+    The sidecar is reused when its leaf at the last shared position still
+    matches the log, so only entries past it are hashed. The count is None
+    when the sidecar has to be rewritten (history rewritten or rolled back).
+
+    `offset` is the number of leading (archived) entries that precede
+    `entries`; their leaves are taken from the sidecar, or rebuilt from
+    `prefix_loader()` when the sidecar does not cover them.
+    """
+    path = Path(path)
+    fingerprint = _fingerprint(path)
+    with _cache_lock:
+        cached = _tree_cache.get(str(path))
+    if cached and cached[0] == fingerprint:
+        tree, intact = cached[1].copy(), True
+    else:
+        tree, intact = _read_sidecar(path)
+    on_disk = tree.size
+
+    if on_disk < offset:
+        if prefix_loader is None:
+            raise ValueError(f"Merkle sidecar covers {on_disk} entries, archive holds {offset}")
+        return MerkleTree.from_entries(list(prefix_loader()) + list(entries)), None
+    usable = min(on_disk - offset, len(entries))
+    if usable and tree.levels[0][offset + usable - 1] != leaf_hash(entries[usable - 1]):
+        tree.truncate(offset)
+        for entry in entries:
+            tree.append(leaf_hash(entry))
+        return tree, None
+    tree.truncate(offset + usable)
+    for entry in entries[usable:]:
+        tree.append(leaf_hash(entry))
+    return tree, offset + usable if intact and offset + usable == on_disk else None
+
+
+def sync_merkle_tree(
+    path: Path,
+    entries: List[Dict[str, Any]],
+    offset: int = 0,
+    prefix_loader: Optional[Callable[[], List[Dict[str, Any]]]] = None,
+) -> MerkleTree:
+    """Bring the sidecar in line with `entries`, appending only the new leaves."""
+    path = Path(path)
+    tree, valid = load_merkle_tree(path, entries, offset, prefix_loader)
+    if valid is not None:
+        with open(path, "a", encoding="utf-8") as f:
+            f.writelines(_sidecar_lines(tree, valid))
+    else:
+        tmp = path.with_suffix(path.suffix + ".tmp")
+        with open(tmp, "w", encoding="utf-8") as f:
+            f.writelines(_sidecar_lines(tree, 0))
+        os.replace(tmp, path)
+    with _cache_lock:
+        _tree_cache[str(path)] = (_fingerprint(path), tree.copy())
+    return tree
+
+
+def _position_of(entries: List[Dict[str, Any]], event_id: str) -> int:
+    for idx in range(len(entries) - 1, -1, -1):
+        entry = entries[idx]
+        if isinstance(entry, dict) and entry.get("event_id") == event_id:
+            return idx
+    raise KeyError(event_id)
+
+
+def inclusion_proof_for_event(
+    tree: MerkleTree,
+    entries: List[Dict[str, Any]],
+    event_id: str,
+    size: Optional[int] = None,
+    offset: int = 0,
+) -> Dict[str, Any]:
+    """Inclusion proof payload for the log entry carrying `event_id`.
+
+    `entries` start at log position `offset` (after archived entries).
+    """
+    position = offset + _position_of(entries, event_id)
+    size = tree.size if size is None else int(size)
+    return {
+        "event_id": event_id,
+        "position": position,
+        "tree_size": size,
+        "leaf": tree.levels[0][position],
+        "root": tree.root(size),
+        "proof": tree.inclusion_proof(position, size),
+    }
+
+
+def consistency_proof_payload(
+    tree: MerkleTree, first: int, second: Optional[int] = None
+) -> Dict[str, Any]:
+    second = tree.size if second is None else int(second)
+    return {
+        "first_size": first,
+        "second_size": second,
+        "first_root": tree.root(first),
+        "second_root": tree.root(second),
+        "proof": tree.consistency_proof(first, second),
+    }
+
+
+__all__ = [
+    "MERKLE_KEY",
+    "EMPTY_ROOT",
+    "merkle_path_for",
+    "leaf_hash",
+    "node_hash",
+    "MerkleTree",
+    "verify_inclusion",
+    "verify_consistency",
+    "load_merkle_tree",
+    "sync_merkle_tree",
+    "inclusion_proof_for_event",
+    "consistency_proof_payload",
+]
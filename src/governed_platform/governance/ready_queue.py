@@ -0,0 +1,262 @@
+"""Incrementally maintained set of packets that can be claimed next.
+
+A packet is ready when it is pending and every packet it depends on is done.
+Rather than re-checking every packet's dependencies per query, the state
+document carries `ready_queue`: the count of unfinished dependencies per
+packet, the packet statuses those counts were computed for, the ready
+packets in definition order, and a binary heap of the same packets in
+dispatch order (`dispatch`).
+
+Engines call `sync_ready_queue` just before saving. It diffs the packet
+statuses against that snapshot and only touches the dependents of packets
+that moved into or out of `done` (done, fail and its cascade, reset), so the
+cost of an update is the number of affected edges. Dependency edits
+(`add-dep`, `remove-dep`) recount just the edited packet.
+
+The state writers stamp the queue with the revision being written
+(`stamp_ready_queue`), after checking its status snapshot still matches the
+packets. Readers trust the queue only when that stamp and the definition
+fingerprint match, so `ready_packet_ids` answers in O(result) and
+`dispatch_order` walks the stored heap without re-sorting. A write that
+bypassed the sync (hand edits, imports, `remove`) drops the queue; readers
+then rebuild it in one pass until the next engine save persists it again.
+"""
+
+from __future__ import annotations
+
+import heapq
+from typing import TYPE_CHECKING, Any, Dict, Iterable, Iterator, List, Optional
+
+from governed_platform.governance.dispatch import dispatch_key, iter_heap
+from governed_platform.governance.status import normalize_runtime_status
+
+if TYPE_CHECKING:
+    # Annotation only: the dependency index imports the state store, which
+    # stamps the queue on write.
+    from governed_platform.governance.dependency_index import DependencyIndex
+
+READY_QUEUE_KEY = "ready_queue"
+
+
+def _status_snapshot(packets: Dict[str, Any]) -> Dict[str, str]:
+    return {
+        pid: normalize_runtime_status(record.get("status"))
+        for pid, record in (packets or {}).items()
+        if isinstance(record, dict)
+    }
+
+
+class ReadyQueue:
+    """Unfinished-dependency counters and the ready set for one definition."""
+
+    def __init__(
+        self,
+        index: DependencyIndex,
+        status: Dict[str, str],
+        waiting: Dict[str, int],
+        ready: Iterable[str],
+        heap: Optional[Iterable[Iterable[Any]]] = None,
+    ):
+        self.index = index
+        self.status = dict(status)
+        self.waiting = {pid: int(count) for pid, count in waiting.items() if int(count) > 0}
+        self.ready = set(ready)
+        if heap is None:
+            self.heap = [dispatch_key(index, pid) for pid in self.ready]
+            heapq.heapify(self.heap)
+        else:
+            self.heap = [list(entry) for entry in heap]
+
+    @classmethod
+    def build(cls, index: DependencyIndex, packets: Dict[str, Any]) -> ReadyQueue:
+        """Full rebuild: one pass over packets and dependency edges."""
+        queue = cls(index, _status_snapshot(packets), {}, ())
+        for pid in index.forward:
+            queue._recount(pid)
+        for pid in index.packet_by_id:
+            queue._reevaluate(pid)
+        return queue
+
+    @classmethod
+    def from_state(
+        cls,
+        state: Dict[str, Any],
+        index: DependencyIndex,
+        previous_fingerprint: Optional[str] = None,
+        changed: Iterable[str] = (),
+    ) -> ReadyQueue:
+        """Queue carried by `state`, or a rebuild when it was computed for another definition.
+
+        `previous_fingerprint`/`changed` let a dependency edit reuse a queue
+        computed for the definition before the edit: only the packets in
+        `changed` are recounted.
+        """
+        cached = state.get(READY_QUEUE_KEY)
+        if isinstance(cached, dict) and index.fingerprint:
+            definition = cached.get("definition")
+            reusable = definition == index.fingerprint or (
+                previous_fingerprint is not None and definition == previous_fingerprint
+            )
+            if reusable:
+                try:
+                    queue = cls(
+                        index,
+                        cached["status"],
+                        cached.get("waiting") or {},
+                        cached["ready"],
+                        # Dispatch keys depend on the whole graph; re-key after an edit.
+                        cached.get("dispatch") if definition == index.fingerprint else None,
+                    )
+                except (KeyError, TypeError, ValueError, AttributeError):
+                    queue = None
+                if queue is not None:
+                    for pid in changed:
+                        queue._recount(pid)
+                    return queue
+        return cls.build(index, state.get("packets") or {})
+
+    def _done(self, pid: str) -> bool:
+        return self.status.get(pid) == "done"
+
+    def _recount(self, pid: str) -> None:
+        pending = sum(1 for dep in set(self.index.dependencies_of(pid)) if not self._done(dep))
+        if pending:
+            self.waiting[pid] = pending
+        else:
+            self.waiting.pop(pid, None)
+        self._reevaluate(pid)
+
+    def _reevaluate(self, pid: str) -> None:
+        if (
+            pid in self.index.packet_by_id
+            and self.status.get(pid, "pending") == "pending"
+            and not self.waiting.get(pid)
+        ):
+            if pid not in self.ready:
+                self.ready.add(pid)
+                heapq.heappush(self.heap, dispatch_key(self.index, pid))
+        else:
+            # Heap entries of packets that left the set are dropped on compaction.
+            self.ready.discard(pid)
+
+    def set_status(self, pid: str, status: Optional[str]) -> None:
+        """Apply one packet's status change; O(dependents) when it crosses `done`."""
+        was_done = self._done(pid)
+        if status is None:
+            self.status.pop(pid, None)
+        else:
+            self.status[pid] = normalize_runtime_status(status)
+        if was_done != self._done(pid):
+            step = 1 if was_done else -1
+            for dependent in self.index.dependents_of(pid):
+                remaining = self.waiting.get(dependent, 0) + step
+                if remaining > 0:
+                    self.waiting[dependent] = remaining
+                else:
+                    self.waiting.pop(dependent, None)
+                self._reevaluate(dependent)
+        self._reevaluate(pid)
+
+    def sync(self, packets: Dict[str, Any]) -> List[str]:
+        """Bring the queue in line with `packets`; returns the packets whose status changed."""
+        current = _status_snapshot(packets)
+        changed = [pid for pid, status in current.items() if self.status.get(pid) != status]
+        changed.extend(pid for pid in self.status if pid not in current)
+        for pid in changed:
+            self.set_status(pid, current.get(pid))
+        return changed
+
+    def ready_ids(self) -> List[str]:
+        """Ready packets in definition order."""
+        position = self.index.position
+        return sorted(self.ready, key=lambda pid: position.get(pid, len(position)))
+
+    def _compact(self) -> None:
+        if len(self.heap) == len(self.ready):
+            return
+        kept: Dict[str, List[Any]] = {}
+        for entry in self.heap:
+            if entry[-1] in self.ready:
+                kept.setdefault(entry[-1], entry)
+        self.heap = list(kept.values())
+        heapq.heapify(self.heap)
+
+    def dispatch_ids(self) -> Iterator[str]:
+        """Ready packets best first (see `dispatch`)."""
+        self._compact()
+        return iter_heap(self.heap)
+
+    def to_dict(self) -> Dict[str, Any]:
+        self._compact()
+        return {
+            "definition": self.index.fingerprint,
+            "status": dict(self.status),
+            "waiting": dict(self.waiting),
+            "ready": self.ready_ids(),
+            "dispatch": [list(entry) for entry in self.heap],
+        }
+
+
+def sync_ready_queue(
+    state: Dict[str, Any],
+    index: DependencyIndex,
+    previous_fingerprint: Optional[str] = None,
+    changed: Iterable[str] = (),
+) -> ReadyQueue:
+    """Update `state[READY_QUEUE_KEY]` for the packet statuses about to be saved."""
+    queue = ReadyQueue.from_state(state, index, previous_fingerprint, changed)
+    queue.sync(state.get("packets") or {})
+    state[READY_QUEUE_KEY] = queue.to_dict()
+    return queue
+
+
+def stamp_ready_queue(state: Dict[str, Any], revision: int) -> bool:
+    """Mark the queue current for `revision`, or drop it if the packets moved without a sync."""
+    queue = state.get(READY_QUEUE_KEY)
+    if not isinstance(queue, dict):
+        return False
+    if queue.get("status") != _status_snapshot(state.get("packets") or {}):
+        state.pop(READY_QUEUE_KEY, None)
+        return False
+    queue["revision"] = revision
+    return True
+
+
+def _stored_queue(state: Dict[str, Any], index: DependencyIndex) -> Optional[Dict[str, Any]]:
+    queue = state.get(READY_QUEUE_KEY)
+    if (
+        isinstance(queue, dict)
+        and index.fingerprint
+        and queue.get("definition") == index.fingerprint
+        and queue.get("revision") is not None
+        and queue.get("revision") == state.get("revision")
+        and isinstance(queue.get("ready"), (list, tuple))
+    ):
+        return queue
+    return None
+
+
+def ready_packet_ids(state: Dict[str, Any], index: DependencyIndex) -> List[str]:
+    """Ready packet ids in definition order; O(result) when the stored queue is current."""
+    queue = _stored_queue(state, index)
+    if queue is not None:
+        return list(queue["ready"])
+    return ReadyQueue.build(index, state.get("packets") or {}).ready_ids()
+
+
+def dispatch_order(state: Dict[str, Any], index: DependencyIndex) -> Iterator[str]:
+    """Ready packet ids best first; reads the stored heap lazily when the queue is current."""
+    queue = _stored_queue(state, index)
+    if queue is not None and isinstance(queue.get("dispatch"), (list, tuple)):
+        return iter_heap(queue["dispatch"])
+    return ReadyQueue.build(index, state.get("packets") or {}).dispatch_ids()
+
+
+__all__ = [
+    "READY_QUEUE_KEY",
+    "ReadyQueue",
+    "sync_ready_queue",
+    "stamp_ready_queue",
+    "ready_packet_ids",
+    "dispatch_order",
+]
@@ -0,0 +1,111 @@
+"""Pluggable on-disk encodings for governance JSON documents.
+
+- `json`: pretty JSON (`indent=2`), the default; git-friendly diffs.
+- `json-compact`: minified JSON; same data, fewer bytes, faster encode.
+- `binary`: a 13-byte header (`WBSB` magic, version byte, 8-byte big-endian
+  body length) followed by the zlib-compressed `json-compact` encoding.
+  Smallest on disk; decoding is plain JSON parsing, so a crafted file can at
+  worst fail to load. Not human readable; tools that want JSON should read
+  through `decode_document` (or `wbs_cli.py export state-pretty`).
+
+Readers never need to know the format: `decode_document` detects it from the
+leading bytes.
+"""
+
+import json
+import struct
+import zlib
+from pathlib import Path
+from typing import Any
+
+STATE_FORMAT_JSON = "json"
+STATE_FORMAT_COMPACT = "json-compact"
+STATE_FORMAT_BINARY = "binary"
+STATE_FORMATS = (STATE_FORMAT_JSON, STATE_FORMAT_COMPACT, STATE_FORMAT_BINARY)
+STATE_FORMAT_KEY = "state_format"
+
+BINARY_MAGIC = b"WBSB"
+# Version 1 (a `marshal` payload) is no longer read.
+BINARY_VERSION = 2
+BINARY_COMPRESS_LEVEL = 6
+
+_BINARY_HEADER = struct.Struct(">4sBQ")
+
+_FORMAT_ALIASES = {
+    "json": STATE_FORMAT_JSON,
+    "pretty": STATE_FORMAT_JSON,
+    "json-compact": STATE_FORMAT_COMPACT,
+    "json_compact": STATE_FORMAT_COMPACT,
+    "compact": STATE_FORMAT_COMPACT,
+    "minified": STATE_FORMAT_COMPACT,
+    "binary": STATE_FORMAT_BINARY,
+}
+
+
+def normalize_state_format(value: Any, strict: bool = False) -> str:
+    token = str(value or "").strip().lower()
+    if token in _FORMAT_ALIASES:
+        return _FORMAT_ALIASES[token]
+    if strict:
+        raise ValueError(f"Invalid state format: {value!r}")
+    return STATE_FORMAT_JSON
+
+
+def _compact_json(payload: Any) -> bytes:
+    return json.dumps(payload, separators=(",", ":")).encode()
+
+
+def encode_document(payload: Any, fmt: str = STATE_FORMAT_JSON) -> bytes:
+    fmt = normalize_state_format(fmt, strict=True)
+    if fmt == STATE_FORMAT_BINARY:
+        body = zlib.compress(_compact_json(payload), BINARY_COMPRESS_LEVEL)
+        return _BINARY_HEADER.pack(BINARY_MAGIC, BINARY_VERSION, len(body)) + body
+    if fmt == STATE_FORMAT_COMPACT:
+        return _compact_json(payload) + b"\n"
+    return (json.dumps(payload, indent=2) + "\n").encode()
+
+
+def detect_format(data: bytes) -> str:
+    if data[: len(BINARY_MAGIC)] == BINARY_MAGIC:
+        return STATE_FORMAT_BINARY
+    head = data.lstrip()[:2]
+    if head[:1] in (b"{", b"[") and head[1:2] not in (b"\n", b"\r", b"]", b"}"):
+        return STATE_FORMAT_COMPACT
+    return STATE_FORMAT_JSON
+
+
+def decode_document(data: bytes) -> Any:
+    """Decode a document in any supported format."""
+    if data[: len(BINARY_MAGIC)] != BINARY_MAGIC:
+        return json.loads(data)
+    if len(data) < _BINARY_HEADER.size:
+        raise ValueError("Truncated binary document header")
+    _, version, length = _BINARY_HEADER.unpack_from(data)
+    if version != BINARY_VERSION:
+        raise ValueError(f"Unsupported binary document version: {version}")
+    body = data[_BINARY_HEADER.size :]
+    if len(body) != length:
+        raise ValueError(f"Truncated binary document ({len(body)} of {length} bytes)")
+    try:
+        return json.loads(zlib.decompress(body))
+    except zlib.error as exc:
+        raise ValueError(f"Corrupt binary document: {exc}") from exc
+
+
+def read_document(path: Path) -> Any:
+    with open(path, "rb") as f:
+        return decode_document(f.read())
+
+
+__all__ = [
+    "STATE_FORMAT_JSON",
+    "STATE_FORMAT_COMPACT",
+    "STATE_FORMAT_BINARY",
+    "STATE_FORMATS",
+    "STATE_FORMAT_KEY",
+    "normalize_state_format",
+    "encode_document",
+    "detect_format",
+    "decode_document",
+    "read_document",
+]
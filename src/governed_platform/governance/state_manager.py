@@ -1,11 +1,10 @@
-import json
 from datetime import datetime
 from pathlib import Path
-from typing import Dict, Any
+from typing import Any, Dict, List, Optional
 
-from governed_platform.governance.file_lock import atomic_write_json
-from governed_platform.governance.log_integrity import normalize_log_mode
-from governed_platform.governance.status import normalize_packet_status_map
+from governed_platform.governance.log_index import packet_log_entries
+from governed_platform.governance.state_snapshot import freeze, read_state_snapshot
+from governed_platform.governance.state_store import read_state_document, write_state_document
 
 
 STATE_VERSION = "1.0"
@@ -14,8 +13,11 @@ STATE_VERSION = "1.0"
 class StateManager:
     """Version-aware state storage and migration entrypoint."""
 
-    def __init__(self, state_path: Path):
+    def __init__(self, state_path: Path, storage: Optional[Any] = None):
         self.state_path = state_path
+        # Optional substrate_core StorageInterface (for example SqliteStorage);
+        # when unset the JSON state document at `state_path` is used.
+        self.storage = storage
 
     def default_state(self) -> Dict[str, Any]:
         return {
@@ -29,32 +31,52 @@ class StateManager:
         }
 
     def load(self) -> Dict[str, Any]:
+        # Both storage backends migrate and normalize on write, so a document
+        # they wrote is returned as parsed.
+        if self.storage is not None:
+            return self.storage.read_state()
         if not self.state_path.exists():
             return self.default_state()
-        with open(self.state_path) as f:
-            state = json.load(f)
-        state = self._ensure_version(state)
-        state.setdefault("log_integrity_mode", "plain")
-        state["log_integrity_mode"] = normalize_log_mode(state.get("log_integrity_mode"))
-        return normalize_packet_status_map(state)
+        return read_state_document(self.state_path)
+
+    def load_for_update(self) -> Dict[str, Any]:
+        """State for a load-modify-save cycle.
+
+        A segmented log is only read from its active segment.
+        """
+        if self.storage is not None:
+            return self.storage.read_state()
+        if not self.state_path.exists():
+            return self.default_state()
+        return read_state_document(self.state_path, full_log=False)
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Immutable state for read-only callers; cached until the document is rewritten."""
+        if self.storage is not None:
+            return freeze(self.storage.read_state())
+        if not self.state_path.exists():
+            return freeze(self.default_state())
+        return read_state_snapshot(self.state_path)
+
+    def packet_log(self, state: Dict[str, Any], packet_id: str) -> List[Dict[str, Any]]:
+        """In-state log entries for one packet, via the log index sidecar for the JSON backend."""
+        return packet_log_entries(
+            state, packet_id, None if self.storage is not None else self.state_path
+        )
 
     def save(self, state: Dict[str, Any]) -> None:
         state["version"] = state.get("version", STATE_VERSION)
         state["updated_at"] = datetime.now().isoformat()
-        atomic_write_json(self.state_path, state)
+        if self.storage is not None:
+            self.storage.write_state(state)
+            return
+        write_state_document(self.state_path, state)
 
     def save_without_lock(self, state: Dict[str, Any]) -> None:
         """Persist state atomically when caller already holds the state lock."""
         state["version"] = state.get("version", STATE_VERSION)
         state["updated_at"] = datetime.now().isoformat()
-        self.state_path.parent.mkdir(parents=True, exist_ok=True)
-        tmp = self.state_path.with_suffix(self.state_path.suffix + ".tmp")
-        with open(tmp, "w") as f:
-            json.dump(state, f, indent=2)
-            f.write("\n")
-        tmp.replace(self.state_path)
-
-    def _ensure_version(self, state: Dict[str, Any]) -> Dict[str, Any]:
-        from governed_platform.governance.migrations.runner import migrate_state
-
-        return migrate_state(state)
+        if self.storage is not None:
+            self.storage.write_state(state)
+            return
+        write_state_document(self.state_path, state, lock=False)
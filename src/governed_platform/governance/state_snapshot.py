@@ -0,0 +1,183 @@
+"""Lock-free, cached read snapshots of governance documents.
+
+Writers replace the state document atomically (`replace_json`), so a reader
+never needs the state lock: it either sees the old file or the new one. This
+module keeps the last parse of each document in process, keyed on the file
+fingerprint `(inode, mtime_ns, size)`, and hands out the same immutable
+snapshot until a writer replaces the file. Repeated status/dashboard polls
+cost one `stat()` instead of a parse.
+
+Snapshots are deep-frozen (`FrozenDict` / `FrozenList`); callers that need to
+mutate take a copy with `thaw()` (or `copy.deepcopy`).
+"""
+
+import threading
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional
+
+from governed_platform.governance.state_store import (
+    Fingerprint,
+    read_state_document,
+    stat_fingerprint,
+)
+
+
+def _read_only(self, *args, **kwargs):
+    raise TypeError(f"{type(self).__name__} snapshot is read-only; use thaw() for a mutable copy")
+
+
+class FrozenDict(dict):
+    """`dict` that rejects mutation; still JSON-serializable and dict-typed."""
+
+    __slots__ = ()
+    __setitem__ = __delitem__ = __ior__ = _read_only
+    clear = pop = popitem = setdefault = update = _read_only
+
+    def __hash__(self):
+        raise TypeError("unhashable type: 'FrozenDict'")
+
+    def __copy__(self):
+        return dict(self)
+
+    def __deepcopy__(self, memo):
+        return thaw(self)
+
+    def __reduce__(self):
+        return (dict, (thaw(self),))
+
+
+class FrozenList(list):
+    """`list` that rejects mutation; still JSON-serializable and list-typed."""
+
+    __slots__ = ()
+    __setitem__ = __delitem__ = __iadd__ = __imul__ = _read_only
+    append = clear = extend = insert = pop = remove = reverse = sort = _read_only
+
+    def __hash__(self):
+        raise TypeError("unhashable type: 'FrozenList'")
+
+    def __copy__(self):
+        return list(self)
+
+    def __deepcopy__(self, memo):
+        return thaw(self)
+
+    def __reduce__(self):
+        return (list, (thaw(self),))
+
+
+def freeze(value: Any) -> Any:
+    """Deep-convert dicts/lists into their frozen counterparts."""
+    if isinstance(value, FrozenDict) or isinstance(value, FrozenList):
+        return value
+    if isinstance(value, dict):
+        return FrozenDict((k, freeze(v)) for k, v in value.items())
+    if isinstance(value, list):
+        return FrozenList(freeze(v) for v in value)
+    return value
+
+
+def thaw(value: Any) -> Any:
+    """Deep mutable copy of a (possibly frozen) document."""
+    if isinstance(value, dict):
+        return {k: thaw(v) for k, v in value.items()}
+    if isinstance(value, list):
+        return [thaw(v) for v in value]
+    return value
+
+
+@dataclass(frozen=True)
+class Snapshot:
+    """One immutable parse of a document.
+
+    `version` is a per-path counter that increases every time the cache
+    observes a new file; `fingerprint` is the `(inode, mtime_ns, size)` it was
+    parsed from.
+    """
+
+    path: str
+    version: int
+    fingerprint: Optional[Fingerprint]
+    data: Any
+
+
+class SnapshotCache:
+    """Per-path cache of frozen document snapshots.
+
+    Cache hits take no lock. A miss is parsed by a single thread per path;
+    concurrent readers of the same changed file wait for that parse instead
+    of repeating it. A parse is only cached when the fingerprint did not move
+    while reading, so a snapshot always matches one committed file.
+    """
+
+    def __init__(self, loader: Callable[[Path], Any] = read_state_document):
+        self.loader = loader
+        self._entries: Dict[str, Snapshot] = {}
+        self._versions: Dict[str, int] = {}
+        self._path_locks: Dict[str, threading.Lock] = {}
+        self._guard = threading.Lock()
+
+    def _path_lock(self, key: str) -> threading.Lock:
+        lock = self._path_locks.get(key)
+        if lock is None:
+            with self._guard:
+                lock = self._path_locks.setdefault(key, threading.Lock())
+        return lock
+
+    def get(self, path: Path) -> Snapshot:
+        """Return the snapshot for the committed file at `path` (raises if missing)."""
+        key = str(path)
+        fingerprint = stat_fingerprint(path)
+        cached = self._entries.get(key)
+        if cached is not None and fingerprint is not None and cached.fingerprint == fingerprint:
+            return cached
+        with self._path_lock(key):
+            cached = self._entries.get(key)
+            fingerprint = stat_fingerprint(path)
+            if cached is not None and fingerprint is not None and cached.fingerprint == fingerprint:
+                return cached
+            data = freeze(self.loader(Path(path)))
+            stable = fingerprint is not None and fingerprint == stat_fingerprint(path)
+            with self._guard:
+                version = self._versions.get(key, 0) + 1
+                self._versions[key] = version
+            snapshot = Snapshot(
+                path=key, version=version, fingerprint=fingerprint if stable else None, data=data
+            )
+            if stable:
+                self._entries[key] = snapshot
+            else:
+                self._entries.pop(key, None)
+            return snapshot
+
+    def invalidate(self, path: Optional[Path] = None) -> None:
+        if path is None:
+            self._entries.clear()
+        else:
+            self._entries.pop(str(path), None)
+
+
+_state_cache = SnapshotCache()
+
+
+def state_snapshot(state_path: Path) -> Snapshot:
+    """Versioned snapshot of the state document (parsed once per committed write)."""
+    return _state_cache.get(Path(state_path))
+
+
+def read_state_snapshot(state_path: Path) -> Dict[str, Any]:
+    """Immutable parsed state document; see `state_snapshot` for the version."""
+    return _state_cache.get(Path(state_path)).data
+
+
+__all__ = [
+    "FrozenDict",
+    "FrozenList",
+    "freeze",
+    "thaw",
+    "Snapshot",
+    "SnapshotCache",
+    "state_snapshot",
+    "read_state_snapshot",
+]
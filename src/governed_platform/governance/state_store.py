@@ -0,0 +1,377 @@
+"""Read/write entrypoints for the on-disk state document.
+
+Every writer of `wbs-state.json` (core storage, state manager, CLI, server)
+goes through `write_state_document` so storage-level concerns such as log
+segmentation, the Merkle sidecar, out-of-line text payloads, the state
+revision counter, the ready-queue stamp and schema normalization stay in one
+place.
+
+Documents are migrated and normalized on write and stamped with
+`normalized_schema` (schema revision plus the write time, which is also set
+as the file mtime). A read of a document whose stamp is current and whose
+mtime still matches is a plain parse; anything else (older documents, hand
+edits) is normalized on read.
+"""
+
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from governed_platform.governance.blob_store import BlobStore, blob_root_for
+from governed_platform.governance.file_lock import file_lock, replace_json
+from governed_platform.governance.json_stream import iter_array_member, scan_object
+from governed_platform.governance.log_archive import (
+    archive_dir_for,
+    archived_count,
+    archived_tail,
+    iter_archived_entries,
+)
+from governed_platform.governance.log_index import (
+    load_log_index,
+    log_index_path_for,
+    sync_log_index,
+)
+from governed_platform.governance.log_integrity import (
+    LOG_MODE_HASH_CHAIN,
+    log_tail_current,
+    normalize_log_mode,
+)
+from governed_platform.governance.log_segments import (
+    LOG_OFFSET_KEY,
+    hydrate_log,
+    is_segmented,
+    iter_segment_entries,
+    load_log_prefix,
+    log_offset,
+    persist_log_segments,
+    prune_log_segments,
+    segment_dir_for,
+    segment_names,
+)
+from governed_platform.governance.merkle import MERKLE_KEY, merkle_path_for, sync_merkle_tree
+from governed_platform.governance.migrations.runner import migrate_state
+from governed_platform.governance.ready_queue import stamp_ready_queue
+from governed_platform.governance.serialization import (
+    BINARY_MAGIC,
+    STATE_FORMAT_KEY,
+    decode_document,
+    normalize_state_format,
+    read_document,
+)
+from governed_platform.governance.status import normalize_packet_status_map
+from governed_platform.governance.text_blobs import (
+    TEXT_BLOBS_KEY,
+    externalize_entry,
+    externalize_payloads,
+    resolve_entry,
+    resolve_payloads,
+    text_blob_threshold,
+)
+
+NORMALIZED_SCHEMA_KEY = "normalized_schema"
+NORMALIZED_SCHEMA_REVISION = 1
+
+
+class StateConflictError(RuntimeError):
+    """Raised when a compare-and-swap write finds the state revision has moved."""
+
+    def __init__(self, expected: int, actual: int):
+        super().__init__(
+            f"State revision changed concurrently (expected {expected}, found {actual})"
+        )
+        self.expected = expected
+        self.actual = actual
+
+
+Fingerprint = Tuple[int, int, int]
+
+# Last revision seen per state path, keyed by file fingerprint, so revision
+# checks under the lock avoid re-parsing a document this process already read.
+_known_revisions: Dict[str, Tuple[Fingerprint, int]] = {}
+_known_lock = threading.Lock()
+
+
+def stat_fingerprint(path: Path) -> Optional[Fingerprint]:
+    """Return (inode, mtime_ns, size) for a file, or None when it is missing."""
+    try:
+        st = Path(path).stat()
+    except FileNotFoundError:
+        return None
+    return (st.st_ino, st.st_mtime_ns, st.st_size)
+
+
+def state_revision(state: Dict[str, Any]) -> int:
+    try:
+        return int(state.get("revision") or 0)
+    except (TypeError, ValueError):
+        return 0
+
+
+def _remember(state_path: Path, revision: int) -> None:
+    fingerprint = stat_fingerprint(state_path)
+    if fingerprint is None:
+        return
+    with _known_lock:
+        _known_revisions[str(state_path)] = (fingerprint, revision)
+
+
+def current_revision(state_path: Path) -> int:
+    """Revision of the committed state document (0 when missing or unstamped)."""
+    state_path = Path(state_path)
+    fingerprint = stat_fingerprint(state_path)
+    if fingerprint is None:
+        return 0
+    with _known_lock:
+        known = _known_revisions.get(str(state_path))
+    if known and known[0] == fingerprint:
+        return known[1]
+    revision = state_revision(read_document(state_path))
+    _remember(state_path, revision)
+    return revision
+
+
+def normalize_state_document(state: Dict[str, Any]) -> Dict[str, Any]:
+    """Migrate to the latest state version and normalize boundary values in place."""
+    state = migrate_state(state)
+    now = datetime.now().isoformat()
+    state.setdefault("created_at", now)
+    state.setdefault("updated_at", now)
+    state.setdefault("packets", {})
+    state.setdefault("log", [])
+    state.setdefault("area_closeouts", {})
+    state["log_integrity_mode"] = normalize_log_mode(state.get("log_integrity_mode", "plain"))
+    if STATE_FORMAT_KEY in state:
+        state[STATE_FORMAT_KEY] = normalize_state_format(state[STATE_FORMAT_KEY])
+    return normalize_packet_status_map(state)
+
+
+def is_normalized(state: Dict[str, Any]) -> bool:
+    """True when the state carries a stamp for the current normalized schema revision."""
+    stamp = state.get(NORMALIZED_SCHEMA_KEY)
+    return isinstance(stamp, dict) and stamp.get("revision") == NORMALIZED_SCHEMA_REVISION
+
+
+def _stamp_current(state: Dict[str, Any], fingerprint: Optional[Fingerprint]) -> bool:
+    # The write time doubles as the file mtime, so any edit since the write
+    # (which moves the mtime) forces normalization again.
+    return (
+        fingerprint is not None
+        and is_normalized(state)
+        and state[NORMALIZED_SCHEMA_KEY].get("written_ns") == fingerprint[1]
+    )
+
+
+def _log_prefix(state_path: Path, state: Dict[str, Any]) -> List[Dict[str, Any]]:
+    prefix = load_log_prefix(state_path, state)
+    if state.get(TEXT_BLOBS_KEY):
+        get_blob = BlobStore(blob_root_for(state_path)).get
+        prefix = [resolve_entry(entry, get_blob) for entry in prefix]
+    return prefix
+
+
+def _hydrate_prefix(state_path: Path, state: Dict[str, Any]) -> None:
+    """Complete a state that only loaded the active log segment."""
+    if log_offset(state):
+        state["log"] = _log_prefix(state_path, state) + state.get("log", [])
+        state.pop(LOG_OFFSET_KEY, None)
+
+
+def read_state_document(state_path: Path, full_log: bool = True) -> Dict[str, Any]:
+    """Parse the state document, hydrate log segments and text payloads, normalize if needed.
+
+    With `full_log=False` (writers) a segmented log is only read from its
+    active segment when the document is current and its cached log digest
+    (and, in hash-chain mode, chain head) matches that segment; `state["log"]` then starts at
+    `log_offset(state)` and the write path persists it from there.
+    """
+    state_path = Path(state_path)
+    for attempt in range(2):
+        fingerprint = stat_fingerprint(state_path)
+        state = read_document(state_path)
+        unchanged = fingerprint is not None and fingerprint == stat_fingerprint(state_path)
+        if unchanged:
+            with _known_lock:
+                _known_revisions[str(state_path)] = (fingerprint, state_revision(state))
+        current = unchanged and _stamp_current(state, fingerprint)
+        try:
+            state = hydrate_log(state_path, state, full=full_log or not current)
+        except FileNotFoundError:
+            if attempt:
+                raise
+            continue  # a writer pruned segments of the version parsed above; read the new one
+        break
+    if log_offset(state) and not log_tail_current(state):
+        _hydrate_prefix(state_path, state)
+    resolve_payloads(state, BlobStore(blob_root_for(state_path)).get)
+    if not current:
+        normalize_state_document(state)
+    return state
+
+
+@contextmanager
+def open_state_log(state_path: Path) -> Iterator[Tuple[Dict[str, Any], Iterator[Dict[str, Any]]]]:
+    """Stream the in-state log without loading the whole document.
+
+    Yields `(header, entries)`: every top-level key except `log`, and a lazy
+    iterator over the in-state (or segmented) log entries. JSON documents are
+    decoded incrementally from one open file handle, so both views come from
+    the same committed version even if a writer replaces the file meanwhile;
+    binary documents cannot be streamed and are decoded whole.
+    """
+    state_path = Path(state_path)
+    with open(state_path, "rb") as f:
+        if f.read(len(BINARY_MAGIC)) == BINARY_MAGIC:
+            f.seek(0)
+            header = decode_document(f.read())
+            entries: Iterator[Dict[str, Any]] = iter(header.pop("log", None) or [])
+        else:
+            f.seek(0)
+            header = scan_object(f, skip=("log",))
+            f.seek(0)
+            entries = iter_array_member(f, "log")
+        if is_segmented(header):
+            entries = iter_segment_entries(state_path, header)
+        if header.get(TEXT_BLOBS_KEY):
+            get_blob = BlobStore(blob_root_for(state_path)).get
+            entries = (resolve_entry(entry, get_blob) for entry in entries)
+        yield header, entries
+
+
+def iter_state_log(state_path: Path, packet_id: Optional[str] = None) -> Iterator[Dict[str, Any]]:
+    """Yield the full lifecycle log (archived entries first) one entry at a time.
+
+    With `packet_id` only that packet's entries are yielded, and archive
+    segments whose index does not list it are never opened. Stop iterating
+    to stop reading. A shared lock is held until then, so writers cannot
+    prune segment files the stream still has to open.
+    """
+    with file_lock(state_path, shared=True), open_state_log(state_path) as (header, entries):
+        if archived_count(header):
+            for _, entry in iter_archived_entries(state_path, header, packet_id=packet_id):
+                yield entry
+        for entry in entries:
+            if not isinstance(entry, dict):
+                continue
+            if packet_id is None or str(entry.get("packet_id") or "") == packet_id:
+                yield entry
+
+
+def tail_state_log(state_path: Path, limit: int) -> List[Dict[str, Any]]:
+    """The newest `limit` log entries, holding at most `limit` entries in memory."""
+    if limit <= 0:
+        return []
+    with open_state_log(state_path) as (header, entries):
+        tail = list(deque((e for e in entries if isinstance(e, dict)), maxlen=limit))
+        if len(tail) < limit and archived_count(header):
+            tail = archived_tail(state_path, header, limit - len(tail)) + tail
+    return tail
+
+
+def state_companion_paths(state_path: Path) -> List[Path]:
+    """Directories next to the state document holding data it references (commit them together)."""
+    state_path = Path(state_path)
+    return [blob_root_for(state_path), segment_dir_for(state_path), archive_dir_for(state_path)]
+
+
+def _write_unlocked(
+    state_path: Path, state: Dict[str, Any], expected_revision: Optional[int]
+) -> None:
+    on_disk = current_revision(state_path)
+    if expected_revision is not None and on_disk != expected_revision:
+        raise StateConflictError(expected_revision, on_disk)
+    state["revision"] = max(on_disk, state_revision(state)) + 1
+    normalize_state_document(state)
+    written_ns = time.time_ns()
+    state[NORMALIZED_SCHEMA_KEY] = {
+        "revision": NORMALIZED_SCHEMA_REVISION,
+        "written_ns": written_ns,
+    }
+    stamp_ready_queue(state, state["revision"])
+
+    if normalize_log_mode(state.get("log_integrity_mode")) == LOG_MODE_HASH_CHAIN:
+        tree = sync_merkle_tree(
+            merkle_path_for(state_path),
+            state.get("log", []),
+            offset=archived_count(state) + log_offset(state),
+            prefix_loader=lambda: (
+                [entry for _, entry in iter_archived_entries(state_path, state)]
+                + _log_prefix(state_path, state)
+            ),
+        )
+        state[MERKLE_KEY] = {"size": tree.size, "root": tree.root()}
+
+    index_path = log_index_path_for(state_path)
+    if (
+        log_offset(state)
+        and load_log_index(index_path, state["log"], archived_count(state) + log_offset(state))[1]
+        is None
+    ):
+        _hydrate_prefix(
+            state_path, state
+        )  # the sidecar does not reach the loaded segment; rebuild it
+    sync_log_index(
+        index_path, state.get("log", []), offset=archived_count(state) + log_offset(state)
+    )
+
+    put_blob = BlobStore(blob_root_for(state_path)).put
+    threshold = text_blob_threshold()
+    previous_segments = segment_names(state)
+    if is_segmented(state):
+        persist_log_segments(
+            state_path, state, prepare=lambda entry: externalize_entry(entry, put_blob, threshold)
+        )
+        payload = {k: v for k, v in state.items() if k not in ("log", LOG_OFFSET_KEY)}
+    else:
+        _hydrate_prefix(state_path, state)
+        state.pop("log_segments", None)
+        payload = state
+    payload = externalize_payloads(payload, put_blob, threshold)
+    replace_json(state_path, payload, normalize_state_format(state.get(STATE_FORMAT_KEY)))
+    os.utime(state_path, ns=(written_ns, written_ns))
+    _remember(state_path, state["revision"])
+    if is_segmented(state):
+        prune_log_segments(state_path, previous_segments | segment_names(state))
+
+
+def write_state_document(
+    state_path: Path,
+    state: Dict[str, Any],
+    lock: bool = True,
+    timeout: float = 10.0,
+    expected_revision: Optional[int] = None,
+) -> None:
+    """Persist state atomically and bump its revision.
+
+    When `expected_revision` is given the write is a compare-and-swap: it only
+    commits if the on-disk revision still matches, otherwise
+    `StateConflictError` is raised and nothing is written.
+    """
+    state_path = Path(state_path)
+    if not lock:
+        _write_unlocked(state_path, state, expected_revision)
+        return
+    with file_lock(state_path, timeout=timeout):
+        _write_unlocked(state_path, state, expected_revision)
+
+
+__all__ = [
+    "NORMALIZED_SCHEMA_KEY",
+    "NORMALIZED_SCHEMA_REVISION",
+    "StateConflictError",
+    "stat_fingerprint",
+    "state_revision",
+    "current_revision",
+    "is_normalized",
+    "normalize_state_document",
+    "read_state_document",
+    "open_state_log",
+    "iter_state_log",
+    "tail_state_log",
+    "state_companion_paths",
+    "write_state_document",
+]
@@ -0,0 +1,240 @@
+"""Out-of-line storage for large packet and log text payloads.
+
+Packet `notes`, handover `reason` / `progress_notes` and log entry `notes` are
+rewritten with the state document on every mutation. When
+`WBS_TEXT_BLOB_BYTES` is set to a positive byte count (unset or 0 disables;
+the feature is opt-in) the writers store any of those strings that encode to
+more than the threshold in the content-addressed blob store. The document on
+disk then keeps a preview in the field plus a sibling `<field>_ref`:
+
+    {"digest": <blob sha256>, "size": <blob bytes>, "stub": <preview digest>}
+
+Externalization only applies to what is written: `externalize_payloads`
+returns a copy-on-write document and leaves the caller's state untouched, and
+the readers (`read_state_document`, the log streams, the SQLite backend)
+resolve every ref back to the full value, so code working on loaded state
+never sees a preview. Only string fields are moved; lists such as
+`files_modified` always stay inline. Documents written with the feature on
+carry `text_blobs: true`, which keeps ref resolution on for later reads even
+if the feature is switched off again.
+
+A ref whose `stub` no longer matches the field (the field was hand-edited)
+is ignored and the field is read as-is.
+"""
+
+import hashlib
+import json
+import os
+from typing import Any, Callable, Dict, Iterator, Optional, Tuple
+
+from governed_platform.governance.blob_store import encode_json_blob
+
+TEXT_BLOB_THRESHOLD_ENV = "WBS_TEXT_BLOB_BYTES"
+DEFAULT_TEXT_BLOB_THRESHOLD = 0
+TEXT_BLOBS_KEY = "text_blobs"
+PREVIEW_BYTES = 1024
+PREVIEW_MARKER = " [...]"
+
+PACKET_TEXT_FIELDS = ("notes",)
+HANDOVER_TEXT_FIELDS = ("reason", "progress_notes")
+LOG_TEXT_FIELDS = ("notes",)
+
+
+def text_blob_threshold() -> int:
+    raw = os.environ.get(TEXT_BLOB_THRESHOLD_ENV, "").strip()
+    try:
+        return int(raw) if raw else DEFAULT_TEXT_BLOB_THRESHOLD
+    except ValueError:
+        return DEFAULT_TEXT_BLOB_THRESHOLD
+
+
+def ref_key(field: str) -> str:
+    return f"{field}_ref"
+
+
+def _stub(value: Any) -> str:
+    encoded = json.dumps(value, sort_keys=True, separators=(",", ":"), ensure_ascii=False).encode()
+    return hashlib.sha256(encoded).hexdigest()[:16]
+
+
+def preview_of(value: str, limit: int = PREVIEW_BYTES) -> str:
+    """A bounded stand-in for `value`: a text prefix plus a marker."""
+    encoded = str(value).encode("utf-8")
+    return encoded[:limit].decode("utf-8", errors="ignore") + PREVIEW_MARKER
+
+
+def payload_ref(record: Dict[str, Any], field: str) -> Optional[Dict[str, Any]]:
+    """The blob ref for `record[field]`, or None if the field holds its full value."""
+    ref = record.get(ref_key(field))
+    if isinstance(ref, dict) and ref.get("digest") and ref.get("stub") == _stub(record.get(field)):
+        return ref
+    return None
+
+
+def externalize_record(
+    record: Dict[str, Any],
+    fields: Tuple[str, ...],
+    put_blob: Callable[[bytes], str],
+    threshold: int,
+) -> Dict[str, Any]:
+    """`record` with oversized text fields replaced by preview + ref.
+
+    Returns a copy when anything moved, else `record` itself.
+    """
+    out = record
+    for field in fields:
+        value = record.get(field)
+        if threshold <= 0 or not isinstance(value, str) or len(value) * 6 + 2 <= threshold:
+            continue  # cannot exceed the threshold even fully escaped; skip encoding
+        body = encode_json_blob(value)
+        if len(body) <= threshold:
+            continue
+        if out is record:
+            out = dict(record)
+        preview = preview_of(value)
+        out[field] = preview
+        out[ref_key(field)] = {"digest": put_blob(body), "size": len(body), "stub": _stub(preview)}
+    return out
+
+
+def externalize_entry(
+    entry: Dict[str, Any],
+    put_blob: Callable[[bytes], str],
+    threshold: Optional[int] = None,
+) -> Dict[str, Any]:
+    """Log entry as it should be written (see `externalize_record`)."""
+    threshold = text_blob_threshold() if threshold is None else threshold
+    if threshold <= 0 or not isinstance(entry, dict):
+        return entry
+    return externalize_record(entry, LOG_TEXT_FIELDS, put_blob, threshold)
+
+
+def _externalize_packet(packet: Any, put_blob: Callable[[bytes], str], threshold: int) -> Any:
+    if not isinstance(packet, dict):
+        return packet
+    out = externalize_record(packet, PACKET_TEXT_FIELDS, put_blob, threshold)
+    handovers = packet.get("handovers")
+    if isinstance(handovers, list):
+        written = [
+            externalize_record(h, HANDOVER_TEXT_FIELDS, put_blob, threshold)
+            if isinstance(h, dict)
+            else h
+            for h in handovers
+        ]
+        if any(a is not b for a, b in zip(written, handovers)):
+            out = dict(out) if out is packet else out
+            out["handovers"] = written
+    return out
+
+
+def externalize_payloads(
+    state: Dict[str, Any],
+    put_blob: Callable[[bytes], str],
+    threshold: Optional[int] = None,
+    log: bool = True,
+) -> Dict[str, Any]:
+    """The document to write for `state`, with oversized text payloads moved into blobs.
+
+    `state` itself is never modified; records are copied only where a field
+    moved. With `log=False` the log is passed through unchanged, for writers
+    that store log entries elsewhere and call `externalize_entry` themselves.
+    Returns `state` unchanged when the feature is disabled.
+    """
+    threshold = text_blob_threshold() if threshold is None else threshold
+    if threshold <= 0:
+        return state
+    doc = dict(state)
+    doc[TEXT_BLOBS_KEY] = True
+    packets = state.get("packets")
+    if isinstance(packets, dict):
+        doc["packets"] = {
+            pid: _externalize_packet(pkt, put_blob, threshold) for pid, pkt in packets.items()
+        }
+    if log and isinstance(state.get("log"), list):
+        doc["log"] = [externalize_entry(entry, put_blob, threshold) for entry in state["log"]]
+    return doc
+
+
+def resolve_record(
+    record: Dict[str, Any], fields: Tuple[str, ...], get_blob: Callable[[str], bytes]
+) -> int:
+    """Replace externalized fields of `record` with their full values in place.
+
+    A ref whose blob is missing is left in place (the field keeps its
+    preview); returns how many fields were resolved.
+    """
+    resolved = 0
+    for field in fields:
+        key = ref_key(field)
+        if key not in record:
+            continue
+        ref = payload_ref(record, field)
+        if ref is None:
+            del record[key]  # the field was rewritten since it was externalized
+            continue
+        try:
+            record[field] = json.loads(get_blob(ref["digest"]))
+        except KeyError:
+            continue
+        del record[key]
+        resolved += 1
+    return resolved
+
+
+def resolve_entry(entry: Any, get_blob: Callable[[str], bytes]) -> Any:
+    if isinstance(entry, dict):
+        resolve_record(entry, LOG_TEXT_FIELDS, get_blob)
+    return entry
+
+
+def _records(state: Dict[str, Any]) -> Iterator[Tuple[Dict[str, Any], Tuple[str, ...]]]:
+    for pkt in (state.get("packets") or {}).values():
+        if not isinstance(pkt, dict):
+            continue
+        yield pkt, PACKET_TEXT_FIELDS
+        for handover in pkt.get("handovers") or []:
+            if isinstance(handover, dict):
+                yield handover, HANDOVER_TEXT_FIELDS
+    for entry in state.get("log") or []:
+        if isinstance(entry, dict):
+            yield entry, LOG_TEXT_FIELDS
+
+
+def resolve_payloads(state: Dict[str, Any], get_blob: Callable[[str], bytes]) -> int:
+    """Resolve every ref in a loaded document in place; a no-op unless it was written with refs."""
+    if not state.get(TEXT_BLOBS_KEY):
+        return 0
+    return sum(resolve_record(record, fields, get_blob) for record, fields in _records(state))
+
+
+def load_payload(record: Dict[str, Any], field: str, get_blob: Callable[[str], bytes]) -> Any:
+    """Full value of `record[field]`, reading the blob only when it is still externalized.
+
+    Raises KeyError when the referenced blob is missing.
+    """
+    ref = payload_ref(record, field)
+    if ref is None:
+        return record.get(field)
+    return json.loads(get_blob(ref["digest"]))
+
+
+__all__ = [
+    "TEXT_BLOB_THRESHOLD_ENV",
+    "DEFAULT_TEXT_BLOB_THRESHOLD",
+    "TEXT_BLOBS_KEY",
+    "PREVIEW_BYTES",
+    "PACKET_TEXT_FIELDS",
+    "HANDOVER_TEXT_FIELDS",
+    "LOG_TEXT_FIELDS",
+    "text_blob_threshold",
+    "ref_key",
+    "preview_of",
+    "payload_ref",
+    "externalize_record",
+    "externalize_entry",
+    "externalize_payloads",
+    "resolve_record",
+    "resolve_entry",
+    "resolve_payloads",
+    "load_payload",
+]
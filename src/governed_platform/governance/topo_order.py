@@ -0,0 +1,136 @@
+"""Dynamic topological order of the dependency graph for edge edits.
+
+Dependency edits (`add-dep`, `/api/add-dep`, `/api/remove-dep`) keep a
+topological order of packets in a sidecar next to the definition
+(`<stem>-topo.json`), tagged with the digest of the `dependencies` map it
+was computed for. Adding `packet -> depends_on` then only has to look at the
+packets between the two in that order (Pearce-Kelly): if `depends_on`
+already sits before `packet` nothing changes; otherwise its transitive
+dependencies inside that window are searched, which either reaches `packet`
+(a cycle, rejected) or yields the set to shift in front of `packet`.
+Removing an edge never invalidates the order.
+
+The sidecar is reused only while its digest matches the definition; any
+other change (hand edits, packet removal) rebuilds it from the dependency
+index.
+"""
+
+import json
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Set
+
+from governed_platform.governance.blob_store import json_digest
+from governed_platform.governance.dependency_index import dependency_index
+from governed_platform.governance.file_lock import replace_json
+from governed_platform.governance.serialization import STATE_FORMAT_COMPACT
+
+
+def topo_order_path_for(definition_path: Path) -> Path:
+    definition_path = Path(definition_path)
+    return definition_path.with_name(f"{definition_path.stem}-topo.json")
+
+
+class DynamicTopoOrder:
+    """Topological order (dependencies first) over a mutable dependency map."""
+
+    def __init__(self, dependencies: Dict[str, List[str]], order: List[str]):
+        self.dependencies = dependencies
+        self.order = list(order)
+        self.pos: Dict[str, int] = {node: idx for idx, node in enumerate(self.order)}
+
+    def _position(self, node: str) -> int:
+        if node not in self.pos:
+            # Nodes missing from the order have no edges yet (the digest
+            # covers every edge), so any slot is valid; append them.
+            self.pos[node] = len(self.order)
+            self.order.append(node)
+        return self.pos[node]
+
+    def add_dependency(self, packet_id: str, depends_on: str) -> Optional[List[str]]:
+        """Record `packet_id -> depends_on`; returns the cycle instead if the edge would close one.
+
+        On success the edge is appended to `dependencies` and the order
+        repaired; a rejected edge leaves both untouched.
+        """
+        if packet_id == depends_on:
+            return [packet_id, packet_id]
+        lower, upper = self._position(packet_id), self._position(depends_on)
+        if upper > lower:
+            # depends_on is ordered after packet_id: collect its transitive
+            # dependencies inside the window; reaching packet_id is a cycle.
+            parent: Dict[str, Optional[str]] = {depends_on: None}
+            stack = [depends_on]
+            while stack:
+                node = stack.pop()
+                for dep in self.dependencies.get(node, []):
+                    if dep == packet_id:
+                        return self._cycle_path(packet_id, node, parent)
+                    if dep not in parent and lower < self._position(dep) <= upper:
+                        parent[dep] = node
+                        stack.append(dep)
+            self._shift_before(lower, upper, set(parent))
+        self.dependencies.setdefault(packet_id, []).append(depends_on)
+        return None
+
+    @staticmethod
+    def _cycle_path(packet_id: str, last: str, parent: Dict[str, Optional[str]]) -> List[str]:
+        chain = [last]
+        while parent[chain[-1]] is not None:
+            chain.append(parent[chain[-1]])
+        # chain runs last -> ... -> depends_on against dependency direction.
+        return [packet_id] + list(reversed(chain)) + [packet_id]
+
+    def _shift_before(self, lower: int, upper: int, moved: Set[str]) -> None:
+        window = self.order[lower : upper + 1]
+        ahead = [node for node in window if node in moved]
+        behind = [node for node in window if node not in moved]
+        self.order[lower : upper + 1] = ahead + behind
+        for idx in range(lower, upper + 1):
+            self.pos[self.order[idx]] = idx
+
+    def remove_dependency(self, packet_id: str, depends_on: str) -> None:
+        deps = self.dependencies.get(packet_id, [])
+        if depends_on in deps:
+            deps.remove(depends_on)
+        if packet_id in self.dependencies and not self.dependencies[packet_id]:
+            del self.dependencies[packet_id]
+
+
+def load_topo_order(
+    definition_path: Path, definition: Dict[str, Any]
+) -> Optional[DynamicTopoOrder]:
+    """Order for `definition["dependencies"]`, from the sidecar when it is current.
+
+    Returns None when the definition is already cyclic (no order exists).
+    """
+    dependencies = definition.setdefault("dependencies", {})
+    digest = json_digest(dependencies)
+    path = topo_order_path_for(definition_path)
+    try:
+        cached = json.loads(path.read_text())
+    except (OSError, ValueError):
+        cached = None
+    if (
+        isinstance(cached, dict)
+        and cached.get("digest") == digest
+        and isinstance(cached.get("order"), list)
+    ):
+        return DynamicTopoOrder(dependencies, cached["order"])
+    index = dependency_index(definition)
+    if not index.acyclic:
+        return None
+    return DynamicTopoOrder(dependencies, index.topo_order)
+
+
+def save_topo_order(definition_path: Path, topo: DynamicTopoOrder) -> None:
+    """Persist the order for the current dependency map; call after saving the definition."""
+    payload = {"digest": json_digest(topo.dependencies), "order": topo.order}
+    replace_json(topo_order_path_for(definition_path), payload, STATE_FORMAT_COMPACT)
+
+
+__all__ = [
+    "DynamicTopoOrder",
+    "topo_order_path_for",
+    "load_topo_order",
+    "save_topo_order",
+]
@@ -1,5 +1,14 @@
-from substrate_core.engine import PacketEngine
+from substrate_core.engine import PacketEngine, PacketTransaction
 from substrate_core.state import ActorContext, EngineResult
-from substrate_core.storage import FileStorage, StorageInterface
+from substrate_core.storage import FileStorage, SqliteStorage, StorageInterface, build_storage
 
-__all__ = ["ActorContext", "EngineResult", "PacketEngine", "FileStorage", "StorageInterface"]
+__all__ = [
+    "ActorContext",
+    "EngineResult",
+    "PacketEngine",
+    "PacketTransaction",
+    "FileStorage",
+    "SqliteStorage",
+    "StorageInterface",
+    "build_storage",
+]
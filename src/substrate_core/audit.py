@@ -1,13 +1,26 @@
 from __future__ import annotations
 
+import os
+from copy import deepcopy
+from dataclasses import dataclass
 from datetime import datetime, timezone
-from typing import Any, Dict, List, Mapping, Tuple
+from pathlib import Path
+from typing import Any, Dict, List, Mapping, Optional, Tuple
 
+from governed_platform.governance.log_archive import archived_count, iter_archived_entries
+from governed_platform.governance.log_index import packet_log_entries
 from governed_platform.governance.log_integrity import (
     LOG_MODE_HASH_CHAIN,
+    append_log_entry,
     build_log_entry,
+    chain_head,
+    entry_digest,
+    log_digest,
+    next_chain_link,
     normalize_log_mode,
+    roll_log_digest,
 )
+from governed_platform.governance.state_store import iter_state_log
 
 from substrate_core.storage import StorageInterface
 
@@ -49,17 +62,13 @@ def append_mutation_log(
     exit_state: str = "",
 ) -> Dict[str, Any]:
     """Persist immutable lifecycle + structured mutation fields into state log."""
-    state = storage.read_state()
-    entries = state.setdefault("log", [])
+    state = storage.read_state_for_update()
     mode = normalize_log_mode(state.get("log_integrity_mode", "plain"))
 
     prev_hash = ""
     hash_index = 1
     if mode == LOG_MODE_HASH_CHAIN:
-        hashed = [entry for entry in entries if isinstance(entry, dict) and entry.get("hash")]
-        if hashed:
-            prev_hash = hashed[-1].get("hash", "") or ""
-            hash_index = len(hashed) + 1
+        prev_hash, hash_index = next_chain_link(state)
 
     lifecycle = build_log_entry(
         packet_id=packet_id,
@@ -84,7 +93,7 @@ def append_mutation_log(
         )
     )
 
-    entries.append(lifecycle)
+    append_log_entry(state, lifecycle)
     storage.write_state(state)
     return lifecycle
 
@@ -99,19 +108,121 @@ def validate_append_only_log(previous: List[Dict[str, Any]], current: List[Dict[
     return True, "ok"
 
 
-def provenance_chain(state: Dict[str, Any], packet_id: str) -> List[Dict[str, Any]]:
-    """Return ordered lifecycle/provenance events for a packet id."""
+LOG_GUARD_ENV = "WBS_LOG_GUARD"
+LOG_GUARD_PARANOID = "paranoid"
+
+
+def paranoid_log_guard_enabled() -> bool:
+    return os.environ.get(LOG_GUARD_ENV, "").strip().lower() == LOG_GUARD_PARANOID
+
+
+@dataclass(frozen=True)
+class LogPrefixMarker:
+    """Pre-transition view of the audit log used by the append-only guard.
+
+    `length` and `tail_digest` pin the last existing entry and `prefix_digest`
+    is the rolling digest of the whole prior log (`log_integrity.log_digest`);
+    `chain_hash` is the hash-chain head (empty in plain mode, where entries
+    carry no hashes). `snapshot` is only set in paranoid mode.
+    """
+
+    length: int
+    tail_digest: str
+    prefix_digest: str
+    chain_hash: str
+    snapshot: Optional[List[Dict[str, Any]]] = None
+
+
+def capture_log_prefix(state: Dict[str, Any], paranoid: bool = False) -> LogPrefixMarker:
+    """O(1) marker of the current log (paranoid mode also deep-copies it)."""
+    entries = state.setdefault("log", [])
+    hashed = normalize_log_mode(state.get("log_integrity_mode")) == LOG_MODE_HASH_CHAIN
+    return LogPrefixMarker(
+        length=len(entries),
+        tail_digest=entry_digest(entries[-1]) if entries else "",
+        prefix_digest=log_digest(state)["digest"],
+        chain_hash=(chain_head(state).get("hash", "") or "") if hashed else "",
+        snapshot=deepcopy(entries) if paranoid else None,
+    )
+
+
+def validate_log_prefix(
+    marker: LogPrefixMarker,
+    current: List[Dict[str, Any]],
+    digest: Optional[Dict[str, Any]] = None,
+) -> Tuple[bool, str]:
+    """Check the log only grew since `marker`, touching just the tail and new entries.
+
+    The default check catches truncation, rewrites of the last prior entry and
+    new hashed entries that do not extend the prior chain head. With `digest`
+    (the state's `log_digest` after the transition) the marker's prefix digest
+    rolled over the new entries must reproduce it, so appends that bypassed
+    `append_log_entry` or entries edited after being appended are rejected too.
+    Prior entries are not re-read; a rewrite of an older one is caught by
+    `verify-log --full`, which re-rolls the digest over the whole log. Set
+    `WBS_LOG_GUARD=paranoid` (or pass `paranoid=True` when capturing) to
+    compare every prior entry at save.
+    """
+    if marker.snapshot is not None:
+        return validate_append_only_log(marker.snapshot, current)
+    if len(current) < marker.length:
+        return False, "Audit log shrank; append-only invariant violated"
+    if marker.length and entry_digest(current[marker.length - 1]) != marker.tail_digest:
+        return (
+            False,
+            f"Audit log mutated at index {marker.length - 1}; append-only invariant violated",
+        )
+    expected_prev = marker.chain_hash
+    rolled = marker.prefix_digest
+    for idx in range(marker.length, len(current)):
+        entry = current[idx]
+        if isinstance(entry, dict) and entry.get("hash"):
+            if entry.get("prev_hash", "") != expected_prev:
+                return (
+                    False,
+                    f"Audit log entry {idx} does not extend the prior chain; "
+                    "append-only invariant violated",
+                )
+            expected_prev = entry["hash"]
+        rolled = roll_log_digest(rolled, entry)
+    if digest is not None and digest.get("digest") != rolled:
+        return (
+            False,
+            "Audit log digest does not match the prior log plus new entries; "
+            "append-only invariant violated",
+        )
+    return True, "ok"
+
+
+def provenance_chain(
+    state: Optional[Dict[str, Any]],
+    packet_id: str,
+    state_path: Optional[Path] = None,
+) -> List[Dict[str, Any]]:
+    """Return ordered lifecycle/provenance events for a packet id.
+
+    With `state_path`, archived events are included (only archive segments
+    whose index lists the packet are opened) and in-state events are read at
+    the positions recorded in the log index sidecar. Pass `state=None` to stream the
+    log from `state_path` instead of holding the whole document in memory.
+    """
+    if state is None:
+        if state_path is None:
+            raise ValueError("provenance_chain needs state or state_path")
+        return list(iter_state_log(state_path, packet_id=packet_id))
     chain: List[Dict[str, Any]] = []
-    for entry in state.get("log", []):
-        if not isinstance(entry, dict):
-            continue
-        if str(entry.get("packet_id") or "") == packet_id:
-            chain.append(entry)
+    if state_path is not None and archived_count(state):
+        chain.extend(
+            entry for _, entry in iter_archived_entries(state_path, state, packet_id=packet_id)
+        )
+    chain.extend(packet_log_entries(state, packet_id, state_path))
     return chain
 
 
-def export_provenance_snapshot(state: Dict[str, Any], packet_id: str) -> Dict[str, Any]:
-    chain = provenance_chain(state, packet_id)
+def export_provenance_snapshot(
+    state: Optional[Dict[str, Any]], packet_id: str, state_path: Optional[Path] = None
+) -> Dict[str, Any]:
+    chain = provenance_chain(state, packet_id, state_path)
     return {
         "packet_id": packet_id,
         "event_count": len(chain),
@@ -123,6 +234,13 @@ __all__ = [
     "mutation_entry",
     "append_mutation_log",
     "validate_append_only_log",
+    "LOG_GUARD_ENV",
+    "LOG_GUARD_PARANOID",
+    "paranoid_log_guard_enabled",
+    "entry_digest",
+    "LogPrefixMarker",
+    "capture_log_prefix",
+    "validate_log_prefix",
     "provenance_chain",
     "export_provenance_snapshot",
 ]
@@ -1,14 +1,29 @@
 from __future__ import annotations
 
-from copy import deepcopy
+import functools
+import inspect
+import random
+import time
 from datetime import datetime
-from typing import Any, Dict, List, Tuple
+from typing import Any, Callable, Dict, List, Tuple
 
+from governed_platform.governance.blob_store import json_digest
+from governed_platform.governance.graph_cycles import dependency_cycles
+from governed_platform.governance.log_integrity import LOG_DIGEST_KEY
+from governed_platform.governance.ready_queue import sync_ready_queue
 from governed_platform.governance.status import normalize_runtime_status
 
-from substrate_core.audit import append_mutation_log, validate_append_only_log
+from substrate_core.audit import (
+    LogPrefixMarker,
+    append_mutation_log,
+    capture_log_prefix,
+    paranoid_log_guard_enabled,
+    validate_log_prefix,
+)
 from substrate_core.graph_core import (
+    DependencyIndex,
     critical_path as graph_critical_path,
+    dependency_index,
     downstream_nodes,
     impact_analysis as graph_impact_analysis,
     postgres_recursive_cte_queries,
@@ -34,13 +49,13 @@ from substrate_core.budget import (
     consume_budget,
 )
 from substrate_core.rag import retrieve_scoped
+from substrate_core.replay import DEFAULT_CHECKPOINT_INTERVAL, ReplayEngine
 from substrate_core.observability import append_ai_event, metrics_snapshot
 from substrate_core.security import register_agent_profile, validate_execution_guard
 from substrate_core.state import ActorContext, EngineResult
-from substrate_core.storage import StorageInterface
+from substrate_core.storage import StateConflictError, StorageInterface
 from substrate_core.trust import register_trust_model, score_with_active_model
 from substrate_core.validation import (
-    detect_dependency_cycle,
     dependency_blocker,
     validate_claim_pipeline,
     validate_done,
@@ -51,22 +66,103 @@ from substrate_core.validation import (
 )
 
 
+DEFAULT_CONFLICT_RETRIES = 3
+
+BATCH_ALL_OR_NOTHING = "all_or_nothing"
+BATCH_BEST_EFFORT = "best_effort"
+BATCH_MODES = (BATCH_ALL_OR_NOTHING, BATCH_BEST_EFFORT)
+
+
+def _retry_on_conflict(
+    action: str,
+) -> Callable[[Callable[..., EngineResult]], Callable[..., EngineResult]]:
+    """Re-run a load/mutate/save transition when the storage reports a revision conflict.
+
+    Each attempt reloads state, so policy and constraint checks are evaluated
+    against the state that actually won the race.
+    """
+
+    def decorator(method: Callable[..., EngineResult]) -> Callable[..., EngineResult]:
+        signature = inspect.signature(method)
+
+        @functools.wraps(method)
+        def wrapper(self: "PacketEngine", *args: Any, **kwargs: Any) -> EngineResult:
+            attempts = max(int(self.conflict_retries), 0) + 1
+            conflict: StateConflictError | None = None
+            for attempt in range(attempts):
+                try:
+                    return method(self, *args, **kwargs)
+                except StateConflictError as exc:
+                    conflict = exc
+                    if attempt + 1 < attempts:
+                        time.sleep(random.uniform(0.0, 0.01 * (attempt + 1)))
+            bound = signature.bind(self, *args, **kwargs)
+            return EngineResult(
+                False,
+                f"{conflict}; gave up after {attempts} attempts",
+                self._decision_payload(
+                    action=action,
+                    packet_id=bound.arguments.get("packet_id", ""),
+                    actor=bound.arguments["actor"],
+                    ok=False,
+                    constraint_result="deny",
+                    reason_codes=["STATE_CONFLICT"],
+                ),
+            )
+
+        return wrapper
+
+    return decorator
+
+
 class PacketEngine:
     """Reusable packet lifecycle engine for CLI/API/terminal callers."""
 
-    def __init__(self, storage: StorageInterface, definition: Dict[str, Any]):
+    def __init__(
+        self,
+        storage: StorageInterface,
+        definition: Dict[str, Any],
+        conflict_retries: int = DEFAULT_CONFLICT_RETRIES,
+        paranoid_log_guard: bool | None = None,
+        replay_interval: int = DEFAULT_CHECKPOINT_INTERVAL,
+    ):
         self.storage = storage
         self.definition = definition
         self.dependencies = definition.get("dependencies", {})
+        self.conflict_retries = conflict_retries
+        self.replay_interval = replay_interval
+        self.paranoid_log_guard = (
+            paranoid_log_guard_enabled() if paranoid_log_guard is None else paranoid_log_guard
+        )
+
+    @functools.cached_property
+    def graph(self) -> DependencyIndex:
+        """Compiled dependency index; the definition is read-only for the engine's lifetime."""
+        return dependency_index(self.definition)
 
     def _load(self) -> Dict[str, Any]:
         return self.storage.read_state()
 
+    def _load_for_update(self) -> Dict[str, Any]:
+        """State for a transition; the log may be only its recent tail.
+
+        See `read_state_for_update`.
+        """
+        return self.storage.read_state_for_update()
+
     def _save(self, state: Dict[str, Any]) -> None:
+        sync_ready_queue(state, self.graph)
         self.storage.write_state(state)
 
-    def _save_with_log_guard(self, state: Dict[str, Any], before_log: List[Dict[str, Any]]) -> Tuple[bool, str]:
-        ok, msg = validate_append_only_log(before_log, state.get("log", []))
+    def _log_prefix(self, state: Dict[str, Any]) -> LogPrefixMarker:
+        return capture_log_prefix(state, paranoid=self.paranoid_log_guard)
+
+    def _save_with_log_guard(
+        self, state: Dict[str, Any], log_prefix: LogPrefixMarker
+    ) -> Tuple[bool, str]:
+        ok, msg = validate_log_prefix(
+            log_prefix, state.get("log", []), state.get(LOG_DIGEST_KEY) or {}
+        )
         if not ok:
             return False, msg
         self._save(state)
@@ -108,19 +204,17 @@ class PacketEngine:
     ) -> Dict[str, Any]:
         from governed_platform.governance.log_integrity import (
             LOG_MODE_HASH_CHAIN,
+            append_log_entry,
             build_log_entry,
+            next_chain_link,
             normalize_log_mode,
         )
 
-        entries = state.setdefault("log", [])
         mode = normalize_log_mode(state.get("log_integrity_mode", "plain"))
         prev_hash = ""
         hash_index = 1
         if mode == LOG_MODE_HASH_CHAIN:
-            hashed = [entry for entry in entries if isinstance(entry, dict) and entry.get("hash")]
-            if hashed:
-                prev_hash = hashed[-1].get("hash", "") or ""
-                hash_index = len(hashed) + 1
+            prev_hash, hash_index = next_chain_link(state)
 
         entry = build_log_entry(
             packet_id=packet_id,
@@ -143,7 +237,7 @@ class PacketEngine:
                 "exit_state": exit_state,
             }
         )
-        entries.append(entry)
+        append_log_entry(state, entry)
         return state
 
     def _ensure_packet_runtime(self, state: Dict[str, Any]) -> Dict[str, Any]:
@@ -197,9 +291,9 @@ class PacketEngine:
                 return item
         return {}
 
-    def claim(self, packet_id: str, actor: ActorContext) -> EngineResult:
-        state = self._ensure_packet_runtime(self._load())
-        before_log = list(state.get("log", []))
+    def _claim_in_state(
+        self, state: Dict[str, Any], packet_id: str, actor: ActorContext
+    ) -> EngineResult:
         policy = evaluate_policy_with_opa(
             self.definition,
             packet_id=packet_id,
@@ -225,7 +319,9 @@ class PacketEngine:
                     },
                 ),
             )
-        ok, msg = validate_packet_dependency_ontology(packet_id, self.definition, self.dependencies)
+        ok, msg = validate_packet_dependency_ontology(
+            packet_id, self.definition, self.dependencies, self.graph
+        )
         if not ok:
             return EngineResult(
                 False,
@@ -240,7 +336,9 @@ class PacketEngine:
                     reason_codes=["ONTOLOGY_DENY"],
                 ),
             )
-        ok, msg, trace = validate_claim_pipeline(packet_id, self.dependencies, state)
+        ok, msg, trace = validate_claim_pipeline(
+            packet_id, self.dependencies, state, acyclic=self.graph.acyclic
+        )
         if not ok:
             return EngineResult(
                 False,
@@ -271,21 +369,6 @@ class PacketEngine:
             notes=f"Claimed by {actor.user_id}",
             exit_state="in_progress",
         )
-        ok, msg = self._save_with_log_guard(state, before_log)
-        if not ok:
-            return EngineResult(
-                False,
-                msg,
-                self._decision_payload(
-                    action="claim",
-                    packet_id=packet_id,
-                    actor=actor,
-                    ok=False,
-                    policy_result="allow",
-                    constraint_result="deny",
-                    reason_codes=["PERSISTENCE_ERROR"],
-                ),
-            )
         return EngineResult(
             True,
             f"{packet_id} claimed by {actor.user_id}",
@@ -304,9 +387,9 @@ class PacketEngine:
             ),
         )
 
-    def done(self, packet_id: str, actor: ActorContext, notes: str = "") -> EngineResult:
-        state = self._ensure_packet_runtime(self._load())
-        before_log = list(state.get("log", []))
+    def _done_in_state(
+        self, state: Dict[str, Any], packet_id: str, actor: ActorContext, notes: str = ""
+    ) -> EngineResult:
         policy = evaluate_policy_with_opa(
             self.definition,
             packet_id=packet_id,
@@ -376,21 +459,6 @@ class PacketEngine:
             notes=notes,
             exit_state="done",
         )
-        ok, msg = self._save_with_log_guard(state, before_log)
-        if not ok:
-            return EngineResult(
-                False,
-                msg,
-                self._decision_payload(
-                    action="done",
-                    packet_id=packet_id,
-                    actor=actor,
-                    ok=False,
-                    policy_result="allow",
-                    constraint_result="deny",
-                    reason_codes=["PERSISTENCE_ERROR"],
-                ),
-            )
         return EngineResult(
             True,
             f"{packet_id} marked done",
@@ -409,9 +477,9 @@ class PacketEngine:
             ),
         )
 
-    def note(self, packet_id: str, message: str, actor: ActorContext) -> EngineResult:
-        state = self._ensure_packet_runtime(self._load())
-        before_log = list(state.get("log", []))
+    def _note_in_state(
+        self, state: Dict[str, Any], packet_id: str, actor: ActorContext, message: str = ""
+    ) -> EngineResult:
         ok, msg = validate_note(packet_id, state)
         if not ok:
             return EngineResult(
@@ -438,20 +506,6 @@ class PacketEngine:
             notes=message,
             exit_state=normalize_runtime_status(state["packets"][packet_id].get("status", "pending")),
         )
-        ok, msg = self._save_with_log_guard(state, before_log)
-        if not ok:
-            return EngineResult(
-                False,
-                msg,
-                self._decision_payload(
-                    action="note",
-                    packet_id=packet_id,
-                    actor=actor,
-                    ok=False,
-                    constraint_result="deny",
-                    reason_codes=["PERSISTENCE_ERROR"],
-                ),
-            )
         return EngineResult(
             True,
             f"{packet_id} notes updated",
@@ -464,9 +518,9 @@ class PacketEngine:
             ),
         )
 
-    def fail(self, packet_id: str, actor: ActorContext, reason: str = "") -> EngineResult:
-        state = self._ensure_packet_runtime(self._load())
-        before_log = list(state.get("log", []))
+    def _fail_in_state(
+        self, state: Dict[str, Any], packet_id: str, actor: ActorContext, reason: str = ""
+    ) -> EngineResult:
         ok, msg = validate_fail(packet_id, state)
         if not ok:
             return EngineResult(
@@ -511,20 +565,6 @@ class PacketEngine:
         )
 
         blocked = self._cascade_block(state, packet_id, actor)
-        ok, msg = self._save_with_log_guard(state, before_log)
-        if not ok:
-            return EngineResult(
-                False,
-                msg,
-                self._decision_payload(
-                    action="fail",
-                    packet_id=packet_id,
-                    actor=actor,
-                    ok=False,
-                    constraint_result="deny",
-                    reason_codes=["PERSISTENCE_ERROR"],
-                ),
-            )
         suffix = f"; blocked: {', '.join(blocked)}" if blocked else ""
         return EngineResult(
             True,
@@ -540,8 +580,7 @@ class PacketEngine:
         )
 
     def _cascade_block(self, state: Dict[str, Any], failed_id: str, actor: ActorContext) -> List[str]:
-        deps = self.dependencies
-        to_block = [pid for pid, sources in deps.items() if failed_id in sources]
+        to_block = list(self.graph.dependents_of(failed_id))
         blocked: List[str] = []
         while to_block:
             pid = to_block.pop(0)
@@ -560,12 +599,12 @@ class PacketEngine:
                     exit_state="blocked",
                 )
                 blocked.append(pid)
-                to_block.extend(target for target, sources in deps.items() if pid in sources)
+                to_block.extend(self.graph.dependents_of(pid))
         return blocked
 
-    def block(self, packet_id: str, actor: ActorContext, reason: str = "") -> EngineResult:
-        state = self._ensure_packet_runtime(self._load())
-        before_log = list(state.get("log", []))
+    def _block_in_state(
+        self, state: Dict[str, Any], packet_id: str, actor: ActorContext, reason: str = ""
+    ) -> EngineResult:
         if packet_id not in state.get("packets", {}):
             return EngineResult(
                 False,
@@ -592,20 +631,6 @@ class PacketEngine:
             notes=reason,
             exit_state="blocked",
         )
-        ok, msg = self._save_with_log_guard(state, before_log)
-        if not ok:
-            return EngineResult(
-                False,
-                msg,
-                self._decision_payload(
-                    action="block",
-                    packet_id=packet_id,
-                    actor=actor,
-                    ok=False,
-                    constraint_result="deny",
-                    reason_codes=["PERSISTENCE_ERROR"],
-                ),
-            )
         return EngineResult(
             True,
             f"{packet_id} marked blocked",
@@ -618,9 +643,9 @@ class PacketEngine:
             ),
         )
 
-    def reset(self, packet_id: str, actor: ActorContext) -> EngineResult:
-        state = self._ensure_packet_runtime(self._load())
-        before_log = list(state.get("log", []))
+    def _reset_in_state(
+        self, state: Dict[str, Any], packet_id: str, actor: ActorContext
+    ) -> EngineResult:
         ok, msg = validate_reset(packet_id, state)
         if not ok:
             return EngineResult(
@@ -650,20 +675,6 @@ class PacketEngine:
             notes="",
             exit_state="pending",
         )
-        ok, msg = self._save_with_log_guard(state, before_log)
-        if not ok:
-            return EngineResult(
-                False,
-                msg,
-                self._decision_payload(
-                    action="reset",
-                    packet_id=packet_id,
-                    actor=actor,
-                    ok=False,
-                    constraint_result="deny",
-                    reason_codes=["PERSISTENCE_ERROR"],
-                ),
-            )
         return EngineResult(
             True,
             f"{packet_id} reset to pending",
@@ -676,6 +687,96 @@ class PacketEngine:
             ),
         )
 
+    def _apply_single(
+        self,
+        action: str,
+        operation: Callable[..., EngineResult],
+        packet_id: str,
+        actor: ActorContext,
+        *args: Any,
+    ) -> EngineResult:
+        """Load, run one in-state operation and persist it with the log guard."""
+        state = self._ensure_packet_runtime(self._load_for_update())
+        log_prefix = self._log_prefix(state)
+        result = operation(state, packet_id, actor, *args)
+        if not result.ok:
+            return result
+        ok, msg = self._save_with_log_guard(state, log_prefix)
+        if not ok:
+            return self._persistence_error(action, packet_id, actor, result, msg)
+        return result
+
+    def _persistence_error(
+        self, action: str, packet_id: str, actor: ActorContext, result: EngineResult, msg: str
+    ) -> EngineResult:
+        return EngineResult(
+            False,
+            msg,
+            self._decision_payload(
+                action=action,
+                packet_id=packet_id,
+                actor=actor,
+                ok=False,
+                policy_result=result.payload.get("decision", {}).get("policy_result"),
+                constraint_result="deny",
+                reason_codes=["PERSISTENCE_ERROR"],
+            ),
+        )
+
+    @_retry_on_conflict("claim")
+    def claim(self, packet_id: str, actor: ActorContext) -> EngineResult:
+        return self._apply_single("claim", self._claim_in_state, packet_id, actor)
+
+    @_retry_on_conflict("done")
+    def done(self, packet_id: str, actor: ActorContext, notes: str = "") -> EngineResult:
+        return self._apply_single("done", self._done_in_state, packet_id, actor, notes)
+
+    @_retry_on_conflict("note")
+    def note(self, packet_id: str, message: str, actor: ActorContext) -> EngineResult:
+        return self._apply_single("note", self._note_in_state, packet_id, actor, message)
+
+    @_retry_on_conflict("fail")
+    def fail(self, packet_id: str, actor: ActorContext, reason: str = "") -> EngineResult:
+        return self._apply_single("fail", self._fail_in_state, packet_id, actor, reason)
+
+    @_retry_on_conflict("block")
+    def block(self, packet_id: str, actor: ActorContext, reason: str = "") -> EngineResult:
+        return self._apply_single("block", self._block_in_state, packet_id, actor, reason)
+
+    @_retry_on_conflict("reset")
+    def reset(self, packet_id: str, actor: ActorContext) -> EngineResult:
+        return self._apply_single("reset", self._reset_in_state, packet_id, actor)
+
+    def transaction(self, mode: str = BATCH_ALL_OR_NOTHING) -> "PacketTransaction":
+        """Open a unit of work: many transitions against one loaded state, one save.
+
+        Use as a context manager; the state is saved once on a clean exit.
+        A revision conflict at commit raises `StateConflictError` (use
+        `apply_batch` for automatic retries).
+        """
+        return PacketTransaction(self, mode)
+
+    @_retry_on_conflict("batch")
+    def apply_batch(
+        self,
+        operations: List[Dict[str, Any]],
+        actor: ActorContext,
+        mode: str = BATCH_ALL_OR_NOTHING,
+    ) -> EngineResult:
+        """Apply `{"action", "packet_id", ...}` operations with one log-guarded save.
+
+        Each operation runs the same policy/validation as the single-packet
+        method and gets its own result. Operations may carry their own
+        `actor`; extra fields (`notes`, `message`, `reason`) map to the method
+        arguments. In `all_or_nothing` mode the first failure aborts the batch
+        and nothing is written; in `best_effort` mode failed operations are
+        skipped and the rest are committed.
+        """
+        with self.transaction(mode) as txn:
+            for operation in operations:
+                txn.apply(operation, actor)
+        return txn.outcome()
+
     def get_status(self, packet_id: str) -> EngineResult:
         state = self._ensure_packet_runtime(self._load())
         packet = state.get("packets", {}).get(packet_id)
@@ -684,22 +785,28 @@ class PacketEngine:
         return EngineResult(True, "ok", {"packet_id": packet_id, "status": packet})
 
     def upstream(self, packet_id: str) -> EngineResult:
-        if packet_id not in {p.get("id") for p in self.definition.get("packets", [])}:
+        if packet_id not in self.graph.packet_by_id:
             return EngineResult(False, f"Packet {packet_id} not found", {"packet_id": packet_id})
-        return EngineResult(True, "ok", {"packet_id": packet_id, "upstream": upstream_nodes(packet_id, self.dependencies)})
+        return EngineResult(
+            True, "ok", {"packet_id": packet_id, "upstream": upstream_nodes(packet_id, self.graph)}
+        )
 
     def downstream(self, packet_id: str) -> EngineResult:
-        if packet_id not in {p.get("id") for p in self.definition.get("packets", [])}:
+        if packet_id not in self.graph.packet_by_id:
             return EngineResult(False, f"Packet {packet_id} not found", {"packet_id": packet_id})
-        return EngineResult(True, "ok", {"packet_id": packet_id, "downstream": downstream_nodes(packet_id, self.dependencies)})
+        return EngineResult(
+            True,
+            "ok",
+            {"packet_id": packet_id, "downstream": downstream_nodes(packet_id, self.graph)},
+        )
 
     def impact_analysis(self, packet_id: str) -> EngineResult:
-        if packet_id not in {p.get("id") for p in self.definition.get("packets", [])}:
+        if packet_id not in self.graph.packet_by_id:
             return EngineResult(False, f"Packet {packet_id} not found", {"packet_id": packet_id})
         return EngineResult(
             True,
             "ok",
-            {"packet_id": packet_id, "impacted": graph_impact_analysis(packet_id, self.dependencies)},
+            {"packet_id": packet_id, "impacted": graph_impact_analysis(packet_id, self.graph)},
         )
 
     def critical_path(self) -> EngineResult:
@@ -717,7 +824,7 @@ class PacketEngine:
         rationale: str,
     ) -> EngineResult:
         state = self._ensure_packet_runtime(self._load())
-        before_log = list(state.get("log", []))
+        log_prefix = self._log_prefix(state)
         ok, msg = register_policy_version(state, version_id=version_id, policy=policy, actor=actor, rationale=rationale)
         if not ok:
             return EngineResult(False, msg, {"version_id": version_id})
@@ -731,7 +838,7 @@ class PacketEngine:
             notes=rationale,
             exit_state="draft",
         )
-        ok, msg = self._save_with_log_guard(state, before_log)
+        ok, msg = self._save_with_log_guard(state, log_prefix)
         if not ok:
             return EngineResult(False, msg, {"version_id": version_id})
         return EngineResult(True, "ok", {"version_id": version_id})
@@ -744,7 +851,7 @@ class PacketEngine:
         rationale: str,
     ) -> EngineResult:
         state = self._ensure_packet_runtime(self._load())
-        before_log = list(state.get("log", []))
+        log_prefix = self._log_prefix(state)
         ok, msg = activate_policy_version(
             state,
             version_id=version_id,
@@ -764,7 +871,7 @@ class PacketEngine:
             notes=rationale,
             exit_state="active",
         )
-        ok, msg = self._save_with_log_guard(state, before_log)
+        ok, msg = self._save_with_log_guard(state, log_prefix)
         if not ok:
             return EngineResult(False, msg, {"version_id": version_id})
         return EngineResult(True, "ok", {"version_id": version_id})
@@ -778,7 +885,7 @@ class PacketEngine:
         approvals: List[str],
     ) -> EngineResult:
         state = self._ensure_packet_runtime(self._load())
-        before_log = list(state.get("log", []))
+        log_prefix = self._log_prefix(state)
         ok, msg = register_trust_model(
             state,
             version_id=version_id,
@@ -799,7 +906,7 @@ class PacketEngine:
             notes=rationale,
             exit_state="active",
         )
-        ok, msg = self._save_with_log_guard(state, before_log)
+        ok, msg = self._save_with_log_guard(state, log_prefix)
         if not ok:
             return EngineResult(False, msg, {"version_id": version_id})
         return EngineResult(True, "ok", {"version_id": version_id})
@@ -815,7 +922,7 @@ class PacketEngine:
         rationale: str,
     ) -> EngineResult:
         state = self._ensure_packet_runtime(self._load())
-        before_log = list(state.get("log", []))
+        log_prefix = self._log_prefix(state)
         ok, msg = register_prompt_version(
             state,
             prompt_id=prompt_id,
@@ -838,7 +945,7 @@ class PacketEngine:
             notes=rationale,
             exit_state="draft",
         )
-        ok, msg = self._save_with_log_guard(state, before_log)
+        ok, msg = self._save_with_log_guard(state, log_prefix)
         if not ok:
             return EngineResult(False, msg, {"prompt_id": prompt_id, "version_id": version_id})
         return EngineResult(True, "ok", {"prompt_id": prompt_id, "version_id": version_id})
@@ -852,7 +959,7 @@ class PacketEngine:
         rationale: str,
     ) -> EngineResult:
         state = self._ensure_packet_runtime(self._load())
-        before_log = list(state.get("log", []))
+        log_prefix = self._log_prefix(state)
         ok, msg = activate_prompt_version(
             state,
             prompt_id=prompt_id,
@@ -873,7 +980,7 @@ class PacketEngine:
             notes=rationale,
             exit_state="active",
         )
-        ok, msg = self._save_with_log_guard(state, before_log)
+        ok, msg = self._save_with_log_guard(state, log_prefix)
         if not ok:
             return EngineResult(False, msg, {"prompt_id": prompt_id, "version_id": version_id})
         return EngineResult(True, "ok", {"prompt_id": prompt_id, "version_id": version_id})
@@ -896,7 +1003,7 @@ class PacketEngine:
         requested_tools: List[str] | None = None,
     ) -> EngineResult:
         state = self._ensure_packet_runtime(self._load())
-        before_log = list(state.get("log", []))
+        log_prefix = self._log_prefix(state)
         ok, msg = validate_execution_guard(
             state,
             actor_id=actor.user_id,
@@ -978,7 +1085,7 @@ class PacketEngine:
             notes=msg,
             exit_state="success" if ok else "failed",
         )
-        save_ok, save_msg = self._save_with_log_guard(state, before_log)
+        save_ok, save_msg = self._save_with_log_guard(state, log_prefix)
         if not save_ok:
             return EngineResult(False, save_msg, {"task_id": task_id})
         return EngineResult(ok, msg, {"task_id": task_id, "execution": record})
@@ -995,7 +1102,7 @@ class PacketEngine:
         trust_score: float = 0.5,
     ) -> EngineResult:
         state = self._ensure_packet_runtime(self._load())
-        before_log = list(state.get("log", []))
+        log_prefix = self._log_prefix(state)
         ok, msg = register_agent_profile(
             state,
             agent_id=agent_id,
@@ -1017,7 +1124,7 @@ class PacketEngine:
             notes=f"owner={owner}",
             exit_state="active",
         )
-        save_ok, save_msg = self._save_with_log_guard(state, before_log)
+        save_ok, save_msg = self._save_with_log_guard(state, log_prefix)
         if not save_ok:
             return EngineResult(False, save_msg, {"agent_id": agent_id})
         return EngineResult(True, "ok", {"agent_id": agent_id})
@@ -1035,7 +1142,7 @@ class PacketEngine:
         actor: ActorContext,
     ) -> EngineResult:
         state = self._ensure_packet_runtime(self._load())
-        before_log = list(state.get("log", []))
+        log_prefix = self._log_prefix(state)
         ok, msg = configure_agent_budget(
             state,
             agent_id=agent_id,
@@ -1055,7 +1162,7 @@ class PacketEngine:
             notes=f"daily_cap={daily_cap},run_cap={run_cap}",
             exit_state="active",
         )
-        save_ok, save_msg = self._save_with_log_guard(state, before_log)
+        save_ok, save_msg = self._save_with_log_guard(state, log_prefix)
         if not save_ok:
             return EngineResult(False, save_msg, {"agent_id": agent_id})
         return EngineResult(True, "ok", budget_remaining(state, agent_id=agent_id))
@@ -1072,14 +1179,19 @@ class PacketEngine:
         if not token:
             return EngineResult(False, "Snapshot label is required", {"label": label})
         state = self._ensure_packet_runtime(self._load())
-        before_log = list(state.get("log", []))
+        log_prefix = self._log_prefix(state)
         snapshots = state.setdefault("snapshots", {})
         if token in snapshots:
             return EngineResult(False, f"Snapshot already exists: {token}", {"label": token})
+        # Packet records are stored out of line as content-addressed blobs;
+        # unchanged records are shared with earlier snapshots.
         snapshots[token] = {
             "label": token,
             "created_at": datetime.now().isoformat(),
-            "packets": deepcopy(state.get("packets", {})),
+            "packet_refs": {
+                pid: self.storage.put_json_blob(record)
+                for pid, record in sorted(state.get("packets", {}).items())
+            },
         }
         snap_actor = actor or ActorContext(user_id="system", role="system", source="engine")
         self._log_with_state(
@@ -1092,7 +1204,7 @@ class PacketEngine:
             notes=f"Snapshot {token} created",
             exit_state="n/a",
         )
-        ok, msg = self._save_with_log_guard(state, before_log)
+        ok, msg = self._save_with_log_guard(state, log_prefix)
         if not ok:
             return EngineResult(False, msg, {"label": token})
         return EngineResult(True, "ok", {"label": token, "snapshot": snapshots[token]})
@@ -1107,15 +1219,27 @@ class PacketEngine:
         if not b:
             return EngineResult(False, f"Snapshot not found: {snapshot_b}", {"snapshot": snapshot_b})
 
-        a_packets = a.get("packets", {})
-        b_packets = b.get("packets", {})
-        packet_ids = sorted(set(a_packets.keys()) | set(b_packets.keys()))
+        a_refs = self._snapshot_refs(a)
+        b_refs = self._snapshot_refs(b)
+        packet_ids = sorted(set(a_refs.keys()) | set(b_refs.keys()))
         changes: List[Dict[str, Any]] = []
-        for pid in packet_ids:
-            left = a_packets.get(pid, {})
-            right = b_packets.get(pid, {})
-            if left != right:
-                changes.append({"packet_id": pid, "from": left, "to": right})
+        try:
+            for pid in packet_ids:
+                if a_refs.get(pid) == b_refs.get(pid):
+                    continue
+                changes.append(
+                    {
+                        "packet_id": pid,
+                        "from": self._snapshot_record(a, pid, a_refs.get(pid)),
+                        "to": self._snapshot_record(b, pid, b_refs.get(pid)),
+                    }
+                )
+        except KeyError as exc:
+            return EngineResult(
+                False,
+                f"Snapshot blob missing: {exc.args[0]}",
+                {"snapshot_a": snapshot_a, "snapshot_b": snapshot_b},
+            )
         return EngineResult(
             True,
             "ok",
@@ -1127,21 +1251,74 @@ class PacketEngine:
             },
         )
 
+    @staticmethod
+    def _snapshot_refs(snapshot: Dict[str, Any]) -> Dict[str, str]:
+        """Packet id -> record digest.
+
+        Legacy snapshots with inline records are hashed on the fly.
+        """
+        if "packet_refs" in snapshot:
+            return dict(snapshot["packet_refs"])
+        return {pid: json_digest(record) for pid, record in snapshot.get("packets", {}).items()}
+
+    def _snapshot_record(
+        self, snapshot: Dict[str, Any], packet_id: str, digest: str | None
+    ) -> Dict[str, Any]:
+        if digest is None:
+            return {}
+        inline = snapshot.get("packets")
+        if isinstance(inline, dict) and packet_id in inline:
+            return inline[packet_id]
+        return self.storage.get_json_blob(digest)
+
+    def as_of(
+        self,
+        timestamp: str | None = None,
+        event_id: str | None = None,
+        packet_id: str | None = None,
+    ) -> EngineResult:
+        """Packet state reconstructed from the log at `timestamp` or just after `event_id`."""
+        if not timestamp and not event_id:
+            return EngineResult(False, "as_of needs a timestamp or event_id", {})
+        target = {"timestamp": timestamp, "event_id": event_id}
+        state = self._load()
+        try:
+            replayed = ReplayEngine(self.storage, self.definition, self.replay_interval).replay(
+                state, timestamp=timestamp, event_id=event_id
+            )
+        except KeyError:
+            return EngineResult(False, f"Event not found: {event_id}", {"as_of": target})
+        except ValueError as exc:
+            return EngineResult(False, str(exc), {"as_of": target})
+        packets = replayed["packets"]
+        if packet_id:
+            if packet_id not in packets:
+                return EngineResult(False, f"Packet not found: {packet_id}", {"as_of": target})
+            packets = {packet_id: packets[packet_id]}
+        return EngineResult(True, "ok", {"as_of": target, **replayed, "packets": packets})
+
     def validate(self) -> EngineResult:
         state = self._ensure_packet_runtime(self._load())
         ok, msg = validate_state_shape(state)
         if not ok:
             return EngineResult(False, msg, {})
 
-        cycle = detect_dependency_cycle(self.dependencies)
-        if cycle:
-            return EngineResult(False, f"Dependency cycle detected: {' -> '.join(cycle)}", {"cycle": cycle})
+        cycles = [] if self.graph.acyclic else dependency_cycles(self.dependencies)
+        if cycles:
+            more = f" (+{len(cycles) - 1} more)" if len(cycles) > 1 else ""
+            return EngineResult(
+                False,
+                f"Dependency cycle detected: {' -> '.join(cycles[0])}{more}",
+                {"cycle": cycles[0], "cycles": cycles},
+            )
 
         for packet in self.definition.get("packets", []):
             packet_id = packet.get("id")
             if not packet_id:
                 continue
-            ok, msg = validate_packet_dependency_ontology(str(packet_id), self.definition, self.dependencies)
+            ok, msg = validate_packet_dependency_ontology(
+                str(packet_id), self.definition, self.dependencies, self.graph
+            )
             if not ok:
                 return EngineResult(False, msg, {"packet_id": packet_id})
 
@@ -1158,4 +1335,202 @@ class PacketEngine:
         return EngineResult(True, "ok", {})
 
 
-__all__ = ["PacketEngine"]
+class PacketTransaction:
+    """Unit of work over one loaded state (see `PacketEngine.transaction`).
+
+    Operations mutate the in-memory state immediately, so later operations
+    see earlier ones (claim then done in one batch works). Nothing is written
+    until `commit`, which does a single log-guarded save.
+    """
+
+    # Action -> name of the optional text argument of its in-state handler.
+    ACTIONS: Dict[str, str | None] = {
+        "claim": None,
+        "done": "notes",
+        "note": "message",
+        "fail": "reason",
+        "block": "reason",
+        "reset": None,
+    }
+
+    def __init__(self, engine: PacketEngine, mode: str = BATCH_ALL_OR_NOTHING):
+        if mode not in BATCH_MODES:
+            raise ValueError(
+                f"Invalid batch mode: {mode!r} (expected one of {', '.join(BATCH_MODES)})"
+            )
+        self.engine = engine
+        self.mode = mode
+        self.state = engine._ensure_packet_runtime(engine._load_for_update())
+        self.log_prefix = engine._log_prefix(self.state)
+        self.results: List[EngineResult] = []
+        self.aborted = False
+        self.committed = False
+        self.written = False
+        self.commit_message = ""
+
+    def __enter__(self) -> "PacketTransaction":
+        return self
+
+    def __exit__(self, exc_type: Any, exc: Any, tb: Any) -> bool:
+        if exc_type is None:
+            self.commit()
+        return False
+
+    def _denied(
+        self, action: str, packet_id: str, actor: ActorContext, message: str, code: str
+    ) -> EngineResult:
+        return EngineResult(
+            False,
+            message,
+            self.engine._decision_payload(
+                action=action,
+                packet_id=packet_id,
+                actor=actor,
+                ok=False,
+                constraint_result="deny",
+                reason_codes=[code],
+            ),
+        )
+
+    def apply(self, operation: Dict[str, Any], actor: ActorContext | None = None) -> EngineResult:
+        """Run one `{"action", "packet_id", ...}` operation against the loaded state."""
+        action = str(operation.get("action") or "").strip().lower()
+        packet_id = str(operation.get("packet_id") or "").strip()
+        actor = operation.get("actor") or actor
+        if not isinstance(actor, ActorContext):
+            raise ValueError(f"Batch operation {action or '?'} {packet_id} has no actor")
+        if self.committed:
+            raise RuntimeError("Transaction already committed")
+        if self.aborted:
+            result = self._denied(
+                action,
+                packet_id,
+                actor,
+                "Skipped: batch aborted by an earlier failure",
+                "BATCH_ABORTED",
+            )
+        elif action not in self.ACTIONS:
+            result = self._denied(
+                action,
+                packet_id,
+                actor,
+                f"Unsupported batch action: {action or '(missing)'}",
+                "UNSUPPORTED_ACTION",
+            )
+        else:
+            handler = getattr(self.engine, f"_{action}_in_state")
+            text_arg = self.ACTIONS[action]
+            args = [] if text_arg is None else [str(operation.get(text_arg) or "")]
+            result = handler(self.state, packet_id, actor, *args)
+        self.results.append(result)
+        if not result.ok and self.mode == BATCH_ALL_OR_NOTHING:
+            self.aborted = True
+        return result
+
+    def claim(self, packet_id: str, actor: ActorContext) -> EngineResult:
+        return self.apply({"action": "claim", "packet_id": packet_id}, actor)
+
+    def done(self, packet_id: str, actor: ActorContext, notes: str = "") -> EngineResult:
+        return self.apply({"action": "done", "packet_id": packet_id, "notes": notes}, actor)
+
+    def note(self, packet_id: str, message: str, actor: ActorContext) -> EngineResult:
+        return self.apply({"action": "note", "packet_id": packet_id, "message": message}, actor)
+
+    def fail(self, packet_id: str, actor: ActorContext, reason: str = "") -> EngineResult:
+        return self.apply({"action": "fail", "packet_id": packet_id, "reason": reason}, actor)
+
+    def block(self, packet_id: str, actor: ActorContext, reason: str = "") -> EngineResult:
+        return self.apply({"action": "block", "packet_id": packet_id, "reason": reason}, actor)
+
+    def reset(self, packet_id: str, actor: ActorContext) -> EngineResult:
+        return self.apply({"action": "reset", "packet_id": packet_id}, actor)
+
+    def rollback(self) -> None:
+        """Discard every operation; nothing is written."""
+        self.aborted = True
+        self.commit()
+
+    def commit(self) -> Tuple[bool, str]:
+        """Persist the batch with one log-guarded save (no-op when aborted or empty)."""
+        if self.committed:
+            return self.written, self.commit_message
+        self.committed = True
+        if self.aborted:
+            self.commit_message = "batch aborted; nothing written"
+            return False, self.commit_message
+        if not any(result.ok for result in self.results):
+            self.commit_message = "nothing to write"
+            return True, self.commit_message
+        ok, msg = self.engine._save_with_log_guard(self.state, self.log_prefix)
+        self.written = ok
+        self.commit_message = msg
+        return ok, msg
+
+    @property
+    def save_failed(self) -> bool:
+        return (
+            self.committed
+            and not self.aborted
+            and not self.written
+            and any(result.ok for result in self.results)
+        )
+
+    def final_results(self) -> List[EngineResult]:
+        """Per-operation results, with validated-but-unpersisted operations reported as failed."""
+        save_failed = self.save_failed
+        results: List[EngineResult] = []
+        for result in self.results:
+            if result.ok and (self.aborted or save_failed):
+                # Validated but never persisted: report it as not applied.
+                code = "BATCH_ROLLED_BACK" if self.aborted else "PERSISTENCE_ERROR"
+                message = "Rolled back: batch aborted" if self.aborted else self.commit_message
+                decision = result.payload.get("decision", {})
+                result = EngineResult(
+                    False,
+                    message,
+                    {
+                        **result.payload,
+                        "decision": {**decision, "status": "denied", "reason_codes": [code]},
+                    },
+                )
+            results.append(result)
+        return results
+
+    def outcome(self) -> EngineResult:
+        """Batch result with one entry per operation, reflecting what was persisted."""
+        results = self.final_results()
+        applied = sum(1 for result in results if result.ok)
+        failed = len(results) - applied
+        if self.aborted:
+            cause = next(
+                (result.message for result in self.results if not result.ok), "rolled back"
+            )
+            ok, message = False, f"Batch aborted, nothing applied: {cause}"
+        elif self.save_failed:
+            ok, message = False, self.commit_message
+        else:
+            ok = self.mode == BATCH_BEST_EFFORT or failed == 0
+            message = f"{applied} of {len(results)} operations applied"
+        return EngineResult(
+            ok,
+            message,
+            {
+                "mode": self.mode,
+                "written": self.written,
+                "applied": applied,
+                "failed": failed,
+                "results": [
+                    {"ok": result.ok, "message": result.message, **result.payload}
+                    for result in results
+                ],
+            },
+        )
+
+
+__all__ = [
+    "BATCH_ALL_OR_NOTHING",
+    "BATCH_BEST_EFFORT",
+    "BATCH_MODES",
+    "PacketEngine",
+    "PacketTransaction",
+]
@@ -1,10 +1,23 @@
 from __future__ import annotations
 
 from collections import deque
-from typing import Dict, Iterable, List, Set, Tuple
+from typing import Dict, Iterable, List, Union
 
+from governed_platform.governance.dependency_index import DependencyIndex, dependency_index
 from substrate_core.validation import detect_dependency_cycle
 
+Graph = Union[Dict[str, List[str]], DependencyIndex]
+
+
+def graph_index(graph: Graph) -> DependencyIndex:
+    """`graph` as a compiled index.
+
+    Plain dependency maps are indexed (and cached) by fingerprint.
+    """
+    if isinstance(graph, DependencyIndex):
+        return graph
+    return dependency_index({"dependencies": graph})
+
 
 def reverse_dependencies(dependencies: Dict[str, List[str]]) -> Dict[str, List[str]]:
     rev: Dict[str, List[str]] = {}
@@ -14,40 +27,15 @@ def reverse_dependencies(dependencies: Dict[str, List[str]]) -> Dict[str, List[s
     return rev
 
 
-def upstream_nodes(packet_id: str, dependencies: Dict[str, List[str]]) -> List[str]:
-    seen: Set[str] = set()
-    out: List[str] = []
-    queue = deque(dependencies.get(packet_id, []))
-    while queue:
-        node = queue.popleft()
-        if node in seen:
-            continue
-        seen.add(node)
-        out.append(node)
-        for nxt in dependencies.get(node, []):
-            if nxt not in seen:
-                queue.append(nxt)
-    return out
-
-
-def downstream_nodes(packet_id: str, dependencies: Dict[str, List[str]]) -> List[str]:
-    rev = reverse_dependencies(dependencies)
-    seen: Set[str] = set()
-    out: List[str] = []
-    queue = deque(rev.get(packet_id, []))
-    while queue:
-        node = queue.popleft()
-        if node in seen:
-            continue
-        seen.add(node)
-        out.append(node)
-        for nxt in rev.get(node, []):
-            if nxt not in seen:
-                queue.append(nxt)
-    return out
-
-
-def impact_analysis(packet_id: str, dependencies: Dict[str, List[str]]) -> List[str]:
+def upstream_nodes(packet_id: str, dependencies: Graph) -> List[str]:
+    return graph_index(dependencies).upstream(packet_id)
+
+
+def downstream_nodes(packet_id: str, dependencies: Graph) -> List[str]:
+    return graph_index(dependencies).downstream(packet_id)
+
+
+def impact_analysis(packet_id: str, dependencies: Graph) -> List[str]:
     return downstream_nodes(packet_id, dependencies)
 
 
@@ -121,6 +109,9 @@ def postgres_recursive_cte_queries() -> Dict[str, str]:
 
 
 __all__ = [
+    "DependencyIndex",
+    "dependency_index",
+    "graph_index",
     "reverse_dependencies",
     "upstream_nodes",
     "downstream_nodes",
@@ -0,0 +1,165 @@
+"""Group commit for concurrent lifecycle writers in one process.
+
+Threads submit single operations (`claim`, `done`, ...). The first thread to
+find the writer idle becomes the leader: it drains everything queued so far
+into one best-effort `PacketTransaction` (one state load, one log-guarded
+write) and hands each waiter its own result. Requests that arrive while a
+write is in flight queue up and are committed together by the next batch, so
+the number of full-state rewrites grows with write latency, not request
+rate.
+
+Each operation is evaluated against the state produced by the operations
+queued before it, exactly as if the requests had run one after another. An
+operation that raises fails alone: the batch is re-run from a fresh load
+without it (so any partial change it made is discarded) and its caller gets
+the exception, while the rest of the batch commits.
+"""
+
+from __future__ import annotations
+
+import threading
+from collections import deque
+from typing import Any, Callable, Deque, Dict, List, Union
+
+from substrate_core.engine import BATCH_BEST_EFFORT, DEFAULT_CONFLICT_RETRIES, PacketEngine
+from substrate_core.state import ActorContext, EngineResult
+from substrate_core.storage import StateConflictError
+
+DEFAULT_MAX_BATCH = 256
+
+
+class _Pending:
+    __slots__ = ("operation", "result", "error", "promoted", "event")
+
+    def __init__(self, operation: Dict[str, Any]):
+        self.operation = operation
+        self.result: EngineResult | None = None
+        self.error: BaseException | None = None
+        self.promoted = False
+        self.event = threading.Event()
+
+    @property
+    def finished(self) -> bool:
+        return self.result is not None or self.error is not None
+
+
+class GroupCommitWriter:
+    """Batches concurrent `submit` calls into shared state writes."""
+
+    def __init__(
+        self,
+        engine_factory: Callable[[], PacketEngine],
+        max_batch: int = DEFAULT_MAX_BATCH,
+        conflict_retries: int = DEFAULT_CONFLICT_RETRIES,
+    ):
+        self.engine_factory = engine_factory
+        self.max_batch = max(int(max_batch), 1)
+        self.conflict_retries = max(int(conflict_retries), 0)
+        self._queue: Deque[_Pending] = deque()
+        self._lock = threading.Lock()
+        self._flushing = False
+        self.batches = 0
+        self.operations = 0
+
+    def submit(self, operation: Dict[str, Any], actor: ActorContext) -> EngineResult:
+        """Queue one `{"action", "packet_id", ...}` operation and wait for its committed result."""
+        pending = _Pending({**operation, "actor": operation.get("actor") or actor})
+        with self._lock:
+            self._queue.append(pending)
+            lead = not self._flushing
+            self._flushing = True
+        if lead:
+            self._drain(pending)
+        while True:
+            pending.event.wait()
+            if pending.finished:
+                break
+            # Promoted by the previous leader: commit the queue (ours first).
+            pending.event.clear()
+            self._drain(pending)
+        if pending.error is not None:
+            raise pending.error
+        assert pending.result is not None
+        return pending.result
+
+    def _drain(self, own: _Pending) -> None:
+        """Commit batches until `own` is done, then hand leadership to the next waiter."""
+        while not own.finished:
+            with self._lock:
+                batch = [
+                    self._queue.popleft() for _ in range(min(len(self._queue), self.max_batch))
+                ]
+            try:
+                results = self._commit([item.operation for item in batch])
+            except Exception as exc:
+                for item in batch:
+                    item.error = exc
+                    item.event.set()
+                continue
+            for item, result in zip(batch, results):
+                if isinstance(result, BaseException):
+                    item.error = result
+                else:
+                    item.result = result
+                item.event.set()
+        with self._lock:
+            if not self._queue:
+                self._flushing = False
+                return
+            successor = self._queue[0]
+        successor.promoted = True
+        successor.event.set()
+
+    def _commit(self, operations: List[Dict[str, Any]]) -> List[Union[EngineResult, Exception]]:
+        """Per-operation results; an operation that raised gets its exception instead."""
+        errors: Dict[int, Exception] = {}
+        conflict: StateConflictError | None = None
+        attempts = 0
+        while attempts <= self.conflict_retries:
+            engine = self.engine_factory()
+            txn = engine.transaction(BATCH_BEST_EFFORT)
+            raised = False
+            for idx, operation in enumerate(operations):
+                if idx in errors:
+                    continue
+                try:
+                    txn.apply(operation)
+                except Exception as exc:
+                    errors[idx] = exc
+                    raised = True
+                    break
+            if raised:
+                # Nothing was written; re-run the others from a fresh load so
+                # no partial change of the raising operation survives.
+                continue
+            try:
+                txn.commit()
+            except StateConflictError as exc:
+                conflict = exc
+                attempts += 1
+                continue
+            self.batches += 1
+            self.operations += len(operations) - len(errors)
+            committed = iter(txn.final_results())
+            return [
+                errors[idx] if idx in errors else next(committed) for idx in range(len(operations))
+            ]
+        return [
+            errors.get(idx)
+            or EngineResult(
+                False,
+                f"{conflict}; gave up after {self.conflict_retries + 1} attempts",
+                engine._decision_payload(
+                    action=str(operation.get("action") or ""),
+                    packet_id=str(operation.get("packet_id") or ""),
+                    actor=operation["actor"],
+                    ok=False,
+                    constraint_result="deny",
+                    reason_codes=["STATE_CONFLICT"],
+                ),
+            )
+            for idx, operation in enumerate(operations)
+        ]
+
+
+__all__ = ["DEFAULT_MAX_BATCH", "GroupCommitWriter"]
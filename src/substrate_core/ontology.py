@@ -2,6 +2,8 @@ from __future__ import annotations
 
 from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
 
+from governed_platform.governance.dependency_index import DependencyIndex
+
 
 BUILTIN_ENTITY_TYPES: Set[str] = {
     "Packet",
@@ -51,8 +53,14 @@ def validate_packet_dependency_ontology(
     packet_id: str,
     definition: Dict[str, Any],
     dependencies: Dict[str, List[str]],
+    index: Optional[DependencyIndex] = None,
 ) -> Tuple[bool, str]:
-    packets = {str(p.get("id") or ""): p for p in definition.get("packets", []) if isinstance(p, dict)}
+    if index is not None:
+        packets = index.packet_by_id
+    else:
+        packets = {
+            str(p.get("id") or ""): p for p in definition.get("packets", []) if isinstance(p, dict)
+        }
     source = packets.get(packet_id)
     if not source:
         return False, f"Packet {packet_id} not found in definition"
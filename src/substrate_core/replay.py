@@ -0,0 +1,298 @@
+"""Event-sourced packet state rebuilt from the lifecycle log.
+
+`fold_entry` applies one lifecycle event (`started`, `completed`, `failed`,
+`blocked`, `reset`, `noted`, `handover`, `resumed`) to a packet map; when an
+entry carries an `exit_state` that is a runtime status, that status wins.
+Replaying the whole log from all-pending packets reconstructs packet status,
+owner, timestamps and notes at any point in history.
+
+Every `interval` events a checkpoint (packet map as a content-addressed blob
+plus the log position, timestamp and digest of the last folded entry) is
+recorded under `replay_checkpoints` in state. `as_of` starts from the nearest
+checkpoint at or before the target, so a historical query costs the distance
+from that checkpoint rather than the length of the log. A checkpoint is
+dropped, with every later one, once the entry it was taken after no longer
+matches its digest (truncated or rewritten history; deeper rewrites are
+`verify-log`'s job, as for the append-only guard).
+"""
+
+from __future__ import annotations
+
+from copy import deepcopy
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from governed_platform.governance.log_archive import (
+    archived_count,
+    find_archived_event,
+    iter_archived_entries,
+)
+from substrate_core.audit import entry_digest
+from substrate_core.storage import StateConflictError, StorageInterface
+
+REPLAY_CHECKPOINT_KEY = "replay_checkpoints"
+DEFAULT_CHECKPOINT_INTERVAL = 500
+
+_RUNTIME_STATUSES = {"pending", "in_progress", "done", "failed", "blocked"}
+
+
+def _blank_packet() -> Dict[str, Any]:
+    return {
+        "status": "pending",
+        "assigned_to": None,
+        "started_at": None,
+        "completed_at": None,
+        "notes": None,
+    }
+
+
+def initial_packets(definition: Dict[str, Any]) -> Dict[str, Dict[str, Any]]:
+    """All definition packets as pending, the state before the first event."""
+    return {
+        packet["id"]: _blank_packet()
+        for packet in definition.get("packets", [])
+        if packet.get("id")
+    }
+
+
+def fold_entry(packets: Dict[str, Dict[str, Any]], entry: Dict[str, Any]) -> bool:
+    """Apply one log entry to `packets` in place; False if it is not a packet transition."""
+    if not isinstance(entry, dict):
+        return False
+    event = str(entry.get("event") or "")
+    packet_id = str(entry.get("packet_id") or "")
+    if not packet_id or event not in _FOLDS:
+        return False
+    pkt = packets.setdefault(packet_id, _blank_packet())
+    _FOLDS[event](pkt, entry)
+    exit_state = str(entry.get("exit_state") or "").strip().lower()
+    if exit_state in _RUNTIME_STATUSES:
+        pkt["status"] = exit_state
+    return True
+
+
+def _started(pkt: Dict[str, Any], entry: Dict[str, Any]) -> None:
+    pkt["status"] = "in_progress"
+    pkt["assigned_to"] = entry.get("agent")
+    pkt["started_at"] = entry.get("timestamp")
+
+
+def _finished(status: str):
+    def fold(pkt: Dict[str, Any], entry: Dict[str, Any]) -> None:
+        pkt["status"] = status
+        pkt["completed_at"] = entry.get("timestamp")
+        pkt["notes"] = entry.get("notes")
+
+    return fold
+
+
+def _blocked(pkt: Dict[str, Any], entry: Dict[str, Any]) -> None:
+    pkt["status"] = "blocked"
+    if entry.get("action") == "block":
+        # An explicit block records its reason; cascaded blocks leave notes alone.
+        pkt["notes"] = entry.get("notes")
+
+
+def _reset(pkt: Dict[str, Any], entry: Dict[str, Any]) -> None:
+    pkt["status"] = "pending"
+    pkt["assigned_to"] = None
+    pkt["started_at"] = None
+
+
+def _noted(pkt: Dict[str, Any], entry: Dict[str, Any]) -> None:
+    pkt["notes"] = entry.get("notes")
+
+
+def _handover(pkt: Dict[str, Any], entry: Dict[str, Any]) -> None:
+    pkt["assigned_to"] = None
+
+
+def _resumed(pkt: Dict[str, Any], entry: Dict[str, Any]) -> None:
+    pkt["assigned_to"] = entry.get("agent")
+    pkt["started_at"] = pkt.get("started_at") or entry.get("timestamp")
+
+
+_FOLDS = {
+    "started": _started,
+    "completed": _finished("done"),
+    "failed": _finished("failed"),
+    "blocked": _blocked,
+    "reset": _reset,
+    "noted": _noted,
+    "handover": _handover,
+    "resumed": _resumed,
+}
+
+
+def parse_instant(value: Any) -> Optional[datetime]:
+    """ISO timestamp as naive local time, so naive and UTC-stamped entries compare."""
+    try:
+        parsed = datetime.fromisoformat(str(value).strip())
+    except (TypeError, ValueError):
+        return None
+    if parsed.tzinfo is not None:
+        parsed = parsed.astimezone().replace(tzinfo=None)
+    return parsed
+
+
+class ReplayEngine:
+    """Folds the lifecycle log into packet state, reusing stored checkpoints."""
+
+    def __init__(
+        self,
+        storage: StorageInterface,
+        definition: Dict[str, Any],
+        interval: int = DEFAULT_CHECKPOINT_INTERVAL,
+    ):
+        self.storage = storage
+        self.definition = definition
+        self.interval = max(int(interval), 1)
+
+    @property
+    def _state_path(self) -> Optional[Path]:
+        return getattr(self.storage, "state_path", None)
+
+    def _iter_entries(
+        self, state: Dict[str, Any], start: int
+    ) -> Iterator[Tuple[int, Dict[str, Any]]]:
+        """Yield `(position, entry)` from log position `start`, archived entries included."""
+        offset = archived_count(state)
+        if start < offset:
+            if self._state_path is None:
+                raise ValueError("Archived log history is not readable from this storage backend")
+            yield from iter_archived_entries(self._state_path, state, start=start)
+        for idx, entry in enumerate(state.get("log", [])[max(start - offset, 0) :]):
+            yield max(start, offset) + idx, entry
+
+    def checkpoints(self, state: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """Stored checkpoints that still match the log, oldest first.
+
+        Checkpoints inside the archive are trusted (sealed segments are
+        digest-checked by `verify-log --full`); later ones must match the
+        digest of the in-state entry they were taken after.
+        """
+        offset = archived_count(state)
+        entries = state.get("log", [])
+        valid = []
+        for record in sorted(
+            state.get(REPLAY_CHECKPOINT_KEY) or [], key=lambda r: int(r.get("position") or 0)
+        ):
+            position = int(record.get("position") or 0)
+            if position <= 0 or position > offset + len(entries):
+                break
+            if position > offset:
+                entry = entries[position - offset - 1]
+                if entry_digest(entry) != record.get("digest"):
+                    break  # history changed at or before this checkpoint
+            valid.append(record)
+        return valid
+
+    def _locate_event(self, state: Dict[str, Any], event_id: str) -> int:
+        offset = archived_count(state)
+        entries = state.get("log", [])
+        for idx in range(len(entries) - 1, -1, -1):
+            entry = entries[idx]
+            if isinstance(entry, dict) and entry.get("event_id") == event_id:
+                return offset + idx
+        if offset and self._state_path is not None:
+            return find_archived_event(self._state_path, state, event_id)[0]
+        raise KeyError(event_id)
+
+    def replay(
+        self,
+        state: Dict[str, Any],
+        timestamp: Optional[str] = None,
+        event_id: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        """Packet state after the target event (inclusive) or at `timestamp`.
+
+        Raises KeyError for an unknown event id and ValueError for an
+        unparseable timestamp.
+        """
+        end: Optional[int] = None
+        cutoff: Optional[datetime] = None
+        if event_id:
+            end = self._locate_event(state, event_id) + 1
+        elif timestamp:
+            cutoff = parse_instant(timestamp)
+            if cutoff is None:
+                raise ValueError(f"Invalid timestamp: {timestamp!r}")
+
+        checkpoints = self.checkpoints(state)
+        base: Optional[Dict[str, Any]] = None
+        for record in checkpoints:
+            if end is not None and int(record["position"]) > end:
+                break
+            if (
+                cutoff is not None
+                and (parse_instant(record.get("timestamp")) or datetime.max) > cutoff
+            ):
+                break
+            base = record
+        if base is not None:
+            packets = deepcopy(self.storage.get_json_blob(base["ref"]))
+            position = int(base["position"])
+        else:
+            packets = initial_packets(self.definition)
+            position = 0
+
+        start = position
+        last: Optional[Dict[str, Any]] = None
+        new_checkpoints: List[Dict[str, Any]] = []
+        known = {int(record["position"]) for record in checkpoints}
+        for pos, entry in self._iter_entries(state, position):
+            if end is not None and pos >= end:
+                break
+            if cutoff is not None:
+                stamp = parse_instant(entry.get("timestamp")) if isinstance(entry, dict) else None
+                if stamp is not None and stamp > cutoff:
+                    break
+            fold_entry(packets, entry)
+            position, last = pos + 1, entry
+            if position % self.interval == 0 and position not in known:
+                new_checkpoints.append(
+                    {
+                        "position": position,
+                        "timestamp": entry.get("timestamp") if isinstance(entry, dict) else None,
+                        "event_id": entry.get("event_id") if isinstance(entry, dict) else None,
+                        "digest": entry_digest(entry),
+                        "ref": self.storage.put_json_blob(packets),
+                    }
+                )
+        if new_checkpoints:
+            self._record_checkpoints(new_checkpoints)
+
+        if last is None and base is not None:
+            last = {"timestamp": base.get("timestamp"), "event_id": base.get("event_id")}
+        return {
+            "position": position,
+            "timestamp": (last or {}).get("timestamp"),
+            "event_id": (last or {}).get("event_id"),
+            "checkpoint": int(base["position"]) if base else None,
+            "replayed": position - start,
+            "packets": packets,
+        }
+
+    def _record_checkpoints(self, records: List[Dict[str, Any]]) -> None:
+        # Best effort: checkpoints only speed up later queries, so a concurrent
+        # writer winning the race simply means they are recorded next time.
+        state = self.storage.read_state()
+        kept = {int(r["position"]): r for r in self.checkpoints(state)}
+        for record in records:
+            kept[record["position"]] = record
+        state[REPLAY_CHECKPOINT_KEY] = [kept[pos] for pos in sorted(kept)]
+        try:
+            self.storage.write_state(state)
+        except StateConflictError:
+            pass
+
+
+__all__ = [
+    "REPLAY_CHECKPOINT_KEY",
+    "DEFAULT_CHECKPOINT_INTERVAL",
+    "initial_packets",
+    "fold_entry",
+    "parse_instant",
+    "ReplayEngine",
+]
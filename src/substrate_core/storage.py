@@ -1,21 +1,66 @@
 from __future__ import annotations
 
 import json
+import os
+import sqlite3
 from abc import ABC, abstractmethod
+from contextlib import contextmanager
 from copy import deepcopy
 from datetime import datetime
 from pathlib import Path
-from typing import Any, Dict, List
+from typing import Any, Dict, Iterator, List, Optional
 
-from governed_platform.governance.file_lock import atomic_write_json
-from governed_platform.governance.log_integrity import normalize_log_mode
-from governed_platform.governance.status import normalize_packet_status_map
+from governed_platform.governance.blob_store import (
+    BlobStore,
+    blob_digest,
+    blob_root_for,
+    encode_json_blob,
+)
+from governed_platform.governance.log_integrity import log_tail_current
+from governed_platform.governance.log_segments import LOG_OFFSET_KEY, log_offset
+from governed_platform.governance.ready_queue import READY_QUEUE_KEY, stamp_ready_queue
+from governed_platform.governance.state_store import (
+    NORMALIZED_SCHEMA_KEY,
+    NORMALIZED_SCHEMA_REVISION,
+    StateConflictError,
+    is_normalized,
+    normalize_state_document,
+    read_state_document,
+    state_revision,
+    write_state_document,
+)
+from governed_platform.governance.text_blobs import externalize_payloads, resolve_payloads
 
 STATE_VERSION = "1.0"
 
+STORAGE_BACKEND_JSON = "json"
+STORAGE_BACKEND_SQLITE = "sqlite"
+STORAGE_BACKENDS = (STORAGE_BACKEND_JSON, STORAGE_BACKEND_SQLITE)
+STORAGE_BACKEND_ENV = "WBS_STORAGE_BACKEND"
+DEFAULT_SQLITE_FILENAME = "wbs-state.sqlite"
+
+
+def _default_state() -> Dict[str, Any]:
+    now = datetime.now().isoformat()
+    return {
+        "version": STATE_VERSION,
+        "created_at": now,
+        "updated_at": now,
+        "packets": {},
+        "log": [],
+        "area_closeouts": {},
+        "log_integrity_mode": "plain",
+        "revision": 0,
+    }
+
 
 class StorageInterface(ABC):
-    """Storage boundary for packet runtime state and mutation log persistence."""
+    """Storage boundary for packet runtime state and mutation log persistence.
+
+    Implementations that support optimistic concurrency stamp a monotonically
+    increasing `revision` on the state they return and raise
+    `StateConflictError` from `write_state` when it no longer matches.
+    """
 
     @abstractmethod
     def read_state(self) -> Dict[str, Any]:
@@ -25,53 +70,463 @@ class StorageInterface(ABC):
     def write_state(self, state: Dict[str, Any]) -> None:
         raise NotImplementedError
 
+    def read_state_for_update(self) -> Dict[str, Any]:
+        """State for a load-modify-write cycle.
+
+        Backends may leave out the older log entries such a cycle never
+        touches; `log_segments.log_offset(state)` is then the position of
+        `state["log"][0]` and `write_state` keeps the rest as stored. The
+        default loads everything.
+        """
+        return self.read_state()
+
     @abstractmethod
     def append_audit(self, entry: Dict[str, Any]) -> Dict[str, Any]:
         raise NotImplementedError
 
+    # Content-addressed blobs (snapshot records, large notes). Not abstract:
+    # the default keeps blobs in process memory; persistent backends override.
+    def put_blob(self, data: bytes) -> str:
+        digest = blob_digest(data)
+        self.__dict__.setdefault("_memory_blobs", {})[digest] = bytes(data)
+        return digest
+
+    def get_blob(self, digest: str) -> bytes:
+        try:
+            return self.__dict__.get("_memory_blobs", {})[digest]
+        except KeyError:
+            raise KeyError(digest) from None
+
+    def has_blob(self, digest: str) -> bool:
+        return digest in self.__dict__.get("_memory_blobs", {})
+
+    def put_json_blob(self, value: Any) -> str:
+        return self.put_blob(encode_json_blob(value))
+
+    def get_json_blob(self, digest: str) -> Any:
+        return json.loads(self.get_blob(digest))
+
 
 class FileStorage(StorageInterface):
     """State/audit adapter backed by `.governance/wbs-state.json`."""
 
     def __init__(self, state_path: Path):
         self.state_path = Path(state_path)
+        self.blobs = BlobStore(blob_root_for(self.state_path))
 
     def default_state(self) -> Dict[str, Any]:
-        now = datetime.now().isoformat()
-        return {
-            "version": STATE_VERSION,
-            "created_at": now,
-            "updated_at": now,
-            "packets": {},
-            "log": [],
-            "area_closeouts": {},
-            "log_integrity_mode": "plain",
-        }
+        return _default_state()
+
+    def exists(self) -> bool:
+        return self.state_path.exists()
 
     def read_state(self) -> Dict[str, Any]:
         if not self.state_path.exists():
             return self.default_state()
-        with open(self.state_path, encoding="utf-8") as f:
-            state = json.load(f)
-        state.setdefault("packets", {})
-        state.setdefault("log", [])
-        state.setdefault("area_closeouts", {})
-        state.setdefault("log_integrity_mode", "plain")
-        state["log_integrity_mode"] = normalize_log_mode(state.get("log_integrity_mode"))
-        return normalize_packet_status_map(state)
+        # Normalized on write; read_state_document only re-normalizes documents
+        # that were not written (or were edited since) by write_state_document.
+        state = read_state_document(self.state_path)
+        state.setdefault("revision", 0)
+        return state
+
+    def read_state_for_update(self) -> Dict[str, Any]:
+        if not self.state_path.exists():
+            return self.default_state()
+        state = read_state_document(self.state_path, full_log=False)
+        state.setdefault("revision", 0)
+        return state
 
     def write_state(self, state: Dict[str, Any]) -> None:
-        payload = deepcopy(state)
+        # Shallow copy: the writer only replaces top-level keys, and copying the
+        # full log here would make every save O(history).
+        payload = dict(state)
         payload["version"] = payload.get("version", STATE_VERSION)
         payload["updated_at"] = datetime.now().isoformat()
-        atomic_write_json(self.state_path, payload)
+        expected = state_revision(state) if "revision" in state else None
+        write_state_document(self.state_path, payload, expected_revision=expected)
+        state["revision"] = payload["revision"]
 
     def append_audit(self, entry: Dict[str, Any]) -> Dict[str, Any]:
-        state = self.read_state()
+        state = self.read_state_for_update()
         audit = state.setdefault("log", [])
         audit.append(deepcopy(entry))
         self.write_state(state)
         return entry
 
+    def put_blob(self, data: bytes) -> str:
+        return self.blobs.put(data)
+
+    def get_blob(self, digest: str) -> bytes:
+        return self.blobs.get(digest)
+
+    def has_blob(self, digest: str) -> bool:
+        return self.blobs.has(digest)
+
+
+def _encode(value: Any) -> str:
+    return json.dumps(value, sort_keys=True, separators=(",", ":"))
+
+
+class SqliteStorage(StorageInterface):
+    """State/audit adapter backed by SQLite in WAL mode.
+
+    Packet runtime records are stored one row per packet and the mutation log
+    as an append-only table, so a transition only touches the rows it changed
+    instead of rewriting the whole state document.
+    """
+
+    # Log entries older than this window are never re-compared on write; only
+    # the recent tail may be annotated in place (for example git linkage).
+    LOG_TAIL_WINDOW = 64
+
+    def __init__(self, db_path: Path, timeout: float = 10.0):
+        self.db_path = Path(db_path)
+        self.timeout = timeout
+        self._rows_revision: Any = None
+        self._meta_rows: Optional[Dict[str, str]] = None
+        self._packet_rows: Optional[Dict[str, str]] = None
+        self._packet_records: Optional[Dict[str, Any]] = None
+
+    @contextmanager
+    def connection(self) -> Iterator[sqlite3.Connection]:
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        conn = sqlite3.connect(str(self.db_path), timeout=self.timeout, isolation_level=None)
+        conn.row_factory = sqlite3.Row
+        try:
+            conn.execute("PRAGMA journal_mode = WAL")
+            conn.execute("PRAGMA synchronous = NORMAL")
+            self._ensure_schema(conn)
+            yield conn
+        finally:
+            conn.close()
+
+    def _ensure_schema(self, conn: sqlite3.Connection) -> None:
+        conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS state_meta (
+              key TEXT PRIMARY KEY,
+              value TEXT NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS packet_runtime (
+              packet_id TEXT PRIMARY KEY,
+              record TEXT NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS mutation_log (
+              seq INTEGER PRIMARY KEY,
+              packet_id TEXT,
+              entry TEXT NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS idx_mutation_log_packet ON mutation_log(packet_id, seq);
+            CREATE TABLE IF NOT EXISTS blobs (
+              digest TEXT PRIMARY KEY,
+              body BLOB NOT NULL
+            );
+            """
+        )
+
+    def exists(self) -> bool:
+        if not self.db_path.exists():
+            return False
+        with self.connection() as conn:
+            return conn.execute("SELECT 1 FROM state_meta LIMIT 1").fetchone() is not None
+
+    def default_state(self) -> Dict[str, Any]:
+        return _default_state()
+
+    def _read(self, tail: Optional[int]) -> Dict[str, Any]:
+        with self.connection() as conn:
+            conn.execute("BEGIN")
+            meta_rows = {
+                row["key"]: row["value"]
+                for row in conn.execute("SELECT key, value FROM state_meta")
+            }
+            packet_rows = {
+                row["packet_id"]: row["record"]
+                for row in conn.execute("SELECT packet_id, record FROM packet_runtime")
+            }
+            state = {key: json.loads(value) for key, value in meta_rows.items()}
+            offset = 0
+            if tail is not None:
+                total = conn.execute(
+                    "SELECT COALESCE(MAX(seq), 0) AS n FROM mutation_log"
+                ).fetchone()["n"]
+                offset = max(0, total - tail)
+            state["log"] = [
+                json.loads(row["entry"])
+                for row in conn.execute(
+                    "SELECT entry FROM mutation_log WHERE seq > ? ORDER BY seq", (offset,)
+                )
+            ]
+            if offset:
+                state[LOG_OFFSET_KEY] = offset
+                if not log_tail_current(state):
+                    # The cached digest or chain head cannot be extended from the
+                    # tail; load the whole log.
+                    state.pop(LOG_OFFSET_KEY)
+                    state["log"] = [
+                        json.loads(row["entry"])
+                        for row in conn.execute("SELECT entry FROM mutation_log ORDER BY seq")
+                    ]
+            conn.execute("COMMIT")
+        if not meta_rows:
+            return self.default_state()
+        self._remember_rows(state.get("revision", 0), meta_rows, packet_rows)
+        state.setdefault("revision", 0)
+        state["packets"] = {pid: json.loads(record) for pid, record in packet_rows.items()}
+        resolve_payloads(state, self.get_blob)
+        if not is_normalized(state):
+            normalize_state_document(state)
+        return state
+
+    def read_state(self) -> Dict[str, Any]:
+        return self._read(tail=None)
+
+    def read_state_for_update(self) -> Dict[str, Any]:
+        """Metadata, packet rows and only the newest `LOG_TAIL_WINDOW` log entries."""
+        return self._read(tail=self.LOG_TAIL_WINDOW)
+
+    def _remember_rows(
+        self, revision: Any, meta_rows: Dict[str, str], packet_rows: Dict[str, str]
+    ) -> None:
+        # Encoded rows as last read/written. Their decoded copies, used to find
+        # unchanged packets by comparison instead of re-encoding, are only
+        # built by the next write (`_pristine_packets`), so a read decodes once.
+        self._rows_revision = revision
+        self._meta_rows = meta_rows
+        self._packet_rows = packet_rows
+        self._packet_records = None
+
+    def _pristine_packets(self) -> Dict[str, Any]:
+        if self._packet_records is None:
+            self._packet_records = {
+                pid: json.loads(record) for pid, record in (self._packet_rows or {}).items()
+            }
+        return self._packet_records
+
+    def _encode_packets(
+        self, state: Dict[str, Any], stored: Dict[str, Any], reuse: bool
+    ) -> Dict[str, str]:
+        known = self._packet_rows if reuse else None
+        pristine = self._pristine_packets() if reuse else None
+        live = state.get("packets") or {}
+        rows = {}
+        for pid, record in (stored.get("packets") or {}).items():
+            if known is not None and pid in known and live.get(pid) == pristine.get(pid):
+                rows[pid] = known[pid]
+            else:
+                rows[pid] = _encode(record)
+        return rows
+
+    def write_state(self, state: Dict[str, Any]) -> None:
+        normalize_state_document(state)
+        state[NORMALIZED_SCHEMA_KEY] = {"revision": NORMALIZED_SCHEMA_REVISION}
+        stored = externalize_payloads(state, self.put_blob)
+        meta = {k: v for k, v in stored.items() if k not in {"packets", "log", LOG_OFFSET_KEY}}
+        meta["version"] = meta.get("version", STATE_VERSION)
+        meta["updated_at"] = datetime.now().isoformat()
+        entries = stored.get("log") or []
+
+        with self.connection() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                row = conn.execute("SELECT value FROM state_meta WHERE key = 'revision'").fetchone()
+                on_disk = int(json.loads(row["value"])) if row else 0
+                if "revision" in state and on_disk != state_revision(state):
+                    raise StateConflictError(state_revision(state), on_disk)
+                meta["revision"] = max(on_disk, state_revision(state)) + 1
+                if not stamp_ready_queue(state, meta["revision"]):
+                    meta.pop(READY_QUEUE_KEY, None)
+                meta_rows = {key: _encode(value) for key, value in meta.items()}
+                # Cached rows are only trusted if nobody wrote since they were read.
+                cached = self._packet_rows is not None and self._rows_revision == on_disk
+                if cached:
+                    known_meta, known_packets = self._meta_rows, self._packet_rows
+                else:
+                    known_meta = {
+                        row["key"]: row["value"]
+                        for row in conn.execute("SELECT key, value FROM state_meta")
+                    }
+                    known_packets = {
+                        row["packet_id"]: row["record"]
+                        for row in conn.execute("SELECT packet_id, record FROM packet_runtime")
+                    }
+                packet_rows = self._encode_packets(state, stored, reuse=cached)
+                self._sync_rows(conn, "state_meta", "key", "value", known_meta, meta_rows)
+                self._sync_rows(
+                    conn, "packet_runtime", "packet_id", "record", known_packets, packet_rows
+                )
+                self._sync_log(conn, entries, log_offset(state))
+                conn.execute("COMMIT")
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+        self._remember_rows(meta["revision"], meta_rows, packet_rows)
+        state["revision"] = meta["revision"]
+
+    @staticmethod
+    def _sync_rows(
+        conn: sqlite3.Connection,
+        table: str,
+        key_col: str,
+        value_col: str,
+        known: Dict[str, str],
+        wanted: Dict[str, str],
+    ) -> None:
+        changed = [(key, value) for key, value in wanted.items() if known.get(key) != value]
+        removed = [(key,) for key in known if key not in wanted]
+        if changed:
+            conn.executemany(
+                f"INSERT INTO {table}({key_col}, {value_col}) VALUES (?, ?) "
+                f"ON CONFLICT({key_col}) DO UPDATE SET {value_col} = excluded.{value_col}",
+                changed,
+            )
+        if removed:
+            conn.executemany(f"DELETE FROM {table} WHERE {key_col} = ?", removed)
+
+    def _sync_log(
+        self, conn: sqlite3.Connection, entries: List[Dict[str, Any]], offset: int = 0
+    ) -> None:
+        """Persist `entries`, which start at log position `offset` (see `read_state_for_update`)."""
+        total = offset + len(entries)
+        stored = conn.execute("SELECT COALESCE(MAX(seq), 0) AS n FROM mutation_log").fetchone()["n"]
+        if stored > total:
+            # History was rewritten (for example a rollback); drop the surplus tail.
+            conn.execute("DELETE FROM mutation_log WHERE seq > ?", (total,))
+            stored = total
+        if stored < offset:
+            raise ValueError(
+                f"Mutation log holds {stored} entries; the loaded tail starts at {offset}"
+            )
+        window_start = max(offset, stored - self.LOG_TAIL_WINDOW)
+        on_disk = {
+            row["seq"]: row["entry"]
+            for row in conn.execute(
+                "SELECT seq, entry FROM mutation_log WHERE seq > ?", (window_start,)
+            )
+        }
+        updates = []
+        for seq in range(window_start + 1, stored + 1):
+            encoded = _encode(entries[seq - 1 - offset])
+            if on_disk.get(seq) != encoded:
+                updates.append((encoded, seq))
+        if updates:
+            conn.executemany("UPDATE mutation_log SET entry = ? WHERE seq = ?", updates)
+        conn.executemany(
+            "INSERT INTO mutation_log(seq, packet_id, entry) VALUES (?, ?, ?)",
+            [
+                (
+                    seq,
+                    str(entries[seq - 1 - offset].get("packet_id") or ""),
+                    _encode(entries[seq - 1 - offset]),
+                )
+                for seq in range(stored + 1, total + 1)
+            ],
+        )
+
+    def append_audit(self, entry: Dict[str, Any]) -> Dict[str, Any]:
+        with self.connection() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                stored = conn.execute(
+                    "SELECT COALESCE(MAX(seq), 0) AS n FROM mutation_log"
+                ).fetchone()["n"]
+                conn.execute(
+                    "INSERT INTO mutation_log(seq, packet_id, entry) VALUES (?, ?, ?)",
+                    (stored + 1, str(entry.get("packet_id") or ""), _encode(entry)),
+                )
+                # Bump the revision so a writer that loaded the log before this
+                # append fails its compare-and-swap instead of dropping the row.
+                row = conn.execute("SELECT value FROM state_meta WHERE key = 'revision'").fetchone()
+                revision = (int(json.loads(row["value"])) if row else 0) + 1
+                conn.execute(
+                    "INSERT INTO state_meta(key, value) VALUES ('revision', ?) "
+                    "ON CONFLICT(key) DO UPDATE SET value = excluded.value",
+                    (_encode(revision),),
+                )
+                conn.execute("COMMIT")
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+        return entry
+
+    def put_blob(self, data: bytes) -> str:
+        digest = blob_digest(data)
+        with self.connection() as conn:
+            conn.execute(
+                "INSERT OR IGNORE INTO blobs(digest, body) VALUES (?, ?)", (digest, bytes(data))
+            )
+        return digest
+
+    def get_blob(self, digest: str) -> bytes:
+        with self.connection() as conn:
+            row = conn.execute("SELECT body FROM blobs WHERE digest = ?", (digest,)).fetchone()
+        if row is None:
+            raise KeyError(digest)
+        return bytes(row["body"])
+
+    def has_blob(self, digest: str) -> bool:
+        with self.connection() as conn:
+            return (
+                conn.execute("SELECT 1 FROM blobs WHERE digest = ?", (digest,)).fetchone()
+                is not None
+            )
+
+
+def normalize_storage_backend(value: Any, strict: bool = False) -> str:
+    """Normalize storage backend names."""
+    raw = str(value or STORAGE_BACKEND_JSON).strip().lower()
+    if raw in STORAGE_BACKENDS:
+        return raw
+    if strict:
+        raise ValueError(f"Invalid storage backend: {value}")
+    return STORAGE_BACKEND_JSON
+
+
+def default_storage_config() -> Dict[str, Any]:
+    return {"backend": STORAGE_BACKEND_JSON, "sqlite_path": DEFAULT_SQLITE_FILENAME}
+
+
+def load_storage_config(path: Path) -> Dict[str, Any]:
+    """Load storage backend config; `WBS_STORAGE_BACKEND` overrides the file."""
+    out = default_storage_config()
+    target = Path(path)
+    if target.exists():
+        raw = json.loads(target.read_text())
+        if isinstance(raw, dict):
+            out.update(raw)
+    env_backend = os.environ.get(STORAGE_BACKEND_ENV, "").strip()
+    if env_backend:
+        out["backend"] = env_backend
+    out["backend"] = normalize_storage_backend(out.get("backend"), strict=True)
+    out["sqlite_path"] = str(out.get("sqlite_path") or DEFAULT_SQLITE_FILENAME)
+    return out
+
+
+def build_storage(state_path: Path, config: Optional[Dict[str, Any]] = None) -> StorageInterface:
+    """Build the configured storage backend for a state path."""
+    config = config or default_storage_config()
+    backend = normalize_storage_backend(config.get("backend"), strict=True)
+    state_path = Path(state_path)
+    if backend == STORAGE_BACKEND_SQLITE:
+        db_path = Path(config.get("sqlite_path") or DEFAULT_SQLITE_FILENAME)
+        if not db_path.is_absolute():
+            db_path = state_path.parent / db_path
+        return SqliteStorage(db_path)
+    return FileStorage(state_path)
+
 
-__all__ = ["StorageInterface", "FileStorage", "STATE_VERSION"]
+__all__ = [
+    "StorageInterface",
+    "FileStorage",
+    "SqliteStorage",
+    "STATE_VERSION",
+    "StateConflictError",
+    "STORAGE_BACKEND_JSON",
+    "STORAGE_BACKEND_SQLITE",
+    "STORAGE_BACKENDS",
+    "STORAGE_BACKEND_ENV",
+    "normalize_storage_backend",
+    "default_storage_config",
+    "load_storage_config",
+    "build_storage",
+]
@@ -1,39 +1,16 @@
 from __future__ import annotations
 
-from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+from typing import Any, Dict, Iterable, List, Optional, Tuple
 
+from governed_platform.governance.graph_cycles import find_dependency_cycle
 from governed_platform.governance.status import normalize_runtime_status
 
 _MUTATION_STATUSES = {"pending", "in_progress", "done", "failed", "blocked"}
 
 
 def detect_dependency_cycle(dependencies: Dict[str, List[str]]) -> List[str]:
-    visited: Set[str] = set()
-    stack: List[str] = []
-    in_stack: Set[str] = set()
-
-    def walk(node: str) -> List[str]:
-        visited.add(node)
-        stack.append(node)
-        in_stack.add(node)
-        for nxt in dependencies.get(node, []):
-            if nxt not in visited:
-                found = walk(nxt)
-                if found:
-                    return found
-            elif nxt in in_stack:
-                idx = stack.index(nxt)
-                return stack[idx:] + [nxt]
-        stack.pop()
-        in_stack.remove(node)
-        return []
-
-    for node in dependencies:
-        if node not in visited:
-            found = walk(node)
-            if found:
-                return found
-    return []
+    """First dependency cycle as a closed path, or [] (iterative, no recursion limit)."""
+    return find_dependency_cycle(dependencies)
 
 
 def dependency_blocker(packet_id: str, dependencies: Dict[str, List[str]], state: Dict[str, Any]) -> Optional[str]:
@@ -62,8 +39,13 @@ def validate_claim_pipeline(
     packet_id: str,
     dependencies: Dict[str, List[str]],
     state: Dict[str, Any],
+    acyclic: Optional[bool] = None,
 ) -> Tuple[bool, str, List[str]]:
-    """Deterministic gate ordering for claim transitions."""
+    """Deterministic gate ordering for claim transitions.
+
+    `acyclic` is a cached verdict for this dependency map (for example
+    `DependencyIndex.acyclic`); when True the cycle walk is skipped.
+    """
     trace: List[str] = []
 
     # 1) Referential integrity
@@ -78,7 +60,7 @@ def validate_claim_pipeline(
             return False, f"Dependency missing: {packet_id} -> {dep_id}", trace
 
     # 2) Invariant enforcement
-    cycle = detect_dependency_cycle(dependencies)
+    cycle = [] if acyclic else detect_dependency_cycle(dependencies)
     trace.append("invariant_cycle_check")
     if cycle:
         return False, f"Dependency cycle detected: {' -> '.join(cycle)}", trace
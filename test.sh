@@ -49,8 +49,8 @@ ID=$(python3 -c "import json;print(json.load(open('.governance/wbs.json'))['pack
 [ -n "$ID" ] && python3 .governance/wbs_cli.py claim "$ID" test-agent >/dev/null 2>&1 && pass "claim" || fail "claim"
 [ -n "$ID" ] && python3 .governance/wbs_cli.py done "$ID" test-agent "tested" >/dev/null 2>&1 && pass "done" || fail "done"
 
-# Verify state is JSON
-python3 -c "import json;json.load(open('.governance/wbs-state.json'))" 2>/dev/null && pass "valid json" || fail "valid json"
+# Verify state decodes (any configured state_format)
+python3 -c 'import sys; sys.path.insert(0, "src"); from governed_platform.governance.state_store import read_state_document; read_state_document(".governance/wbs-state.json")' 2>/dev/null && pass "valid state" || fail "valid state"
 
 # Circular detection
 echo '{"metadata":{},"work_areas":[{"id":"T","title":"T"}],"packets":[{"id":"A","wbs_ref":"1","area_id":"T","title":"A","scope":""},{"id":"B","wbs_ref":"2","area_id":"T","title":"B","scope":""}],"dependencies":{"A":["B"],"B":["A"]}}' > /tmp/c.json
@@ -10,6 +10,7 @@ ROOT = Path(__file__).resolve().parents[1]
 CLI = [sys.executable, str(ROOT / ".governance" / "wbs_cli.py")]
 WBS = ROOT / ".governance" / "wbs.json"
 STATE = ROOT / ".governance" / "wbs-state.json"
+LOG_INDEX = ROOT / ".governance" / "wbs-state-log-index.ndjson"
 AGENTS = ROOT / ".governance" / "agents.json"
 
 
@@ -60,6 +61,7 @@ class AgentCapabilitiesTests(unittest.TestCase):
             STATE.unlink(missing_ok=True)
         else:
             STATE.write_bytes(cls._state_backup)
+        LOG_INDEX.unlink(missing_ok=True)
 
         if cls._agents_backup is None:
             AGENTS.unlink(missing_ok=True)
@@ -0,0 +1,117 @@
+import json
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+ROOT = Path(__file__).resolve().parents[1]
+import sys
+
+sys.path.insert(0, str(ROOT / "src"))
+
+from governed_platform.governance.blob_store import BlobStore, blob_root_for, json_digest  # noqa: E402
+from substrate_core.engine import PacketEngine  # noqa: E402
+from substrate_core.state import ActorContext  # noqa: E402
+from substrate_core.storage import FileStorage, SqliteStorage  # noqa: E402
+
+
+class BlobStoreTests(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.store = BlobStore(Path(self.tmpdir.name) / "blobs")
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def test_put_is_content_addressed_and_idempotent(self):
+        digest = self.store.put(b"payload")
+        self.assertEqual(self.store.put(b"payload"), digest)
+        self.assertEqual(self.store.get(digest), b"payload")
+        self.assertEqual(len(list((Path(self.tmpdir.name) / "blobs").rglob("*"))), 2)
+
+    def test_missing_or_corrupted_blob_raises_key_error(self):
+        digest = self.store.put(b"payload")
+        self.store.path_for(digest).write_bytes(b"tampered")
+        with self.assertRaises(KeyError):
+            self.store.get(digest)
+        with self.assertRaises(KeyError):
+            self.store.get("0" * 64)
+        with self.assertRaises(ValueError):
+            self.store.get("../../etc/passwd")
+
+
+class SnapshotBlobTests(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.state_path = Path(self.tmpdir.name) / "wbs-state.json"
+        self.definition = {
+            "packets": [{"id": pid, "title": pid} for pid in ("A", "B", "C")],
+            "dependencies": {},
+        }
+        self.actor = ActorContext(user_id="dev", role="developer", source="api")
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def _engine(self, storage):
+        return PacketEngine(storage=storage, definition=self.definition)
+
+    def test_snapshots_keep_only_digests_in_state_and_share_blobs(self):
+        engine = self._engine(FileStorage(self.state_path))
+        self.assertTrue(engine.snapshot("s1", self.actor).ok)
+        engine.claim("A", self.actor)
+        self.assertTrue(engine.snapshot("s2", self.actor).ok)
+
+        doc = json.loads(self.state_path.read_text())
+        s1, s2 = doc["snapshots"]["s1"], doc["snapshots"]["s2"]
+        self.assertNotIn("packets", s1)
+        self.assertEqual(s1["packet_refs"]["B"], s2["packet_refs"]["B"])
+        self.assertNotEqual(s1["packet_refs"]["A"], s2["packet_refs"]["A"])
+        blobs = [p for p in blob_root_for(self.state_path).rglob("*") if p.is_file()]
+        self.assertEqual(len(blobs), 2)  # one shared pending record + claimed A
+
+    def test_diff_loads_bodies_only_for_changed_packets(self):
+        storage = FileStorage(self.state_path)
+        engine = self._engine(storage)
+        engine.snapshot("s1", self.actor)
+        engine.claim("B", self.actor)
+        engine.snapshot("s2", self.actor)
+
+        with mock.patch.object(storage, "get_json_blob", wraps=storage.get_json_blob) as loads:
+            diff = engine.diff("s1", "s2")
+        self.assertTrue(diff.ok)
+        self.assertEqual([c["packet_id"] for c in diff.payload["changes"]], ["B"])
+        self.assertEqual(diff.payload["changes"][0]["to"]["status"], "in_progress")
+        self.assertEqual(loads.call_count, 2)
+
+    def test_diff_against_legacy_inline_snapshot(self):
+        storage = FileStorage(self.state_path)
+        engine = self._engine(storage)
+        engine.snapshot("new", self.actor)
+        state = storage.read_state()
+        legacy_packets = json.loads(json.dumps(state["packets"]))
+        legacy_packets["C"]["status"] = "blocked"
+        state["snapshots"]["old"] = {
+            "label": "old",
+            "created_at": "2026-01-01T00:00:00",
+            "packets": legacy_packets,
+        }
+        storage.write_state(state)
+
+        diff = engine.diff("old", "new")
+        self.assertTrue(diff.ok)
+        self.assertEqual(diff.payload["change_count"], 1)
+        self.assertEqual(diff.payload["changes"][0]["from"]["status"], "blocked")
+
+    def test_sqlite_storage_stores_blobs_in_database(self):
+        storage = SqliteStorage(Path(self.tmpdir.name) / "state.sqlite")
+        digest = storage.put_json_blob({"status": "pending"})
+        self.assertEqual(digest, json_digest({"status": "pending"}))
+        self.assertTrue(storage.has_blob(digest))
+        self.assertEqual(storage.get_json_blob(digest), {"status": "pending"})
+        with self.assertRaises(KeyError):
+            storage.get_blob("f" * 64)
+
+
+if __name__ == "__main__":
+    unittest.main()
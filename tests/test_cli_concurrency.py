@@ -11,6 +11,7 @@ ROOT = Path(__file__).resolve().parents[1]
 CLI = [sys.executable, str(ROOT / '.governance' / 'wbs_cli.py')]
 WBS = ROOT / '.governance' / 'wbs.json'
 STATE = ROOT / '.governance' / 'wbs-state.json'
+LOG_INDEX = ROOT / '.governance' / 'wbs-state-log-index.ndjson'
 
 
 def run_cli(args, expect=0):
@@ -39,6 +40,7 @@ class CliConcurrencyTests(unittest.TestCase):
             STATE.unlink(missing_ok=True)
         else:
             STATE.write_bytes(cls._state_backup)
+        LOG_INDEX.unlink(missing_ok=True)
 
     def setUp(self):
         STATE.unlink(missing_ok=True)
@@ -10,6 +10,7 @@ ROOT = Path(__file__).resolve().parents[1]
 CLI = [sys.executable, str(ROOT / '.governance' / 'wbs_cli.py')]
 WBS = ROOT / '.governance' / 'wbs.json'
 STATE = ROOT / '.governance' / 'wbs-state.json'
+LOG_INDEX = ROOT / '.governance' / 'wbs-state-log-index.ndjson'
 
 
 def run_cli(args, expect=0):
@@ -38,6 +39,7 @@ class CliE2ETests(unittest.TestCase):
             STATE.unlink(missing_ok=True)
         else:
             STATE.write_bytes(cls._state_backup)
+        LOG_INDEX.unlink(missing_ok=True)
 
     def setUp(self):
         STATE.unlink(missing_ok=True)
@@ -83,6 +85,33 @@ class CliE2ETests(unittest.TestCase):
         self.assertEqual(state['packets']['B']['status'], 'failed')
         self.assertEqual(state['packets']['C']['status'], 'blocked')
 
+    def test_storage_backend_round_trip_keeps_state(self):
+        config = ROOT / '.governance' / 'storage-config.json'
+        config_backup = config.read_bytes() if config.exists() else None
+        db = STATE.with_suffix('.sqlite')
+
+        def restore():
+            for path in (db, db.with_name(db.name + '-wal'), db.with_name(db.name + '-shm')):
+                path.unlink(missing_ok=True)
+            if config_backup is None:
+                config.unlink(missing_ok=True)
+            else:
+                config.write_bytes(config_backup)
+
+        self.addCleanup(restore)
+        self._init_dep_graph()
+        run_cli(['claim', 'A', 'agent'])
+        run_cli(['done', 'A', 'agent', 'ok', '--risk', 'none'])
+        self.assertGreater(json.loads(STATE.read_text())['revision'], 0)
+
+        run_cli(['storage-backend', 'sqlite'])
+        run_cli(['claim', 'B', 'agent'])
+        run_cli(['storage-backend', 'json'])
+        state = json.loads(STATE.read_text())
+        self.assertEqual(state['packets']['A']['status'], 'done')
+        self.assertEqual(state['packets']['B']['status'], 'in_progress')
+        self.assertEqual([e['event'] for e in state['log']], ['started', 'completed', 'started'])
+
     def test_graph_dot_export(self):
         self._init_dep_graph()
         with tempfile.TemporaryDirectory() as td:
@@ -9,6 +9,7 @@ ROOT = Path(__file__).resolve().parents[1]
 CLI = [sys.executable, str(ROOT / '.governance' / 'wbs_cli.py')]
 WBS = ROOT / '.governance' / 'wbs.json'
 STATE = ROOT / '.governance' / 'wbs-state.json'
+LOG_INDEX = ROOT / '.governance' / 'wbs-state-log-index.ndjson'
 
 
 def run_cli(args, expect=0):
@@ -37,6 +38,7 @@ class CliExportTests(unittest.TestCase):
             STATE.unlink(missing_ok=True)
         else:
             STATE.write_bytes(cls._state_backup)
+        LOG_INDEX.unlink(missing_ok=True)
 
     def setUp(self):
         STATE.unlink(missing_ok=True)
@@ -61,6 +63,29 @@ class CliExportTests(unittest.TestCase):
             self.assertIn('packet_id,event,agent,timestamp,notes', csv_text.splitlines()[0])
             self.assertIn('FX-1', csv_text)
 
+    def test_binary_state_format_converts_and_exports_pretty_json(self):
+        before = json.loads(STATE.read_text())
+        run_cli(['state-format', 'binary'])
+        self.assertTrue(STATE.read_bytes().startswith(b'WBSB'))
+
+        status = json.loads(run_cli(['--json', 'state-format']).stdout)
+        self.assertEqual(status['format'], 'binary')
+        self.assertEqual(status['detected'], 'binary')
+        run_cli(['note', 'FX-2', 'agent', 'written as binary'])
+        self.assertTrue(STATE.read_bytes().startswith(b'WBSB'))
+
+        with tempfile.TemporaryDirectory() as td:
+            out = Path(td) / 'state.json'
+            run_cli(['export', 'state-pretty', str(out)])
+            exported = json.loads(out.read_text())
+            self.assertEqual(exported['packets']['FX-1']['status'], 'done')
+            self.assertEqual(len(exported['log']), len(before['log']) + 1)
+
+        run_cli(['state-format', 'json'])
+        self.assertEqual(
+            json.loads(STATE.read_text())['packets']['FX-1'], before['packets']['FX-1']
+        )
+
 
 if __name__ == '__main__':
     unittest.main()
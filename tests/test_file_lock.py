@@ -1,5 +1,7 @@
 import json
 import os
+import signal
+import subprocess
 import tempfile
 import threading
 import time
@@ -12,7 +14,13 @@ import sys
 
 sys.path.insert(0, str(SRC))
 
-from governed_platform.governance.file_lock import LockTimeoutError, atomic_write_json, file_lock  # noqa: E402
+from governed_platform.governance.file_lock import (  # noqa: E402
+    LOCK_BACKEND_ENV,
+    LockTimeoutError,
+    atomic_write_json,
+    fcntl,
+    file_lock,
+)
 
 
 class FileLockTests(unittest.TestCase):
@@ -72,5 +80,119 @@ class FileLockTests(unittest.TestCase):
         self.assertFalse(lock_path.exists())
 
 
+@unittest.skipIf(fcntl is None, "flock backend requires fcntl")
+class FlockBackendTests(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.state_path = Path(self.tmpdir.name) / "state.json"
+        os.environ[LOCK_BACKEND_ENV] = "flock"
+
+    def tearDown(self):
+        os.environ.pop(LOCK_BACKEND_ENV, None)
+        self.tmpdir.cleanup()
+
+    def _hold(self, shared=False):
+        entered = threading.Event()
+        release = threading.Event()
+
+        def holder():
+            with file_lock(self.state_path, timeout=1.0, shared=shared):
+                entered.set()
+                release.wait(timeout=5.0)
+
+        thread = threading.Thread(target=holder, daemon=True)
+        thread.start()
+        self.assertTrue(entered.wait(timeout=1.0))
+        return release, thread
+
+    def test_exclusive_lock_times_out_then_blocks_until_release(self):
+        release, thread = self._hold()
+        threads = threading.active_count()
+        with self.assertRaises(LockTimeoutError):
+            with file_lock(self.state_path, timeout=0.1):
+                pass
+        # The timed-out waiter leaves nothing behind that could take the lock later.
+        self.assertEqual(threading.active_count(), threads)
+        self.assertEqual(signal.getitimer(signal.ITIMER_REAL)[0], 0)
+        self.assertIs(signal.getsignal(signal.SIGALRM), signal.SIG_DFL)
+
+        threading.Timer(0.1, release.set).start()
+        started = time.monotonic()
+        with file_lock(self.state_path, timeout=2.0):
+            waited = time.monotonic() - started
+        self.assertLess(waited, 1.0)
+        thread.join(timeout=2.0)
+        self.assertFalse(Path(f"{self.state_path}.lock").exists())
+
+    def test_shared_locks_coexist_but_exclude_writers(self):
+        release, thread = self._hold(shared=True)
+        with file_lock(self.state_path, timeout=0.2, shared=True):
+            pass
+        with self.assertRaises(LockTimeoutError):
+            with file_lock(self.state_path, timeout=0.1):
+                pass
+        release.set()
+        thread.join(timeout=2.0)
+
+    def test_waiters_off_the_main_thread_poll_until_timeout(self):
+        release, thread = self._hold()
+        outcome = []
+
+        def waiter():
+            try:
+                with file_lock(self.state_path, timeout=0.1, poll_interval=0.01):
+                    outcome.append("acquired")
+            except LockTimeoutError:
+                outcome.append("timeout")
+            with file_lock(self.state_path, timeout=2.0, poll_interval=0.01):
+                outcome.append("acquired")
+
+        worker = threading.Thread(target=waiter, daemon=True)
+        worker.start()
+        time.sleep(0.3)
+        release.set()
+        worker.join(timeout=3.0)
+        thread.join(timeout=2.0)
+        self.assertEqual(outcome, ["timeout", "acquired"])
+
+    def test_lock_released_when_holder_process_dies(self):
+        script = (
+            "import sys, time; sys.path.insert(0, sys.argv[1]);"
+            "from governed_platform.governance.file_lock import file_lock;"
+            "cm = file_lock(sys.argv[2]); cm.__enter__(); print('held', flush=True); time.sleep(30)"
+        )
+        env = dict(os.environ, **{LOCK_BACKEND_ENV: "flock"})
+        proc = subprocess.Popen(
+            [sys.executable, "-c", script, str(SRC), str(self.state_path)],
+            stdout=subprocess.PIPE,
+            text=True,
+            env=env,
+        )
+        try:
+            self.assertEqual(proc.stdout.readline().strip(), "held")
+            with self.assertRaises(LockTimeoutError):
+                with file_lock(self.state_path, timeout=0.1):
+                    pass
+            proc.kill()
+            proc.wait(timeout=5)
+            with file_lock(self.state_path, timeout=1.0):
+                pass
+        finally:
+            proc.kill()
+            proc.stdout.close()
+
+    def test_atomic_write_json_survives_concurrent_writers(self):
+        def writer(worker_id: int):
+            for i in range(20):
+                atomic_write_json(self.state_path, {"worker": worker_id, "seq": i})
+
+        threads = [threading.Thread(target=writer, args=(idx,), daemon=True) for idx in range(5)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join(timeout=5.0)
+        self.assertIn("seq", json.loads(self.state_path.read_text()))
+
+
 if __name__ == "__main__":
     unittest.main()
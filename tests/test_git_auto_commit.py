@@ -1,5 +1,6 @@
 import json
 import os
+import shutil
 import subprocess
 import sys
 import tempfile
@@ -7,14 +8,20 @@ import unittest
 from pathlib import Path
 
 ROOT = Path(__file__).resolve().parents[1]
-CLI = [sys.executable, str(ROOT / ".governance" / "wbs_cli.py")]
-WBS = ROOT / ".governance" / "wbs.json"
-STATE = ROOT / ".governance" / "wbs-state.json"
-GIT_GOV = ROOT / ".governance" / "git-governance.json"
+
+# The CLI commits to the repository that contains its `.governance/`, so these
+# tests drive a throwaway copy outside any git work tree; a ledger write can
+# never land in the working repository.
+WORKDIR = Path(tempfile.gettempdir()) / f"substrate-git-auto-{os.getpid()}"
+CLI = [sys.executable, str(WORKDIR / ".governance" / "wbs_cli.py")]
+WBS = WORKDIR / ".governance" / "wbs.json"
+STATE = WORKDIR / ".governance" / "wbs-state.json"
+GIT_GOV = WORKDIR / ".governance" / "git-governance.json"
 
 
 def run_cli(args, expect=0):
-    proc = subprocess.run(CLI + args, cwd=ROOT, capture_output=True, text=True)
+    env = dict(os.environ, GIT_CEILING_DIRECTORIES=str(WORKDIR.parent))
+    proc = subprocess.run(CLI + args, cwd=WORKDIR, capture_output=True, text=True, env=env)
     if proc.returncode != expect:
         raise AssertionError(
             f"command failed: {' '.join(args)}\nrc={proc.returncode}\nstdout={proc.stdout}\nstderr={proc.stderr}"
@@ -36,26 +43,20 @@ def write_git_mode(mode: str, auto_commit: bool):
 class GitAutoCommitTests(unittest.TestCase):
     @classmethod
     def setUpClass(cls):
-        cls._wbs_backup = WBS.read_bytes() if WBS.exists() else None
-        cls._state_backup = STATE.read_bytes() if STATE.exists() else None
-        cls._git_backup = GIT_GOV.read_bytes() if GIT_GOV.exists() else None
+        shutil.rmtree(WORKDIR, ignore_errors=True)
+        shutil.copytree(
+            ROOT / ".governance",
+            WORKDIR / ".governance",
+            ignore=shutil.ignore_patterns(
+                "wbs-state*", "*-topo.json", "terminal-log.jsonl", "__pycache__"
+            ),
+            dirs_exist_ok=True,
+        )
+        (WORKDIR / "src").symlink_to(ROOT / "src", target_is_directory=True)
 
     @classmethod
     def tearDownClass(cls):
-        if cls._wbs_backup is None:
-            WBS.unlink(missing_ok=True)
-        else:
-            WBS.write_bytes(cls._wbs_backup)
-
-        if cls._state_backup is None:
-            STATE.unlink(missing_ok=True)
-        else:
-            STATE.write_bytes(cls._state_backup)
-
-        if cls._git_backup is None:
-            GIT_GOV.unlink(missing_ok=True)
-        else:
-            GIT_GOV.write_bytes(cls._git_backup)
+        shutil.rmtree(WORKDIR, ignore_errors=True)
 
     def setUp(self):
         STATE.unlink(missing_ok=True)
@@ -0,0 +1,136 @@
+import copy
+import sys
+import threading
+import time
+import unittest
+from pathlib import Path
+from unittest import mock
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT / "src"))
+
+from substrate_core.engine import PacketEngine
+from substrate_core.group_commit import GroupCommitWriter
+from substrate_core.state import ActorContext
+from substrate_core.storage import StateConflictError, StorageInterface
+
+
+class SlowStorage(StorageInterface):
+    """In-memory storage whose writes take long enough for requests to pile up."""
+
+    def __init__(self, state, write_delay=0.02, conflicts=0):
+        self.state = copy.deepcopy(state)
+        self.state["revision"] = 0
+        self.write_delay = write_delay
+        self.conflicts = conflicts
+        self.writes = 0
+
+    def read_state(self):
+        return copy.deepcopy(self.state)
+
+    def write_state(self, state):
+        time.sleep(self.write_delay)
+        if self.conflicts:
+            self.conflicts -= 1
+            self.state["revision"] += 1
+            raise StateConflictError(state.get("revision", 0), self.state["revision"])
+        self.state = copy.deepcopy(state)
+        self.state["revision"] += 1
+        self.writes += 1
+
+    def append_audit(self, entry):
+        self.state.setdefault("log", []).append(copy.deepcopy(entry))
+        return entry
+
+
+class GroupCommitWriterTests(unittest.TestCase):
+    def setUp(self):
+        ids = [f"P{i}" for i in range(24)]
+        self.definition = {
+            "packets": [{"id": pid, "title": pid} for pid in ids],
+            "dependencies": {},
+        }
+        self.ids = ids
+
+    def _writer(self, storage):
+        return GroupCommitWriter(lambda: PacketEngine(storage=storage, definition=self.definition))
+
+    def _claim_concurrently(self, writer, ids):
+        results = {}
+        barrier = threading.Barrier(len(ids))
+
+        def worker(pid):
+            barrier.wait()
+            actor = ActorContext(user_id=f"agent-{pid}", role="developer", source="api")
+            results[pid] = writer.submit({"action": "claim", "packet_id": pid}, actor)
+
+        threads = [threading.Thread(target=worker, args=(pid,)) for pid in ids]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join(10)
+        return results
+
+    def test_concurrent_requests_share_writes_and_get_own_results(self):
+        storage = SlowStorage({"packets": {}, "log": []})
+        writer = self._writer(storage)
+        results = self._claim_concurrently(writer, self.ids)
+
+        self.assertEqual(len(results), len(self.ids))
+        self.assertTrue(all(result.ok for result in results.values()))
+        self.assertEqual(results["P3"].message, "P3 claimed by agent-P3")
+        self.assertLess(storage.writes, len(self.ids))
+        self.assertEqual(writer.operations, len(self.ids))
+        self.assertEqual(len(storage.state["log"]), len(self.ids))
+        for pid in self.ids:
+            self.assertEqual(storage.state["packets"][pid]["assigned_to"], f"agent-{pid}")
+
+    def test_denied_request_reports_its_own_result(self):
+        storage = SlowStorage({"packets": {}, "log": []}, write_delay=0.0)
+        writer = self._writer(storage)
+        actor = ActorContext(user_id="dev", role="developer", source="api")
+        self.assertTrue(writer.submit({"action": "claim", "packet_id": "P0"}, actor).ok)
+        second = writer.submit({"action": "claim", "packet_id": "P0"}, actor)
+        self.assertFalse(second.ok)
+        self.assertEqual(second.payload["decision"]["reason_codes"], ["CONSTRAINT_DENY"])
+        self.assertTrue(
+            writer.submit({"action": "done", "packet_id": "P0", "notes": "ok"}, actor).ok
+        )
+        self.assertEqual(storage.state["packets"]["P0"]["status"], "done")
+
+    def test_conflicting_batch_is_reloaded_and_retried(self):
+        storage = SlowStorage({"packets": {}, "log": []}, write_delay=0.0, conflicts=1)
+        writer = self._writer(storage)
+        actor = ActorContext(user_id="dev", role="developer", source="api")
+        self.assertTrue(writer.submit({"action": "claim", "packet_id": "P1"}, actor).ok)
+        self.assertEqual(storage.writes, 1)
+
+    def test_raising_operation_fails_alone(self):
+        storage = SlowStorage({"packets": {}, "log": []}, write_delay=0.0)
+        writer = self._writer(storage)
+        actor = ActorContext(user_id="dev", role="developer", source="api")
+        claim = PacketEngine._claim_in_state
+
+        def flaky_claim(engine, state, packet_id, *args):
+            if packet_id == "P1":
+                state["packets"].setdefault("P1", {})["status"] = "in_progress"
+                raise RuntimeError("handler bug")
+            return claim(engine, state, packet_id, *args)
+
+        operations = [
+            {"action": "claim", "packet_id": pid, "actor": actor} for pid in ("P0", "P1", "P2")
+        ]
+        with mock.patch.object(PacketEngine, "_claim_in_state", flaky_claim):
+            results = writer._commit(operations)
+
+        self.assertTrue(results[0].ok)
+        self.assertIsInstance(results[1], RuntimeError)
+        self.assertTrue(results[2].ok)
+        self.assertEqual(storage.writes, 1)
+        self.assertEqual(writer.operations, 2)
+        self.assertNotEqual(storage.state["packets"].get("P1", {}).get("status"), "in_progress")
+        self.assertEqual(storage.state["packets"]["P2"]["status"], "in_progress")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,117 @@
+import io
+import json
+import tempfile
+import unittest
+from itertools import islice
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+import sys
+
+sys.path.insert(0, str(ROOT / "src"))
+
+from governed_platform.governance.json_stream import iter_array_member, scan_object  # noqa: E402
+from governed_platform.governance.log_archive import archive_state_log  # noqa: E402
+from governed_platform.governance.state_store import (  # noqa: E402
+    iter_state_log,
+    read_state_document,
+    tail_state_log,
+    write_state_document,
+)
+from substrate_core.audit import provenance_chain  # noqa: E402
+
+
+class CountingStream(io.BytesIO):
+    def __init__(self, data):
+        super().__init__(data)
+        self.bytes_read = 0
+
+    def read(self, size=-1):
+        chunk = super().read(size)
+        self.bytes_read += len(chunk)
+        return chunk
+
+
+DOC = {
+    "packets": {"A": {"status": "done", "notes": 'quote " brace } bracket ] \\ esc'}},
+    "numbers": [1, -2.5e-10, 12345678901234567890, True, None],
+    "log": [{"packet_id": "A", "notes": "é ✓", "n": i * 1.5} for i in range(40)],
+    "revision": 7,
+}
+
+
+class JsonStreamTests(unittest.TestCase):
+    def test_array_member_matches_json_load_at_any_chunk_size(self):
+        for indent in (None, 2):
+            data = json.dumps(DOC, indent=indent, ensure_ascii=False).encode()
+            for chunk_size in (1, 3, 17, 4096):
+                self.assertEqual(
+                    list(iter_array_member(io.BytesIO(data), "log", chunk_size)), DOC["log"]
+                )
+                header = scan_object(io.BytesIO(data), skip=("log",), chunk_size=chunk_size)
+                self.assertEqual(header, {k: v for k, v in DOC.items() if k != "log"})
+
+    def test_missing_member_yields_nothing(self):
+        self.assertEqual(list(iter_array_member(io.BytesIO(b'{"log": null, "a": []}'), "log")), [])
+        self.assertEqual(list(iter_array_member(io.BytesIO(b'{"a": [1]}'), "log")), [])
+        with self.assertRaises(ValueError):
+            list(iter_array_member(io.BytesIO(b'{"log": [1, 2'), "log"))
+
+    def test_early_exit_reads_only_a_prefix(self):
+        doc = {"log": [{"packet_id": f"P{i}", "notes": "x" * 200} for i in range(2000)]}
+        stream = CountingStream(json.dumps(doc).encode())
+        first = list(islice(iter_array_member(stream, "log", chunk_size=1024), 3))
+        self.assertEqual([e["packet_id"] for e in first], ["P0", "P1", "P2"])
+        self.assertLess(stream.bytes_read, 4096)
+
+
+class StateLogStreamTests(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.path = Path(self.tmpdir.name) / "wbs-state.json"
+        log = [
+            {
+                "packet_id": "A" if i % 2 else "B",
+                "event": "noted",
+                "notes": f"n{i}",
+                "timestamp": f"2026-01-01T00:00:{i:02d}",
+            }
+            for i in range(10)
+        ]
+        write_state_document(self.path, {"packets": {}, "log": log})
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def _notes(self, entries):
+        return [e["notes"] for e in entries]
+
+    def test_iter_and_tail_span_archive_and_hot_log(self):
+        archive_state_log(self.path, keep_last=3)
+        self.assertEqual(self._notes(iter_state_log(self.path)), [f"n{i}" for i in range(10)])
+        self.assertEqual(
+            self._notes(iter_state_log(self.path, packet_id="B")), ["n0", "n2", "n4", "n6", "n8"]
+        )
+        self.assertEqual(self._notes(tail_state_log(self.path, 2)), ["n8", "n9"])
+        self.assertEqual(self._notes(tail_state_log(self.path, 5)), ["n5", "n6", "n7", "n8", "n9"])
+        self.assertEqual(
+            self._notes(provenance_chain(None, "A", self.path)), ["n1", "n3", "n5", "n7", "n9"]
+        )
+
+    def test_segmented_and_binary_documents(self):
+        state = read_state_document(self.path)
+        state["log_storage"] = "segmented"
+        write_state_document(self.path, state)
+        self.assertNotIn("log", json.loads(self.path.read_text()))
+        self.assertEqual(self._notes(tail_state_log(self.path, 2)), ["n8", "n9"])
+
+        state = read_state_document(self.path)
+        state.pop("log_storage")
+        state["state_format"] = "binary"
+        write_state_document(self.path, state)
+        self.assertEqual(len(list(iter_state_log(self.path))), 10)
+        self.assertEqual(self._notes(iter_state_log(self.path, packet_id="A"))[:2], ["n1", "n3"])
+
+
+if __name__ == "__main__":
+    unittest.main()
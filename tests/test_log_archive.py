@@ -0,0 +1,273 @@
+import json
+import shutil
+import subprocess
+import sys
+import tempfile
+import unittest
+from datetime import datetime
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT / "src"))
+
+from governed_platform.governance.log_archive import (  # noqa: E402
+    archive_dir_for,
+    archive_state_log,
+    archived_count,
+    archived_tail,
+    find_archived_event,
+    iter_full_log,
+    load_segment_index,
+    restore_log_archive,
+    select_archivable,
+    snapshot_log_archive,
+    verify_archive,
+)
+from governed_platform.governance.log_checkpoints import checkpoint_path_for, verify_state_log  # noqa: E402
+from governed_platform.governance.log_integrity import (  # noqa: E402
+    LOG_MODE_HASH_CHAIN,
+    append_log_entry,
+    build_log_entry,
+    chain_base,
+    next_chain_link,
+    verify_log_integrity,
+)
+from governed_platform.governance.log_segments import segment_dir_for  # noqa: E402
+from governed_platform.governance.merkle import MERKLE_KEY  # noqa: E402
+from governed_platform.governance.state_store import read_state_document, write_state_document  # noqa: E402
+from substrate_core.audit import provenance_chain  # noqa: E402
+
+CLI = [sys.executable, str(ROOT / ".governance" / "wbs_cli.py")]
+WBS = ROOT / ".governance" / "wbs.json"
+STATE = ROOT / ".governance" / "wbs-state.json"
+LOG_INDEX = ROOT / ".governance" / "wbs-state-log-index.ndjson"
+
+
+def append_hashed(state, packet_id, notes, timestamp):
+    prev_hash, hash_index = next_chain_link(state)
+    append_log_entry(
+        state,
+        build_log_entry(
+            packet_id=packet_id,
+            event="noted",
+            agent="op",
+            notes=notes,
+            timestamp=timestamp,
+            mode=LOG_MODE_HASH_CHAIN,
+            previous_hash=prev_hash,
+            hash_index=hash_index,
+        ),
+    )
+
+
+class LogArchiveTests(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.path = Path(self.tmpdir.name) / "wbs-state.json"
+        state = {"packets": {}, "log": [], "log_integrity_mode": LOG_MODE_HASH_CHAIN}
+        for i in range(12):
+            append_hashed(state, "A" if i % 3 else "B", f"n{i}", f"2026-01-{i + 1:02d}T00:00:00")
+        write_state_document(self.path, state)
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def _state(self):
+        return read_state_document(self.path)
+
+    def test_select_archivable_takes_a_prefix(self):
+        entries = self._state()["log"]
+        self.assertEqual(select_archivable(entries, keep_last=5), 7)
+        self.assertEqual(
+            select_archivable(entries, older_than_days=10, now=datetime(2026, 1, 15)), 4
+        )
+        self.assertEqual(select_archivable(entries), 0)
+
+    def test_archive_keeps_chain_continuous_and_merkle_root_stable(self):
+        root_before = self._state()[MERKLE_KEY]["root"]
+        result = archive_state_log(self.path, keep_last=4, codec="lzma")
+        self.assertEqual(result["archived"], 8)
+        self.assertTrue(result["segment"]["name"].endswith(".ndjson.xz"))
+
+        state = self._state()
+        self.assertEqual(len(state["log"]), 4)
+        self.assertEqual(archived_count(state), 8)
+        self.assertEqual(state[MERKLE_KEY]["root"], root_before)
+        self.assertEqual(verify_archive(self.path, state), (True, []))
+
+        append_hashed(state, "A", "after archive", "2026-02-01T00:00:00")
+        write_state_document(self.path, state)
+        state = self._state()
+        self.assertEqual(state["log"][-1]["prev_hash"], state["log"][-2]["hash"])
+        self.assertEqual(verify_log_integrity(state["log"], start=chain_base(state)), (True, []))
+        self.assertEqual(len(list(iter_full_log(self.path, state))), 13)
+
+    def test_checkpoints_survive_archiving_without_rewrite(self):
+        self.assertTrue(verify_state_log(self.path, self._state())["valid"])
+        checkpoints = checkpoint_path_for(self.path)
+        recorded = checkpoints.read_bytes()
+
+        archive_state_log(self.path, keep_last=4)
+        self.assertEqual(checkpoints.read_bytes(), recorded)
+        state = self._state()
+        append_hashed(state, "A", "after archive", "2026-02-01T00:00:00")
+        write_state_document(self.path, state)
+
+        result = verify_state_log(self.path, self._state())
+        self.assertTrue(result["valid"], result["issues"])
+        self.assertEqual(result["verified_from"], 12)
+        self.assertEqual(result["head"]["position"], 13)
+
+        archive_state_log(self.path, keep_last=0)
+        result = verify_state_log(self.path, self._state(), full=True)
+        self.assertTrue(result["valid"], result["issues"])
+
+    def test_archiving_segmented_log_rewrites_only_the_cut_segment(self):
+        state = self._state()
+        state["log_storage"] = "segmented"
+        state["log_segments"] = {"max_entries": 5, "segments": []}
+        write_state_document(self.path, state)
+        segments = segment_dir_for(self.path)
+        self.assertEqual(
+            sorted(p.name for p in segments.iterdir()),
+            [f"segment-00000{i}.ndjson" for i in (1, 2, 3)],
+        )
+        untouched = (segments / "segment-000003.ndjson").read_bytes()
+
+        archive_state_log(self.path, keep_last=6)
+        state = self._state()
+        self.assertEqual([e["notes"] for e in state["log"]], [f"n{i}" for i in range(6, 12)])
+        self.assertEqual(
+            [(seg["name"], seg["count"]) for seg in state["log_segments"]["segments"]],
+            [("segment-000004.ndjson", 4), ("segment-000003.ndjson", 2)],
+        )
+        self.assertEqual((segments / "segment-000003.ndjson").read_bytes(), untouched)
+        self.assertEqual(verify_log_integrity(state["log"], start=chain_base(state)), (True, []))
+        self.assertEqual(len(list(iter_full_log(self.path, state))), 12)
+
+        # Dropped files outlive the document that referenced them by one write.
+        self.assertTrue((segments / "segment-000001.ndjson").exists())
+        append_hashed(state, "A", "after archive", "2026-02-01T00:00:00")
+        write_state_document(self.path, state)
+        self.assertEqual(
+            sorted(p.name for p in segments.iterdir()),
+            ["segment-000003.ndjson", "segment-000004.ndjson"],
+        )
+        self.assertEqual(self._state()["log"][-1]["notes"], "after archive")
+
+    def test_snapshot_restore_removes_new_archive_files(self):
+        archive_state_log(self.path, keep_last=8)
+        snapshot = snapshot_log_archive(self.path)
+        document = self.path.read_bytes()
+        archive_state_log(self.path, keep_last=2)
+        self.assertEqual(len(list(archive_dir_for(self.path).iterdir())), 4)
+
+        self.path.write_bytes(document)
+        restore_log_archive(self.path, snapshot)
+        self.assertEqual(sorted(p.name for p in archive_dir_for(self.path).iterdir()), snapshot)
+        state = self._state()
+        self.assertEqual(verify_archive(self.path, state), (True, []))
+        self.assertEqual(len(list(iter_full_log(self.path, state))), 12)
+
+    def test_second_segment_continues_from_first(self):
+        archive_state_log(self.path, keep_last=8)
+        archive_state_log(self.path, keep_last=2)
+        state = self._state()
+        self.assertEqual(archived_count(state), 10)
+        self.assertTrue(verify_archive(self.path, state)[0])
+        self.assertEqual(
+            [e["notes"] for e in archived_tail(self.path, state, 3)], ["n7", "n8", "n9"]
+        )
+        position, entry = find_archived_event(self.path, state, "evt-00000003")
+        self.assertEqual((position, entry["notes"]), (2, "n2"))
+        position, entry = find_archived_event(self.path, state, "evt-00000010")
+        self.assertEqual((position, entry["notes"]), (9, "n9"))
+        with self.assertRaises(KeyError):
+            find_archived_event(self.path, state, "evt-00000011")
+
+    def test_tampered_segment_fails_verification(self):
+        archive_state_log(self.path, keep_last=4)
+        state = self._state()
+        segment = archive_dir_for(self.path) / state["log_archive"]["segments"][0]["name"]
+        segment.write_bytes(segment.read_bytes()[:-4] + b"\x00\x00\x00\x00")
+        ok, issues = verify_archive(self.path, state)
+        self.assertFalse(ok)
+        self.assertIn("sha256 mismatch", issues[0])
+
+    def test_provenance_chain_reads_only_indexed_segments(self):
+        archive_state_log(self.path, keep_last=4)
+        state = self._state()
+        index = load_segment_index(self.path, state["log_archive"]["segments"][0])
+        self.assertEqual(index["packets"]["B"], [0, 3, 6])
+
+        chain = provenance_chain(state, "B", self.path)
+        self.assertEqual([e["notes"] for e in chain], ["n0", "n3", "n6", "n9"])
+        self.assertEqual([e["notes"] for e in provenance_chain(state, "B")], ["n9"])
+
+    def test_dry_run_and_saved_policy(self):
+        result = archive_state_log(self.path, keep_last=6, dry_run=True)
+        self.assertEqual(result["archived"], 6)
+        self.assertFalse(archive_dir_for(self.path).exists())
+
+        archive_state_log(self.path, keep_last=10, save_policy=True)
+        state = self._state()
+        append_hashed(state, "A", "more", "2026-02-01T00:00:00")
+        write_state_document(self.path, state)
+        self.assertEqual(archive_state_log(self.path)["archived"], 1)
+        self.assertEqual(len(self._state()["log"]), 10)
+
+
+class CliLogArchiveTests(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls._wbs_backup = WBS.read_bytes() if WBS.exists() else None
+        cls._state_backup = STATE.read_bytes() if STATE.exists() else None
+
+    @classmethod
+    def tearDownClass(cls):
+        if cls._wbs_backup is None:
+            WBS.unlink(missing_ok=True)
+        else:
+            WBS.write_bytes(cls._wbs_backup)
+        if cls._state_backup is None:
+            STATE.unlink(missing_ok=True)
+        else:
+            STATE.write_bytes(cls._state_backup)
+        LOG_INDEX.unlink(missing_ok=True)
+
+    def setUp(self):
+        shutil.rmtree(archive_dir_for(STATE), ignore_errors=True)
+        STATE.unlink(missing_ok=True)
+        self.run_cli(["init", str(ROOT / "tests" / "fixtures" / "wbs_linear.json")])
+        for i in range(4):
+            self.run_cli(["note", "FX-1", "agent", f"note {i}"])
+
+    def tearDown(self):
+        shutil.rmtree(archive_dir_for(STATE), ignore_errors=True)
+
+    def run_cli(self, args, expect=0):
+        proc = subprocess.run(CLI + args, cwd=ROOT, capture_output=True, text=True)
+        self.assertEqual(
+            proc.returncode, expect, f"{args}\nstdout={proc.stdout}\nstderr={proc.stderr}"
+        )
+        return proc
+
+    def test_archived_entries_stay_visible_to_log_and_export(self):
+        before = json.loads(self.run_cli(["--json", "log", "50"]).stdout)["log"]
+        result = json.loads(self.run_cli(["--json", "log-archive", "--keep", "2"]).stdout)
+        self.assertEqual(result["archived"], len(before) - 2)
+        self.assertEqual(len(json.loads(STATE.read_text())["log"]), 2)
+
+        self.assertEqual(json.loads(self.run_cli(["--json", "log", "50"]).stdout)["log"], before)
+        with tempfile.TemporaryDirectory() as td:
+            out = Path(td) / "log.json"
+            self.run_cli(["export", "log-json", str(out)])
+            self.assertEqual(json.loads(out.read_text())["log"], before)
+
+        status = json.loads(self.run_cli(["--json", "log-archive"]).stdout)
+        self.assertEqual(status["archived_events"], len(before) - 2)
+        self.run_cli(["log-archive", "--codec", "zip", "--keep", "1"], expect=1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,123 @@
+import json
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+ROOT = Path(__file__).resolve().parents[1]
+import sys
+
+sys.path.insert(0, str(ROOT / "src"))
+
+from governed_platform.governance import log_index  # noqa: E402
+from governed_platform.governance.log_archive import archive_state_log  # noqa: E402
+from governed_platform.governance.log_index import (  # noqa: E402
+    LogIndex,
+    load_log_index,
+    log_index_path_for,
+    packet_log_entries,
+    sync_log_index,
+)
+from governed_platform.governance.state_store import read_state_document, write_state_document  # noqa: E402
+from substrate_core.audit import provenance_chain  # noqa: E402
+
+
+def make_log(count, start=0):
+    return [
+        {"packet_id": f"P{i % 3}", "event": "noted", "notes": f"n{i}"}
+        for i in range(start, start + count)
+    ]
+
+
+class LogIndexTests(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.path = Path(self.tmpdir.name) / "wbs-state-log-index.ndjson"
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def test_sidecar_appends_only_new_positions(self):
+        entries = make_log(6)
+        sync_log_index(self.path, entries[:4])
+        index = sync_log_index(self.path, entries)
+        self.assertEqual(len(self.path.read_text().splitlines()), 6)
+        self.assertEqual(index.positions_for("P0"), [0, 3])
+
+        loaded, valid = load_log_index(self.path, entries)
+        self.assertEqual(valid, 6)
+        self.assertEqual(loaded.positions, index.positions)
+
+    def test_rewritten_or_rolled_back_log_rebuilds(self):
+        entries = make_log(6)
+        sync_log_index(self.path, entries)
+        index = sync_log_index(self.path, entries[:4])
+        self.assertEqual(index.size, 4)
+        self.assertEqual(len(self.path.read_text().splitlines()), 4)
+
+        entries[3]["packet_id"] = "P9"
+        index = sync_log_index(self.path, entries[:4])
+        self.assertEqual(index.positions_for("P9"), [3])
+        self.assertEqual(index.positions_for("P0"), [0])
+
+    def test_empty_log_keeps_no_sidecar(self):
+        sync_log_index(self.path, [])
+        self.assertFalse(self.path.exists())
+        sync_log_index(self.path, make_log(2))
+        sync_log_index(self.path, [], offset=2)
+        self.assertFalse(self.path.exists())
+
+    def test_torn_tail_line_is_rewritten(self):
+        entries = make_log(3)
+        sync_log_index(self.path, entries)
+        with open(self.path, "a") as f:
+            f.write('[3,"P')
+        log_index._index_cache.clear()
+        self.assertIsNone(load_log_index(self.path, entries)[1])
+        sync_log_index(self.path, entries)
+        self.assertEqual(len(self.path.read_text().splitlines()), 3)
+
+    def test_truncate_drops_positions(self):
+        index = LogIndex.from_entries(make_log(5), start=2)
+        index.truncate(4)
+        self.assertEqual(index.size, 4)
+        self.assertEqual(index.positions, {"P0": [2], "P1": [3]})
+
+
+class StateLogIndexTests(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.state_path = Path(self.tmpdir.name) / "wbs-state.json"
+        write_state_document(self.state_path, {"packets": {}, "log": make_log(9)})
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def test_state_writes_maintain_index(self):
+        sidecar = log_index_path_for(self.state_path)
+        self.assertEqual(len(sidecar.read_text().splitlines()), 9)
+        state = read_state_document(self.state_path)
+        state["log"].extend(make_log(2, start=9))
+        write_state_document(self.state_path, state)
+        self.assertEqual(json.loads(sidecar.read_text().splitlines()[-1])[:2], [10, "P1"])
+
+    def test_packet_lookup_reads_only_indexed_positions(self):
+        state = read_state_document(self.state_path)
+        with mock.patch.object(log_index, "_packet_of", wraps=log_index._packet_of) as scanned:
+            entries = packet_log_entries(state, "P1", self.state_path)
+        self.assertEqual([e["notes"] for e in entries], ["n1", "n4", "n7"])
+        self.assertEqual(scanned.call_count, 0)
+        self.assertEqual(packet_log_entries(state, "P1"), entries)
+
+    def test_index_spans_archive_boundary(self):
+        archive_state_log(self.state_path, keep_last=4)
+        state = read_state_document(self.state_path)
+        self.assertEqual(
+            [e["notes"] for e in packet_log_entries(state, "P2", self.state_path)], ["n5", "n8"]
+        )
+        chain = provenance_chain(state, "P2", self.state_path)
+        self.assertEqual([e["notes"] for e in chain], ["n2", "n5", "n8"])
+
+
+if __name__ == "__main__":
+    unittest.main()
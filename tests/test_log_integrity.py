@@ -10,6 +10,28 @@ ROOT = Path(__file__).resolve().parents[1]
 CLI = [sys.executable, str(ROOT / ".governance" / "wbs_cli.py")]
 WBS = ROOT / ".governance" / "wbs.json"
 STATE = ROOT / ".governance" / "wbs-state.json"
+LOG_INDEX = ROOT / ".governance" / "wbs-state-log-index.ndjson"
+CHECKPOINTS = ROOT / ".governance" / "wbs-state-log-checkpoints.json"
+MERKLE = ROOT / ".governance" / "wbs-state-merkle.ndjson"
+sys.path.insert(0, str(ROOT / "src"))
+
+from governed_platform.governance.log_checkpoints import (  # noqa: E402
+    CHECKPOINT_KEY_ENV,
+    advance_checkpoint,
+    record_checkpoint,
+    verify_log_incremental,
+)
+from governed_platform.governance.log_integrity import (  # noqa: E402
+    CHAIN_HEAD_KEY,
+    LOG_MODE_HASH_CHAIN,
+    append_log_entry,
+    build_log_entry,
+    compute_entry_hash,
+    compute_entry_hashes,
+    next_chain_link,
+    verify_log_integrity,
+)
+from governed_platform.governance.merkle import verify_consistency, verify_inclusion  # noqa: E402
 
 
 def run_cli(args, expect=0):
@@ -38,6 +60,9 @@ class LogIntegrityTests(unittest.TestCase):
             STATE.unlink(missing_ok=True)
         else:
             STATE.write_bytes(cls._state_backup)
+        LOG_INDEX.unlink(missing_ok=True)
+        CHECKPOINTS.unlink(missing_ok=True)
+        MERKLE.unlink(missing_ok=True)
 
     def setUp(self):
         STATE.unlink(missing_ok=True)
@@ -91,6 +116,196 @@ class LogIntegrityTests(unittest.TestCase):
         self.assertFalse(result["valid"])
         self.assertTrue(any("hash mismatch" in issue for issue in result["issues"]))
 
+    def test_cli_transitions_persist_chain_head(self):
+        run_cli(["log-mode", "hash-chain"])
+        run_cli(["claim", "A", "op"])
+        run_cli(["note", "A", "op", "progress"])
+
+        state = json.loads(STATE.read_text())
+        head = state[CHAIN_HEAD_KEY]
+        self.assertEqual(head["position"], len(state["log"]))
+        self.assertEqual(head["index"], 2)
+        self.assertEqual(head["hash"], state["log"][-1]["hash"])
+
+    def test_verify_log_resumes_from_checkpoint_and_full_mode_audits_everything(self):
+        run_cli(["log-mode", "hash-chain"])
+        run_cli(["claim", "A", "op"])
+        first = json.loads(run_cli(["--json", "verify-log"]).stdout)
+        self.assertEqual(first["verified_from"], 0)
+        run_cli(["note", "A", "op", "more"])
+
+        second = json.loads(run_cli(["--json", "verify-log"]).stdout)
+        self.assertTrue(second["valid"])
+        self.assertEqual(second["verified_from"], 1)
+        self.assertEqual(second["hashed_events"], 2)
+
+        full = json.loads(run_cli(["--json", "verify-log", "--full"]).stdout)
+        self.assertTrue(full["valid"])
+        self.assertEqual(full["verified_from"], 0)
+
+    def test_log_proof_commands_return_verifiable_proofs(self):
+        run_cli(["log-mode", "hash-chain"])
+        run_cli(["claim", "A", "op"])
+        run_cli(["note", "A", "op", "one"])
+        run_cli(["note", "A", "op", "two"])
+
+        state = json.loads(STATE.read_text())
+        self.assertEqual(state["log_merkle"]["size"], len(state["log"]))
+        event_id = state["log"][-2]["event_id"]
+        proof = json.loads(run_cli(["--json", "log-proof", event_id]).stdout)
+        self.assertEqual(proof["root"], state["log_merkle"]["root"])
+        self.assertTrue(
+            verify_inclusion(
+                proof["leaf"], proof["position"], proof["tree_size"], proof["proof"], proof["root"]
+            )
+        )
+
+        consistency = json.loads(run_cli(["--json", "log-consistency", "2"]).stdout)
+        self.assertTrue(
+            verify_consistency(
+                2,
+                consistency["second_size"],
+                consistency["first_root"],
+                consistency["second_root"],
+                consistency["proof"],
+            )
+        )
+        run_cli(["log-proof", "evt-99999999"], expect=1)
+
+
+def append_hashed(state, notes):
+    prev_hash, hash_index = next_chain_link(state)
+    entry = build_log_entry(
+        packet_id="A",
+        event="noted",
+        agent="op",
+        notes=notes,
+        timestamp="2026-01-01T00:00:00",
+        mode=LOG_MODE_HASH_CHAIN,
+        previous_hash=prev_hash,
+        hash_index=hash_index,
+    )
+    return append_log_entry(state, entry)
+
+
+class ChainHeadTests(unittest.TestCase):
+    def _append(self, state, notes):
+        return append_hashed(state, notes)
+
+    def test_cached_head_links_appends_without_rescanning(self):
+        state = {"log": []}
+        for i in range(3):
+            self._append(state, f"n{i}")
+        self.assertEqual(state[CHAIN_HEAD_KEY]["index"], 3)
+
+        # A poisoned older entry is never read while the head agrees with the tail.
+        state["log"][0] = "not-an-entry"
+        entry = self._append(state, "n3")
+        self.assertEqual(entry["event_id"], "evt-00000004")
+        self.assertEqual(entry["prev_hash"], state["log"][2]["hash"])
+
+    def test_head_disagreeing_with_tail_is_rebuilt(self):
+        state = {"log": []}
+        for i in range(2):
+            self._append(state, f"n{i}")
+        # Appended by a writer that does not maintain the head.
+        state["log"].append(
+            {"packet_id": "A", "event": "noted", "agent": "op", "timestamp": "t", "notes": "plain"}
+        )
+        state[CHAIN_HEAD_KEY]["hash"] = "stale"
+
+        self._append(state, "n2")
+        valid, issues = verify_log_integrity(state["log"])
+        self.assertTrue(valid, issues)
+        self.assertEqual(state[CHAIN_HEAD_KEY]["position"], 4)
+        self.assertEqual(state[CHAIN_HEAD_KEY]["hash_position"], 3)
+
+
+class IncrementalVerificationTests(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.path = Path(self.tmpdir.name) / "wbs-state-log-checkpoints.json"
+        self.entries = []
+        self._extend(3)
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+        os.environ.pop(CHECKPOINT_KEY_ENV, None)
+
+    def _extend(self, count):
+        state = {"log": self.entries}
+        for _ in range(count):
+            append_hashed(state, f"n{len(self.entries)}")
+
+    def test_only_entries_after_checkpoint_are_rehashed(self):
+        record_checkpoint(self.path, advance_checkpoint(None, self.entries))
+        self._extend(2)
+        # Tampering before the checkpoint anchor is only caught by a full audit.
+        self.entries[0]["notes"] = "tampered"
+
+        result = verify_log_incremental(
+            self.entries, json.loads(self.path.read_text())["checkpoints"]
+        )
+        self.assertTrue(result["valid"], result["issues"])
+        self.assertEqual(result["verified_from"], 3)
+        self.assertEqual(result["head"]["index"], 5)
+        self.assertFalse(verify_log_integrity(self.entries)[0])
+
+    def test_rewritten_anchor_invalidates_checkpoint(self):
+        record_checkpoint(self.path, advance_checkpoint(None, self.entries))
+        self.entries[2]["notes"] = "tampered"
+        result = verify_log_incremental(
+            self.entries, json.loads(self.path.read_text())["checkpoints"]
+        )
+        self.assertFalse(result["valid"])
+        self.assertEqual(result["verified_from"], 0)
+        self.assertTrue(any("no longer matches" in issue for issue in result["issues"]))
+
+    def test_unsigned_checkpoints_are_ignored_when_key_configured(self):
+        record_checkpoint(self.path, advance_checkpoint(None, self.entries))
+        os.environ[CHECKPOINT_KEY_ENV] = "secret"
+        result = verify_log_incremental(
+            self.entries, json.loads(self.path.read_text())["checkpoints"]
+        )
+        self.assertTrue(result["valid"])
+        self.assertEqual(result["verified_from"], 0)
+        self.assertEqual(result["ignored_checkpoints"], 1)
+
+        record_checkpoint(self.path, advance_checkpoint(None, self.entries + [{"packet_id": "A"}]))
+        signed = json.loads(self.path.read_text())["checkpoints"][-1]
+        self.assertIn("signature", signed)
+
+
+class ParallelVerificationTests(unittest.TestCase):
+    def setUp(self):
+        state = {"log": []}
+        for i in range(40):
+            append_hashed(state, f"n{i}")
+        self.entries = state["log"]
+
+    def test_chunked_hashes_match_single_process(self):
+        self.entries.insert(5, {"packet_id": "A", "event": "noted", "notes": "plain"})
+        digests = compute_entry_hashes(self.entries, workers=2, chunk_size=7)
+        self.assertIsNone(digests[5])
+        self.assertEqual(digests[0], compute_entry_hash(self.entries[0]))
+        self.assertEqual(digests, compute_entry_hashes(self.entries))
+
+    def test_parallel_verification_reports_same_issues(self):
+        self.entries[3]["notes"] = "tampered"
+        self.entries[17]["prev_hash"] = "bogus"
+        del self.entries[30]
+
+        import governed_platform.governance.log_integrity as log_integrity
+
+        original = log_integrity.PARALLEL_VERIFY_MIN_ENTRIES
+        log_integrity.PARALLEL_VERIFY_MIN_ENTRIES = 1
+        try:
+            parallel = verify_log_integrity(self.entries, workers=2)
+        finally:
+            log_integrity.PARALLEL_VERIFY_MIN_ENTRIES = original
+        self.assertFalse(parallel[0])
+        self.assertEqual(parallel, verify_log_integrity(self.entries))
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,217 @@
+import json
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+ROOT = Path(__file__).resolve().parents[1]
+import sys
+
+sys.path.insert(0, str(ROOT / "src"))
+
+from governed_platform.governance import state_store
+from governed_platform.governance.engine import GovernanceEngine
+from governed_platform.governance.log_integrity import (
+    LOG_MODE_HASH_CHAIN,
+    build_log_entry,
+    verify_log_integrity,
+)
+from governed_platform.governance.log_segments import (
+    log_offset,
+    restore_log_segments,
+    segment_dir_for,
+    snapshot_log_segments,
+)
+from governed_platform.governance.state_manager import StateManager
+from substrate_core.audit import provenance_chain
+from substrate_core.engine import PacketEngine
+from substrate_core.state import ActorContext
+from substrate_core.storage import FileStorage
+
+
+class SegmentedLogStorageTests(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.state_path = Path(self.tmpdir.name) / "wbs-state.json"
+        self.storage = FileStorage(self.state_path)
+        state = self.storage.read_state()
+        state["log_storage"] = "segmented"
+        state["log_segments"] = {"max_entries": 3, "segments": []}
+        self.storage.write_state(state)
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def _append(self, count, mode="plain"):
+        for _ in range(count):
+            state = self.storage.read_state()
+            hashed = [e for e in state["log"] if e.get("hash")]
+            entry = build_log_entry(
+                packet_id="A",
+                event="noted",
+                agent="codex",
+                notes=f"n{len(state['log'])}",
+                timestamp="2026-01-01T00:00:00",
+                mode=mode,
+                previous_hash=hashed[-1]["hash"] if hashed else "",
+                hash_index=len(hashed) + 1,
+            )
+            state["log"].append(entry)
+            self.storage.write_state(state)
+
+    def test_entries_rotate_across_segments_and_stay_out_of_state_document(self):
+        self._append(7)
+        doc = json.loads(self.state_path.read_text())
+        self.assertNotIn("log", doc)
+        self.assertEqual([s["count"] for s in doc["log_segments"]["segments"]], [3, 3, 1])
+        self.assertEqual(len(list(segment_dir_for(self.state_path).glob("*.ndjson"))), 3)
+
+        state = self.storage.read_state()
+        self.assertEqual([e["notes"] for e in state["log"]], [f"n{i}" for i in range(7)])
+        self.assertEqual(len(StateManager(self.state_path).load()["log"]), 7)
+
+    def test_hash_chain_verifies_across_segment_boundaries(self):
+        state = self.storage.read_state()
+        state["log_integrity_mode"] = LOG_MODE_HASH_CHAIN
+        self.storage.write_state(state)
+        self._append(5, mode=LOG_MODE_HASH_CHAIN)
+
+        state = self.storage.read_state()
+        valid, issues = verify_log_integrity(state["log"])
+        self.assertTrue(valid, issues)
+        self.assertEqual(len(provenance_chain(state, "A")), 5)
+
+    def test_uncommitted_segment_tail_is_ignored_and_truncated(self):
+        self._append(2)
+        snapshot = self.state_path.read_bytes()
+        self._append(1)
+        # Roll the state document back, as strict git rollback does.
+        self.state_path.write_bytes(snapshot)
+
+        state = self.storage.read_state()
+        self.assertEqual(len(state["log"]), 2)
+        self._append(1)
+        state = self.storage.read_state()
+        self.assertEqual([e["notes"] for e in state["log"]], ["n0", "n1", "n2"])
+        active = segment_dir_for(self.state_path) / "segment-000001.ndjson"
+        self.assertEqual(len(active.read_text().splitlines()), 3)
+
+    def test_in_place_edit_of_active_segment_is_persisted(self):
+        self._append(2)
+        state = self.storage.read_state()
+        state["log"][-1]["git_commit"] = "abc123"
+        self.storage.write_state(state)
+        self.assertEqual(self.storage.read_state()["log"][-1]["git_commit"], "abc123")
+
+    def test_switching_back_to_inline_restores_embedded_log(self):
+        self._append(4)
+        state = self.storage.read_state()
+        state["log_storage"] = "inline"
+        self.storage.write_state(state)
+        doc = json.loads(self.state_path.read_text())
+        self.assertEqual(len(doc["log"]), 4)
+        self.assertNotIn("log_segments", doc)
+
+    def _files(self):
+        return sorted(p.name for p in segment_dir_for(self.state_path).glob("*.ndjson"))
+
+    def test_rewrite_uses_new_segment_names_and_keeps_committed_files(self):
+        self._append(7)
+        before = {
+            name: (segment_dir_for(self.state_path) / name).read_bytes() for name in self._files()
+        }
+        committed = self.state_path.read_bytes()
+
+        state = self.storage.read_state()
+        state["log"] = state["log"][:4]
+        with mock.patch.object(state_store, "replace_json", side_effect=OSError("disk full")):
+            with self.assertRaises(OSError):
+                self.storage.write_state(state)
+        for name, data in before.items():
+            self.assertEqual((segment_dir_for(self.state_path) / name).read_bytes(), data)
+        self.assertEqual(self.state_path.read_bytes(), committed)
+        self.assertEqual(len(self.storage.read_state()["log"]), 7)
+
+        state = self.storage.read_state()
+        state["log"] = state["log"][:4]
+        self.storage.write_state(state)
+        doc = json.loads(self.state_path.read_text())
+        names = [seg["name"] for seg in doc["log_segments"]["segments"]]
+        self.assertTrue(set(names).isdisjoint(before))
+        self.assertEqual(
+            [e["notes"] for e in self.storage.read_state()["log"]], ["n0", "n1", "n2", "n3"]
+        )
+        # Superseded files outlive the write that replaced them by one revision.
+        self.assertTrue(set(before) <= set(self._files()))
+        self._append(1)
+        self.assertEqual(self._files(), sorted(names))
+
+    def test_writers_only_load_the_active_segment(self):
+        state = self.storage.read_state()
+        state["log_integrity_mode"] = LOG_MODE_HASH_CHAIN
+        self.storage.write_state(state)
+        definition = {
+            "packets": [{"id": "A", "wbs_ref": "1.1", "title": "A", "area_id": "1.0"}],
+            "dependencies": {},
+        }
+        sm = StateManager(self.state_path)
+        state = sm.load()
+        state["packets"]["A"] = {"status": "pending", "assigned_to": None, "notes": None}
+        sm.save(state)
+        engine = GovernanceEngine(definition, sm)
+        engine.claim("A", "codex")
+        for i in range(6):
+            self.assertTrue(engine.note("A", "codex", f"note {i}")[0])
+
+        partial = sm.load_for_update()
+        self.assertEqual(log_offset(partial), 6)
+        self.assertEqual(len(partial["log"]), 1)
+        first = segment_dir_for(self.state_path) / "segment-000001.ndjson"
+        first.write_text("not json\n" * 3)  # sealed segments are not read on the write path
+        self.assertTrue(engine.done("A", "codex", "finished")[0])
+
+        first.unlink()
+        state = sm.load_for_update()
+        self.assertEqual(state["log"][-1]["event"], "completed")
+        self.assertEqual(state["log"][-1]["event_id"], "evt-00000008")
+
+    def test_migrated_plain_legacy_log_supports_transitions(self):
+        legacy = {
+            "packets": {"A": {"status": "pending", "assigned_to": None, "notes": None}},
+            "log": [
+                {"packet_id": "A", "event": "noted", "agent": "codex", "notes": f"n{i}"}
+                for i in range(7)
+            ],
+        }
+        self.state_path.write_text(json.dumps(legacy))
+        state = self.storage.read_state()
+        state["log_storage"] = "segmented"
+        state["log_segments"] = {"max_entries": 3, "segments": []}
+        self.storage.write_state(state)
+        self.assertEqual(
+            len(json.loads(self.state_path.read_text())["log_segments"]["segments"]), 3
+        )
+
+        engine = PacketEngine(
+            self.storage, {"packets": [{"id": "A", "title": "A", "scope": "s"}], "dependencies": {}}
+        )
+        actor = ActorContext(user_id="dev", role="developer", source="api")
+        self.assertTrue(engine.claim("A", actor).ok)
+        self.assertTrue(engine.done("A", actor, "evidence").ok)
+        log = self.storage.read_state()["log"]
+        self.assertEqual(len(log), 9)
+        self.assertEqual([e["event"] for e in log[-2:]], ["started", "completed"])
+
+    def test_snapshot_restore_undoes_segment_writes(self):
+        self._append(3)
+        snapshot = (self.state_path.read_bytes(), snapshot_log_segments(self.state_path))
+        self._append(2)
+        self.assertEqual(len(self._files()), 2)
+        self.state_path.write_bytes(snapshot[0])
+        restore_log_segments(self.state_path, snapshot[1])
+        self.assertEqual(self._files(), ["segment-000001.ndjson"])
+        self.assertEqual(len(self.storage.read_state()["log"]), 3)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,160 @@
+import hashlib
+import json
+import tempfile
+import unittest
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+import sys
+
+sys.path.insert(0, str(ROOT / "src"))
+
+from governed_platform.governance.log_integrity import (
+    LOG_MODE_HASH_CHAIN,
+    append_log_entry,
+    build_log_entry,
+    next_chain_link,
+)
+from governed_platform.governance.merkle import (
+    EMPTY_ROOT,
+    MERKLE_KEY,
+    MerkleTree,
+    inclusion_proof_for_event,
+    leaf_hash,
+    load_merkle_tree,
+    merkle_path_for,
+    node_hash,
+    sync_merkle_tree,
+    verify_consistency,
+    verify_inclusion,
+)
+from substrate_core.storage import FileStorage
+
+
+def reference_root(leaves):
+    """Straight RFC 6962 MTH, recomputed from the leaves."""
+    if not leaves:
+        return hashlib.sha256(b"").hexdigest()
+    if len(leaves) == 1:
+        return leaves[0]
+    k = 1
+    while k * 2 < len(leaves):
+        k *= 2
+    return node_hash(reference_root(leaves[:k]), reference_root(leaves[k:]))
+
+
+def hashed_log(count):
+    state = {"log": []}
+    for i in range(count):
+        prev_hash, hash_index = next_chain_link(state)
+        append_log_entry(
+            state,
+            build_log_entry(
+                packet_id="A",
+                event="noted",
+                agent="op",
+                notes=f"n{i}",
+                timestamp="2026-01-01T00:00:00",
+                mode=LOG_MODE_HASH_CHAIN,
+                previous_hash=prev_hash,
+                hash_index=hash_index,
+            ),
+        )
+    return state["log"]
+
+
+class MerkleTreeTests(unittest.TestCase):
+    def setUp(self):
+        self.entries = hashed_log(21)
+        self.tree = MerkleTree.from_entries(self.entries)
+        self.leaves = [leaf_hash(entry) for entry in self.entries]
+
+    def test_roots_match_reference_for_every_size(self):
+        self.assertEqual(self.tree.root(0), EMPTY_ROOT)
+        for size in range(1, 22):
+            self.assertEqual(self.tree.root(size), reference_root(self.leaves[:size]))
+
+    def test_inclusion_proofs_verify_and_stay_logarithmic(self):
+        for size in range(1, 22):
+            root = self.tree.root(size)
+            for index in range(size):
+                proof = self.tree.inclusion_proof(index, size)
+                self.assertLessEqual(len(proof), (size - 1).bit_length())
+                self.assertTrue(verify_inclusion(self.leaves[index], index, size, proof, root))
+        proof = self.tree.inclusion_proof(4)
+        self.assertFalse(verify_inclusion(self.leaves[5], 4, 21, proof, self.tree.root()))
+
+    def test_consistency_proofs_verify_between_sizes(self):
+        for second in range(1, 22):
+            for first in range(0, second + 1):
+                proof = self.tree.consistency_proof(first, second)
+                self.assertTrue(
+                    verify_consistency(
+                        first, second, self.tree.root(first), self.tree.root(second), proof
+                    ),
+                    (first, second),
+                )
+        forked = MerkleTree.from_entries(self.entries[:6] + hashed_log(3))
+        proof = self.tree.consistency_proof(7, 21)
+        self.assertFalse(verify_consistency(7, 21, forked.root(7), self.tree.root(), proof))
+
+    def test_event_proof_locates_entry_by_event_id(self):
+        payload = inclusion_proof_for_event(self.tree, self.entries, "evt-00000009")
+        self.assertEqual(payload["position"], 8)
+        self.assertTrue(
+            verify_inclusion(
+                payload["leaf"],
+                payload["position"],
+                payload["tree_size"],
+                payload["proof"],
+                payload["root"],
+            )
+        )
+        with self.assertRaises(KeyError):
+            inclusion_proof_for_event(self.tree, self.entries, "evt-99999999")
+
+
+class MerkleSidecarTests(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.path = Path(self.tmpdir.name) / "wbs-state-merkle.ndjson"
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def test_sidecar_appends_and_reloads_without_rehashing(self):
+        entries = hashed_log(12)
+        sync_merkle_tree(self.path, entries[:5])
+        tree = sync_merkle_tree(self.path, entries)
+        self.assertEqual(len(self.path.read_text().splitlines()), 12)
+
+        loaded, valid = load_merkle_tree(self.path, entries)
+        self.assertEqual(valid, 12)
+        self.assertEqual(loaded.levels, tree.levels)
+
+    def test_rolled_back_or_rewritten_log_rewrites_sidecar(self):
+        entries = hashed_log(8)
+        sync_merkle_tree(self.path, entries)
+        tree = sync_merkle_tree(self.path, entries[:5])
+        self.assertEqual(len(self.path.read_text().splitlines()), 5)
+        self.assertEqual(tree.root(), MerkleTree.from_entries(entries[:5]).root())
+
+        entries[4]["notes"] = "rewritten"
+        tree = sync_merkle_tree(self.path, entries[:5])
+        self.assertEqual(tree.root(), MerkleTree.from_entries(entries[:5]).root())
+
+    def test_hash_chain_state_writes_stamp_root(self):
+        storage = FileStorage(Path(self.tmpdir.name) / "wbs-state.json")
+        state = storage.read_state()
+        state["log_integrity_mode"] = LOG_MODE_HASH_CHAIN
+        state["log"] = hashed_log(3)
+        storage.write_state(state)
+
+        doc = json.loads((Path(self.tmpdir.name) / "wbs-state.json").read_text())
+        self.assertEqual(doc[MERKLE_KEY]["size"], 3)
+        self.assertEqual(doc[MERKLE_KEY]["root"], MerkleTree.from_entries(state["log"]).root())
+        self.assertTrue(merkle_path_for(Path(self.tmpdir.name) / "wbs-state.json").exists())
+
+
+if __name__ == "__main__":
+    unittest.main()
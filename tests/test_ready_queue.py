@@ -0,0 +1,223 @@
+import json
+import random
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+ROOT = Path(__file__).resolve().parents[1]
+import sys
+
+sys.path.insert(0, str(ROOT / "src"))
+
+from governed_platform.governance import ready_queue  # noqa: E402
+from governed_platform.governance.dependency_index import dependency_index  # noqa: E402
+from governed_platform.governance.dispatch import dispatch_key, iter_heap  # noqa: E402
+from governed_platform.governance.engine import GovernanceEngine  # noqa: E402
+from governed_platform.governance.ready_queue import (  # noqa: E402
+    READY_QUEUE_KEY,
+    ReadyQueue,
+    dispatch_order,
+    ready_packet_ids,
+    sync_ready_queue,
+)
+from governed_platform.governance.state_manager import StateManager  # noqa: E402
+from governed_platform.governance.supervisor import DeterministicSupervisor, SupervisorPolicy  # noqa: E402
+from substrate_core.storage import SqliteStorage  # noqa: E402
+
+
+def scan_ready(definition, packets):
+    deps = definition.get("dependencies", {})
+    out = []
+    for pkt in definition["packets"]:
+        status = packets.get(pkt["id"], {}).get("status", "pending")
+        if status == "pending" and all(
+            packets.get(d, {}).get("status") == "done" for d in deps.get(pkt["id"], [])
+        ):
+            out.append(pkt["id"])
+    return out
+
+
+class ReadyQueueTests(unittest.TestCase):
+    def test_incremental_updates_match_full_scan(self):
+        rng = random.Random(11)
+        ids = [f"P{i}" for i in range(40)]
+        deps = {}
+        for i, pid in enumerate(ids[1:], start=1):
+            deps[pid] = rng.sample(ids[:i], min(i, rng.randint(0, 3)))
+        definition = {"packets": [{"id": pid} for pid in ids], "dependencies": deps}
+        index = dependency_index(definition)
+        packets = {pid: {"status": "pending"} for pid in ids}
+        queue = ReadyQueue.build(index, packets)
+        for _ in range(400):
+            pid = rng.choice(ids)
+            packets[pid]["status"] = rng.choice(
+                ["pending", "in_progress", "done", "failed", "blocked"]
+            )
+            queue.set_status(pid, packets[pid]["status"])
+            self.assertEqual(queue.ready_ids(), scan_ready(definition, packets))
+
+    def test_sync_only_touches_changed_packets(self):
+        definition = {
+            "packets": [{"id": p} for p in "ABCD"],
+            "dependencies": {"B": ["A"], "C": ["A", "B"]},
+        }
+        index = dependency_index(definition)
+        state = {"packets": {p: {"status": "pending"} for p in "ABCD"}}
+        self.assertEqual(sync_ready_queue(state, index).ready_ids(), ["A", "D"])
+
+        state["packets"]["A"]["status"] = "done"
+        with mock.patch.object(ReadyQueue, "build") as rebuilt:
+            queue = sync_ready_queue(state, index)
+        rebuilt.assert_not_called()
+        self.assertEqual(queue.ready_ids(), ["B", "D"])
+        self.assertEqual(state[READY_QUEUE_KEY]["waiting"], {"C": 1})
+
+    def test_dependency_edit_recounts_edited_packet(self):
+        definition = {"packets": [{"id": p} for p in "AB"], "dependencies": {}}
+        state = {"packets": {"A": {"status": "pending"}, "B": {"status": "pending"}}}
+        previous = dependency_index(definition)
+        sync_ready_queue(state, previous)
+
+        definition = {"packets": definition["packets"], "dependencies": {"B": ["A"]}}
+        queue = sync_ready_queue(state, dependency_index(definition), previous.fingerprint, ["B"])
+        self.assertEqual(queue.ready_ids(), ["A"])
+        self.assertEqual(
+            state[READY_QUEUE_KEY]["definition"], dependency_index(definition).fingerprint
+        )
+
+
+class DispatchOrderTests(unittest.TestCase):
+    def setUp(self):
+        # A -> B -> C -> D is the critical path; F hangs off A, E is independent.
+        self.definition = {
+            "packets": [{"id": p} for p in "ABCDEF"],
+            "dependencies": {"B": ["A"], "C": ["B"], "D": ["C"], "F": ["A"]},
+        }
+
+    def test_slack_and_fan_out(self):
+        index = dependency_index(self.definition)
+        self.assertEqual(
+            {p: index.slack(p) for p in "ABCDEF"}, {"A": 0, "B": 0, "C": 0, "D": 0, "E": 3, "F": 2}
+        )
+        self.assertEqual(index.fan_out("A"), 4)
+        self.assertEqual(index.fan_out("E"), 0)
+
+    def test_priority_then_slack_then_fan_out(self):
+        state = {"packets": {p: {"status": "pending"} for p in "ABCDEF"}}
+        state["packets"]["A"]["status"] = "done"
+        index = dependency_index(self.definition)
+        self.assertEqual(list(dispatch_order(state, index)), ["B", "F", "E"])
+
+        self.definition["packets"][4]["priority"] = "HIGH"
+        index = dependency_index(self.definition)
+        self.assertEqual(list(dispatch_order(state, index)), ["E", "B", "F"])
+
+    def test_heap_walk_matches_sorted_keys(self):
+        rng = random.Random(5)
+        ids = [f"P{i}" for i in range(60)]
+        definition = {
+            "packets": [
+                {"id": pid, "priority": rng.choice(["LOW", "MEDIUM", "HIGH", "CRITICAL"])}
+                for pid in ids
+            ],
+            "dependencies": {
+                pid: rng.sample(ids[:i], min(i, 2)) for i, pid in enumerate(ids) if i % 3
+            },
+        }
+        index = dependency_index(definition)
+        queue = ReadyQueue.build(index, {pid: {"status": "pending"} for pid in ids})
+        for pid in rng.sample(ids, 30):
+            queue.set_status(pid, "done")
+            expected = [entry[-1] for entry in sorted(dispatch_key(index, p) for p in queue.ready)]
+            self.assertEqual(list(queue.dispatch_ids()), expected)
+        self.assertEqual(list(iter_heap(queue.to_dict()["dispatch"])), expected)
+
+
+class StoredReadyQueueTests(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.state_path = Path(self.tmpdir.name) / "state.json"
+        self.definition = {
+            "packets": [
+                {"id": p, "wbs_ref": f"1.{i}", "title": p, "area_id": "1.0"}
+                for i, p in enumerate("ABC")
+            ],
+            "dependencies": {"B": ["A"], "C": ["B"]},
+        }
+        self.sm = StateManager(self.state_path)
+        state = self.sm.load()
+        for p in "ABC":
+            state["packets"][p] = {
+                "status": "pending",
+                "assigned_to": None,
+                "started_at": None,
+                "completed_at": None,
+                "notes": None,
+            }
+        self.sm.save(state)
+        self.engine = GovernanceEngine(self.definition, self.sm)
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def test_engine_transitions_keep_stored_queue_current(self):
+        self.engine.claim("A", "agent")
+        self.engine.done("A", "agent", "ok")
+        raw = json.loads(self.state_path.read_text())
+        self.assertEqual(raw[READY_QUEUE_KEY]["ready"], ["B"])
+        self.assertEqual(raw[READY_QUEUE_KEY]["revision"], raw["revision"])
+
+        with mock.patch.object(ready_queue.ReadyQueue, "build") as rebuilt:
+            self.assertEqual([p["id"] for p in self.engine.ready()["ready"]], ["B"])
+        rebuilt.assert_not_called()
+
+        self.engine.claim("B", "agent")
+        self.engine.fail("B", "agent", "broken")
+        self.assertEqual(self.engine.ready()["ready"], [])
+
+    def test_next_packets_skips_packets_agent_cannot_claim(self):
+        registry = Path(self.tmpdir.name) / "agents.json"
+        registry.write_text(
+            json.dumps(
+                {
+                    "enforcement_mode": "strict",
+                    "capability_taxonomy": ["code", "docs"],
+                    "agents": [{"id": "writer", "capabilities": ["docs"]}],
+                }
+            )
+        )
+        self.definition["dependencies"] = {}
+        self.definition["packets"][0].update(priority="CRITICAL", required_capabilities=["code"])
+        engine = GovernanceEngine(
+            self.definition,
+            self.sm,
+            DeterministicSupervisor(SupervisorPolicy(agent_registry_path=registry)),
+        )
+        self.assertEqual([p["id"] for p in engine.next_packets()["next"]], ["A"])
+        picked = engine.next_packets(agent="writer", limit=5)["next"]
+        self.assertEqual([p["id"] for p in picked], ["B", "C"])
+        self.assertEqual(picked[0]["priority"], "MEDIUM")
+
+    def test_write_outside_engine_drops_stale_queue(self):
+        self.engine.claim("A", "agent")
+        state = self.sm.load()
+        state["packets"]["A"]["status"] = "done"
+        self.sm.save(state)
+        raw = json.loads(self.state_path.read_text())
+        self.assertNotIn(READY_QUEUE_KEY, raw)
+        self.assertEqual(ready_packet_ids(raw, self.engine.graph), ["B"])
+
+    def test_sqlite_backend_stamps_queue(self):
+        storage = SqliteStorage(Path(self.tmpdir.name) / "state.sqlite")
+        state = storage.read_state()
+        state["packets"] = {p: {"status": "pending"} for p in "ABC"}
+        sync_ready_queue(state, self.engine.graph)
+        storage.write_state(state)
+        stored = storage.read_state()
+        self.assertEqual(stored[READY_QUEUE_KEY]["revision"], stored["revision"])
+        self.assertEqual(ready_packet_ids(stored, self.engine.graph), ["A"])
+
+
+if __name__ == "__main__":
+    unittest.main()
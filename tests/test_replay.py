@@ -0,0 +1,131 @@
+import json
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+ROOT = Path(__file__).resolve().parents[1]
+import sys
+
+sys.path.insert(0, str(ROOT / "src"))
+
+from governed_platform.governance.log_archive import archive_state_log  # noqa: E402
+from substrate_core.engine import PacketEngine  # noqa: E402
+from substrate_core.replay import REPLAY_CHECKPOINT_KEY, ReplayEngine, fold_entry, initial_packets  # noqa: E402
+from substrate_core.state import ActorContext  # noqa: E402
+from substrate_core.storage import FileStorage  # noqa: E402
+
+
+class FoldTests(unittest.TestCase):
+    def test_fold_tracks_lifecycle_fields(self):
+        packets = initial_packets({"packets": [{"id": "A"}, {"id": "B"}]})
+        fold_entry(
+            packets, {"packet_id": "A", "event": "started", "agent": "dev", "timestamp": "t1"}
+        )
+        fold_entry(packets, {"packet_id": "A", "event": "handover", "agent": "dev"})
+        fold_entry(
+            packets, {"packet_id": "A", "event": "resumed", "agent": "ops", "timestamp": "t2"}
+        )
+        fold_entry(
+            packets, {"packet_id": "A", "event": "completed", "notes": "shipped", "timestamp": "t3"}
+        )
+        fold_entry(packets, {"packet_id": "B", "event": "blocked", "notes": "Blocked by A"})
+        self.assertFalse(fold_entry(packets, {"packet_id": "AREA-1", "event": "area_closed"}))
+
+        self.assertEqual(
+            packets["A"],
+            {
+                "status": "done",
+                "assigned_to": "ops",
+                "started_at": "t1",
+                "completed_at": "t3",
+                "notes": "shipped",
+            },
+        )
+        self.assertEqual(packets["B"]["status"], "blocked")
+        self.assertIsNone(packets["B"]["notes"])
+        self.assertNotIn("AREA-1", packets)
+
+
+class AsOfTests(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.state_path = Path(self.tmpdir.name) / "wbs-state.json"
+        self.storage = FileStorage(self.state_path)
+        self.definition = {
+            "packets": [{"id": f"P{i}", "title": f"P{i}"} for i in range(6)],
+            "dependencies": {},
+        }
+        self.engine = PacketEngine(
+            storage=self.storage, definition=self.definition, replay_interval=4
+        )
+        self.actor = ActorContext(user_id="dev", role="developer", source="api")
+        state = self.storage.read_state()
+        state["log_integrity_mode"] = "hash_chain"
+        self.storage.write_state(state)
+        for i in range(6):
+            self.engine.claim(f"P{i}", self.actor)
+            self.engine.done(f"P{i}", self.actor, f"done {i}")
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def _log(self):
+        return self.storage.read_state()["log"]
+
+    def test_as_of_event_replays_from_nearest_checkpoint(self):
+        event_id = self._log()[6]["event_id"]
+        first = self.engine.as_of(event_id=event_id)
+        self.assertTrue(first.ok, first.message)
+        self.assertEqual(first.payload["position"], 7)
+        self.assertEqual(first.payload["packets"]["P3"]["status"], "in_progress")
+        self.assertEqual(first.payload["packets"]["P2"]["status"], "done")
+        self.assertEqual(first.payload["packets"]["P4"]["status"], "pending")
+
+        self.engine.as_of(event_id=self._log()[-1]["event_id"])
+        positions = [cp["position"] for cp in self.storage.read_state()[REPLAY_CHECKPOINT_KEY]]
+        self.assertEqual(positions, [4, 8, 12])
+
+        again = self.engine.as_of(event_id=event_id, packet_id="P3")
+        self.assertEqual(again.payload["checkpoint"], 4)
+        self.assertEqual(again.payload["replayed"], 3)
+        self.assertEqual(again.payload["packets"], {"P3": first.payload["packets"]["P3"]})
+
+    def test_as_of_timestamp_matches_current_state_at_end(self):
+        log = self._log()
+        result = self.engine.as_of(timestamp=log[-1]["timestamp"])
+        current = self.storage.read_state()["packets"]
+        for pid, pkt in result.payload["packets"].items():
+            self.assertEqual(pkt["status"], current[pid]["status"])
+            self.assertEqual(pkt["notes"], current[pid]["notes"])
+        early = self.engine.as_of(timestamp="2000-01-01T00:00:00")
+        self.assertEqual(early.payload["position"], 0)
+        self.assertFalse(self.engine.as_of(timestamp="yesterday").ok)
+        self.assertFalse(self.engine.as_of(event_id="evt-99999999").ok)
+
+    def test_rewritten_history_invalidates_checkpoints(self):
+        self.engine.as_of(event_id=self._log()[-1]["event_id"])
+        state = self.storage.read_state()
+        state["log"][7]["notes"] = "rewritten"
+        self.storage.write_state(state)
+        replay = ReplayEngine(self.storage, self.definition, interval=4)
+        self.assertEqual(
+            [cp["position"] for cp in replay.checkpoints(self.storage.read_state())], [4]
+        )
+
+    def test_replay_reads_archived_segments(self):
+        target = self._log()[8]["event_id"]
+        expected = self.engine.as_of(event_id=target).payload["packets"]
+        archive_state_log(self.state_path, keep_last=2)
+        state = self.storage.read_state()
+        state.pop(REPLAY_CHECKPOINT_KEY)
+        self.storage.write_state(state)
+        with mock.patch.object(self.storage, "get_json_blob") as blob_reads:
+            result = self.engine.as_of(event_id=target)
+        self.assertEqual(blob_reads.call_count, 0)
+        self.assertEqual(result.payload["packets"], expected)
+        self.assertEqual(json.loads(self.state_path.read_text())["log_archive"]["entries"], 10)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -10,6 +10,7 @@ ROOT = Path(__file__).resolve().parents[1]
 CLI = [sys.executable, str(ROOT / ".governance" / "wbs_cli.py")]
 WBS = ROOT / ".governance" / "wbs.json"
 STATE = ROOT / ".governance" / "wbs-state.json"
+LOG_INDEX = ROOT / ".governance" / "wbs-state-log-index.ndjson"
 RISK_REGISTER = ROOT / ".governance" / "residual-risk-register.json"
 
 
@@ -39,6 +40,7 @@ class ResidualRiskTests(unittest.TestCase):
             STATE.unlink(missing_ok=True)
         else:
             STATE.write_bytes(cls._state_backup)
+        LOG_INDEX.unlink(missing_ok=True)
         if cls._risk_backup is None:
             RISK_REGISTER.unlink(missing_ok=True)
         else:
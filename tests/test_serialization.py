@@ -0,0 +1,77 @@
+import json
+import tempfile
+import unittest
+import zlib
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+import sys
+
+sys.path.insert(0, str(ROOT / "src"))
+
+from governed_platform.governance.serialization import (
+    STATE_FORMAT_BINARY,
+    STATE_FORMAT_COMPACT,
+    STATE_FORMAT_JSON,
+    STATE_FORMATS,
+    decode_document,
+    detect_format,
+    encode_document,
+)
+from substrate_core.storage import FileStorage
+
+PAYLOAD = {
+    "packets": {
+        "A": {"status": "done", "notes": "café", "attempts": 2, "ok": True, "blocked": None}
+    },
+    "log": [{"packet_id": "A", "event": "started", "ratio": 0.5}],
+}
+
+
+class SerializationTests(unittest.TestCase):
+    def test_every_format_round_trips_and_is_detected(self):
+        for fmt in STATE_FORMATS:
+            data = encode_document(PAYLOAD, fmt)
+            self.assertEqual(detect_format(data), fmt)
+            self.assertEqual(decode_document(data), PAYLOAD)
+
+    def test_pretty_json_matches_previous_layout_and_compact_is_smaller(self):
+        pretty = encode_document(PAYLOAD, STATE_FORMAT_JSON)
+        self.assertEqual(pretty.decode(), json.dumps(PAYLOAD, indent=2) + "\n")
+        self.assertLess(len(encode_document(PAYLOAD, STATE_FORMAT_COMPACT)), len(pretty))
+
+    def test_binary_document_is_compressed_json(self):
+        data = encode_document(PAYLOAD, STATE_FORMAT_BINARY)
+        self.assertEqual(json.loads(zlib.decompress(data[13:])), PAYLOAD)
+
+    def test_truncated_or_foreign_binary_document_is_rejected(self):
+        data = encode_document(PAYLOAD, STATE_FORMAT_BINARY)
+        with self.assertRaises(ValueError):
+            decode_document(data[:-3])
+        with self.assertRaises(ValueError):
+            decode_document(data[:4] + bytes([1]) + data[5:])
+        with self.assertRaises(ValueError):
+            decode_document(data[:13] + b"x" * (len(data) - 13))
+        with self.assertRaises(ValueError):
+            encode_document(PAYLOAD, "yaml")
+
+    def test_file_storage_writes_selected_format(self):
+        with tempfile.TemporaryDirectory() as td:
+            path = Path(td) / "wbs-state.json"
+            storage = FileStorage(path)
+            state = storage.read_state()
+            state["packets"] = dict(PAYLOAD["packets"])
+            state["state_format"] = "binary"
+            storage.write_state(state)
+            self.assertEqual(detect_format(path.read_bytes()), STATE_FORMAT_BINARY)
+            self.assertEqual(storage.read_state()["packets"]["A"]["notes"], "café")
+
+            state = storage.read_state()
+            state["state_format"] = "compact"
+            storage.write_state(state)
+            self.assertEqual(detect_format(path.read_bytes()), STATE_FORMAT_COMPACT)
+            self.assertEqual(json.loads(path.read_text())["state_format"], STATE_FORMAT_COMPACT)
+
+
+if __name__ == "__main__":
+    unittest.main()
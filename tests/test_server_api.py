@@ -21,6 +21,8 @@ from http.server import HTTPServer  # noqa: E402
 CLI = [sys.executable, str(GOV / 'wbs_cli.py')]
 WBS = GOV / 'wbs.json'
 STATE = GOV / 'wbs-state.json'
+LOG_INDEX = GOV / 'wbs-state-log-index.ndjson'
+MERKLE = GOV / 'wbs-state-merkle.ndjson'
 DEFAULT_OPENER = None
 
 
@@ -112,6 +114,8 @@ class ServerApiTests(unittest.TestCase):
             STATE.unlink(missing_ok=True)
         else:
             STATE.write_bytes(cls._state_backup)
+        LOG_INDEX.unlink(missing_ok=True)
+        MERKLE.unlink(missing_ok=True)
 
     def setUp(self):
         STATE.unlink(missing_ok=True)
@@ -274,6 +278,23 @@ class ServerApiTests(unittest.TestCase):
         self.assertTrue(all(d.get('category') == 'root' for d in docs))
         self.assertTrue(any(d.get('path') == 'README.md' for d in docs))
 
+    def test_log_proof_endpoint_returns_inclusion_and_consistency_proofs(self):
+        run_cli(['log-mode', 'hash-chain'])
+        run_cli(['claim', 'A', 'op'])
+        run_cli(['note', 'A', 'op', 'progress'])
+
+        proof = get_json(self.base, '/api/log-proof?event_id=evt-00000001')
+        self.assertTrue(proof['success'])
+        self.assertEqual(proof['position'], 0)
+        self.assertEqual(len(proof['proof']), 1)
+
+        consistency = get_json(self.base, '/api/log-proof?first=1&second=2')
+        self.assertTrue(consistency['success'])
+        self.assertEqual(consistency['second_root'], proof['root'])
+
+        missing = get_json(self.base, '/api/log-proof?event_id=evt-99999999')
+        self.assertFalse(missing['success'])
+
     def test_unknown_api_route_returns_json_404(self):
         status, body = request_json(self.base, '/api/does-not-exist')
         self.assertEqual(status, 404)
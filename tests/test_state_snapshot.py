@@ -0,0 +1,102 @@
+import copy
+import json
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+ROOT = Path(__file__).resolve().parents[1]
+import sys
+
+sys.path.insert(0, str(ROOT / "src"))
+
+from governed_platform.governance import state_snapshot as snapshot_module  # noqa: E402
+from governed_platform.governance.engine import GovernanceEngine  # noqa: E402
+from governed_platform.governance.state_manager import StateManager  # noqa: E402
+from governed_platform.governance.state_snapshot import (  # noqa: E402
+    FrozenDict,
+    FrozenList,
+    SnapshotCache,
+    freeze,
+    state_snapshot,
+    thaw,
+)
+
+
+class FrozenValueTests(unittest.TestCase):
+    def test_frozen_document_rejects_mutation_but_reads_like_json(self):
+        doc = freeze({"packets": {"A": {"status": "pending"}}, "log": [{"event": "claimed"}]})
+        self.assertIsInstance(doc, dict)
+        self.assertIsInstance(doc["log"], FrozenList)
+        with self.assertRaises(TypeError):
+            doc["packets"]["A"]["status"] = "done"
+        with self.assertRaises(TypeError):
+            doc["log"].append({})
+        with self.assertRaises(TypeError):
+            doc.setdefault("area_closeouts", {})
+        self.assertEqual(json.loads(json.dumps(doc)), thaw(doc))
+
+    def test_copies_are_mutable(self):
+        doc = freeze({"packets": {"A": {"status": "pending"}}})
+        clone = copy.deepcopy(doc)
+        clone["packets"]["A"]["status"] = "done"
+        self.assertNotIsInstance(clone, FrozenDict)
+        self.assertEqual(doc["packets"]["A"]["status"], "pending")
+
+
+class SnapshotCacheTests(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.state_path = Path(self.tmpdir.name) / "state.json"
+        self.sm = StateManager(self.state_path)
+        state = self.sm.load()
+        state["packets"]["A"] = {"status": "pending"}
+        self.sm.save(state)
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def test_unchanged_file_is_parsed_once(self):
+        loader = mock.Mock(side_effect=lambda path: json.loads(path.read_text()))
+        cache = SnapshotCache(loader=loader)
+        first = cache.get(self.state_path)
+        second = cache.get(self.state_path)
+        self.assertIs(first, second)
+        self.assertEqual(loader.call_count, 1)
+
+    def test_writer_replacement_yields_new_version(self):
+        first = state_snapshot(self.state_path)
+        state = self.sm.load()
+        state["packets"]["A"]["status"] = "in_progress"
+        self.sm.save(state)
+
+        second = state_snapshot(self.state_path)
+        self.assertGreater(second.version, first.version)
+        self.assertEqual(second.data["packets"]["A"]["status"], "in_progress")
+        self.assertEqual(first.data["packets"]["A"]["status"], "pending")
+
+    def test_reads_take_no_state_lock(self):
+        with mock.patch("governed_platform.governance.state_store.file_lock") as lock:
+            self.sm.snapshot()
+            state_snapshot(self.state_path)
+        lock.assert_not_called()
+
+    def test_engine_status_is_cached_snapshot(self):
+        engine = GovernanceEngine(
+            {"packets": [{"id": "A", "title": "A"}], "dependencies": {}}, self.sm
+        )
+        with mock.patch.object(
+            snapshot_module._state_cache, "loader", wraps=snapshot_module._state_cache.loader
+        ) as loader:
+            snapshot_module._state_cache.invalidate(self.state_path)
+            self.assertIs(engine.status(), engine.status())
+            self.assertEqual(loader.call_count, 1)
+            engine.claim("A", "agent")
+            self.assertEqual(engine.status()["packets"]["A"]["status"], "in_progress")
+            self.assertEqual(loader.call_count, 2)
+        with self.assertRaises(TypeError):
+            engine.status()["packets"]["A"]["status"] = "done"
+
+
+if __name__ == "__main__":
+    unittest.main()
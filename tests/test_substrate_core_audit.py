@@ -7,11 +7,22 @@ import sys
 ROOT = Path(__file__).resolve().parents[1]
 sys.path.insert(0, str(ROOT / "src"))
 
+from governed_platform.governance.log_checkpoints import verify_state_log
+from governed_platform.governance.log_integrity import (
+    LOG_DIGEST_KEY,
+    LOG_MODE_HASH_CHAIN,
+    append_log_entry,
+    build_log_entry,
+    next_chain_link,
+    verify_log_integrity,
+)
 from substrate_core.audit import (
     append_mutation_log,
+    capture_log_prefix,
     export_provenance_snapshot,
     provenance_chain,
     validate_append_only_log,
+    validate_log_prefix,
 )
 from substrate_core.storage import FileStorage
 
@@ -78,6 +89,112 @@ class AuditTests(unittest.TestCase):
         self.assertFalse(ok)
         self.assertIn("append-only invariant violated", msg)
 
+    def test_log_prefix_guard_checks_length_tail_and_chain(self):
+        state = {
+            "log": [{"event": "started", "packet_id": "A"}, {"event": "noted", "packet_id": "A"}]
+        }
+        marker = capture_log_prefix(state)
+        self.assertIsNone(marker.snapshot)
+        state["log"].append({"event": "completed", "packet_id": "A"})
+        self.assertTrue(validate_log_prefix(marker, state["log"])[0])
+
+        ok, msg = validate_log_prefix(marker, state["log"][:1])
+        self.assertFalse(ok)
+        self.assertIn("shrank", msg)
+
+        state["log"][1]["notes"] = "edited"
+        ok, msg = validate_log_prefix(marker, state["log"])
+        self.assertFalse(ok)
+        self.assertIn("index 1", msg)
+
+    def test_log_prefix_guard_rejects_entries_not_extending_chain_head(self):
+        state = {"log": [], "log_integrity_mode": LOG_MODE_HASH_CHAIN}
+
+        def append(notes, prev_hash=None, index=None):
+            link_hash, link_index = next_chain_link(state)
+            entry = build_log_entry(
+                packet_id="A",
+                event="noted",
+                agent="a",
+                notes=notes,
+                timestamp="2026-01-01T00:00:00",
+                mode=LOG_MODE_HASH_CHAIN,
+                previous_hash=link_hash if prev_hash is None else prev_hash,
+                hash_index=link_index if index is None else index,
+            )
+            append_log_entry(state, entry)
+
+        append("n0")
+        marker = capture_log_prefix(state)
+        append("n1")
+        self.assertTrue(validate_log_prefix(marker, state["log"])[0])
+        append("forged", prev_hash="", index=1)
+        ok, msg = validate_log_prefix(marker, state["log"])
+        self.assertFalse(ok)
+        self.assertIn("entry 2", msg)
+
+    def test_older_hashed_rewrite_is_left_to_log_verification(self):
+        state = {"log": [], "log_integrity_mode": LOG_MODE_HASH_CHAIN}
+        for notes in ("n0", "n1"):
+            link_hash, link_index = next_chain_link(state)
+            append_log_entry(
+                state,
+                build_log_entry(
+                    packet_id="A",
+                    event="noted",
+                    agent="a",
+                    notes=notes,
+                    timestamp="2026-01-01T00:00:00",
+                    mode=LOG_MODE_HASH_CHAIN,
+                    previous_hash=link_hash,
+                    hash_index=link_index,
+                ),
+            )
+        marker = capture_log_prefix(state)
+        state["log"][0]["notes"] = "edited"
+        self.assertTrue(validate_log_prefix(marker, state["log"])[0])
+        ok, issues = verify_log_integrity(state["log"])
+        self.assertFalse(ok)
+        self.assertIn("log[0] hash mismatch", issues)
+
+    def test_log_prefix_guard_compares_rolling_digest(self):
+        state = {"log": []}
+        append_log_entry(state, {"event": "started", "packet_id": "A"})
+        marker = capture_log_prefix(state)
+        self.assertEqual(marker.chain_hash, "")
+        entry = append_log_entry(state, {"event": "noted", "packet_id": "A"})
+        append_log_entry(state, {"event": "completed", "packet_id": "A"})
+        self.assertTrue(validate_log_prefix(marker, state["log"], state[LOG_DIGEST_KEY])[0])
+
+        entry["notes"] = "edited after append"
+        ok, msg = validate_log_prefix(marker, state["log"], state[LOG_DIGEST_KEY])
+        self.assertFalse(ok)
+        self.assertIn("digest", msg)
+
+    def test_older_plain_rewrite_is_caught_by_full_verification(self):
+        state = {"log": []}
+        for event in ("started", "noted", "completed"):
+            append_log_entry(state, {"event": event, "packet_id": "A"})
+        self.assertTrue(verify_state_log(self.path, state, full=True)["valid"])
+        marker = capture_log_prefix(state)
+        state["log"][0]["event"] = "mutated"
+        self.assertTrue(validate_log_prefix(marker, state["log"], state[LOG_DIGEST_KEY])[0])
+        verification = verify_state_log(self.path, state, full=True)
+        self.assertFalse(verification["valid"])
+        self.assertIn("log digest mismatch", verification["issues"][0])
+
+    def test_paranoid_log_prefix_guard_compares_every_entry(self):
+        state = {
+            "log": [{"event": "started", "packet_id": "A"}, {"event": "noted", "packet_id": "A"}]
+        }
+        cheap = capture_log_prefix(state)
+        paranoid = capture_log_prefix(state, paranoid=True)
+        state["log"][0]["event"] = "mutated"
+        self.assertTrue(validate_log_prefix(cheap, state["log"])[0])
+        ok, msg = validate_log_prefix(paranoid, state["log"])
+        self.assertFalse(ok)
+        self.assertIn("index 0", msg)
+
     def test_provenance_snapshot_export(self):
         append_mutation_log(
             self.storage,
@@ -6,9 +6,9 @@ import sys
 ROOT = Path(__file__).resolve().parents[1]
 sys.path.insert(0, str(ROOT / "src"))
 
-from substrate_core.engine import PacketEngine
+from substrate_core.engine import BATCH_BEST_EFFORT, PacketEngine
 from substrate_core.state import ActorContext
-from substrate_core.storage import StorageInterface
+from substrate_core.storage import StateConflictError, StorageInterface
 
 
 class InMemoryStorage(StorageInterface):
@@ -29,6 +29,28 @@ class InMemoryStorage(StorageInterface):
         return entry
 
 
+class RacingStorage(InMemoryStorage):
+    """Simulates another writer committing before each of our first `races` writes."""
+
+    def __init__(self, state, races, rival=None):
+        super().__init__(state)
+        self.state["revision"] = 0
+        self.races = races
+        self.rival = rival
+
+    def write_state(self, state):
+        if self.races > 0:
+            self.races -= 1
+            if self.rival:
+                self.rival(self.state)
+            self.state["revision"] += 1
+            raise StateConflictError(state["revision"], self.state["revision"])
+        if state.get("revision") != self.state["revision"]:
+            raise StateConflictError(state.get("revision"), self.state["revision"])
+        super().write_state(state)
+        self.state["revision"] += 1
+
+
 class PacketEngineTests(unittest.TestCase):
     def _definition(self):
         return {
@@ -254,6 +276,99 @@ class PacketEngineTests(unittest.TestCase):
         self.assertTrue(score.ok)
         self.assertEqual(score.payload["model_version"], "1.0")
 
+    def test_claim_retries_after_conflict_and_sees_winning_state(self):
+        def rival_claim(state):
+            state["packets"]["A"].update({"status": "in_progress", "assigned_to": "rival"})
+
+        storage = RacingStorage(self._state(), races=1, rival=rival_claim)
+        engine = PacketEngine(storage=storage, definition=self._definition())
+        result = engine.claim("A", ActorContext(user_id="dev", role="developer", source="api"))
+        self.assertFalse(result.ok)
+        self.assertIn("not pending", result.message)
+        self.assertEqual(storage.state["packets"]["A"]["assigned_to"], "rival")
+
+    def test_conflict_retry_is_bounded(self):
+        storage = RacingStorage(self._state(), races=10)
+        engine = PacketEngine(storage=storage, definition=self._definition(), conflict_retries=2)
+        result = engine.claim("A", ActorContext(user_id="dev", role="developer", source="api"))
+        self.assertFalse(result.ok)
+        self.assertEqual(result.payload["decision"]["reason_codes"], ["STATE_CONFLICT"])
+        self.assertEqual(storage.races, 7)
+
+        storage.races = 1
+        self.assertTrue(
+            engine.claim("A", ActorContext(user_id="dev", role="developer", source="api")).ok
+        )
+
+    def test_apply_batch_runs_dependent_operations_with_one_write(self):
+        engine, storage, actor = self._engine()
+        result = engine.apply_batch(
+            [
+                {"action": "claim", "packet_id": "A"},
+                {"action": "done", "packet_id": "A", "notes": "shipped"},
+                {"action": "claim", "packet_id": "B"},
+                {"action": "note", "packet_id": "B", "message": "started"},
+            ],
+            actor,
+        )
+        self.assertTrue(result.ok)
+        self.assertEqual(result.payload["applied"], 4)
+        self.assertEqual(storage.writes, 1)
+        self.assertEqual(storage.state["packets"]["A"]["status"], "done")
+        self.assertEqual(storage.state["packets"]["B"]["notes"], "started")
+        self.assertEqual(
+            [e["event"] for e in storage.state["log"]], ["started", "completed", "started", "noted"]
+        )
+
+    def test_apply_batch_all_or_nothing_writes_nothing_on_failure(self):
+        engine, storage, actor = self._engine()
+        result = engine.apply_batch(
+            [
+                {"action": "claim", "packet_id": "A"},
+                {"action": "claim", "packet_id": "B"},
+                {"action": "note", "packet_id": "A", "message": "never reached"},
+            ],
+            actor,
+        )
+        self.assertFalse(result.ok)
+        self.assertEqual(storage.writes, 0)
+        codes = [r["decision"]["reason_codes"] for r in result.payload["results"]]
+        self.assertEqual(codes, [["BATCH_ROLLED_BACK"], ["CONSTRAINT_DENY"], ["BATCH_ABORTED"]])
+
+    def test_apply_batch_best_effort_commits_successes(self):
+        engine, storage, actor = self._engine()
+        result = engine.apply_batch(
+            [
+                {"action": "claim", "packet_id": "B"},
+                {"action": "claim", "packet_id": "A"},
+                {"action": "teleport", "packet_id": "A"},
+            ],
+            actor,
+            mode=BATCH_BEST_EFFORT,
+        )
+        self.assertTrue(result.ok)
+        self.assertEqual([r["ok"] for r in result.payload["results"]], [False, True, False])
+        self.assertEqual(
+            result.payload["results"][2]["decision"]["reason_codes"], ["UNSUPPORTED_ACTION"]
+        )
+        self.assertEqual(storage.writes, 1)
+        self.assertEqual(storage.state["packets"]["A"]["status"], "in_progress")
+
+    def test_transaction_context_saves_once_and_retries_batch_on_conflict(self):
+        engine, storage, actor = self._engine()
+        with engine.transaction() as txn:
+            self.assertTrue(txn.claim("A", actor).ok)
+            self.assertTrue(txn.done("A", actor, "ok").ok)
+            self.assertEqual(storage.writes, 0)
+        self.assertEqual(storage.writes, 1)
+        self.assertEqual(storage.state["packets"]["A"]["status"], "done")
+
+        storage = RacingStorage(self._state(), races=1)
+        engine = PacketEngine(storage=storage, definition=self._definition())
+        result = engine.apply_batch([{"action": "claim", "packet_id": "A"}], actor)
+        self.assertTrue(result.ok)
+        self.assertEqual(len(storage.state["log"]), 1)
+
 
 if __name__ == "__main__":
     unittest.main()
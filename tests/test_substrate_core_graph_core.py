@@ -1,12 +1,18 @@
+import json
 import unittest
 from pathlib import Path
+from unittest import mock
 import sys
 
 ROOT = Path(__file__).resolve().parents[1]
 sys.path.insert(0, str(ROOT / "src"))
 
+from governed_platform.governance import dependency_index as dependency_index_module  # noqa: E402
+from governed_platform.governance.state_snapshot import freeze  # noqa: E402
 from substrate_core.graph_core import (  # noqa: E402
+    DependencyIndex,
     critical_path,
+    dependency_index,
     downstream_nodes,
     impact_analysis,
     postgres_recursive_cte_queries,
@@ -45,5 +51,54 @@ class GraphCoreTests(unittest.TestCase):
         self.assertIn("WITH RECURSIVE", queries["upstream"])
 
 
+class DependencyIndexTests(unittest.TestCase):
+    def setUp(self):
+        self.definition = {
+            "packets": [
+                {"id": "A", "area_id": "1.0"},
+                {"id": "B", "area_id": "1.0"},
+                {"id": "C", "area_id": "2.0"},
+                {"id": "D", "area_id": "2.0"},
+            ],
+            "dependencies": {"B": ["A"], "C": ["B", "A"], "D": ["A", "A"]},
+        }
+
+    def test_index_tables(self):
+        index = dependency_index(self.definition)
+        self.assertEqual(index.dependents_of("A"), ("B", "C", "D"))
+        self.assertEqual(index.dependencies_of("C"), ("B", "A"))
+        self.assertEqual(index.downstream("B"), ["C"])
+        self.assertEqual(index.upstream("C"), ["B", "A"])
+        self.assertEqual(index.areas, {"1.0": ["A", "B"], "2.0": ["C", "D"]})
+        self.assertEqual(index.area_of("C"), "2.0")
+        self.assertEqual(index.packet_by_id["D"], {"id": "D", "area_id": "2.0"})
+        self.assertTrue(index.acyclic)
+        order = index.topo_order
+        self.assertLess(order.index("A"), order.index("B"))
+        self.assertLess(order.index("B"), order.index("C"))
+
+    def test_built_once_per_fingerprint(self):
+        with mock.patch.object(
+            dependency_index_module, "DependencyIndex", wraps=DependencyIndex
+        ) as build:
+            first = dependency_index(self.definition)
+            self.assertIs(dependency_index(json.loads(json.dumps(self.definition))), first)
+            frozen = freeze(self.definition)
+            self.assertIs(dependency_index(frozen), first)
+            with mock.patch.object(dependency_index_module, "fingerprint_json") as fingerprint:
+                self.assertIs(dependency_index(frozen), first)
+            fingerprint.assert_not_called()
+            self.definition["dependencies"]["D"] = ["C"]
+            self.assertEqual(dependency_index(self.definition).downstream("C"), ["D"])
+        self.assertLessEqual(build.call_count, 2)
+
+    def test_cycle_leaves_partial_order(self):
+        index = DependencyIndex(
+            {"packets": [{"id": "A"}, {"id": "B"}], "dependencies": {"A": ["B"], "B": ["A"]}}
+        )
+        self.assertFalse(index.acyclic)
+        self.assertEqual(index.downstream("A"), ["B", "A"])
+
+
 if __name__ == "__main__":
     unittest.main()
@@ -1,14 +1,26 @@
 import json
 import tempfile
 import unittest
+from contextlib import contextmanager
 from pathlib import Path
+from unittest import mock
 
 ROOT = Path(__file__).resolve().parents[1]
 import sys
 
 sys.path.insert(0, str(ROOT / "src"))
 
-from substrate_core.storage import FileStorage
+from governed_platform.governance import state_store
+from governed_platform.governance.log_integrity import log_digest
+from substrate_core.engine import PacketEngine
+from substrate_core.state import ActorContext
+from substrate_core.storage import (
+    FileStorage,
+    SqliteStorage,
+    StateConflictError,
+    build_storage,
+    load_storage_config,
+)
 
 
 class FileStorageTests(unittest.TestCase):
@@ -45,6 +57,180 @@ class FileStorageTests(unittest.TestCase):
         self.assertEqual(len(persisted["log"]), 1)
         self.assertEqual(persisted["log"][0]["event"], "started")
 
+    def test_write_state_is_compare_and_swap_on_revision(self):
+        self.storage.write_state(self.storage.read_state())
+        first = self.storage.read_state()
+        second = FileStorage(self.state_path).read_state()
+        self.assertEqual(first["revision"], 1)
+
+        first["packets"]["A"] = {"status": "in_progress"}
+        self.storage.write_state(first)
+        second["packets"]["A"] = {"status": "failed"}
+        with self.assertRaises(StateConflictError):
+            FileStorage(self.state_path).write_state(second)
+
+        persisted = json.loads(self.state_path.read_text())
+        self.assertEqual(persisted["revision"], 2)
+        self.assertEqual(persisted["packets"]["A"]["status"], "in_progress")
+
+    def test_written_documents_are_normalized_once_and_read_as_parsed(self):
+        state = self.storage.read_state()
+        state["packets"]["A"] = {"status": "IN_PROGRESS"}
+        state["log_integrity_mode"] = "hash-chain"
+        self.storage.write_state(state)
+
+        doc = json.loads(self.state_path.read_text())
+        self.assertEqual(doc["packets"]["A"]["status"], "in_progress")
+        self.assertEqual(doc["log_integrity_mode"], "hash_chain")
+        self.assertEqual(
+            doc[state_store.NORMALIZED_SCHEMA_KEY]["written_ns"], self.state_path.stat().st_mtime_ns
+        )
+        with mock.patch.object(state_store, "normalize_state_document") as normalize:
+            self.assertEqual(self.storage.read_state()["packets"]["A"]["status"], "in_progress")
+        normalize.assert_not_called()
+
+    def test_hand_edited_or_legacy_documents_are_normalized_on_read(self):
+        state = self.storage.read_state()
+        state["packets"]["A"] = {"status": "pending"}
+        self.storage.write_state(state)
+        doc = json.loads(self.state_path.read_text())
+        doc["packets"]["A"]["status"] = "DONE"
+        self.state_path.write_text(json.dumps(doc))
+        self.assertEqual(self.storage.read_state()["packets"]["A"]["status"], "done")
+
+        self.state_path.write_text(json.dumps({"packets": {"A": {"status": "Blocked"}}, "log": []}))
+        state = self.storage.read_state()
+        self.assertEqual(state["version"], "1.0")
+        self.assertEqual(state["packets"]["A"]["status"], "blocked")
+        self.assertEqual(state["log_integrity_mode"], "plain")
+
+
+class TracingSqliteStorage(SqliteStorage):
+    def __init__(self, db_path, statements):
+        super().__init__(db_path)
+        self.statements = statements
+
+    @contextmanager
+    def connection(self):
+        with super().connection() as conn:
+            conn.set_trace_callback(self.statements.append)
+            yield conn
+
+
+class SqliteStorageTests(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.db_path = Path(self.tmpdir.name) / "wbs-state.sqlite"
+        self.storage = SqliteStorage(self.db_path)
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def test_round_trips_state_shape(self):
+        self.assertFalse(self.storage.exists())
+        state = self.storage.read_state()
+        state["packets"]["A"] = {"status": "pending", "notes": None}
+        state["log"].append({"packet_id": "A", "event": "started", "agent": "codex"})
+        state["area_closeouts"]["1.0"] = {"status": "closed"}
+        self.storage.write_state(state)
+
+        loaded = SqliteStorage(self.db_path).read_state()
+        self.assertTrue(self.storage.exists())
+        self.assertEqual(loaded["packets"]["A"]["status"], "pending")
+        self.assertEqual(loaded["log"][0]["event"], "started")
+        self.assertEqual(loaded["area_closeouts"]["1.0"]["status"], "closed")
+        self.assertEqual(loaded["log_integrity_mode"], "plain")
+
+    def test_write_only_touches_changed_rows(self):
+        state = self.storage.read_state()
+        state["packets"] = {pid: {"status": "pending"} for pid in ("A", "B", "C")}
+        self.storage.write_state(state)
+
+        statements = []
+        storage = TracingSqliteStorage(self.db_path, statements)
+        state = storage.read_state()
+        state["packets"]["B"]["status"] = "in_progress"
+        state["log"].append({"packet_id": "B", "event": "started", "agent": "codex"})
+        statements.clear()
+        storage.write_state(state)
+
+        packet_writes = [sql for sql in statements if "INTO packet_runtime" in sql]
+        self.assertEqual(len(packet_writes), 1)
+        self.assertIn("'B'", packet_writes[0])
+        self.assertEqual(len([sql for sql in statements if "INTO mutation_log" in sql]), 1)
+        with storage.connection() as conn:
+            self.assertEqual(conn.execute("PRAGMA journal_mode").fetchone()[0], "wal")
+
+    def test_update_reads_only_log_tail(self):
+        window = SqliteStorage.LOG_TAIL_WINDOW
+        state = self.storage.read_state()
+        state["packets"] = {"A": {"status": "pending"}}
+        state["log"] = [{"packet_id": "A", "event": "note", "seq": i} for i in range(window * 3)]
+        log_digest(state)
+        self.storage.write_state(state)
+
+        state = SqliteStorage(self.db_path).read_state_for_update()
+        self.assertEqual(len(state["log"]), window)
+        self.assertEqual(state["log"][0]["seq"], window * 2)
+        state["log"][-1]["linked"] = True
+        state["log"].append({"packet_id": "A", "event": "note", "seq": window * 3})
+        SqliteStorage(self.db_path).write_state(state)
+
+        log = SqliteStorage(self.db_path).read_state()["log"]
+        self.assertEqual([e["seq"] for e in log], list(range(window * 3 + 1)))
+        self.assertTrue(log[-2]["linked"])
+
+    def test_packet_engine_runs_on_sqlite_storage(self):
+        definition = {"packets": [{"id": "A", "title": "A", "scope": "s"}], "dependencies": {}}
+        engine = PacketEngine(self.storage, definition)
+        actor = ActorContext(user_id="dev", role="developer", source="api")
+        self.assertTrue(engine.claim("A", actor).ok)
+        self.assertTrue(engine.done("A", actor, "evidence").ok)
+
+        state = SqliteStorage(self.db_path).read_state()
+        self.assertEqual(state["packets"]["A"]["status"], "done")
+        self.assertEqual([e["event"] for e in state["log"]], ["started", "completed"])
+
+    def test_sqlite_write_rejects_stale_revision(self):
+        self.storage.write_state(self.storage.read_state())
+        first = self.storage.read_state()
+        second = SqliteStorage(self.db_path).read_state()
+        self.storage.write_state(first)
+        with self.assertRaises(StateConflictError):
+            SqliteStorage(self.db_path).write_state(second)
+
+    def test_append_audit_conflicts_with_writers_that_loaded_before_it(self):
+        state = self.storage.read_state()
+        state["log"] = [{"packet_id": "A", "event": "note", "seq": 0}]
+        self.storage.write_state(state)
+
+        stale = SqliteStorage(self.db_path).read_state_for_update()
+        SqliteStorage(self.db_path).append_audit({"packet_id": "A", "event": "note", "seq": 1})
+        stale["log"][-1]["linked"] = True
+        with self.assertRaises(StateConflictError):
+            SqliteStorage(self.db_path).write_state(stale)
+        self.assertEqual(
+            [e["seq"] for e in SqliteStorage(self.db_path).read_state()["log"]], [0, 1]
+        )
+
+        fresh = SqliteStorage(self.db_path)
+        fresh.append_audit({"packet_id": "B", "event": "note"})
+        state = fresh.read_state()
+        self.assertEqual(state["revision"], 3)
+        self.assertEqual(len(state["log"]), 3)
+
+    def test_build_storage_selects_backend_from_config(self):
+        state_path = Path(self.tmpdir.name) / "wbs-state.json"
+        config_path = Path(self.tmpdir.name) / "storage-config.json"
+        self.assertIsInstance(
+            build_storage(state_path, load_storage_config(config_path)), FileStorage
+        )
+
+        config_path.write_text(json.dumps({"backend": "sqlite"}))
+        storage = build_storage(state_path, load_storage_config(config_path))
+        self.assertIsInstance(storage, SqliteStorage)
+        self.assertEqual(storage.db_path, Path(self.tmpdir.name) / "wbs-state.sqlite")
+
 
 if __name__ == "__main__":
     unittest.main()
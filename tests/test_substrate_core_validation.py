@@ -5,7 +5,11 @@ import sys
 ROOT = Path(__file__).resolve().parents[1]
 sys.path.insert(0, str(ROOT / "src"))
 
-from substrate_core.validation import (
+from governed_platform.governance.graph_cycles import (  # noqa: E402
+    dependency_cycles,
+    strongly_connected_components,
+)
+from substrate_core.validation import (  # noqa: E402
     detect_dependency_cycle,
     validate_claim,
     validate_claim_pipeline,
@@ -71,6 +75,36 @@ class ValidationTests(unittest.TestCase):
         self.assertTrue(cycle)
         self.assertEqual(cycle[0], cycle[-1])
 
+    def test_deep_chain_without_recursion(self):
+        n = 100_000
+        chain = {f"P{i}": [f"P{i + 1}"] for i in range(n)}
+        self.assertEqual(detect_dependency_cycle(chain), [])
+        chain[f"P{n}"] = ["P0"]
+        cycle = detect_dependency_cycle(chain)
+        self.assertEqual(len(cycle), n + 2)
+        self.assertEqual(cycle[0], cycle[-1])
+
+    def test_reports_every_cyclic_component(self):
+        deps = {
+            "A": ["B"],
+            "B": ["C", "A"],
+            "C": ["A"],
+            "D": ["D"],
+            "E": ["A"],
+            "F": ["G"],
+            "G": ["F"],
+        }
+        components = strongly_connected_components(deps)
+        self.assertEqual(
+            sorted(sorted(c) for c in components), [["A", "B", "C"], ["D"], ["E"], ["F", "G"]]
+        )
+        self.assertLess(components.index(["A", "B", "C"]), components.index(["E"]))
+        cycles = dependency_cycles(deps)
+        self.assertEqual(cycles, [["A", "B", "A"], ["D", "D"], ["F", "G", "F"]])
+        for cycle in cycles:
+            for source, target in zip(cycle, cycle[1:]):
+                self.assertIn(target, deps[source])
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -21,6 +21,7 @@ from wbs_server import Handler  # noqa: E402
 CLI = [sys.executable, str(GOV / "wbs_cli.py")]
 WBS = GOV / "wbs.json"
 STATE = GOV / "wbs-state.json"
+LOG_INDEX = GOV / "wbs-state-log-index.ndjson"
 
 
 def run_cli(args, expect=0):
@@ -80,6 +81,7 @@ class TerminalEngineIntegrationTests(unittest.TestCase):
             STATE.unlink(missing_ok=True)
         else:
             STATE.write_bytes(cls._state_backup)
+        LOG_INDEX.unlink(missing_ok=True)
 
     def setUp(self):
         STATE.unlink(missing_ok=True)
@@ -0,0 +1,154 @@
+import json
+import os
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+ROOT = Path(__file__).resolve().parents[1]
+import sys
+
+sys.path.insert(0, str(ROOT / "src"))
+
+from governed_platform.governance.blob_store import BlobStore  # noqa: E402
+from governed_platform.governance.engine import GovernanceEngine  # noqa: E402
+from governed_platform.governance.state_manager import StateManager  # noqa: E402
+from governed_platform.governance.state_store import iter_state_log  # noqa: E402
+from governed_platform.governance.text_blobs import (  # noqa: E402
+    PREVIEW_BYTES,
+    TEXT_BLOB_THRESHOLD_ENV,
+    externalize_payloads,
+    load_payload,
+    resolve_payloads,
+)
+from substrate_core.storage import SqliteStorage  # noqa: E402
+
+LONG = "evidence line ✓\n" * 600
+
+
+class TextBlobTests(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.store = BlobStore(Path(self.tmpdir.name) / "blobs")
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def test_written_document_holds_refs_and_state_stays_intact(self):
+        files = [f"src/module_{i}.py" for i in range(400)]
+        handover = {"reason": "short", "progress_notes": LONG, "files_modified": files}
+        state = {
+            "packets": {"A": {"notes": LONG, "handovers": [handover]}, "B": {"notes": "small"}},
+            "log": [{"packet_id": "A", "notes": LONG}, {"packet_id": "B", "notes": "ok"}],
+        }
+        doc = externalize_payloads(state, self.store.put, threshold=4096)
+
+        self.assertEqual(state["packets"]["A"]["notes"], LONG)
+        self.assertNotIn("progress_notes_ref", handover)
+        pkt = doc["packets"]["A"]
+        self.assertLessEqual(len(pkt["notes"].encode()), PREVIEW_BYTES + 10)
+        self.assertIn("progress_notes_ref", pkt["handovers"][0])
+        self.assertEqual(pkt["handovers"][0]["files_modified"], files)
+        self.assertIn("notes_ref", doc["log"][0])
+        self.assertIs(doc["packets"]["B"], state["packets"]["B"])
+        self.assertEqual(load_payload(pkt, "notes", self.store.get), LONG)
+
+        loaded = json.loads(json.dumps(doc))
+        self.assertEqual(resolve_payloads(loaded, self.store.get), 3)
+        self.assertEqual(loaded, {**state, "text_blobs": True})
+
+    def test_disabled_by_default(self):
+        state = {"packets": {"A": {"notes": LONG}}}
+        with mock.patch.dict(os.environ, {TEXT_BLOB_THRESHOLD_ENV: ""}):
+            self.assertIs(externalize_payloads(state, self.store.put), state)
+
+    def test_hand_edited_field_ignores_stale_ref(self):
+        doc = externalize_payloads(
+            {"packets": {"A": {"notes": LONG}}}, self.store.put, threshold=4096
+        )
+        doc["packets"]["A"]["notes"] = "replaced"
+        resolve_payloads(doc, self.store.get)
+        self.assertEqual(doc["packets"]["A"], {"notes": "replaced"})
+
+
+class StateTextBlobTests(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.state_path = Path(self.tmpdir.name) / "state.json"
+        self.env = mock.patch.dict(os.environ, {TEXT_BLOB_THRESHOLD_ENV: "4096"})
+        self.env.start()
+        definition = {
+            "packets": [{"id": "A", "wbs_ref": "1.1", "title": "A", "area_id": "1.0"}],
+            "dependencies": {},
+        }
+        self.sm = StateManager(self.state_path)
+        state = self.sm.load()
+        state["packets"]["A"] = {
+            "status": "pending",
+            "assigned_to": None,
+            "started_at": None,
+            "completed_at": None,
+            "notes": None,
+        }
+        self.sm.save(state)
+        self.engine = GovernanceEngine(definition, self.sm)
+
+    def tearDown(self):
+        self.env.stop()
+        self.tmpdir.cleanup()
+
+    def test_payloads_stay_out_of_document_and_load_in_full(self):
+        self.engine.claim("A", "agent")
+        ok, _ = self.engine.handover(
+            "A", "agent", LONG, progress_notes=LONG, remaining_work=["finish"]
+        )
+        self.assertTrue(ok)
+        raw = json.loads(self.state_path.read_text())
+        pkt = raw["packets"]["A"]
+        self.assertIn("notes_ref", pkt)
+        self.assertIn("progress_notes_ref", pkt["handovers"][0])
+        self.assertIn("notes_ref", raw["log"][-1])
+        self.assertLess(self.state_path.stat().st_size, len(LONG.encode()))
+
+        state = self.sm.load()
+        self.assertEqual(state["packets"]["A"]["notes"], LONG)
+        self.assertEqual(state["packets"]["A"]["handovers"][0]["reason"], LONG)
+        self.assertNotIn("notes_ref", state["packets"]["A"])
+        self.assertEqual(state["log"][-1]["notes"], LONG)
+        self.assertEqual(list(iter_state_log(self.state_path))[-1]["notes"], LONG)
+
+        ok, bundle = self.engine.context_bundle("A", max_notes_bytes=32000)
+        self.assertTrue(ok)
+        self.assertEqual(bundle["runtime_state"]["notes"], LONG)
+        self.assertEqual(bundle["handovers"][0]["progress_notes"], LONG)
+        self.assertFalse(bundle["truncated"])
+
+    def test_segmented_log_entries_are_externalized(self):
+        state = self.sm.load()
+        state["log_storage"] = "segmented"
+        self.sm.save(state)
+        self.engine.claim("A", "agent")
+        self.engine.done("A", "agent", LONG)
+        segment = next((Path(self.tmpdir.name) / "state-log").glob("*.ndjson"))
+        self.assertNotIn(LONG, segment.read_text())
+        self.assertEqual(self.sm.load()["log"][-1]["notes"], LONG)
+        self.assertEqual(list(iter_state_log(self.state_path))[-1]["notes"], LONG)
+
+    def test_sqlite_backend_uses_blob_table(self):
+        storage = SqliteStorage(Path(self.tmpdir.name) / "state.sqlite")
+        state = storage.read_state()
+        state["packets"]["A"] = {"status": "done", "notes": LONG}
+        state["log"].append({"packet_id": "A", "notes": LONG})
+        storage.write_state(state)
+        with storage.connection() as conn:
+            record = conn.execute(
+                "SELECT record FROM packet_runtime WHERE packet_id = 'A'"
+            ).fetchone()["record"]
+        self.assertIn("notes_ref", json.loads(record))
+        stored = storage.read_state()
+        self.assertEqual(stored["packets"]["A"]["notes"], LONG)
+        self.assertEqual(stored["log"][-1]["notes"], LONG)
+
+
+if __name__ == "__main__":
+    unittest.main()
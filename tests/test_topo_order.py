@@ -0,0 +1,107 @@
+import json
+import random
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+ROOT = Path(__file__).resolve().parents[1]
+import sys
+
+sys.path.insert(0, str(ROOT / "src"))
+
+from governed_platform.governance import topo_order  # noqa: E402
+from governed_platform.governance.topo_order import (  # noqa: E402
+    DynamicTopoOrder,
+    load_topo_order,
+    save_topo_order,
+    topo_order_path_for,
+)
+from substrate_core import validation  # noqa: E402
+from substrate_core.validation import detect_dependency_cycle, validate_claim_pipeline  # noqa: E402
+
+
+def assert_topological(test, topo):
+    for packet_id, sources in topo.dependencies.items():
+        for dep in sources:
+            test.assertLess(topo.pos[dep], topo.pos[packet_id], f"{dep} must precede {packet_id}")
+
+
+class DynamicTopoOrderTests(unittest.TestCase):
+    def test_rejects_cycle_with_path(self):
+        deps = {"B": ["A"], "C": ["B"]}
+        topo = DynamicTopoOrder(deps, ["A", "B", "C"])
+        self.assertEqual(topo.add_dependency("A", "C"), ["A", "C", "B", "A"])
+        self.assertEqual(deps, {"B": ["A"], "C": ["B"]})
+        self.assertEqual(topo.add_dependency("A", "A"), ["A", "A"])
+
+    def test_reorders_only_the_affected_window(self):
+        deps = {}
+        topo = DynamicTopoOrder(deps, ["A", "B", "C", "D", "E"])
+        self.assertIsNone(topo.add_dependency("D", "C"))  # already ordered
+        self.assertEqual(topo.order, ["A", "B", "C", "D", "E"])
+        self.assertIsNone(topo.add_dependency("B", "D"))
+        self.assertEqual(topo.order[:1] + topo.order[4:], ["A", "E"])
+        assert_topological(self, topo)
+        self.assertIsNone(topo.add_dependency("F", "E"))  # unseen node is appended
+        assert_topological(self, topo)
+
+    def test_matches_full_cycle_check_on_random_edits(self):
+        rng = random.Random(7)
+        nodes = [f"P{i}" for i in range(30)]
+        deps = {}
+        topo = DynamicTopoOrder(deps, nodes)
+        for _ in range(300):
+            a, b = rng.sample(nodes, 2)
+            if b in deps.get(a, []):
+                topo.remove_dependency(a, b)
+                continue
+            trial = {k: list(v) for k, v in deps.items()}
+            trial.setdefault(a, []).append(b)
+            expected_cycle = bool(detect_dependency_cycle(trial))
+            self.assertEqual(topo.add_dependency(a, b) is not None, expected_cycle)
+            assert_topological(self, topo)
+
+
+class TopoSidecarTests(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.wbs = Path(self.tmpdir.name) / "wbs.json"
+        self.definition = {"packets": [{"id": p} for p in "ABC"], "dependencies": {"B": ["A"]}}
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def test_sidecar_reused_until_dependencies_change(self):
+        topo = load_topo_order(self.wbs, self.definition)
+        topo.add_dependency("C", "B")
+        save_topo_order(self.wbs, topo)
+        self.assertEqual(
+            json.loads(topo_order_path_for(self.wbs).read_text())["order"], ["A", "B", "C"]
+        )
+
+        with mock.patch.object(topo_order, "dependency_index") as rebuilt:
+            reloaded = load_topo_order(self.wbs, self.definition)
+        rebuilt.assert_not_called()
+        self.assertEqual(reloaded.order, ["A", "B", "C"])
+
+        self.definition["dependencies"]["A"] = ["C"]
+        self.assertIsNone(load_topo_order(self.wbs, self.definition))  # hand-edited into a cycle
+
+
+class ClaimCycleCheckTests(unittest.TestCase):
+    def test_cached_acyclic_flag_skips_graph_walk(self):
+        state = {"packets": {"A": {"status": "done"}, "B": {"status": "pending"}}}
+        with mock.patch.object(
+            validation, "detect_dependency_cycle", wraps=detect_dependency_cycle
+        ) as walk:
+            ok, _, trace = validate_claim_pipeline("B", {"B": ["A"]}, state, acyclic=True)
+            self.assertTrue(ok)
+            walk.assert_not_called()
+            validate_claim_pipeline("B", {"B": ["A"]}, state)
+            self.assertEqual(walk.call_count, 1)
+        self.assertIn("invariant_cycle_check", trace)
+
+
+if __name__ == "__main__":
+    unittest.main()